@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+"""
+Read-path benchmark for the users service.
+Measures CPU time and peak Python memory per request for the group list
+(get_all_groups) and group member list (get_group_members), comparing the
+current read path (column-only selects into __slots__ rows, read-only
+session) with the previous handlers (full ORM hydration in a read/write
+session), which are mounted alongside under /legacy for the comparison.
+
+Runs in-process against a scratch SQLite database seeded with
+--groups x --members rows (or DATABASE_TEST_URL if set).
+
+Usage:
+    python benchmark_read_path.py [--groups 500] [--members 60] [--requests 30]
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+
+SERVICE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'services', 'users')
+
+
+def print_header(title):
+    """Print section header."""
+    print(f"\n{'='*80}")
+    print(title)
+    print('='*80)
+
+
+def legacy_blueprint():
+    """The list handlers as they were before the read path, for comparison."""
+    from flask import Blueprint, jsonify, request
+    from project.api.models import SavingsGroup, GroupMember
+    from project.api.read_routing import allows_writes
+
+    legacy = Blueprint('legacy_read_path', __name__)
+
+    @legacy.route('/savings-groups', methods=['GET'])
+    @allows_writes
+    def get_all_groups():
+        limit = request.args.get('limit', 50, type=int)
+        offset = request.args.get('offset', 0, type=int)
+        groups = SavingsGroup.query.limit(limit).offset(offset).all()
+        total = SavingsGroup.query.count()
+        groups_list = []
+        for group in groups:
+            actual_member_count = GroupMember.query.filter_by(group_id=group.id).count()
+            groups_list.append({
+                'id': group.id, 'name': group.name, 'description': group.description,
+                'status': group.status or group.state, 'country': group.country, 'region': group.region,
+                'district': group.district, 'parish': group.parish, 'village': group.village,
+                'meeting_location': group.meeting_location, 'meeting_day': group.meeting_day,
+                'meeting_frequency': group.meeting_frequency,
+                'meeting_time': group.meeting_time.isoformat() if group.meeting_time else None,
+                'formation_date': group.formation_date.isoformat() if group.formation_date else None,
+                'currency': group.currency, 'share_value': str(group.share_value or 0),
+                'total_members': actual_member_count, 'max_members': group.max_members,
+                'total_savings': str(group.savings_balance or 0),
+                'created_date': group.created_date.isoformat() if group.created_date else None
+            })
+        return jsonify({'status': 'success',
+                        'data': {'groups': groups_list, 'count': len(groups_list), 'total': total}}), 200
+
+    @legacy.route('/savings-groups/<int:group_id>/members', methods=['GET'])
+    @allows_writes
+    def get_group_members(group_id):
+        members = GroupMember.query.filter_by(group_id=group_id).all()
+        members_list = []
+        for member in members:
+            members_list.append({
+                'id': member.id, 'first_name': member.first_name, 'last_name': member.last_name,
+                'email': member.email, 'phone_number': member.phone_number, 'role': member.role,
+                'status': member.status, 'share_balance': str(member.share_balance or 0),
+                'total_contributions': str(member.total_contributions or 0),
+                'attendance_percentage': float(member.attendance_percentage or 0),
+                'is_eligible_for_loans': member.is_eligible_for_loans
+            })
+        return jsonify({'status': 'success', 'data': {'members': members_list, 'count': len(members_list)}}), 200
+
+    return legacy
+
+
+def seed(db, groups, members):
+    """Bulk insert groups with members."""
+    from project.api.models import User, SavingsGroup, GroupMember
+
+    user = User('bench', 'bench@example.com', 'bench-password')
+    user.admin = True
+    db.session.add(user)
+    db.session.flush()
+    db.session.execute(SavingsGroup.__table__.insert(), [{
+        'name': f'Group {g}', 'group_code': f'BENCH{g:05d}', 'description': 'Benchmark group',
+        'district': 'Kampala', 'parish': 'Central', 'village': f'Village {g % 40}', 'created_by': user.id,
+        'status': 'ACTIVE', 'currency': 'UGX', 'meeting_frequency': 'WEEKLY',
+    } for g in range(groups)])
+    group_ids = [row[0] for row in db.session.execute(db.text('SELECT id FROM savings_groups ORDER BY id'))]
+    db.session.execute(GroupMember.__table__.insert(), [{
+        'group_id': group_id, 'first_name': f'Member{m}', 'last_name': f'G{group_id}',
+        'phone_number': f'+2567{group_id:04d}{m:04d}', 'role': 'MEMBER', 'status': 'ACTIVE',
+        'share_balance': 1000 * m, 'total_contributions': 1500 * m, 'attendance_percentage': 80,
+    } for group_id in group_ids for m in range(members)])
+    db.session.commit()
+    token = user.encode_token(user.id)
+    return group_ids, token.decode() if isinstance(token, bytes) else token
+
+
+def measure(client, url, headers, requests):
+    """Median CPU ms and peak traced KB per request."""
+    client.get(url, headers=headers)  # warm up
+    cpu_ms, peak_kb = [], []
+    for _ in range(requests):
+        tracemalloc.start()
+        start = time.process_time()
+        response = client.get(url, headers=headers)
+        cpu_ms.append((time.process_time() - start) * 1000)
+        peak_kb.append(tracemalloc.get_traced_memory()[1] / 1024)
+        tracemalloc.stop()
+        if response.status_code != 200:
+            print(f"❌ {url} returned {response.status_code}: {response.get_data(as_text=True)[:200]}")
+            sys.exit(1)
+    return statistics.median(cpu_ms), statistics.median(peak_kb), response.get_json()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the GET read path')
+    parser.add_argument('--groups', type=int, default=500, help='Groups to seed')
+    parser.add_argument('--members', type=int, default=60, help='Members per group')
+    parser.add_argument('--limit', type=int, default=50, help='Page size for the group list')
+    parser.add_argument('--requests', type=int, default=30, help='Timed requests per endpoint')
+    args = parser.parse_args()
+
+    scratch = tempfile.NamedTemporaryFile(suffix='.db', delete=False)
+    os.environ.setdefault('APP_SETTINGS', 'project.config.TestingConfig')
+    os.environ.setdefault('DATABASE_TEST_URL', f'sqlite:///{scratch.name}')
+    sys.path.insert(0, SERVICE_DIR)
+    from project import create_app, db
+
+    app = create_app()
+    app.register_blueprint(legacy_blueprint(), url_prefix='/legacy')
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        print_header(f"SEEDING {args.groups} groups x {args.members} members")
+        group_ids, token = seed(db, args.groups, args.members)
+        db.session.remove()
+
+    headers = {'Authorization': f'Bearer {token}'}
+    client = app.test_client()
+    endpoints = [
+        ('get_all_groups', f'/api/savings-groups?limit={args.limit}', f'/legacy/savings-groups?limit={args.limit}'),
+        ('get_group_members', f'/api/savings-groups/{group_ids[0]}/members',
+         f'/legacy/savings-groups/{group_ids[0]}/members'),
+    ]
+
+    failed = False
+    for name, url, legacy_url in endpoints:
+        print_header(f"{name} x {args.requests} requests")
+        legacy_cpu, legacy_kb, legacy_body = measure(client, legacy_url, headers, args.requests)
+        cpu, kb, body = measure(client, url, headers, args.requests)
+        same = legacy_body == body
+        print(f"   {'':18s} {'CPU ms/request':>16s} {'peak KB/request':>16s}")
+        print(f"   {'ORM hydration':18s} {legacy_cpu:16.2f} {legacy_kb:16.0f}")
+        print(f"   {'read path':18s} {cpu:16.2f} {kb:16.0f}")
+        print(f"   {'reduction':18s} {(1 - cpu / legacy_cpu) * 100:15.0f}% {(1 - kb / legacy_kb) * 100:15.0f}%")
+        print(f"   {'✅' if same else '❌'} responses {'identical' if same else 'differ'}")
+        failed = failed or not same
+
+    os.unlink(scratch.name)
+    if not failed:
+        print("\n✅ Read-path benchmark complete")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Cold-start benchmark for the users service.
+Measures how long `create_app()` takes in a fresh interpreter (what every
+gunicorn worker pays on boot) using `python -X importtime`, and fails if a
+heavy media library is imported eagerly.
+
+Usage:
+    python benchmark_startup.py [--runs 5] [--top 15] [--budget-ms 1500]
+"""
+
+import argparse
+import os
+import re
+import statistics
+import subprocess
+import sys
+import time
+
+SERVICE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'services', 'users')
+
+BOOT_SNIPPET = "from project import create_app; create_app()"
+
+# Libraries that must only load on first use (see project/api/media_backends.py)
+LAZY_MODULES = ['PIL', 'PyPDF2', 'pdf2image', 'moviepy', 'magic', 'zstandard', 'numpy']
+
+IMPORTTIME_LINE = re.compile(r'^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)$')
+
+
+def print_header(title):
+    """Print section header."""
+    print(f"\n{'='*80}")
+    print(title)
+    print('='*80)
+
+
+def run_boot(env):
+    """Boot the app once in a fresh interpreter; return (wall_ms, importtime entries)."""
+    start = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', BOOT_SNIPPET],
+        cwd=SERVICE_DIR, env=env, capture_output=True, text=True
+    )
+    wall_ms = (time.perf_counter() - start) * 1000
+
+    if result.returncode != 0:
+        print(f"❌ create_app() failed:\n{result.stderr[-2000:]}")
+        sys.exit(1)
+
+    entries = []
+    for line in result.stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, module = match.groups()
+            entries.append((module, int(self_us), int(cumulative_us), len(indent) // 2))
+    return wall_ms, entries
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark create_app() cold boot')
+    parser.add_argument('--runs', type=int, default=5, help='Number of cold boots to time')
+    parser.add_argument('--top', type=int, default=15, help='Slowest top-level imports to list')
+    parser.add_argument('--budget-ms', type=float, default=None, help='Fail if median boot exceeds this')
+    args = parser.parse_args()
+
+    env = dict(os.environ)
+    env.setdefault('APP_SETTINGS', 'project.config.TestingConfig')
+
+    print_header(f"COLD START: create_app() x {args.runs}")
+    wall_times = []
+    entries = []
+    for i in range(args.runs):
+        wall_ms, entries = run_boot(env)
+        wall_times.append(wall_ms)
+        print(f"   run {i + 1}: {wall_ms:.0f} ms")
+
+    median_ms = statistics.median(wall_times)
+    import_ms = sum(e[1] for e in entries) / 1000
+    print(f"\n   median wall time: {median_ms:.0f} ms (interpreter + imports + create_app)")
+    print(f"   import time (last run): {import_ms:.0f} ms across {len(entries)} modules")
+
+    print_header("SLOWEST TOP-LEVEL IMPORTS (cumulative, last run)")
+    top_level = sorted((e for e in entries if e[3] == 0), key=lambda e: e[2], reverse=True)
+    for module, _, cumulative_us, _ in top_level[:args.top]:
+        print(f"   {cumulative_us / 1000:8.1f} ms  {module}")
+
+    print_header("LAZY MEDIA BACKENDS")
+    imported = {e[0].split('.')[0] for e in entries}
+    eager = [m for m in LAZY_MODULES if m in imported]
+    for module in LAZY_MODULES:
+        print(f"   {'❌ imported at boot' if module in eager else '✅ deferred':20s} {module}")
+
+    failed = False
+    if eager:
+        print(f"\n❌ Heavy modules imported during create_app(): {', '.join(eager)}")
+        failed = True
+    if args.budget_ms is not None and median_ms > args.budget_ms:
+        print(f"\n❌ Median boot {median_ms:.0f} ms exceeds budget {args.budget_ms:.0f} ms")
+        failed = True
+
+    if not failed:
+        print("\n✅ Startup benchmark passed")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
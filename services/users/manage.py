@@ -2,6 +2,7 @@
 """Management script for Flask application."""
 import sys
 import os
+import click
 from flask.cli import FlaskGroup
 from flask_migrate import Migrate
 from project import create_app, db
@@ -90,6 +91,277 @@ def create_super_admin():
         print('ℹ️  Super admin already exists')
 
 
+@cli.command('recompress_documents')
+@click.option('--batch-size', default=100, help='Rows processed per commit')
+@click.option('--limit', default=None, type=int, help='Maximum documents to examine')
+@click.option('--dry-run', is_flag=True, help='Only count documents that would be examined')
+def recompress_documents_command(batch_size, limit, dry_run):
+    """Re-apply the compression policy to existing stored documents."""
+    from project.api.compression_jobs import recompress_documents
+
+    print('🗜️  Recompressing stored documents...')
+    stats = recompress_documents(batch_size=batch_size, limit=limit, dry_run=dry_run)
+    for table, table_stats in stats.items():
+        print(f"  {table}: examined {table_stats['examined']}, "
+              f"recompressed {table_stats['recompressed']}, "
+              f"missing {table_stats['missing']}, failed {table_stats['failed']}, "
+              f"saved {round(table_stats['bytes_saved'] / (1024 * 1024), 2)} MB")
+    print('✅ Recompression complete' if not dry_run else 'ℹ️  Dry run, no files changed')
+
+
+@cli.command('compression_stats')
+def compression_stats():
+    """Show compression effectiveness per MIME type."""
+    from project.api.compression_jobs import get_compression_stats
+    from project.api.read_routing import read_from_replica
+
+    with read_from_replica():
+        stats = get_compression_stats()
+    for entry in stats:
+        print(f"  {entry['mime_type']}: {entry['file_count']} files, "
+              f"{entry['compressed_count']} compressed, "
+              f"avg ratio {entry['avg_compression_ratio']}%, "
+              f"saved {round(entry['space_saved'] / (1024 * 1024), 2)} MB")
+
+
+@cli.command('train_compression_dictionary')
+@click.option('--max-samples', default=2000, help='Maximum documents to sample')
+def train_compression_dictionary_command(max_samples):
+    """Train a zstd dictionary from small CSV/TXT documents."""
+    from project.api.compression_jobs import train_compression_dictionary
+
+    dict_id = train_compression_dictionary(max_samples=max_samples)
+    if dict_id:
+        print(f'✅ Trained compression dictionary {dict_id}')
+    else:
+        print('⚠️  Not enough samples (or zstandard not installed); no dictionary trained')
+
+
+@cli.command('reconcile_storage_usage')
+@click.option('--workers', default=8, help='Directory-scanning threads')
+@click.option('--dry-run', is_flag=True, help='Report drift without correcting it')
+def reconcile_storage_usage(workers, dry_run):
+    """Re-walk the upload tree and correct storage usage ledger drift (nightly or by hand)."""
+    from project.api.file_storage_service import get_file_storage_service
+
+    print('📊 Reconciling storage usage ledger...')
+    stats = get_file_storage_service().reconcile_storage_usage(max_workers=workers, dry_run=dry_run)
+    print(f"  Entities scanned: {stats['entities_scanned']}")
+    print(f"  Rows corrected: {stats['rows_corrected']}, rollups corrected: {stats['rollups_corrected']} "
+          f"(files {stats['file_count_drift']:+d}, bytes {stats['size_drift']:+d})")
+    print('✅ Storage usage reconciled' if not dry_run else 'ℹ️  Dry run, ledger unchanged')
+
+
+@cli.command('cleanup_orphaned_files')
+@click.option('--execute', is_flag=True, help='Actually remove orphans (default is a dry run)')
+@click.option('--delete', 'hard_delete', is_flag=True, help='Delete orphans instead of quarantining them')
+@click.option('--grace-period', default=3600, help='Skip files modified within this many seconds')
+@click.option('--retention-days', default=30, help='Keep files of soft-deleted documents this long')
+@click.option('--batch-size', default=500, help='Paths checked per database query')
+@click.option('--rate', default=None, type=float, help='Maximum files removed per second')
+@click.option('--purge-quarantine-days', default=None, type=int,
+              help='Also purge quarantine folders older than this many days')
+def cleanup_orphaned_files(execute, hard_delete, grace_period, retention_days, batch_size, rate,
+                           purge_quarantine_days):
+    """Garbage-collect upload files no document references."""
+    from project.api.file_storage_service import get_file_storage_service
+    from project.api.storage_gc import OrphanedFileCollector
+
+    storage_service = get_file_storage_service()
+    print('🧹 Scanning for orphaned files...')
+    stats = storage_service.cleanup_orphaned_files(
+        dry_run=not execute,
+        quarantine=not hard_delete,
+        grace_period_seconds=grace_period,
+        retention_days=retention_days,
+        batch_size=batch_size,
+        max_files_per_second=rate
+    )
+    print(f"  Files scanned: {stats['files_scanned']} ({stats['files_in_grace_period']} in grace period)")
+    print(f"  Orphans found: {stats['orphans_found']} ({stats['orphan_bytes_mb']} MB)")
+    print(f"  Orphans {'quarantined' if not hard_delete else 'deleted'}: {stats['orphans_removed']}")
+    print(f"  Temp files removed: {stats['temp_files_removed']}, failures: {stats['failed']}")
+
+    if purge_quarantine_days is not None:
+        OrphanedFileCollector(storage_service.base_upload_folder, dry_run=not execute) \
+            .purge_quarantine(purge_quarantine_days)
+
+    print('✅ Cleanup complete' if execute else 'ℹ️  Dry run, nothing removed (use --execute)')
+
+
+@cli.command('regenerate_loan_schedules')
+@click.option('--group-id', default=None, type=int, help='Only regenerate loans of this group')
+@click.option('--batch-size', default=1000, help='Loans computed and committed per batch')
+def regenerate_loan_schedules_command(group_id, batch_size):
+    """Rebuild loan_installments for every approved/disbursed loan."""
+    from project.api.loan_schedule import regenerate_loan_schedules
+
+    print('📅 Regenerating loan schedules...')
+    stats = regenerate_loan_schedules(
+        group_id=group_id,
+        batch_size=batch_size,
+        progress=lambda loans, installments: print(f"  {loans} loans, {installments} installments")
+    )
+    print(f"✅ Regenerated {stats['installments']} installments for {stats['loans']} loans")
+    if stats['skipped']:
+        print(f"⚠️  Skipped {stats['skipped']} loans whose schedule does not match total_amount_due: "
+              f"{', '.join(str(loan_id) for loan_id in stats['skipped_loan_ids'])}")
+
+
+@cli.command('update_loan_delinquency')
+@click.option('--as-of', default=None, help='Measure arrears at this date (YYYY-MM-DD, default today)')
+@click.option('--chunk-size', default=5000, help='Loans evaluated and committed per chunk')
+def update_loan_delinquency_command(as_of, chunk_size):
+    """Recompute days_overdue, payments_missed and payments_made for active loans (nightly)."""
+    import datetime
+    import time
+    from project.api.loan_delinquency import update_loan_delinquency
+
+    as_of_date = datetime.date.fromisoformat(as_of) if as_of else datetime.date.today()
+    started = time.perf_counter()
+    print(f'📊 Updating loan delinquency as of {as_of_date.isoformat()}...')
+    stats = update_loan_delinquency(
+        as_of=as_of_date,
+        chunk_size=chunk_size,
+        progress=lambda s: print(f"  chunk {s['chunks']}: {s['loans_processed']} loans processed, "
+                                 f"{s['loans_updated']} updated, {s['loans_overdue']} overdue")
+    )
+    print(f"✅ {stats['loans_processed']} loans processed ({stats['loans_overdue']} overdue) "
+          f"in {time.perf_counter() - started:.1f}s")
+
+
+@cli.command('portfolio_at_risk_report')
+@click.option('--refresh', is_flag=True, help="Recompute today's report even if a snapshot exists")
+def portfolio_at_risk_report(refresh):
+    """Generate and store today's PAR30/60/90 aging report (monthly, after update_loan_delinquency)."""
+    from project.api.portfolio_report import get_portfolio_at_risk
+    from project.api.read_routing import read_from_replica
+
+    print('📊 Generating portfolio-at-risk report...')
+    with read_from_replica() as replica:
+        if replica:
+            print(f'  Reading from {replica}')
+        report = get_portfolio_at_risk(refresh=refresh)
+    portfolio = report['portfolio']
+    print(f"  Report date: {report['report_date']}")
+    print(f"  Groups: {portfolio['groups']}, active loans: {portfolio['active_loans']}, "
+          f"outstanding: {portfolio['outstanding_balance']:,.2f}")
+    for days in (30, 60, 90):
+        par = portfolio[f'par{days}']
+        print(f"  PAR{days}: {par['ratio']:.2f}% ({par['balance']:,.2f} in {par['loans']} loans)")
+    for region in report['regions']:
+        print(f"  {region['region']}: PAR30 {region['par30']['ratio']:.2f}% of {region['outstanding_balance']:,.2f}")
+    print('✅ Report stored')
+
+
+@cli.command('score_loan_eligibility')
+@click.option('--group-id', default=None, type=int, help='Only assess members of this group')
+def score_loan_eligibility(group_id):
+    """Write a LoanAssessment for every active member (all groups by default)."""
+    from project.api.loan_scoring import run_loan_scoring
+
+    print('📊 Scoring loan eligibility...')
+    stats = run_loan_scoring([group_id] if group_id else None)
+    print(f"✅ {stats['members_assessed']} members assessed, {stats['members_eligible']} eligible")
+
+
+@cli.command('recompute_member_counters')
+@click.option('--group-id', default=None, type=int, help='Only recompute members of this group')
+def recompute_member_counters_command(group_id):
+    """Rebuild attendance_percentage, total_contributions and share_balance from history."""
+    from project.api.member_counters import recompute_member_counters
+
+    print('📊 Recomputing member counters...')
+    updated = recompute_member_counters(group_id=group_id)
+    db.session.commit()
+    print(f'✅ {updated} members updated')
+
+
+@cli.command('recompute_meeting_summaries')
+@click.option('--group-id', default=None, type=int, help='Only recompute meetings of this group')
+@click.option('--meeting-id', 'meeting_ids', multiple=True, type=int, help='Recompute these meetings (repeatable)')
+def recompute_meeting_summaries_command(group_id, meeting_ids):
+    """Recompute MeetingSummary rows of completed meetings (safe to re-run)."""
+    from project.api.meeting_summary import recompute_meeting_summaries
+
+    print('📊 Recomputing meeting summaries...')
+    done = recompute_meeting_summaries(
+        meeting_ids=list(meeting_ids) or None,
+        group_id=group_id,
+        progress=lambda n: print(f'  {n} meetings recomputed')
+    )
+    print(f'✅ {done} meeting summaries recomputed')
+
+
+
+@cli.command('archive_closed_cycles')
+@click.option('--group-id', default=None, type=int, help='Only archive this group')
+@click.option('--keep-cycles', default=0, help='Closed saving cycles to keep in the hot tables')
+@click.option('--as-of', default=None, help='Decide the current cycle at this date (YYYY-MM-DD, default today)')
+def archive_closed_cycles_command(group_id, keep_cycles, as_of):
+    """Move transactions, attendance, fines and repayments of closed saving cycles to the archive."""
+    import datetime
+    from project.api.archival import archive_closed_cycles
+
+    print('🗄️  Archiving closed saving cycles...')
+    stats = archive_closed_cycles(
+        group_ids=[group_id] if group_id else None,
+        keep_cycles=keep_cycles,
+        as_of=datetime.date.fromisoformat(as_of) if as_of else None,
+        progress=lambda group, moved: print(f"  group {group}: " + ', '.join(
+            f"{count} {table}" for table, count in moved.items()))
+    )
+    for table, count in stats['rows'].items():
+        print(f"  {table}: {count} rows archived")
+    print(f"✅ {stats['groups']} groups archived")
+
+
+@cli.command('share_out')
+@click.option('--month', required=True, help='Share out the saving cycles ending in this month (YYYY-MM)')
+@click.option('--group-id', default=None, type=int, help='Only this group')
+def share_out_command(month, group_id):
+    """Compute DRAFT share-outs for every group whose saving cycle ends in the month."""
+    import datetime
+    from project.api.share_out import closing_cycles, create_drafts
+
+    cycles = closing_cycles(datetime.datetime.strptime(month, '%Y-%m').date(),
+                            [group_id] if group_id else None)
+    print(f'💰 Computing share-outs for {len(cycles)} groups closing in {month}...')
+    drafts = create_drafts(cycles)
+    db.session.commit()
+    for share_out in drafts:
+        print(f"  group {share_out.group_id}: cycle {share_out.cycle_number}, {share_out.members_count} members, "
+              f"payout {share_out.total_payout} (profit {share_out.profit_pool})")
+    skipped = len(cycles) - len(drafts)
+    print(f"✅ {len(drafts)} drafts ready for review" + (f", {skipped} already posted" if skipped else ''))
+
+
+@cli.command('delete_group')
+@click.argument('group_id', type=int)
+@click.option('--yes', is_flag=True, help='Do not ask for confirmation')
+def delete_group_command(group_id, yes):
+    """Delete a group with all its meetings, members, savings, loans and documents."""
+    from project.api.cascade_delete import delete_group_records, remove_stored_files
+    from project.api.shared_cache import bump_group_version
+
+    group = SavingsGroup.query.get(group_id)
+    if not group:
+        print(f'❌ Group {group_id} not found')
+        return
+    if not yes:
+        click.confirm(f"Delete group '{group.name}' and all of its data?", abort=True)
+
+    print(f"🗑️  Deleting group '{group.name}'...")
+    result = delete_group_records(group_id)
+    db.session.commit()
+    bump_group_version(group_id)
+    print(f"  {result['rows_deleted']} rows deleted")
+
+    files = remove_stored_files(result['file_paths'], group_id, drop_group_ledger=True)
+    print(f"  {files['deleted_count']} files removed, {files['failed_count']} failed")
+    print('✅ Group deleted')
+
+
 if __name__ == '__main__':
     cli()
 
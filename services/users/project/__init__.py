@@ -4,10 +4,12 @@ from flask import Flask
 from flask_sqlalchemy import SQLAlchemy
 from flask_cors import CORS
 from flask_bcrypt import Bcrypt
+from project.api.read_routing import RoutingSession, init_read_routing
+from project.api.serialization import FastJSONProvider
 
 
 # Instantiate extensions
-db = SQLAlchemy()
+db = SQLAlchemy(session_options={'class_': RoutingSession})
 cors = CORS()
 bcrypt = Bcrypt()
 
@@ -17,6 +19,7 @@ def create_app(script_info=None):
     
     # Instantiate the app
     app = Flask(__name__)
+    app.json = FastJSONProvider(app)
     
     # Set config
     app_settings = os.getenv('APP_SETTINGS', 'project.config.DevelopmentConfig')
@@ -26,6 +29,7 @@ def create_app(script_info=None):
     db.init_app(app)
     cors.init_app(app, resources={r"/*": {"origins": "*"}})
     bcrypt.init_app(app)
+    init_read_routing(app)
     
     # Register blueprints
     from project.api.auth import auth_blueprint
@@ -40,6 +44,8 @@ def create_app(script_info=None):
     from project.api.transaction_documents import transaction_documents_blueprint
     from project.api.group_documents import group_documents_blueprint
     from project.api.remote_payments import remote_payments_blueprint
+    from project.api.reports import reports_blueprint
+    from project.api.share_outs import share_outs_blueprint
     from project.api.ping import ping_blueprint
 
     app.register_blueprint(auth_blueprint, url_prefix='/api/auth')
@@ -54,6 +60,8 @@ def create_app(script_info=None):
     app.register_blueprint(transaction_documents_blueprint, url_prefix='/api/transaction-documents')
     app.register_blueprint(group_documents_blueprint, url_prefix='/api')
     app.register_blueprint(remote_payments_blueprint, url_prefix='/api')
+    app.register_blueprint(reports_blueprint, url_prefix='/api/reports')
+    app.register_blueprint(share_outs_blueprint, url_prefix='/api')
     app.register_blueprint(ping_blueprint)
     
     # Shell context for flask cli
@@ -0,0 +1,155 @@
+"""
+Archival
+Cold storage for closed saving cycles. saving_transactions,
+meeting_attendance, member_fines and loan_repayments each have a
+<table>_archive twin with the same columns (models.ARCHIVE_TABLES). On
+PostgreSQL the archive is range-partitioned on the row's date, one
+partition per year plus a default partition (startup.sh creates the
+parent, partitions are added here as rows arrive); elsewhere it is a plain
+table created with the rest of the schema.
+
+archive_closed_cycles() moves every row dated before the start of its
+group's current saving cycle out of the hot tables, so the hot tables and
+their indexes only grow with the open cycle. Pending payments, unpaid
+fines and repayments of loans still running are never archived.
+
+Code reading history (counters, summaries, reports) selects from
+HISTORY_SQL / history_table(), which UNION ALL the hot and archived rows.
+"""
+import datetime
+from typing import Callable, Dict, Iterable, NamedTuple, Optional
+from sqlalchemy import select, union_all
+from project import db
+from project.api.models import ARCHIVE_TABLES
+from project.api.saving_cycles import current_cycles
+
+
+class ArchiveSpec(NamedTuple):
+    date_column: str
+    owned_by_group: str  # rows of :group_id
+    settled: Optional[str] = None  # rows that may no longer change
+
+
+ARCHIVE_SPECS = {
+    'saving_transactions': ArchiveSpec(
+        'transaction_date',
+        "member_saving_id IN (SELECT ms.id FROM member_savings ms "
+        "JOIN group_members gm ON gm.id = ms.member_id WHERE gm.group_id = :group_id)",
+        "verification_status <> 'PENDING'",
+    ),
+    'meeting_attendance': ArchiveSpec('meeting_date', "group_id = :group_id"),
+    'member_fines': ArchiveSpec(
+        'fine_date',
+        "member_id IN (SELECT id FROM group_members WHERE group_id = :group_id)",
+        "is_paid = TRUE",
+    ),
+    'loan_repayments': ArchiveSpec(
+        'repayment_date',
+        "loan_id IN (SELECT id FROM group_loans WHERE group_id = :group_id AND status IN ('PAID', 'COMPLETED'))",
+    ),
+}
+
+PARTITIONED_SQL = db.text("SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass(:table_name)")
+
+
+def _columns(table_name: str) -> str:
+    return ', '.join(column.name for column in ARCHIVE_TABLES[table_name].columns)
+
+
+def _history_sql(table_name: str) -> str:
+    columns = _columns(table_name)
+    return f"(SELECT {columns} FROM {table_name} UNION ALL SELECT {columns} FROM {table_name}_archive)"
+
+
+# Raw-SQL sources over hot and archived rows: FROM {HISTORY_SQL['member_fines']} mf
+HISTORY_SQL = {table_name: _history_sql(table_name) for table_name in ARCHIVE_TABLES}
+
+
+def history_table(model):
+    """Core selectable over the hot and archived rows of a model, for ORM queries."""
+    table = model.__table__
+    archive = ARCHIVE_TABLES[table.name]
+    return union_all(select(*table.columns), select(*archive.columns)).subquery(f'{table.name}_history')
+
+
+def _move_condition(spec: ArchiveSpec) -> str:
+    date_expr = f"COALESCE({spec.date_column}, DATE(created_date))"
+    condition = f"{spec.owned_by_group} AND {date_expr} < :cutoff"
+    return f"{condition} AND {spec.settled}" if spec.settled else condition
+
+
+def _is_partitioned(table_name: str) -> bool:
+    if db.session.get_bind().dialect.name != 'postgresql':
+        return False
+    return db.session.execute(PARTITIONED_SQL, {'table_name': f'{table_name}_archive'}).first() is not None
+
+
+def _ensure_year_partitions(table_name: str, spec: ArchiveSpec, condition: str, params: Dict):
+    """Create the yearly partitions the rows about to be moved fall in."""
+    years = db.session.execute(db.text(
+        f"SELECT DISTINCT CAST(EXTRACT(YEAR FROM {spec.date_column}) AS INTEGER) "
+        f"FROM {table_name} WHERE {condition} AND {spec.date_column} IS NOT NULL"
+    ), params).scalars().all()
+    for year in years:
+        db.session.execute(db.text(
+            f"CREATE TABLE IF NOT EXISTS {table_name}_archive_{year} PARTITION OF {table_name}_archive "
+            f"FOR VALUES FROM ('{year}-01-01') TO ('{year + 1}-01-01')"
+        ))
+
+
+def _move_rows(table_name: str, params: Dict, partitioned: bool) -> int:
+    spec = ARCHIVE_SPECS[table_name]
+    condition = _move_condition(spec)
+    columns = _columns(table_name)
+
+    if partitioned:
+        _ensure_year_partitions(table_name, spec, condition, params)
+    if db.session.get_bind().dialect.name == 'postgresql':
+        result = db.session.execute(db.text(
+            f"WITH moved AS (DELETE FROM {table_name} WHERE {condition} RETURNING {columns}) "
+            f"INSERT INTO {table_name}_archive ({columns}) SELECT {columns} FROM moved"
+        ), params)
+        return result.rowcount
+
+    # Writers are serialized on SQLite, so copy-then-delete cannot lose rows
+    result = db.session.execute(db.text(
+        f"INSERT INTO {table_name}_archive ({columns}) SELECT {columns} FROM {table_name} WHERE {condition}"
+    ), params)
+    db.session.execute(db.text(f"DELETE FROM {table_name} WHERE {condition}"), params)
+    return result.rowcount
+
+
+def archive_closed_cycles(group_ids: Optional[Iterable[int]] = None, keep_cycles: int = 0,
+                          as_of: Optional[datetime.date] = None,
+                          progress: Optional[Callable[[int, Dict], None]] = None) -> Dict:
+    """
+    Move rows of closed saving cycles into the archive tables, committing
+    once per group.
+
+    Args:
+        group_ids: Only archive these groups (default all)
+        keep_cycles: Closed cycles to leave in the hot tables
+        as_of: Date that decides which cycle is current (default today)
+        progress: Called with (group_id, rows moved per table) after each group
+
+    Returns:
+        Dictionary with groups archived and rows moved per table
+    """
+    partitioned = {table_name: _is_partitioned(table_name) for table_name in ARCHIVE_SPECS}
+    stats = {'groups': 0, 'rows': {table_name: 0 for table_name in ARCHIVE_SPECS}}
+
+    for group_id, cycle in sorted(current_cycles(group_ids, as_of).items()):
+        cutoff = cycle.shifted(-keep_cycles).start
+        if cutoff <= cycle.anchor:
+            continue
+        params = {'group_id': group_id, 'cutoff': cutoff}
+        moved = {table_name: _move_rows(table_name, params, partitioned[table_name]) for table_name in ARCHIVE_SPECS}
+        db.session.commit()
+
+        stats['groups'] += 1
+        for table_name, count in moved.items():
+            stats['rows'][table_name] += count
+        if progress:
+            progress(group_id, moved)
+
+    return stats
@@ -0,0 +1,47 @@
+"""
+Background Tasks
+Runs follow-up work (e.g. loan scoring after a meeting completes) on a small
+per-process thread pool, inside an application context, so it stays out of
+the request path. Tasks are best-effort: failures are logged, not raised.
+"""
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from flask import current_app
+from project import db
+
+
+MAX_WORKERS = 2
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix='background')
+    return _executor
+
+
+def run_in_background(func, *args, **kwargs) -> Future:
+    """
+    Run func(*args, **kwargs) on the background pool with an app context.
+
+    Must be called from within an application context; arguments should be
+    plain values (ids), not ORM objects bound to the request's session.
+    """
+    app = current_app._get_current_object()
+
+    def task():
+        with app.app_context():
+            try:
+                return func(*args, **kwargs)
+            except Exception:
+                db.session.rollback()
+                app.logger.exception('Background task %s failed', getattr(func, '__name__', func))
+            finally:
+                db.session.remove()
+
+    return _get_executor().submit(task)
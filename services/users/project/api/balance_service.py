@@ -0,0 +1,135 @@
+"""
+Balance Service
+All MemberSaving balance mutations go through here. Each one is a single
+atomic UPDATE computed from the row's current values in the database
+(current_balance = current_balance + :delta ... RETURNING), so concurrent
+writers never lose updates and the row lock is only held from the UPDATE
+to the caller's commit, not across Python work. Amounts are Decimal.
+"""
+import datetime
+from decimal import Decimal
+from typing import Dict, Iterable, Optional, Set, Tuple
+from sqlalchemy import Numeric
+from project import db
+
+
+MONEY = Numeric(12, 2)
+
+_BALANCE_DELTA_UPDATE = """
+    UPDATE member_savings
+    SET current_balance = COALESCE(current_balance, 0) + :balance_delta,
+        total_deposits = COALESCE(total_deposits, 0) + :deposit_delta,
+        total_withdrawals = COALESCE(total_withdrawals, 0) + :withdrawal_delta,
+        last_transaction_date = COALESCE(:transaction_date, last_transaction_date),
+        updated_date = :updated_date
+    WHERE id = :member_saving_id
+"""
+
+_MONEY_BINDS = (
+    db.bindparam('balance_delta', type_=MONEY),
+    db.bindparam('deposit_delta', type_=MONEY),
+    db.bindparam('withdrawal_delta', type_=MONEY),
+)
+
+BALANCE_DELTA_SQL = db.text(_BALANCE_DELTA_UPDATE + '    RETURNING current_balance\n') \
+    .bindparams(*_MONEY_BINDS).columns(current_balance=MONEY)
+
+# Executemany form for batches (RETURNING is not available with executemany)
+BALANCE_DELTAS_SQL = db.text(_BALANCE_DELTA_UPDATE).bindparams(*_MONEY_BINDS)
+
+
+SETTLE_PENDING_SQL = db.text("""
+    UPDATE saving_transactions
+    SET verification_status = :status,
+        verified_by = :verified_by,
+        verified_date = :verified_date,
+        notes = COALESCE(:notes, notes)
+    WHERE id IN :transaction_ids AND verification_status = 'PENDING'
+    RETURNING id
+""").bindparams(db.bindparam('transaction_ids', expanding=True))
+
+
+def _decimal(value) -> Decimal:
+    return value if isinstance(value, Decimal) else Decimal(str(value or 0))
+
+
+def apply_transaction(member_saving_id: int, transaction_type: str, amount,
+                      transaction_date: Optional[datetime.date] = None) -> Optional[Decimal]:
+    """
+    Apply a savings transaction to its account balance. A negative amount
+    reverses a previously applied transaction. Does not commit.
+
+    Returns:
+        The new current balance, or None if the account does not exist
+    """
+    amount = _decimal(amount)
+    if transaction_type == 'DEPOSIT':
+        balance_delta, deposit_delta, withdrawal_delta = amount, amount, Decimal('0')
+    elif transaction_type == 'WITHDRAWAL':
+        balance_delta, deposit_delta, withdrawal_delta = -amount, Decimal('0'), amount
+    else:
+        raise ValueError(f'Unknown transaction type: {transaction_type}')
+
+    return db.session.execute(BALANCE_DELTA_SQL, {
+        'member_saving_id': member_saving_id,
+        'balance_delta': balance_delta,
+        'deposit_delta': deposit_delta,
+        'withdrawal_delta': withdrawal_delta,
+        'transaction_date': transaction_date,
+        'updated_date': datetime.datetime.utcnow(),
+    }).scalar()
+
+
+def reverse_transaction(member_saving_id: int, transaction_type: str, amount) -> Optional[Decimal]:
+    """Undo apply_transaction for a transaction being edited or unverified. Does not commit."""
+    return apply_transaction(member_saving_id, transaction_type, -_decimal(amount))
+
+
+def apply_deltas(deltas: Dict[int, Tuple[Decimal, Decimal]],
+                 transaction_date: Optional[datetime.date] = None):
+    """
+    Apply summed (deposits, withdrawals) per account, one UPDATE per
+    account in a single executemany. Does not commit.
+    """
+    now = datetime.datetime.utcnow()
+    params = [{
+        'member_saving_id': member_saving_id,
+        'balance_delta': _decimal(deposits) - _decimal(withdrawals),
+        'deposit_delta': _decimal(deposits),
+        'withdrawal_delta': _decimal(withdrawals),
+        'transaction_date': transaction_date,
+        'updated_date': now,
+    } for member_saving_id, (deposits, withdrawals) in deltas.items()]
+    if params:
+        db.session.execute(BALANCE_DELTAS_SQL, params)
+
+
+def settle_pending_transactions(transaction_ids: Iterable[int], status: str, verified_by: int,
+                                notes: Optional[str] = None) -> Set[int]:
+    """
+    Move PENDING transactions to VERIFIED or REJECTED. Does not commit.
+
+    The status check and the change are one statement, so when two officers
+    settle the same payment at once exactly one succeeds; only that caller
+    may go on to apply the balance.
+
+    Returns:
+        Ids of the transactions this call settled
+    """
+    transaction_ids = list(transaction_ids)
+    if not transaction_ids:
+        return set()
+    result = db.session.execute(SETTLE_PENDING_SQL, {
+        'transaction_ids': transaction_ids,
+        'status': status,
+        'verified_by': verified_by,
+        'verified_date': datetime.datetime.utcnow(),
+        'notes': notes or None,
+    })
+    return {row[0] for row in result}
+
+
+def settle_pending_transaction(transaction_id: int, status: str, verified_by: int,
+                               notes: Optional[str] = None) -> bool:
+    """Settle one PENDING transaction; True if this call settled it. Does not commit."""
+    return bool(settle_pending_transactions([transaction_id], status, verified_by, notes))
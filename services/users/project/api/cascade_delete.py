@@ -0,0 +1,279 @@
+"""
+Cascade Delete
+Set-based deletion of a meeting, or of a whole group, with everything that
+hangs off it. Each child table is cleared by one
+DELETE ... WHERE x_id IN (SELECT ...) statement, so a delete is a fixed
+number of statements however many meetings, trainings, votes or documents
+are involved.
+
+Stored files are handled in two steps: their paths are collected with one
+UNION query before the document rows go, and after the caller commits a
+background worker removes them from disk (with thumbnails, previews and
+compressed copies) and updates the storage ledger. Files no row pointed at
+are left for cleanup_orphaned_files.
+"""
+import os
+from typing import Dict, List, Optional
+from project import db
+from project.api.archival import HISTORY_SQL
+from project.api.background import run_in_background
+from project.api.file_storage_service import get_file_storage_service
+
+
+# Files removed between ledger commits in the background worker
+FILE_BATCH_SIZE = 200
+
+MEETING_IDS = {
+    'meeting': "SELECT id FROM meetings WHERE id = :meeting_id",
+    'group': "SELECT id FROM meetings WHERE group_id = :group_id",
+}
+MEMBER_IDS = "SELECT id FROM group_members WHERE group_id = :group_id"
+
+# Transaction-document entities, as subqueries of the ids being deleted (archived
+# rows included). {meetings} and {members} are the MEETING_IDS / MEMBER_IDS subqueries.
+MEETING_DOCUMENT_ENTITIES = {
+    'meeting': "{meetings}",
+    'training': "SELECT id FROM training_records WHERE meeting_id IN ({meetings})",
+    'voting': "SELECT id FROM voting_records WHERE meeting_id IN ({meetings})",
+    'loan_repayment': f"SELECT id FROM {HISTORY_SQL['loan_repayments']} lr WHERE meeting_id IN ({{meetings}})",
+    'fine': f"SELECT id FROM {HISTORY_SQL['member_fines']} mf WHERE meeting_id IN ({{meetings}})",
+    'savings': f"SELECT id FROM {HISTORY_SQL['saving_transactions']} st WHERE meeting_id IN ({{meetings}})",
+}
+GROUP_DOCUMENT_ENTITIES = dict(MEETING_DOCUMENT_ENTITIES, **{
+    'group': "SELECT :group_id",
+    'member': "{members}",
+    'loan_repayment': f"""
+        SELECT id FROM {HISTORY_SQL['loan_repayments']} lr
+        WHERE meeting_id IN ({{meetings}})
+        OR loan_id IN (SELECT id FROM group_loans WHERE group_id = :group_id)
+    """,
+    'fine': f"SELECT id FROM {HISTORY_SQL['member_fines']} mf WHERE member_id IN ({{members}})",
+    'savings': f"""
+        SELECT id FROM {HISTORY_SQL['saving_transactions']} st
+        WHERE member_saving_id IN (SELECT id FROM member_savings WHERE member_id IN ({{members}}))
+    """,
+})
+
+ACTIVITY_IDS = "SELECT id FROM meeting_activities WHERE meeting_id IN ({meetings})"
+
+# Rows hanging off meetings, children before parents
+MEETING_DELETES = (
+    "DELETE FROM member_votes WHERE voting_record_id IN "
+    "(SELECT id FROM voting_records WHERE meeting_id IN ({meetings}))",
+    "DELETE FROM training_attendance WHERE training_id IN "
+    "(SELECT id FROM training_records WHERE meeting_id IN ({meetings}))",
+    f"DELETE FROM member_activity_participation WHERE activity_id IN ({ACTIVITY_IDS})",
+    f"DELETE FROM activity_documents WHERE activity_id IN ({ACTIVITY_IDS})",
+    "DELETE FROM meeting_activities WHERE meeting_id IN ({meetings})",
+    "DELETE FROM voting_records WHERE meeting_id IN ({meetings})",
+    "DELETE FROM training_records WHERE meeting_id IN ({meetings})",
+    "DELETE FROM meeting_attendance WHERE meeting_id IN ({meetings})",
+    "DELETE FROM meeting_attendance_archive WHERE meeting_id IN ({meetings})",
+    "DELETE FROM saving_transactions WHERE meeting_id IN ({meetings})",
+    "DELETE FROM saving_transactions_archive WHERE meeting_id IN ({meetings})",
+    "DELETE FROM member_fines WHERE meeting_id IN ({meetings})",
+    "DELETE FROM member_fines_archive WHERE meeting_id IN ({meetings})",
+    "DELETE FROM loan_repayments WHERE meeting_id IN ({meetings})",
+    "DELETE FROM loan_repayments_archive WHERE meeting_id IN ({meetings})",
+    "DELETE FROM meeting_summaries WHERE meeting_id IN ({meetings})",
+    "DELETE FROM meetings WHERE id IN ({meetings})",
+)
+
+# Rows owned by the group and its members, after its meetings are gone
+GROUP_DELETES = (
+    "UPDATE savings_groups SET chair_member_id = NULL, treasurer_member_id = NULL, "
+    "secretary_member_id = NULL WHERE id = :group_id",
+    "DELETE FROM member_votes WHERE member_id IN ({members})",
+    "DELETE FROM training_attendance WHERE member_id IN ({members})",
+    "DELETE FROM member_activity_participation WHERE member_id IN ({members})",
+    "DELETE FROM saving_transactions WHERE member_saving_id IN "
+    "(SELECT id FROM member_savings WHERE member_id IN ({members}))",
+    "DELETE FROM saving_transactions_archive WHERE member_saving_id IN "
+    "(SELECT id FROM member_savings WHERE member_id IN ({members}))",
+    "DELETE FROM member_savings WHERE member_id IN ({members})",
+    "DELETE FROM member_fines WHERE member_id IN ({members})",
+    "DELETE FROM member_fines_archive WHERE member_id IN ({members})",
+    "DELETE FROM loan_repayments WHERE loan_id IN (SELECT id FROM group_loans WHERE group_id = :group_id) "
+    "OR member_id IN ({members})",
+    "DELETE FROM loan_repayments_archive WHERE loan_id IN (SELECT id FROM group_loans WHERE group_id = :group_id) "
+    "OR member_id IN ({members})",
+    "DELETE FROM loan_installments WHERE group_id = :group_id",
+    "DELETE FROM group_loans WHERE group_id = :group_id",
+    "DELETE FROM loan_assessments WHERE member_id IN ({members})",
+    "DELETE FROM meeting_attendance WHERE group_id = :group_id OR member_id IN ({members})",
+    "DELETE FROM meeting_attendance_archive WHERE group_id = :group_id OR member_id IN ({members})",
+    "DELETE FROM member_achievements WHERE member_id IN ({members})",
+    "DELETE FROM social_reactions WHERE member_id IN ({members}) "
+    "OR post_id IN (SELECT id FROM social_posts WHERE group_id = :group_id) "
+    "OR comment_id IN (SELECT id FROM social_comments WHERE author_id IN ({members}) "
+    "OR post_id IN (SELECT id FROM social_posts WHERE group_id = :group_id))",
+    "DELETE FROM social_comments WHERE author_id IN ({members}) "
+    "OR post_id IN (SELECT id FROM social_posts WHERE group_id = :group_id)",
+    "DELETE FROM social_posts WHERE group_id = :group_id",
+    "DELETE FROM share_out_items WHERE share_out_id IN (SELECT id FROM share_outs WHERE group_id = :group_id)",
+    "DELETE FROM share_outs WHERE group_id = :group_id",
+    "DELETE FROM group_transactions WHERE group_id = :group_id",
+    "DELETE FROM group_cashbook WHERE group_id = :group_id",
+    "DELETE FROM group_mobile_money_accounts WHERE group_id = :group_id",
+    "DELETE FROM savings_group_iga WHERE group_id = :group_id",
+    "DELETE FROM group_settings WHERE group_id = :group_id",
+    "DELETE FROM group_saving_type_settings WHERE group_id = :group_id "
+    "OR saving_type_id IN (SELECT id FROM saving_types WHERE group_id = :group_id)",
+    "DELETE FROM saving_types WHERE group_id = :group_id",
+    "DELETE FROM group_documents WHERE group_id = :group_id",
+    "DELETE FROM group_sequences WHERE group_id = :group_id",
+    "DELETE FROM group_members WHERE group_id = :group_id",
+    "DELETE FROM savings_groups WHERE id = :group_id",
+)
+
+# Ledger rows of a deleted group, dropped once its files are gone
+DROP_GROUP_LEDGER_SQL = db.text("""
+    DELETE FROM storage_usage WHERE group_id = :group_id AND scope IN ('ENTITY', 'GROUP')
+""")
+
+
+class _Scope:
+    """The meetings (and for a group, members) a cascade operates on."""
+
+    def __init__(self, meeting_id: Optional[int] = None, group_id: Optional[int] = None):
+        self.kind = 'meeting' if meeting_id is not None else 'group'
+        self.params = {'meeting_id': meeting_id} if self.kind == 'meeting' else {'group_id': group_id}
+        self.fragments = {'meetings': MEETING_IDS[self.kind], 'members': MEMBER_IDS}
+
+    def sql(self, template: str) -> str:
+        return template.format(**self.fragments)
+
+    def transaction_document_filter(self) -> str:
+        entities = MEETING_DOCUMENT_ENTITIES if self.kind == 'meeting' else GROUP_DOCUMENT_ENTITIES
+        return ' OR '.join(
+            f"(entity_type = '{entity_type}' AND entity_id IN ({self.sql(subquery)}))"
+            for entity_type, subquery in entities.items()
+        )
+
+    def activity_document_filter(self) -> str:
+        return f"activity_id IN ({self.sql(ACTIVITY_IDS)})"
+
+    def file_query(self):
+        """One UNION query returning (file_path, file_size) of every document in scope."""
+        selects = [
+            f"SELECT file_path, file_size FROM transaction_documents WHERE {self.transaction_document_filter()}",
+            f"SELECT file_path, file_size FROM activity_documents WHERE {self.activity_document_filter()}",
+        ]
+        if self.kind == 'group':
+            selects.append("SELECT file_path, file_size FROM group_documents WHERE group_id = :group_id")
+        return db.text(' UNION ALL '.join(selects))
+
+
+def _collect_files(scope: _Scope) -> Dict:
+    rows = db.session.execute(scope.file_query(), scope.params).fetchall()
+    paths = sorted({row.file_path for row in rows if row.file_path})
+    return {'file_paths': paths, 'file_count': len(paths), 'total_size': sum(row.file_size or 0 for row in rows)}
+
+
+def _delete(scope: _Scope, statements) -> int:
+    rows_deleted = 0
+    for statement in statements:
+        result = db.session.execute(db.text(scope.sql(statement)), scope.params)
+        rows_deleted += max(result.rowcount or 0, 0)
+    return rows_deleted
+
+
+def _cascade(scope: _Scope, statements) -> Dict:
+    db.session.flush()
+    stats = _collect_files(scope)
+    stats['rows_deleted'] = _delete(
+        scope, (f"DELETE FROM transaction_documents WHERE {scope.transaction_document_filter()}",) + statements
+    )
+    return stats
+
+
+def delete_meeting_records(meeting_id: int) -> Dict:
+    """
+    Delete a meeting and every row hanging off it. Does not commit; pass
+    file_paths to remove_files_in_background after the commit.
+
+    Returns:
+        Dictionary with rows_deleted, file_paths, file_count and total_size
+    """
+    return _cascade(_Scope(meeting_id=meeting_id), MEETING_DELETES)
+
+
+def delete_group_records(group_id: int) -> Dict:
+    """
+    Delete a group with its meetings, members, savings, loans and documents.
+    Does not commit; pass file_paths to remove_files_in_background after
+    the commit (with drop_group_ledger=True).
+
+    Returns:
+        Dictionary with rows_deleted, file_paths, file_count and total_size
+    """
+    return _cascade(_Scope(group_id=group_id), MEETING_DELETES + GROUP_DELETES)
+
+
+def soft_delete_documents(user_id: int, meeting_id: Optional[int] = None, group_id: Optional[int] = None) -> Dict:
+    """
+    Mark every document of a meeting (or group) deleted, keeping the rows.
+    Does not commit; pass file_paths to remove_files_in_background after
+    the commit.
+
+    Returns:
+        Dictionary with file_paths, file_count and total_size
+    """
+    scope = _Scope(meeting_id=meeting_id, group_id=group_id)
+    db.session.flush()
+    stats = _collect_files(scope)
+    updates = [
+        f"UPDATE transaction_documents SET is_deleted = TRUE, deleted_at = CURRENT_TIMESTAMP, deleted_by = :user_id "
+        f"WHERE is_deleted IS NOT TRUE AND ({scope.transaction_document_filter()})",
+        f"UPDATE activity_documents SET is_deleted = TRUE, deleted_date = CURRENT_TIMESTAMP, deleted_by = :user_id "
+        f"WHERE is_deleted IS NOT TRUE AND {scope.activity_document_filter()}",
+    ]
+    if scope.kind == 'group':
+        updates.append("UPDATE group_documents SET is_deleted = TRUE, deleted_date = CURRENT_TIMESTAMP, "
+                       "deleted_by = :user_id WHERE is_deleted IS NOT TRUE AND group_id = :group_id")
+    params = dict(scope.params, user_id=user_id)
+    for update in updates:
+        db.session.execute(db.text(update), params)
+    return stats
+
+
+def remove_stored_files(file_paths: List[str], group_id: Optional[int] = None, drop_group_ledger: bool = False) -> Dict:
+    """
+    Remove files (with their thumbnails, previews and compressed copies)
+    and the directories they leave empty, updating the storage ledger.
+
+    Args:
+        file_paths: Paths collected before their document rows were deleted
+        group_id: Owning group, which can no longer be resolved from the entities
+        drop_group_ledger: Also drop the group's ledger rows (the group itself was deleted)
+    """
+    storage_service = get_file_storage_service()
+    deleted_count = failed_count = 0
+    directories = set()
+    for i, file_path in enumerate(file_paths, start=1):
+        if storage_service.delete_file(file_path, delete_related=True, group_id=group_id):
+            deleted_count += 1
+        else:
+            failed_count += 1
+        directories.add(os.path.dirname(file_path))
+        if i % FILE_BATCH_SIZE == 0:
+            db.session.commit()
+
+    if drop_group_ledger and group_id is not None:
+        db.session.execute(DROP_GROUP_LEDGER_SQL, {'group_id': group_id})
+    db.session.commit()
+
+    for directory in directories:
+        try:
+            os.rmdir(directory)
+        except OSError:
+            pass
+
+    return {'deleted_count': deleted_count, 'failed_count': failed_count}
+
+
+def remove_files_in_background(file_paths: List[str], group_id: Optional[int] = None,
+                               drop_group_ledger: bool = False):
+    """Hand remove_stored_files to the background pool; call after the delete commits."""
+    if file_paths or drop_group_ledger:
+        return run_in_background(remove_stored_files, list(file_paths), group_id, drop_group_ledger)
@@ -0,0 +1,290 @@
+"""
+Compression Codecs
+Pluggable gzip/zstd codecs with a per-MIME compression policy table.
+"""
+import os
+import gzip
+import glob
+import shutil
+import zlib
+from typing import Dict, List, Optional
+from project.api.media_backends import backends
+
+
+# Bytes read per chunk when streaming between files
+CHUNK_SIZE = 64 * 1024
+
+# Sample size used by the compressibility probe
+PROBE_SAMPLE_SIZE = 64 * 1024
+
+# Minimum saving (fraction of original size) for a compressed copy to be kept
+MIN_SAVING = 0.10
+
+
+# Per-MIME compression policy. Keys are exact MIME types or prefixes ending
+# in '/' or '.'; the most specific match wins. A policy of None means "never
+# compress" (already-compressed formats such as JPEG, MP4 and ZIP).
+#   codec:          'zstd' or 'gzip' (zstd falls back to gzip when unavailable)
+#   level:          codec compression level
+#   min_size:       files smaller than this are stored as-is
+#   probe:          run a sample-compress probe before compressing the whole file
+#   use_dictionary: compress with the trained zstd dictionary (small text receipts)
+COMPRESSION_POLICIES = {
+    'text/': {'codec': 'zstd', 'level': 9, 'min_size': 1024, 'probe': False, 'use_dictionary': True},
+    'image/svg+xml': {'codec': 'zstd', 'level': 9, 'min_size': 4096, 'probe': False, 'use_dictionary': False},
+    'image/bmp': {'codec': 'zstd', 'level': 6, 'min_size': 64 * 1024, 'probe': True, 'use_dictionary': False},
+    'image/': None,
+    'video/': None,
+    'audio/wav': {'codec': 'zstd', 'level': 3, 'min_size': 1024 * 1024, 'probe': True, 'use_dictionary': False},
+    'audio/': None,
+    'application/pdf': {'codec': 'zstd', 'level': 6, 'min_size': 256 * 1024, 'probe': True, 'use_dictionary': False},
+    'application/msword': {'codec': 'zstd', 'level': 6, 'min_size': 64 * 1024, 'probe': True, 'use_dictionary': False},
+    'application/vnd.ms-excel': {'codec': 'zstd', 'level': 6, 'min_size': 64 * 1024, 'probe': True, 'use_dictionary': False},
+    'application/json': {'codec': 'zstd', 'level': 9, 'min_size': 1024, 'probe': False, 'use_dictionary': True},
+    # OOXML and ODF documents are ZIP containers
+    'application/vnd.openxmlformats-officedocument.': None,
+    'application/vnd.oasis.opendocument.': None,
+    'application/zip': None,
+    'application/gzip': None,
+    'application/x-rar-compressed': None,
+    'application/x-7z-compressed': None,
+}
+
+# Policy for MIME types not listed above
+DEFAULT_POLICY = {'codec': 'gzip', 'level': 6, 'min_size': 5 * 1024 * 1024, 'probe': True, 'use_dictionary': False}
+
+
+def zstd_available() -> bool:
+    """Whether the optional zstandard backend is installed."""
+    return backends.is_available('zstd')
+
+
+def get_compression_policy(mime_type: Optional[str]) -> Optional[Dict]:
+    """
+    Look up the compression policy for a MIME type.
+
+    Args:
+        mime_type: MIME type of the stored file
+
+    Returns:
+        Policy dictionary, or None if the type should never be compressed
+    """
+    mime_type = (mime_type or '').lower()
+    if mime_type in COMPRESSION_POLICIES:
+        return COMPRESSION_POLICIES[mime_type]
+
+    best_prefix = None
+    for key in COMPRESSION_POLICIES:
+        if key.endswith(('/', '.')) and mime_type.startswith(key):
+            if best_prefix is None or len(key) > len(best_prefix):
+                best_prefix = key
+
+    if best_prefix is not None:
+        return COMPRESSION_POLICIES[best_prefix]
+    return DEFAULT_POLICY
+
+
+def probe_compressibility(file_path: str, sample_size: int = PROBE_SAMPLE_SIZE) -> float:
+    """
+    Estimate how well a file compresses by deflating samples from its start,
+    middle and end at the fastest zlib level.
+
+    Args:
+        file_path: Path to file
+        sample_size: Total number of bytes to sample
+
+    Returns:
+        Estimated compressed/original size ratio (1.0 = incompressible)
+    """
+    file_size = os.path.getsize(file_path)
+    if file_size == 0:
+        return 1.0
+
+    chunk = max(sample_size // 3, 1)
+    offsets = [0]
+    if file_size > sample_size:
+        offsets += [file_size // 2, max(file_size - chunk, 0)]
+    else:
+        chunk = file_size
+
+    sample = bytearray()
+    with open(file_path, 'rb') as f:
+        for offset in offsets:
+            f.seek(offset)
+            sample += f.read(chunk)
+
+    if not sample:
+        return 1.0
+    return len(zlib.compress(bytes(sample), 1)) / len(sample)
+
+
+class CompressionCodec:
+    """Base class for streaming file codecs."""
+
+    name = None
+    extension = None
+    default_level = 6
+
+    def compress(self, source_path: str, target_path: str, level: int = None, dictionary=None):
+        """Compress source_path into target_path."""
+        raise NotImplementedError
+
+    def open_reader(self, path: str):
+        """Open a compressed file as a readable stream of decompressed bytes."""
+        raise NotImplementedError
+
+    def decompress(self, source_path: str, target_path: str):
+        """Decompress source_path into target_path."""
+        with self.open_reader(source_path) as f_in:
+            with open(target_path, 'wb') as f_out:
+                shutil.copyfileobj(f_in, f_out, CHUNK_SIZE)
+
+
+class GzipCodec(CompressionCodec):
+    """gzip codec (always available)."""
+
+    name = 'gzip'
+    extension = '.gz'
+    default_level = 6
+
+    def compress(self, source_path: str, target_path: str, level: int = None, dictionary=None):
+        with open(source_path, 'rb') as f_in:
+            with gzip.open(target_path, 'wb', compresslevel=level or self.default_level) as f_out:
+                shutil.copyfileobj(f_in, f_out, CHUNK_SIZE)
+
+    def open_reader(self, path: str):
+        return gzip.open(path, 'rb')
+
+
+class ZstdCodec(CompressionCodec):
+    """Zstandard codec with optional trained-dictionary support."""
+
+    name = 'zstd'
+    extension = '.zst'
+    default_level = 9
+
+    def __init__(self, dictionary_store: 'ZstdDictionaryStore' = None):
+        self.dictionary_store = dictionary_store
+
+    def compress(self, source_path: str, target_path: str, level: int = None, dictionary=None):
+        zstandard = backends.get('zstd')
+        compressor = zstandard.ZstdCompressor(
+            level=level or self.default_level,
+            dict_data=dictionary,
+            write_checksum=True
+        )
+        with open(source_path, 'rb') as f_in:
+            with open(target_path, 'wb') as f_out:
+                compressor.copy_stream(f_in, f_out, read_size=CHUNK_SIZE, write_size=CHUNK_SIZE)
+
+    def open_reader(self, path: str):
+        zstandard = backends.get('zstd')
+        dictionary = None
+        with open(path, 'rb') as f:
+            header = f.read(18)
+        dict_id = zstandard.get_frame_parameters(header).dict_id
+        if dict_id:
+            if not self.dictionary_store:
+                raise ValueError(f"Compression dictionary {dict_id} required to read {path}")
+            dictionary = self.dictionary_store.load(dict_id)
+
+        decompressor = zstandard.ZstdDecompressor(dict_data=dictionary)
+        return decompressor.stream_reader(open(path, 'rb'), read_size=CHUNK_SIZE, closefd=True)
+
+
+class ZstdDictionaryStore:
+    """
+    Trained zstd dictionaries stored on disk as <dict_id>.zdict.
+
+    Every frame records the ID of the dictionary it was compressed with, so
+    old dictionaries must be kept for as long as files reference them.
+    """
+
+    LATEST_FILE = 'latest'
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self._cache = {}
+
+    def _path(self, dict_id: int) -> str:
+        return os.path.join(self.directory, f"{dict_id}.zdict")
+
+    def load(self, dict_id: int):
+        """Load a dictionary by ID."""
+        if dict_id not in self._cache:
+            with open(self._path(dict_id), 'rb') as f:
+                self._cache[dict_id] = backends.get('zstd').ZstdCompressionDict(f.read())
+        return self._cache[dict_id]
+
+    def latest(self):
+        """Return the most recently trained dictionary, or None."""
+        latest_path = os.path.join(self.directory, self.LATEST_FILE)
+        if not zstd_available() or not os.path.exists(latest_path):
+            return None
+        with open(latest_path) as f:
+            dict_id = int(f.read().strip())
+        return self.load(dict_id)
+
+    def train(self, samples: List[bytes], dict_size: int = 112640) -> Optional[int]:
+        """
+        Train a new dictionary from sample file contents and make it the latest.
+
+        Args:
+            samples: Contents of representative small files (CSV/TXT receipts)
+            dict_size: Target dictionary size in bytes
+
+        Returns:
+            New dictionary ID, or None if there were not enough samples
+        """
+        if len(samples) < 8:
+            return None
+
+        dictionary = backends.get('zstd').train_dictionary(dict_size, samples)
+        dict_id = dictionary.dict_id()
+
+        os.makedirs(self.directory, exist_ok=True)
+        with open(self._path(dict_id), 'wb') as f:
+            f.write(dictionary.as_bytes())
+        with open(os.path.join(self.directory, self.LATEST_FILE), 'w') as f:
+            f.write(str(dict_id))
+
+        self._cache[dict_id] = dictionary
+        return dict_id
+
+    def dictionary_ids(self) -> List[int]:
+        """List IDs of all stored dictionaries."""
+        return sorted(
+            int(os.path.basename(p)[:-len('.zdict')])
+            for p in glob.glob(os.path.join(self.directory, '*.zdict'))
+        )
+
+
+class CodecRegistry:
+    """Resolves codecs by name and by compressed file extension."""
+
+    def __init__(self, dictionary_directory: str):
+        self.dictionaries = ZstdDictionaryStore(dictionary_directory)
+        self._codecs = {'gzip': GzipCodec()}
+        if zstd_available():
+            self._codecs['zstd'] = ZstdCodec(self.dictionaries)
+
+    def get(self, name: str) -> CompressionCodec:
+        """Get codec by name, falling back to gzip if it is unavailable."""
+        return self._codecs.get(name) or self._codecs['gzip']
+
+    def for_path(self, path: str) -> Optional[CompressionCodec]:
+        """Get the codec a stored file was compressed with, or None if uncompressed."""
+        for codec in self._codecs.values():
+            if path.endswith(codec.extension):
+                return codec
+        if path.endswith(ZstdCodec.extension):
+            raise ValueError(f"zstandard is not installed; cannot read {path}")
+        return None
+
+    @staticmethod
+    def strip_extension(path: str) -> str:
+        """Remove a compressed-file extension from a path."""
+        for extension in (GzipCodec.extension, ZstdCodec.extension):
+            if path.endswith(extension):
+                return path[:-len(extension)]
+        return path
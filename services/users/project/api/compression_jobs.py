@@ -0,0 +1,171 @@
+"""
+Compression Jobs
+Background recompression of stored documents, compression statistics and
+zstd dictionary training. Run from manage.py (cron-friendly).
+"""
+import os
+from decimal import Decimal
+from typing import Dict, List, Optional
+from sqlalchemy import func
+from project import db
+from project.api.models import ActivityDocument, GroupDocument, TransactionDocument
+from project.api.file_storage_service import get_file_storage_service
+from project.api.compression_codecs import zstd_available
+
+
+# Tables holding stored files, all sharing the same compression columns
+DOCUMENT_MODELS = (ActivityDocument, GroupDocument, TransactionDocument)
+
+# Only small text files benefit from a trained dictionary
+DICTIONARY_SAMPLE_MAX_SIZE = 64 * 1024
+
+
+def recompress_documents(batch_size: int = 100, limit: int = None, dry_run: bool = False) -> Dict:
+    """
+    Re-apply the current compression policy to existing stored documents.
+
+    Uncompressed files that the policy now covers are compressed, and gzip
+    files are re-encoded with zstd where that is smaller. Rows are processed
+    in id-ordered batches, committing after each batch.
+
+    Args:
+        batch_size: Number of rows loaded and committed per batch
+        limit: Optional maximum number of documents to examine
+        dry_run: If True, only report how many documents would be examined
+
+    Returns:
+        Dictionary with recompression statistics per table
+    """
+    storage_service = get_file_storage_service()
+    stats = {}
+    remaining = limit
+
+    for model in DOCUMENT_MODELS:
+        table_stats = {'examined': 0, 'recompressed': 0, 'missing': 0, 'failed': 0, 'bytes_saved': 0}
+        stats[model.__tablename__] = table_stats
+        last_id = 0
+
+        while remaining is None or remaining > 0:
+            size = batch_size if remaining is None else min(batch_size, remaining)
+            documents = model.query.filter(
+                model.id > last_id,
+                model.is_deleted.isnot(True)
+            ).order_by(model.id).limit(size).all()
+
+            if not documents:
+                break
+
+            for document in documents:
+                last_id = document.id
+                table_stats['examined'] += 1
+                if remaining is not None:
+                    remaining -= 1
+
+                if dry_run:
+                    continue
+                if not document.file_path or not os.path.exists(document.file_path):
+                    table_stats['missing'] += 1
+                    continue
+
+                try:
+                    stored_size = os.path.getsize(document.file_path)
+                    new_path, original_size, new_size = storage_service.recompress_file(
+                        document.file_path, document.mime_type, bool(document.is_compressed)
+                    )
+                except Exception:
+                    table_stats['failed'] += 1
+                    continue
+
+                if new_path != document.file_path:
+                    document.file_path = new_path
+                    document.is_compressed = True
+                    document.compressed_size = new_size
+                    document.compression_ratio = (1 - new_size / original_size) * 100 if original_size else 0
+                    table_stats['recompressed'] += 1
+                    table_stats['bytes_saved'] += stored_size - new_size
+
+            db.session.commit()
+
+    return stats
+
+
+def get_compression_stats() -> List[Dict]:
+    """
+    Summarize compression effectiveness per MIME type across all document tables.
+
+    Returns:
+        List of per-MIME statistics, largest original size first
+    """
+    totals = {}
+    for model in DOCUMENT_MODELS:
+        rows = db.session.query(
+            model.mime_type,
+            func.count(model.id),
+            func.sum(db.case((model.is_compressed.is_(True), 1), else_=0)),
+            func.coalesce(func.sum(model.file_size), 0),
+            func.coalesce(func.sum(db.case(
+                (model.is_compressed.is_(True), model.compressed_size), else_=model.file_size
+            )), 0),
+            func.avg(db.case((model.is_compressed.is_(True), model.compression_ratio), else_=None))
+        ).filter(model.is_deleted.isnot(True)).group_by(model.mime_type).all()
+
+        for mime_type, count, compressed, original_size, stored_size, avg_ratio in rows:
+            entry = totals.setdefault(mime_type or 'unknown', {
+                'mime_type': mime_type or 'unknown',
+                'file_count': 0,
+                'compressed_count': 0,
+                'original_size': 0,
+                'stored_size': 0,
+                '_ratio_sum': Decimal('0')
+            })
+            entry['file_count'] += count
+            entry['compressed_count'] += int(compressed or 0)
+            entry['original_size'] += int(original_size)
+            entry['stored_size'] += int(stored_size)
+            entry['_ratio_sum'] += Decimal(str(avg_ratio or 0)) * int(compressed or 0)
+
+    results = []
+    for entry in totals.values():
+        ratio_sum = entry.pop('_ratio_sum')
+        entry['avg_compression_ratio'] = (
+            round(float(ratio_sum / entry['compressed_count']), 2) if entry['compressed_count'] else 0
+        )
+        entry['space_saved'] = entry['original_size'] - entry['stored_size']
+        results.append(entry)
+
+    return sorted(results, key=lambda e: e['original_size'], reverse=True)
+
+
+def train_compression_dictionary(max_samples: int = 2000,
+                                 mime_types: tuple = ('text/csv', 'text/plain')) -> Optional[int]:
+    """
+    Train a zstd dictionary from small stored text documents (receipts).
+
+    Args:
+        max_samples: Maximum number of documents to sample
+        mime_types: MIME types to sample from
+
+    Returns:
+        New dictionary ID, or None if zstd is unavailable or samples are insufficient
+    """
+    if not zstd_available():
+        return None
+
+    storage_service = get_file_storage_service()
+    samples = []
+
+    for model in DOCUMENT_MODELS:
+        if len(samples) >= max_samples:
+            break
+        documents = model.query.with_entities(model.file_path, model.is_compressed).filter(
+            model.mime_type.in_(mime_types),
+            model.file_size <= DICTIONARY_SAMPLE_MAX_SIZE,
+            model.is_deleted.isnot(True)
+        ).order_by(model.id.desc()).limit(max_samples - len(samples)).all()
+
+        for file_path, is_compressed in documents:
+            if file_path and os.path.exists(file_path):
+                with storage_service.open_file(file_path, is_compressed) as f:
+                    samples.append(f.read())
+
+    return storage_service.codecs.dictionaries.train(samples)
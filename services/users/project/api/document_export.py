@@ -0,0 +1,209 @@
+"""
+Document Export
+Streams a ZIP of every document attached to a meeting or group, built on the
+fly with constant memory: files are read in chunks (decompressed if stored
+compressed) and ZIP bytes are yielded as they are produced, with no temp file.
+"""
+import os
+import csv
+import io
+import zipfile
+import datetime
+from typing import Dict, Iterator
+from werkzeug.utils import secure_filename
+from project import db
+from project.api.archival import HISTORY_SQL
+from project.api.compression_codecs import get_compression_policy, CHUNK_SIZE
+from project.api.file_storage_service import get_file_storage_service
+
+
+# Rows fetched per round trip while streaming the document list
+FETCH_SIZE = 500
+
+MANIFEST_COLUMNS = [
+    'archive_path', 'status', 'source', 'document_id', 'entity_type', 'entity_id',
+    'original_filename', 'document_type', 'description', 'mime_type', 'file_size',
+    'file_hash', 'uploaded_by', 'upload_date'
+]
+
+_COLUMNS = """
+    {source} AS source, {alias}.id AS document_id, {entity_type} AS entity_type,
+    {entity_id} AS entity_id, {filename} AS original_filename, {alias}.document_type,
+    {alias}.description, {alias}.mime_type, {alias}.file_size, {alias}.file_hash,
+    {alias}.file_path, {alias}.is_compressed, {alias}.uploaded_by, {alias}.upload_date
+"""
+
+ACTIVITY_COLUMNS = _COLUMNS.format(
+    source="'activity'", alias='ad', entity_type="'activity'", entity_id='ad.activity_id',
+    filename='COALESCE(ad.original_filename, ad.document_name)'
+)
+TRANSACTION_COLUMNS = _COLUMNS.format(
+    source="'transaction'", alias='td', entity_type='td.entity_type', entity_id='td.entity_id',
+    filename='td.original_filename'
+)
+GROUP_COLUMNS = _COLUMNS.format(
+    source="'group'", alias='gd', entity_type="'group'", entity_id='gd.group_id',
+    filename='COALESCE(gd.original_filename, gd.file_name)'
+)
+
+# Transaction-document entities that hang off a meeting, by the table holding meeting_id
+# (hot and archived rows for the tables archival moves out)
+MEETING_ENTITY_TABLES = {
+    'training': 'training_records',
+    'voting': 'voting_records',
+    'loan_repayment': HISTORY_SQL['loan_repayments'],
+    'fine': HISTORY_SQL['member_fines'],
+    'savings': HISTORY_SQL['saving_transactions'],
+}
+
+
+def _meeting_entity_filter(meeting_condition: str) -> str:
+    """WHERE fragment matching transaction documents of meetings selected by meeting_condition."""
+    clauses = [f"(td.entity_type = 'meeting' AND td.entity_id IN (SELECT id FROM meetings m WHERE {meeting_condition}))"]
+    for entity_type, table in MEETING_ENTITY_TABLES.items():
+        clauses.append(
+            f"(td.entity_type = '{entity_type}' AND td.entity_id IN "
+            f"(SELECT e.id FROM {table} e JOIN meetings m ON m.id = e.meeting_id WHERE {meeting_condition}))"
+        )
+    return ' OR '.join(clauses)
+
+
+MEETING_EXPORT_SQL = f"""
+    SELECT {ACTIVITY_COLUMNS}
+    FROM activity_documents ad
+    JOIN meeting_activities ma ON ma.id = ad.activity_id
+    WHERE ma.meeting_id = :meeting_id AND ad.is_deleted IS NOT TRUE
+    UNION ALL
+    SELECT {TRANSACTION_COLUMNS}
+    FROM transaction_documents td
+    WHERE td.is_deleted IS NOT TRUE AND ({_meeting_entity_filter('m.id = :meeting_id')})
+    ORDER BY source, entity_type, entity_id, document_id
+"""
+
+GROUP_EXPORT_SQL = f"""
+    SELECT {GROUP_COLUMNS}
+    FROM group_documents gd
+    WHERE gd.group_id = :group_id AND gd.is_deleted IS NOT TRUE
+    UNION ALL
+    SELECT {ACTIVITY_COLUMNS}
+    FROM activity_documents ad
+    JOIN meeting_activities ma ON ma.id = ad.activity_id
+    JOIN meetings m ON m.id = ma.meeting_id
+    WHERE m.group_id = :group_id AND ad.is_deleted IS NOT TRUE
+    UNION ALL
+    SELECT {TRANSACTION_COLUMNS}
+    FROM transaction_documents td
+    WHERE td.is_deleted IS NOT TRUE AND (
+        (td.entity_type = 'group' AND td.entity_id = :group_id)
+        OR (td.entity_type = 'member' AND td.entity_id IN (SELECT id FROM group_members WHERE group_id = :group_id))
+        OR {_meeting_entity_filter('m.group_id = :group_id')}
+    )
+    ORDER BY source, entity_type, entity_id, document_id
+"""
+
+
+class _StreamBuffer(io.RawIOBase):
+    """
+    Write-only, unseekable sink for ZipFile. The generator drains it after
+    each write, so at most one chunk (plus ZIP headers) is held in memory.
+    """
+
+    def __init__(self):
+        self._chunks = []
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def drain(self) -> bytes:
+        data = b''.join(self._chunks)
+        self._chunks = []
+        return data
+
+
+def _iter_documents(sql: str, params: Dict) -> Iterator:
+    """Stream document rows from the database in FETCH_SIZE batches."""
+    result = db.session.execute(
+        db.text(sql).execution_options(stream_results=True, yield_per=FETCH_SIZE), params
+    )
+    for row in result:
+        yield row
+
+
+def _archive_path(row) -> str:
+    filename = secure_filename(row.original_filename or '') or f"document_{row.document_id}"
+    return f"{row.entity_type}_{row.entity_id}/{row.source}_{row.document_id}_{filename}"
+
+
+def _zip_date_time(value) -> tuple:
+    if isinstance(value, str):
+        value = datetime.datetime.fromisoformat(value)
+    value = value or datetime.datetime.utcnow()
+    return (max(value.year, 1980), value.month, value.day, value.hour, value.minute, value.second)
+
+
+def stream_documents_zip(sql: str, params: Dict) -> Iterator[bytes]:
+    """
+    Yield a ZIP archive of the documents selected by sql.
+
+    The archive starts with manifest.csv (one row per document, including
+    files missing on disk), followed by the files themselves. The document
+    query is streamed twice instead of being held in memory.
+    """
+    storage_service = get_file_storage_service()
+    sink = _StreamBuffer()
+
+    with zipfile.ZipFile(sink, mode='w', compression=zipfile.ZIP_DEFLATED, allowZip64=True) as archive:
+        manifest_info = zipfile.ZipInfo('manifest.csv', _zip_date_time(datetime.datetime.utcnow()))
+        manifest_info.compress_type = zipfile.ZIP_DEFLATED
+        with archive.open(manifest_info, mode='w', force_zip64=True) as manifest_file:
+            text_stream = io.TextIOWrapper(manifest_file, encoding='utf-8', newline='', write_through=True)
+            writer = csv.writer(text_stream)
+            writer.writerow(MANIFEST_COLUMNS)
+            for row in _iter_documents(sql, params):
+                status = 'included' if row.file_path and os.path.exists(row.file_path) else 'missing'
+                writer.writerow([
+                    _archive_path(row), status, row.source, row.document_id, row.entity_type,
+                    row.entity_id, row.original_filename, row.document_type, row.description,
+                    row.mime_type, row.file_size, row.file_hash, row.uploaded_by,
+                    row.upload_date.isoformat() if hasattr(row.upload_date, 'isoformat') else row.upload_date
+                ])
+                yield sink.drain()
+            text_stream.flush()
+            text_stream.detach()
+        yield sink.drain()
+
+        for row in _iter_documents(sql, params):
+            if not row.file_path or not os.path.exists(row.file_path):
+                continue
+
+            info = zipfile.ZipInfo(_archive_path(row), _zip_date_time(row.upload_date))
+            # Don't spend CPU deflating JPEGs, videos and archives
+            info.compress_type = (
+                zipfile.ZIP_STORED if get_compression_policy(row.mime_type) is None else zipfile.ZIP_DEFLATED
+            )
+
+            with storage_service.open_file(row.file_path, row.is_compressed) as source, \
+                    archive.open(info, mode='w', force_zip64=True) as target:
+                while True:
+                    chunk = source.read(CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    target.write(chunk)
+                    yield sink.drain()
+            yield sink.drain()
+
+    yield sink.drain()
+
+
+def export_meeting_documents(meeting_id: int) -> Iterator[bytes]:
+    """Stream a ZIP of all activity and transaction documents of a meeting."""
+    return stream_documents_zip(MEETING_EXPORT_SQL, {'meeting_id': meeting_id})
+
+
+def export_group_documents(group_id: int) -> Iterator[bytes]:
+    """Stream a ZIP of all group, activity, member and transaction documents of a group."""
+    return stream_documents_zip(GROUP_EXPORT_SQL, {'group_id': group_id})
@@ -11,6 +11,7 @@ from project.api.models import (
     ActivityDocument, MeetingActivity, GroupDocument, SavingsGroup,
     User, MemberActivityParticipation
 )
+from project.api import storage_ledger
 
 documents_blueprint = Blueprint('documents', __name__)
 
@@ -153,6 +154,8 @@ def upload_activity_documents(user_id, activity_id):
                 )
                 db.session.add(document)
                 db.session.flush()
+                storage_ledger.record_file_change(current_app.config.get('UPLOAD_FOLDER', '/uploads'),
+                                                  file_path, 1, file_size)
                 
                 uploaded_documents.append({
                     'id': document.id,
@@ -237,7 +240,10 @@ def delete_document(user_id, document_id):
     try:
         # Delete file from filesystem
         if os.path.exists(document.file_path):
+            file_size = os.path.getsize(document.file_path)
             os.remove(document.file_path)
+            storage_ledger.record_file_change(current_app.config.get('UPLOAD_FOLDER', '/uploads'),
+                                              document.file_path, -1, -file_size)
         
         # Delete database record
         db.session.delete(document)
@@ -4,15 +4,20 @@ Includes compression, preview generation, versioning, and cascading deletes.
 """
 import os
 import datetime
-from flask import Blueprint, jsonify, request, current_app, send_file
+from flask import Blueprint, jsonify, request, current_app, send_file, Response, stream_with_context
 from functools import wraps
 from sqlalchemy import and_, or_
 from project import db
 from project.api.models import (
-    ActivityDocument, MeetingActivity, GroupDocument, SavingsGroup,
+    ActivityDocument, MeetingActivity, SavingsGroup,
     User, Meeting, GroupMember
 )
 from project.api.file_storage_service import get_file_storage_service
+from project.api import storage_ledger
+from project.api.document_export import export_meeting_documents, export_group_documents
+from project.api.cascade_delete import soft_delete_documents, remove_files_in_background
+from project.api.read_routing import allows_writes
+from project.api.remote_payments import is_officer_or_admin
 
 documents_enhanced_blueprint = Blueprint('documents_enhanced', __name__)
 
@@ -252,6 +257,7 @@ def get_document_info(user_id, document_id):
 
 
 @documents_enhanced_blueprint.route('/documents/<int:document_id>/download', methods=['GET'])
+@allows_writes
 @authenticate
 def download_document(user_id, document_id):
     """Download a document."""
@@ -264,13 +270,7 @@ def download_document(user_id, document_id):
 
     storage_service = get_file_storage_service()
 
-    # Decompress if needed
-    file_path = document.file_path
-    if document.is_compressed and file_path.endswith('.gz'):
-        temp_path = os.path.join(storage_service.base_upload_folder, 'temp', document.original_filename)
-        file_path = storage_service.decompress_file(document.file_path, temp_path)
-
-    if not os.path.exists(file_path):
+    if not os.path.exists(document.file_path):
         return jsonify({'status': 'error', 'message': 'File not found on server'}), 404
 
     # Update download count and last accessed
@@ -278,8 +278,9 @@ def download_document(user_id, document_id):
     document.last_accessed = datetime.datetime.utcnow()
     db.session.commit()
 
+    # Stream the file, decompressing on the fly if needed
     return send_file(
-        file_path,
+        storage_service.open_file(document.file_path, document.is_compressed),
         as_attachment=True,
         download_name=document.original_filename or document.document_name,
         mimetype=document.mime_type
@@ -373,7 +374,9 @@ def compress_document(user_id, document_id):
 
     try:
         # Compress file
-        compressed_path, original_size, compressed_size = storage_service.compress_file(document.file_path)
+        compressed_path, original_size, compressed_size = storage_service.compress_file(
+            document.file_path, mime_type=document.mime_type, enforce_min_size=False
+        )
 
         if compressed_path != document.file_path:
             # Update document record
@@ -490,8 +493,8 @@ def get_group_storage_usage(user_id, group_id):
     if not group:
         return jsonify({'status': 'error', 'message': 'Group not found'}), 404
 
-    storage_service = get_file_storage_service()
-    usage = storage_service.get_storage_usage('group', group_id)
+    # Rollup of all the group's files (meetings, activities, members, group documents)
+    usage = storage_ledger.get_group_usage(group_id)
 
     return jsonify({
         'status': 'success',
@@ -512,6 +515,52 @@ def get_overall_storage_usage(user_id):
     }), 200
 
 
+def can_export_group_documents(user_id, group_id):
+    """Bulk exports hold every member's receipts and IDs: officers of the group and system admins only."""
+    user = User.query.get(user_id)
+    if user and (user.is_super_admin or user.admin):
+        return True
+    return is_officer_or_admin(user_id, group_id)
+
+
+@documents_enhanced_blueprint.route('/meetings/<int:meeting_id>/documents/export', methods=['GET'])
+@authenticate
+def export_meeting_documents_zip(user_id, meeting_id):
+    """Stream a ZIP of all documents for a meeting, with a CSV manifest."""
+    meeting = Meeting.query.get(meeting_id)
+    if not meeting:
+        return jsonify({'status': 'error', 'message': 'Meeting not found'}), 404
+
+    if not can_export_group_documents(user_id, meeting.group_id):
+        return jsonify({'status': 'error', 'message': 'Only officers and admins can export documents'}), 403
+
+    filename = f"meeting_{meeting.meeting_number}_group_{meeting.group_id}_documents.zip"
+    return Response(
+        stream_with_context(export_meeting_documents(meeting_id)),
+        mimetype='application/zip',
+        headers={'Content-Disposition': f'attachment; filename="{filename}"'}
+    )
+
+
+@documents_enhanced_blueprint.route('/groups/<int:group_id>/documents/export', methods=['GET'])
+@authenticate
+def export_group_documents_zip(user_id, group_id):
+    """Stream a ZIP of all documents for a group, with a CSV manifest."""
+    group = SavingsGroup.query.get(group_id)
+    if not group:
+        return jsonify({'status': 'error', 'message': 'Group not found'}), 404
+
+    if not can_export_group_documents(user_id, group_id):
+        return jsonify({'status': 'error', 'message': 'Only officers and admins can export documents'}), 403
+
+    filename = f"group_{group_id}_documents.zip"
+    return Response(
+        stream_with_context(export_group_documents(group_id)),
+        mimetype='application/zip',
+        headers={'Content-Disposition': f'attachment; filename="{filename}"'}
+    )
+
+
 @documents_enhanced_blueprint.route('/meetings/<int:meeting_id>/cascade-delete-files', methods=['DELETE'])
 @authenticate
 def cascade_delete_meeting_files(user_id, meeting_id):
@@ -520,44 +569,11 @@ def cascade_delete_meeting_files(user_id, meeting_id):
     if not meeting:
         return jsonify({'status': 'error', 'message': 'Meeting not found'}), 404
 
-    storage_service = get_file_storage_service()
-
     try:
-        # Get all activities for this meeting
-        activities = MeetingActivity.query.filter_by(meeting_id=meeting_id).all()
-
-        total_deleted = 0
-        total_size_freed = 0
-
-        for activity in activities:
-            # Delete files for each activity
-            result = storage_service.delete_entity_files('activity', activity.id)
-            total_deleted += result['deleted_count']
-            total_size_freed += result['total_size_freed']
-
-            # Soft delete documents in database
-            ActivityDocument.query.filter_by(activity_id=activity.id).update({
-                'is_deleted': True,
-                'deleted_date': datetime.datetime.utcnow(),
-                'deleted_by': user_id
-            })
-
-        # Delete meeting-level files
-        meeting_result = storage_service.delete_entity_files('meeting', meeting_id)
-        total_deleted += meeting_result['deleted_count']
-        total_size_freed += meeting_result['total_size_freed']
-
+        result = soft_delete_documents(user_id, meeting_id=meeting_id)
         db.session.commit()
-
-        return jsonify({
-            'status': 'success',
-            'message': f'Deleted {total_deleted} files',
-            'data': {
-                'deleted_count': total_deleted,
-                'total_size_freed': total_size_freed,
-                'size_freed_mb': round(total_size_freed / (1024 * 1024), 2)
-            }
-        }), 200
+        remove_files_in_background(result['file_paths'], meeting.group_id)
+        return _files_queued_response(result)
 
     except Exception as e:
         db.session.rollback()
@@ -572,58 +588,30 @@ def cascade_delete_group_files(user_id, group_id):
     if not group:
         return jsonify({'status': 'error', 'message': 'Group not found'}), 404
 
-    storage_service = get_file_storage_service()
-
     try:
-        # Delete group-level files
-        result = storage_service.delete_entity_files('group', group_id)
-
-        # Soft delete documents in database
-        GroupDocument.query.filter_by(group_id=group_id).update({
-            'is_deleted': True,
-            'deleted_date': datetime.datetime.utcnow(),
-            'deleted_by': user_id
-        })
-
-        # Delete all meeting files for this group
-        meetings = Meeting.query.filter_by(group_id=group_id).all()
-        total_deleted = result['deleted_count']
-        total_size_freed = result['total_size_freed']
-
-        for meeting in meetings:
-            activities = MeetingActivity.query.filter_by(meeting_id=meeting.id).all()
-            for activity in activities:
-                activity_result = storage_service.delete_entity_files('activity', activity.id)
-                total_deleted += activity_result['deleted_count']
-                total_size_freed += activity_result['total_size_freed']
-
-                ActivityDocument.query.filter_by(activity_id=activity.id).update({
-                    'is_deleted': True,
-                    'deleted_date': datetime.datetime.utcnow(),
-                    'deleted_by': user_id
-                })
-
-            meeting_result = storage_service.delete_entity_files('meeting', meeting.id)
-            total_deleted += meeting_result['deleted_count']
-            total_size_freed += meeting_result['total_size_freed']
-
+        result = soft_delete_documents(user_id, group_id=group_id)
         db.session.commit()
-
-        return jsonify({
-            'status': 'success',
-            'message': f'Deleted {total_deleted} files',
-            'data': {
-                'deleted_count': total_deleted,
-                'total_size_freed': total_size_freed,
-                'size_freed_mb': round(total_size_freed / (1024 * 1024), 2)
-            }
-        }), 200
+        remove_files_in_background(result['file_paths'], group_id)
+        return _files_queued_response(result)
 
     except Exception as e:
         db.session.rollback()
         return jsonify({'status': 'error', 'message': str(e)}), 400
 
 
+def _files_queued_response(result):
+    """Files are removed by a background worker; report what was queued."""
+    return jsonify({
+        'status': 'success',
+        'message': f"Deleting {result['file_count']} files",
+        'data': {
+            'deleted_count': result['file_count'],
+            'total_size_freed': result['total_size'],
+            'size_freed_mb': round(result['total_size'] / (1024 * 1024), 2)
+        }
+    }), 202
+
+
 @documents_enhanced_blueprint.route('/members/<int:member_id>/cascade-delete-files', methods=['DELETE'])
 @authenticate
 def cascade_delete_member_files(user_id, member_id):
@@ -7,48 +7,31 @@ import uuid
 import shutil
 import datetime
 import hashlib
-import gzip
 from io import BytesIO
 from pathlib import Path
 from typing import Dict, List, Optional, Tuple
-from PIL import Image
-import PyPDF2
 from werkzeug.utils import secure_filename
 from flask import current_app
-
-# Optional imports for advanced features
-try:
-    from pdf2image import convert_from_path
-    PDF2IMAGE_AVAILABLE = True
-except ImportError:
-    PDF2IMAGE_AVAILABLE = False
-
-try:
-    from moviepy.editor import VideoFileClip
-    MOVIEPY_AVAILABLE = True
-except ImportError:
-    MOVIEPY_AVAILABLE = False
-
-try:
-    import magic
-    MAGIC_AVAILABLE = True
-except ImportError:
-    MAGIC_AVAILABLE = False
+from project.api.compression_codecs import (
+    CodecRegistry, get_compression_policy, probe_compressibility, MIN_SAVING
+)
+from project.api import storage_ledger
+# Imaging, PDF, video and content-sniffing libraries are loaded on first use
+from project.api.media_backends import backends
 
 
 class FileStorageService:
     """
     Comprehensive file storage service with:
     - Upload/download management
-    - Automatic compression for large files
+    - Policy-driven compression (gzip/zstd) per MIME type
     - Preview/thumbnail generation
-    - Storage quota tracking
+    - Storage usage ledger (updated on upload/delete)
     - File versioning
     - Cascading deletes
     """
     
-    # File size thresholds
-    COMPRESSION_THRESHOLD = 5 * 1024 * 1024  # 5MB - compress files larger than this
+    # File size thresholds (per-type compression thresholds live in compression_codecs)
     MAX_FILE_SIZE = 50 * 1024 * 1024  # 50MB
     
     # Preview settings
@@ -104,6 +87,7 @@ class FileStorageService:
         """Initialize file storage service."""
         self.base_upload_folder = base_upload_folder or current_app.config.get('UPLOAD_FOLDER', '/app/uploads')
         self._ensure_base_directories()
+        self.codecs = CodecRegistry(os.path.join(self.base_upload_folder, 'dictionaries'))
     
     def _ensure_base_directories(self):
         """Ensure base upload directories exist."""
@@ -115,7 +99,8 @@ class FileStorageService:
             os.path.join(self.base_upload_folder, 'meetings'),
             os.path.join(self.base_upload_folder, 'previews'),
             os.path.join(self.base_upload_folder, 'thumbnails'),
-            os.path.join(self.base_upload_folder, 'temp')
+            os.path.join(self.base_upload_folder, 'temp'),
+            os.path.join(self.base_upload_folder, 'dictionaries')
         ]
         for directory in directories:
             os.makedirs(directory, exist_ok=True)
@@ -146,7 +131,8 @@ class FileStorageService:
             MIME type string
         """
         # Try content-based detection first if file path provided
-        if file_path and MAGIC_AVAILABLE and os.path.exists(file_path):
+        magic = backends.get('magic') if file_path else None
+        if magic and os.path.exists(file_path):
             try:
                 mime = magic.Magic(mime=True)
                 return mime.from_file(file_path)
@@ -201,66 +187,148 @@ class FileStorageService:
         unique_name = f"{uuid.uuid4().hex}.{extension}"
         return unique_name
     
-    def compress_file(self, file_path: str, compression_level: int = 6) -> Tuple[str, int, int]:
+    def compress_file(self, file_path: str, compression_level: int = None,
+                      mime_type: str = None, enforce_min_size: bool = True) -> Tuple[str, int, int]:
         """
-        Compress file using gzip.
-        
+        Compress file using the codec chosen by the per-MIME compression policy.
+
         Args:
             file_path: Path to file to compress
-            compression_level: Compression level (1-9, default 6)
-        
+            compression_level: Optional codec level overriding the policy
+            mime_type: MIME type of the file (detected from the name if omitted)
+            enforce_min_size: Skip files smaller than the policy's min_size
+
         Returns:
             Tuple of (compressed_file_path, original_size, compressed_size)
         """
         if not os.path.exists(file_path):
             raise FileNotFoundError(f"File not found: {file_path}")
-        
+
         original_size = os.path.getsize(file_path)
-        
-        # Don't compress already compressed files
-        ext = self.get_file_extension(file_path)
-        if ext in {'zip', 'rar', '7z', 'gz', 'jpg', 'jpeg', 'png', 'mp4', 'mp3'}:
+
+        policy = get_compression_policy(mime_type or self.get_mime_type(file_path))
+        if policy is None:
             return file_path, original_size, original_size
-        
-        compressed_path = f"{file_path}.gz"
-        
-        with open(file_path, 'rb') as f_in:
-            with gzip.open(compressed_path, 'wb', compresslevel=compression_level) as f_out:
-                shutil.copyfileobj(f_in, f_out)
-        
+        if enforce_min_size and original_size < policy['min_size']:
+            return file_path, original_size, original_size
+
+        # Cheap sample-compress probe before spending CPU on the whole file
+        if policy['probe'] and probe_compressibility(file_path) > 1 - MIN_SAVING:
+            return file_path, original_size, original_size
+
+        codec = self.codecs.get(policy['codec'])
+        dictionary = None
+        if policy['use_dictionary'] and codec.name == 'zstd':
+            dictionary = self.codecs.dictionaries.latest()
+
+        compressed_path = f"{file_path}{codec.extension}"
+        codec.compress(file_path, compressed_path, level=compression_level or policy['level'],
+                       dictionary=dictionary)
+
         compressed_size = os.path.getsize(compressed_path)
-        
+
         # Only keep compressed version if it's actually smaller
-        if compressed_size < original_size * 0.9:  # At least 10% reduction
+        if compressed_size < original_size * (1 - MIN_SAVING):
             os.remove(file_path)
+            storage_ledger.record_file_change(self.base_upload_folder, compressed_path,
+                                              0, compressed_size - original_size)
             return compressed_path, original_size, compressed_size
         else:
             os.remove(compressed_path)
             return file_path, original_size, original_size
-    
+
     def decompress_file(self, compressed_path: str, output_path: str = None) -> str:
         """
-        Decompress gzipped file.
-        
+        Decompress a file this service compressed (is_compressed set on its row).
+
         Args:
             compressed_path: Path to compressed file
-            output_path: Optional output path (defaults to removing .gz extension)
-        
+            output_path: Optional output path (defaults to removing the codec extension)
+
         Returns:
             Path to decompressed file
         """
-        if not compressed_path.endswith('.gz'):
+        codec = self.codecs.for_path(compressed_path)
+        if codec is None:
             return compressed_path
-        
+
         if output_path is None:
-            output_path = compressed_path[:-3]  # Remove .gz extension
-        
-        with gzip.open(compressed_path, 'rb') as f_in:
-            with open(output_path, 'wb') as f_out:
-                shutil.copyfileobj(f_in, f_out)
-        
+            output_path = self.codecs.strip_extension(compressed_path)
+
+        codec.decompress(compressed_path, output_path)
         return output_path
 
+    def open_file(self, file_path: str, is_compressed: bool = False):
+        """
+        Open a stored file for reading, transparently decompressing it.
+
+        Args:
+            file_path: Path to stored file
+            is_compressed: The row's is_compressed flag; uploads that are
+                themselves .gz/.zst files are returned as uploaded
+
+        Returns:
+            Binary file-like object yielding the original file contents
+        """
+        codec = self.codecs.for_path(file_path) if is_compressed else None
+        if codec is None:
+            return open(file_path, 'rb')
+        return codec.open_reader(file_path)
+
+    def recompress_file(self, file_path: str, mime_type: str, is_compressed: bool = False) -> Tuple[str, int, int]:
+        """
+        Re-apply the current compression policy to an existing stored file.
+
+        Uncompressed files are compressed if the policy allows it, and files
+        compressed with a different codec are re-encoded if that is smaller.
+
+        Args:
+            file_path: Path to stored file
+            mime_type: MIME type of the original file
+            is_compressed: The row's is_compressed flag (user .gz/.zst uploads are not ours to re-encode)
+
+        Returns:
+            Tuple of (new_file_path, original_size, stored_size)
+        """
+        current_codec = self.codecs.for_path(file_path) if is_compressed else None
+        if current_codec is None:
+            return self.compress_file(file_path, mime_type=mime_type)
+
+        policy = get_compression_policy(mime_type)
+        stored_size = os.path.getsize(file_path)
+        target_codec = self.codecs.get(policy['codec']) if policy else None
+
+        # Decompress to a sibling temp file so the original is never lost
+        plain_path = os.path.join(self.base_upload_folder, 'temp',
+                                  os.path.basename(self.codecs.strip_extension(file_path)))
+        self.decompress_file(file_path, plain_path)
+        original_size = os.path.getsize(plain_path)
+
+        if target_codec is None or target_codec.name == current_codec.name:
+            os.remove(plain_path)
+            return file_path, original_size, stored_size
+
+        try:
+            dictionary = None
+            if policy['use_dictionary'] and target_codec.name == 'zstd':
+                dictionary = self.codecs.dictionaries.latest()
+            staged_path = f"{plain_path}{target_codec.extension}"
+            target_codec.compress(plain_path, staged_path, level=policy['level'], dictionary=dictionary)
+            new_size = os.path.getsize(staged_path)
+
+            if new_size >= stored_size:
+                os.remove(staged_path)
+                return file_path, original_size, stored_size
+
+            new_path = f"{self.codecs.strip_extension(file_path)}{target_codec.extension}"
+            shutil.move(staged_path, new_path)
+            os.remove(file_path)
+            storage_ledger.record_file_change(self.base_upload_folder, new_path, 0, new_size - stored_size)
+            return new_path, original_size, new_size
+        finally:
+            if os.path.exists(plain_path):
+                os.remove(plain_path)
+
     def generate_image_thumbnail(self, image_path: str, size: Tuple[int, int] = None) -> Optional[str]:
         """
         Generate thumbnail for image file.
@@ -275,6 +343,11 @@ class FileStorageService:
         if size is None:
             size = self.THUMBNAIL_SIZE
 
+        Image = backends.get('image')
+        if Image is None:
+            current_app.logger.warning("Pillow not available, skipping thumbnail generation")
+            return None
+
         try:
             with Image.open(image_path) as img:
                 # Convert RGBA to RGB if necessary
@@ -315,7 +388,9 @@ class FileStorageService:
         Returns:
             Path to preview image or None if generation failed
         """
-        if not PDF2IMAGE_AVAILABLE:
+        convert_from_path = backends.get('pdf_render')
+        Image = backends.get('image')
+        if convert_from_path is None or Image is None:
             current_app.logger.warning("pdf2image not available, skipping PDF preview generation")
             return None
 
@@ -362,7 +437,9 @@ class FileStorageService:
         Returns:
             Path to thumbnail image or None if generation failed
         """
-        if not MOVIEPY_AVAILABLE:
+        VideoFileClip = backends.get('video')
+        Image = backends.get('image')
+        if VideoFileClip is None or Image is None:
             current_app.logger.warning("moviepy not available, skipping video thumbnail generation")
             return None
 
@@ -398,12 +475,13 @@ class FileStorageService:
             current_app.logger.error(f"Failed to generate video thumbnail for {video_path}: {str(e)}")
             return None
 
-    def extract_file_metadata(self, file_path: str) -> Dict:
+    def extract_file_metadata(self, file_path: str, is_compressed: bool = False) -> Dict:
         """
         Extract metadata from file.
 
         Args:
             file_path: Path to file
+            is_compressed: Whether this service compressed the stored file
 
         Returns:
             Dictionary containing file metadata
@@ -416,13 +494,14 @@ class FileStorageService:
             'file_category': self.get_file_category(self.get_file_extension(file_path)),
             'created_date': datetime.datetime.fromtimestamp(os.path.getctime(file_path)),
             'modified_date': datetime.datetime.fromtimestamp(os.path.getmtime(file_path)),
-            'is_compressed': file_path.endswith('.gz'),
+            'is_compressed': is_compressed,
             'file_hash': self.calculate_file_hash(file_path)
         }
 
         # Add image-specific metadata
         ext = metadata['file_extension']
-        if ext in self.ALLOWED_EXTENSIONS['images'] and ext != 'svg':
+        Image = backends.get('image') if ext in self.ALLOWED_EXTENSIONS['images'] and ext != 'svg' else None
+        if Image is not None:
             try:
                 with Image.open(file_path) as img:
                     metadata['image_width'] = img.width
@@ -433,7 +512,8 @@ class FileStorageService:
                 pass
 
         # Add PDF-specific metadata
-        if ext == 'pdf':
+        PyPDF2 = backends.get('pdf') if ext == 'pdf' else None
+        if PyPDF2 is not None:
             try:
                 with open(file_path, 'rb') as f:
                     pdf_reader = PyPDF2.PdfReader(f)
@@ -474,12 +554,14 @@ class FileStorageService:
 
         # Get file size
         file_size = os.path.getsize(file_path)
+        storage_ledger.record_file_change(self.base_upload_folder, file_path, 1, file_size)
 
-        # Compress if needed
+        # Compress according to the per-type policy
         compressed_size = file_size
         is_compressed = False
-        if auto_compress and file_size > self.COMPRESSION_THRESHOLD:
-            compressed_path, original_size, compressed_size = self.compress_file(file_path)
+        if auto_compress:
+            mime_type = self.get_mime_type(original_filename, file_path)
+            compressed_path, original_size, compressed_size = self.compress_file(file_path, mime_type=mime_type)
             if compressed_path != file_path:
                 file_path = compressed_path
                 is_compressed = True
@@ -517,7 +599,7 @@ class FileStorageService:
                 os.remove(temp_path)
 
         # Extract metadata
-        metadata = self.extract_file_metadata(file_path)
+        metadata = self.extract_file_metadata(file_path, is_compressed)
 
         return {
             'original_filename': original_filename,
@@ -532,13 +614,14 @@ class FileStorageService:
             'metadata': metadata
         }
 
-    def delete_file(self, file_path: str, delete_related: bool = True) -> bool:
+    def delete_file(self, file_path: str, delete_related: bool = True, group_id: int = None) -> bool:
         """
         Delete file and optionally its related files (thumbnails, previews).
 
         Args:
             file_path: Path to file to delete
             delete_related: Whether to delete related files (thumbnails, previews)
+            group_id: Owning group for the storage ledger, if its entity was already deleted
 
         Returns:
             True if deletion successful, False otherwise
@@ -546,7 +629,9 @@ class FileStorageService:
         try:
             # Delete main file
             if os.path.exists(file_path):
+                file_size = os.path.getsize(file_path)
                 os.remove(file_path)
+                storage_ledger.record_file_change(self.base_upload_folder, file_path, -1, -file_size, group_id)
 
             # Delete related files
             if delete_related:
@@ -562,11 +647,14 @@ class FileStorageService:
                 if os.path.exists(preview_path):
                     os.remove(preview_path)
 
-                # Delete compressed version if exists
-                if not file_path.endswith('.gz'):
-                    compressed_path = f"{file_path}.gz"
+                # Delete compressed versions if they exist
+                for extension in ('.gz', '.zst'):
+                    compressed_path = f"{file_path}{extension}"
                     if os.path.exists(compressed_path):
+                        compressed_size = os.path.getsize(compressed_path)
                         os.remove(compressed_path)
+                        storage_ledger.record_file_change(self.base_upload_folder, compressed_path,
+                                                          -1, -compressed_size, group_id)
 
             return True
 
@@ -618,7 +706,7 @@ class FileStorageService:
 
     def get_storage_usage(self, entity_type: str = None, entity_id: int = None) -> Dict:
         """
-        Get storage usage statistics.
+        Get storage usage statistics from the usage ledger.
 
         Args:
             entity_type: Optional entity type to filter by
@@ -628,88 +716,52 @@ class FileStorageService:
             Dictionary with storage statistics
         """
         if entity_type and entity_id:
-            # Get usage for specific entity
-            entity_dir = self.get_storage_path(entity_type, entity_id)
-            if not os.path.exists(entity_dir):
-                return {
-                    'total_files': 0,
-                    'total_size': 0,
-                    'total_size_mb': 0,
-                    'by_category': {}
-                }
-
-            total_size = 0
-            file_count = 0
-            by_category = {}
+            return storage_ledger.get_entity_usage(entity_type, entity_id)
+        return storage_ledger.get_global_usage()
 
-            for filename in os.listdir(entity_dir):
-                file_path = os.path.join(entity_dir, filename)
-                if os.path.isfile(file_path):
-                    file_size = os.path.getsize(file_path)
-                    total_size += file_size
-                    file_count += 1
-
-                    category = self.get_file_category(self.get_file_extension(filename))
-                    if category not in by_category:
-                        by_category[category] = {'count': 0, 'size': 0}
-                    by_category[category]['count'] += 1
-                    by_category[category]['size'] += file_size
-
-            return {
-                'total_files': file_count,
-                'total_size': total_size,
-                'total_size_mb': round(total_size / (1024 * 1024), 2),
-                'by_category': by_category
-            }
+    def reconcile_storage_usage(self, max_workers: int = 8, dry_run: bool = False) -> Dict:
+        """
+        Re-walk the upload tree in parallel and correct usage ledger drift.
 
-        else:
-            # Get overall usage
-            total_size = 0
-            file_count = 0
-            by_entity_type = {}
-
-            for entity_type_dir in ['activities', 'groups', 'members', 'meetings']:
-                entity_path = os.path.join(self.base_upload_folder, entity_type_dir)
-                if os.path.exists(entity_path):
-                    for entity_id_dir in os.listdir(entity_path):
-                        entity_full_path = os.path.join(entity_path, entity_id_dir)
-                        if os.path.isdir(entity_full_path):
-                            for filename in os.listdir(entity_full_path):
-                                file_path = os.path.join(entity_full_path, filename)
-                                if os.path.isfile(file_path):
-                                    file_size = os.path.getsize(file_path)
-                                    total_size += file_size
-                                    file_count += 1
-
-                                    if entity_type_dir not in by_entity_type:
-                                        by_entity_type[entity_type_dir] = {'count': 0, 'size': 0}
-                                    by_entity_type[entity_type_dir]['count'] += 1
-                                    by_entity_type[entity_type_dir]['size'] += file_size
-
-            return {
-                'total_files': file_count,
-                'total_size': total_size,
-                'total_size_mb': round(total_size / (1024 * 1024), 2),
-                'total_size_gb': round(total_size / (1024 * 1024 * 1024), 2),
-                'by_entity_type': by_entity_type
-            }
-
-    def cleanup_orphaned_files(self, dry_run: bool = True) -> Dict:
+        Args:
+            max_workers: Number of directory-scanning threads
+            dry_run: If True, only report drift
+
+        Returns:
+            Dictionary with reconciliation statistics
+        """
+        return storage_ledger.reconcile_storage_usage(self.base_upload_folder,
+                                                      max_workers=max_workers, dry_run=dry_run)
+
+    def cleanup_orphaned_files(self, dry_run: bool = True, quarantine: bool = True,
+                               grace_period_seconds: int = 3600, retention_days: int = 30,
+                               batch_size: int = 500, max_files_per_second: float = None) -> Dict:
         """
         Find and optionally delete orphaned files (files without database records).
 
         Args:
             dry_run: If True, only report what would be deleted without actually deleting
+            quarantine: Move orphans to quarantine/<date>/ instead of deleting them
+            grace_period_seconds: Ignore files modified within this window (in-flight uploads)
+            retention_days: Keep files of soft-deleted documents for this many days
+            batch_size: Number of paths checked per database query
+            max_files_per_second: Optional rate limit for deletes/moves
 
         Returns:
             Dictionary with cleanup statistics
         """
-        # This would require database access to check which files are orphaned
-        # Implementation would be added in the documents.py file where we have db access
-        return {
-            'message': 'Orphaned file cleanup requires database access',
-            'dry_run': dry_run
-        }
+        from project.api.storage_gc import OrphanedFileCollector
+
+        collector = OrphanedFileCollector(
+            self.base_upload_folder,
+            dry_run=dry_run,
+            quarantine=quarantine,
+            grace_period_seconds=grace_period_seconds,
+            retention_days=retention_days,
+            batch_size=batch_size,
+            max_files_per_second=max_files_per_second
+        )
+        return collector.run()
 
 
 # Singleton instance
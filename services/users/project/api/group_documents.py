@@ -6,10 +6,13 @@ import os
 import datetime
 from flask import Blueprint, jsonify, request, send_file
 from functools import wraps
+from sqlalchemy import select
 from werkzeug.utils import secure_filename
 from project import db
 from project.api.models import GroupDocument, SavingsGroup, User, GroupMember
 from project.api.file_storage_service import get_file_storage_service
+from project.api.read_models import ReadModel
+from project.api.read_routing import allows_writes
 
 group_documents_blueprint = Blueprint('group_documents', __name__)
 
@@ -63,6 +66,43 @@ def is_group_admin(user_id, group_id):
     return member.role in ['ADMIN', 'LEADER', 'CHAIRPERSON', 'SECRETARY', 'TREASURER']
 
 
+class GroupDocumentListItem(ReadModel):
+    """The GroupDocument columns the document list shows, with the uploader's username."""
+
+    columns = (
+        GroupDocument.id, GroupDocument.document_title, GroupDocument.document_type, GroupDocument.file_name,
+        GroupDocument.file_size, GroupDocument.mime_type, GroupDocument.upload_date, GroupDocument.uploaded_by,
+        GroupDocument.version, GroupDocument.version_number, GroupDocument.description,
+        GroupDocument.is_compressed, GroupDocument.compression_ratio, GroupDocument.has_preview,
+        GroupDocument.download_count, User.username.label('uploader_username'),
+    )
+    __slots__ = ReadModel.slots(columns)
+
+    @classmethod
+    def select(cls):
+        return super().select().select_from(GroupDocument).outerjoin(User, User.id == GroupDocument.uploaded_by)
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'document_title': self.document_title,
+            'document_type': self.document_type,
+            'file_name': self.file_name,
+            'file_size': self.file_size,
+            'mime_type': self.mime_type,
+            'upload_date': self.upload_date.isoformat() if self.upload_date else None,
+            'uploaded_by': self.uploader_username or 'Unknown',
+            'uploader_id': self.uploaded_by,
+            'version': self.version,
+            'version_number': self.version_number,
+            'description': self.description,
+            'is_compressed': self.is_compressed,
+            'compression_ratio': float(self.compression_ratio) if self.compression_ratio else None,
+            'has_preview': self.has_preview,
+            'download_count': self.download_count or 0
+        }
+
+
 def allowed_file(filename):
     """Check if file extension is allowed (PDF only)."""
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
@@ -72,8 +112,7 @@ def allowed_file(filename):
 @authenticate
 def get_group_documents(user_id, group_id):
     """Get all documents for a group."""
-    group = SavingsGroup.query.get(group_id)
-    if not group:
+    if db.session.execute(select(SavingsGroup.id).where(SavingsGroup.id == group_id)).first() is None:
         return jsonify({'status': 'error', 'message': 'Group not found'}), 404
 
     # Check if user is super admin (bypass membership check)
@@ -92,41 +131,19 @@ def get_group_documents(user_id, group_id):
     # Get document type filter from query params
     document_type = request.args.get('type')
     
-    query = GroupDocument.query.filter_by(
-        group_id=group_id,
-        is_deleted=False
+    query = GroupDocumentListItem.select().where(
+        GroupDocument.group_id == group_id,
+        GroupDocument.is_deleted == False
     )
     
     if document_type and document_type in ALLOWED_DOCUMENT_TYPES:
-        query = query.filter_by(document_type=document_type)
-    
-    documents = query.order_by(GroupDocument.upload_date.desc()).all()
+        query = query.where(GroupDocument.document_type == document_type)
     
-    documents_data = []
-    for doc in documents:
-        uploader = User.query.get(doc.uploaded_by) if doc.uploaded_by else None
-        documents_data.append({
-            'id': doc.id,
-            'document_title': doc.document_title,
-            'document_type': doc.document_type,
-            'file_name': doc.file_name,
-            'file_size': doc.file_size,
-            'mime_type': doc.mime_type,
-            'upload_date': doc.upload_date.isoformat() if doc.upload_date else None,
-            'uploaded_by': uploader.username if uploader else 'Unknown',
-            'uploader_id': doc.uploaded_by,
-            'version': doc.version,
-            'version_number': doc.version_number,
-            'description': doc.description,
-            'is_compressed': doc.is_compressed,
-            'compression_ratio': float(doc.compression_ratio) if doc.compression_ratio else None,
-            'has_preview': doc.has_preview,
-            'download_count': doc.download_count or 0
-        })
+    documents = GroupDocumentListItem.fetch(query.order_by(GroupDocument.upload_date.desc()))
     
     return jsonify({
         'status': 'success',
-        'data': documents_data
+        'data': [doc.to_dict() for doc in documents]
     }), 200
 
 
@@ -302,6 +319,7 @@ def delete_group_document(user_id, group_id, document_id):
 
 
 @group_documents_blueprint.route('/groups/<int:group_id>/documents/<int:document_id>/download', methods=['GET'])
+@allows_writes
 @authenticate
 def download_group_document(user_id, group_id, document_id):
     """Download a group document."""
@@ -339,8 +357,9 @@ def download_group_document(user_id, group_id, document_id):
     document.last_accessed = datetime.datetime.utcnow()
     db.session.commit()
 
+    storage_service = get_file_storage_service()
     return send_file(
-        document.file_path,
+        storage_service.open_file(document.file_path, document.is_compressed),
         as_attachment=True,
         download_name=document.file_name,
         mimetype=document.mime_type
@@ -348,6 +367,7 @@ def download_group_document(user_id, group_id, document_id):
 
 
 @group_documents_blueprint.route('/groups/<int:group_id>/documents/<int:document_id>/preview', methods=['GET'])
+@allows_writes
 @authenticate
 def preview_group_document(user_id, group_id, document_id):
     """Preview a group document."""
@@ -387,8 +407,9 @@ def preview_group_document(user_id, group_id, document_id):
     document.last_accessed = datetime.datetime.utcnow()
     db.session.commit()
 
+    storage_service = get_file_storage_service()
     return send_file(
-        preview_path,
+        storage_service.open_file(preview_path, document.is_compressed and preview_path == document.file_path),
         mimetype=document.mime_type
     )
 
@@ -8,6 +8,7 @@ import jwt
 
 from project import db
 from project.api.models import SavingsGroup, GroupSettings, GroupDocument
+from project.api.shared_cache import bump_group_version, cached_json_response
 
 
 group_settings_blueprint = Blueprint('group_settings', __name__)
@@ -42,170 +43,182 @@ def authenticate(f):
     return decorated_function
 
 
+def _default_settings(group_id):
+    """Unsaved settings carrying the column defaults, for groups that never saved any."""
+    settings = GroupSettings(group_id=group_id)
+    for column in GroupSettings.__table__.columns:
+        if column.default is not None and column.default.is_scalar:
+            setattr(settings, column.key, column.default.arg)
+    return settings
+
+
+def _group_settings_data(group_id):
+    """The settings response data of a group, or None if the group does not exist."""
+    group = SavingsGroup.query.filter_by(id=group_id).first()
+    if not group:
+        return None
+
+    settings = GroupSettings.query.filter_by(group_id=group_id).first() or _default_settings(group_id)
+
+    # Get mobile money account
+    mobile_money_query = db.text("""
+        SELECT provider, account_number, account_holder
+        FROM group_mobile_money_accounts
+        WHERE group_id = :group_id AND is_primary = TRUE
+        LIMIT 1
+    """)
+    mobile_money_result = db.session.execute(mobile_money_query, {'group_id': group_id}).fetchone()
+
+    mobile_money = None
+    if mobile_money_result:
+        mobile_money = {
+            'provider': mobile_money_result[0],
+            'account_number': mobile_money_result[1],
+            'account_holder': mobile_money_result[2]
+        }
+
+    response_data = {
+        'group_id': group.id,
+        'group_name': group.name,
+        
+        # Basic Information
+        'basic_info': {
+            'name': group.name,
+            'description': group.description,
+            'formation_date': group.formation_date.isoformat() if group.formation_date else None,
+            'max_members': group.max_members,
+            'saving_cycle_months': group.saving_cycle_months,
+            'status': group.status,
+        },
+        
+        # Location
+        'location': {
+            'country': group.country,
+            'region': group.region,
+            'district': group.district,
+            'parish': group.parish,
+            'village': group.village,
+            'meeting_location': group.meeting_location,
+            'latitude': float(group.latitude) if group.latitude else None,
+            'longitude': float(group.longitude) if group.longitude else None,
+        },
+        
+        # Meeting Schedule
+        'meeting_schedule': {
+            'meeting_day': group.meeting_day,
+            'meeting_frequency': group.meeting_frequency,
+            'meeting_time': group.meeting_time.isoformat() if group.meeting_time else None,
+            'meeting_location': group.meeting_location,
+        },
+        
+        # Registration
+        'registration': {
+            'is_registered': group.is_registered,
+            'registration_number': group.registration_number,
+            'registration_date': group.registration_date.isoformat() if group.registration_date else None,
+            'registration_authority': group.registration_authority,
+            'certificate_number': group.certificate_number,
+        },
+        
+        # Constitution
+        'constitution': {
+            'document_url': group.constitution_document_url,
+            'version': group.constitution_version,
+            'description': group.constitution_description,
+        },
+        
+        # Financial Settings
+        'financial_settings': {
+            'currency': group.currency,
+            'share_value': float(group.share_value) if group.share_value else None,
+            'standard_fine_amount': float(group.standard_fine_amount) if group.standard_fine_amount else None,
+            'loan_interest_rate': float(group.loan_interest_rate) if group.loan_interest_rate else None,
+            'negotiated_interest_rate': float(group.negotiated_interest_rate) if group.negotiated_interest_rate else None,
+            'minimum_contribution': float(group.minimum_contribution) if group.minimum_contribution else None,
+            'target_amount': float(group.target_amount) if group.target_amount else None,
+        },
+        
+        # Mobile Money
+        'mobile_money': mobile_money,
+        
+        # Financial Activities
+        'financial_activities': {
+            'personal_savings': {
+                'enabled': settings.personal_savings_enabled,
+                'minimum': float(settings.personal_savings_minimum) if settings.personal_savings_minimum else None,
+                'maximum': float(settings.personal_savings_maximum) if settings.personal_savings_maximum else None,
+            },
+            'ecd_fund': {
+                'enabled': settings.ecd_fund_enabled,
+                'minimum': float(settings.ecd_fund_minimum) if settings.ecd_fund_minimum else None,
+                'maximum': float(settings.ecd_fund_maximum) if settings.ecd_fund_maximum else None,
+            },
+            'emergency_fund': {
+                'enabled': settings.emergency_fund_enabled,
+            },
+            'social_fund': {
+                'enabled': settings.social_fund_enabled,
+                'minimum': float(settings.social_fund_minimum) if settings.social_fund_minimum else None,
+                'maximum': float(settings.social_fund_maximum) if settings.social_fund_maximum else None,
+            },
+            'target_fund': {
+                'enabled': settings.target_fund_enabled,
+            },
+        },
+        
+        # Attendance Tracking
+        'attendance_tracking': {
+            'enabled': settings.attendance_tracking_enabled,
+        },
+        
+        # Loan Activities
+        'loan_activities': {
+            'loan_disbursement_enabled': settings.loan_disbursement_enabled,
+            'loan_repayment_enabled': settings.loan_repayment_enabled,
+            'max_loan_multiplier': float(settings.max_loan_multiplier) if settings.max_loan_multiplier else None,
+            'min_months_for_loan': settings.min_months_for_loan,
+            'min_attendance_for_loan': float(settings.min_attendance_for_loan) if settings.min_attendance_for_loan else None,
+        },
+        
+        # Other Activities
+        'other_activities': {
+            'voting_session_enabled': settings.voting_session_enabled,
+            'training_session_enabled': settings.training_session_enabled,
+            'fine_collection_enabled': settings.fine_collection_enabled,
+        },
+        
+        # Fine Settings
+        'fine_settings': {
+            'late_arrival_fine': float(settings.late_arrival_fine) if settings.late_arrival_fine else None,
+            'absence_fine': float(settings.absence_fine) if settings.absence_fine else None,
+            'missed_contribution_fine': float(settings.missed_contribution_fine) if settings.missed_contribution_fine else None,
+        },
+        
+        # Meeting Settings
+        'meeting_settings': {
+            'quorum_percentage': float(settings.quorum_percentage) if settings.quorum_percentage else None,
+            'allow_proxy_voting': settings.allow_proxy_voting,
+        },
+    }
+
+    return response_data
+
+
 @group_settings_blueprint.route('/<int:group_id>/settings', methods=['GET'])
 @authenticate
 def get_group_settings(user_id, group_id):
-    """Get complete group settings including all configuration."""
+    """
+    Get complete group settings including all configuration. Served from the
+    shared cache; send the ETag back in If-None-Match to get 304 if unchanged.
+    """
     try:
-        group = SavingsGroup.query.filter_by(id=group_id).first()
-        if not group:
+        response = cached_json_response(group_id, 'settings', lambda: _group_settings_data(group_id))
+        if response is None:
             return jsonify({
                 'status': 'fail',
                 'message': 'Group not found.'
             }), 404
-
-        # Get or create group settings
-        settings = GroupSettings.query.filter_by(group_id=group_id).first()
-        if not settings:
-            settings = GroupSettings(group_id=group_id)
-            db.session.add(settings)
-            db.session.commit()
-
-        # Get mobile money account
-        mobile_money_query = db.text("""
-            SELECT provider, account_number, account_holder
-            FROM group_mobile_money_accounts
-            WHERE group_id = :group_id AND is_primary = TRUE
-            LIMIT 1
-        """)
-        mobile_money_result = db.session.execute(mobile_money_query, {'group_id': group_id}).fetchone()
-
-        mobile_money = None
-        if mobile_money_result:
-            mobile_money = {
-                'provider': mobile_money_result[0],
-                'account_number': mobile_money_result[1],
-                'account_holder': mobile_money_result[2]
-            }
-
-        response_data = {
-            'group_id': group.id,
-            'group_name': group.name,
-            
-            # Basic Information
-            'basic_info': {
-                'name': group.name,
-                'description': group.description,
-                'formation_date': group.formation_date.isoformat() if group.formation_date else None,
-                'max_members': group.max_members,
-                'saving_cycle_months': group.saving_cycle_months,
-                'status': group.status,
-            },
-            
-            # Location
-            'location': {
-                'country': group.country,
-                'region': group.region,
-                'district': group.district,
-                'parish': group.parish,
-                'village': group.village,
-                'meeting_location': group.meeting_location,
-                'latitude': float(group.latitude) if group.latitude else None,
-                'longitude': float(group.longitude) if group.longitude else None,
-            },
-            
-            # Meeting Schedule
-            'meeting_schedule': {
-                'meeting_day': group.meeting_day,
-                'meeting_frequency': group.meeting_frequency,
-                'meeting_time': group.meeting_time.isoformat() if group.meeting_time else None,
-                'meeting_location': group.meeting_location,
-            },
-            
-            # Registration
-            'registration': {
-                'is_registered': group.is_registered,
-                'registration_number': group.registration_number,
-                'registration_date': group.registration_date.isoformat() if group.registration_date else None,
-                'registration_authority': group.registration_authority,
-                'certificate_number': group.certificate_number,
-            },
-            
-            # Constitution
-            'constitution': {
-                'document_url': group.constitution_document_url,
-                'version': group.constitution_version,
-                'description': group.constitution_description,
-            },
-            
-            # Financial Settings
-            'financial_settings': {
-                'currency': group.currency,
-                'share_value': float(group.share_value) if group.share_value else None,
-                'standard_fine_amount': float(group.standard_fine_amount) if group.standard_fine_amount else None,
-                'loan_interest_rate': float(group.loan_interest_rate) if group.loan_interest_rate else None,
-                'negotiated_interest_rate': float(group.negotiated_interest_rate) if group.negotiated_interest_rate else None,
-                'minimum_contribution': float(group.minimum_contribution) if group.minimum_contribution else None,
-                'target_amount': float(group.target_amount) if group.target_amount else None,
-            },
-            
-            # Mobile Money
-            'mobile_money': mobile_money,
-            
-            # Financial Activities
-            'financial_activities': {
-                'personal_savings': {
-                    'enabled': settings.personal_savings_enabled,
-                    'minimum': float(settings.personal_savings_minimum) if settings.personal_savings_minimum else None,
-                    'maximum': float(settings.personal_savings_maximum) if settings.personal_savings_maximum else None,
-                },
-                'ecd_fund': {
-                    'enabled': settings.ecd_fund_enabled,
-                    'minimum': float(settings.ecd_fund_minimum) if settings.ecd_fund_minimum else None,
-                    'maximum': float(settings.ecd_fund_maximum) if settings.ecd_fund_maximum else None,
-                },
-                'emergency_fund': {
-                    'enabled': settings.emergency_fund_enabled,
-                },
-                'social_fund': {
-                    'enabled': settings.social_fund_enabled,
-                    'minimum': float(settings.social_fund_minimum) if settings.social_fund_minimum else None,
-                    'maximum': float(settings.social_fund_maximum) if settings.social_fund_maximum else None,
-                },
-                'target_fund': {
-                    'enabled': settings.target_fund_enabled,
-                },
-            },
-            
-            # Attendance Tracking
-            'attendance_tracking': {
-                'enabled': settings.attendance_tracking_enabled,
-            },
-            
-            # Loan Activities
-            'loan_activities': {
-                'loan_disbursement_enabled': settings.loan_disbursement_enabled,
-                'loan_repayment_enabled': settings.loan_repayment_enabled,
-                'max_loan_multiplier': float(settings.max_loan_multiplier) if settings.max_loan_multiplier else None,
-                'min_months_for_loan': settings.min_months_for_loan,
-                'min_attendance_for_loan': float(settings.min_attendance_for_loan) if settings.min_attendance_for_loan else None,
-            },
-            
-            # Other Activities
-            'other_activities': {
-                'voting_session_enabled': settings.voting_session_enabled,
-                'training_session_enabled': settings.training_session_enabled,
-                'fine_collection_enabled': settings.fine_collection_enabled,
-            },
-            
-            # Fine Settings
-            'fine_settings': {
-                'late_arrival_fine': float(settings.late_arrival_fine) if settings.late_arrival_fine else None,
-                'absence_fine': float(settings.absence_fine) if settings.absence_fine else None,
-                'missed_contribution_fine': float(settings.missed_contribution_fine) if settings.missed_contribution_fine else None,
-            },
-            
-            # Meeting Settings
-            'meeting_settings': {
-                'quorum_percentage': float(settings.quorum_percentage) if settings.quorum_percentage else None,
-                'allow_proxy_voting': settings.allow_proxy_voting,
-            },
-        }
-
-        return jsonify({
-            'status': 'success',
-            'data': response_data
-        }), 200
+        return response
 
     except Exception as e:
         return jsonify({
@@ -405,6 +418,7 @@ def update_group_settings(user_id, group_id):
         settings.updated_date = datetime.datetime.utcnow()
         
         db.session.commit()
+        bump_group_version(group_id)
 
         return jsonify({
             'status': 'success',
@@ -0,0 +1,157 @@
+"""
+Loan Delinquency
+Nightly batch that maintains GroupLoan.payments_made, payments_missed,
+days_overdue and amount_paid for the whole active portfolio. Each chunk of
+loans is evaluated with one aggregate query (installments due vs. the sum
+of recorded repayments) and written back with one executemany UPDATE.
+"""
+import datetime
+from typing import Callable, Dict, Optional
+from project import db
+
+
+# Loans that can fall into arrears
+ACTIVE_LOAN_STATUSES = ('DISBURSED', 'REPAYING', 'ACTIVE')
+
+DEFAULT_CHUNK_SIZE = 5000
+
+# Tolerance for rounding differences between installments and repayments
+PAYMENT_TOLERANCE = 0.005
+
+DELINQUENCY_SQL = db.text("""
+    WITH loans AS (
+        SELECT id, maturity_date, outstanding_balance,
+               payments_made, payments_missed, days_overdue, amount_paid
+        FROM group_loans
+        WHERE id > :after_id AND status IN :statuses
+        ORDER BY id
+        LIMIT :chunk_size
+    ),
+    paid AS (
+        SELECT lr.loan_id, COUNT(*) AS payments_made, SUM(lr.repayment_amount) AS total_paid
+        FROM loan_repayments lr
+        JOIN loans ON loans.id = lr.loan_id
+        GROUP BY lr.loan_id
+    ),
+    due AS (
+        SELECT li.loan_id, li.due_date,
+               SUM(li.amount_due) OVER (PARTITION BY li.loan_id ORDER BY li.installment_number) AS cumulative_due
+        FROM loan_installments li
+        JOIN loans ON loans.id = li.loan_id
+        WHERE li.due_date < :as_of
+    ),
+    missed AS (
+        SELECT due.loan_id, COUNT(*) AS payments_missed, MIN(due.due_date) AS first_missed_date
+        FROM due
+        LEFT JOIN paid ON paid.loan_id = due.loan_id
+        WHERE due.cumulative_due > COALESCE(paid.total_paid, 0) + :tolerance
+        GROUP BY due.loan_id
+    ),
+    scheduled AS (
+        SELECT DISTINCT li.loan_id
+        FROM loan_installments li
+        JOIN loans ON loans.id = li.loan_id
+    )
+    SELECT loans.id, loans.maturity_date, loans.outstanding_balance,
+           loans.payments_made AS old_payments_made, loans.payments_missed AS old_payments_missed,
+           loans.days_overdue AS old_days_overdue, loans.amount_paid AS old_amount_paid,
+           COALESCE(paid.payments_made, 0) AS payments_made,
+           COALESCE(paid.total_paid, 0) AS total_paid,
+           COALESCE(missed.payments_missed, 0) AS payments_missed,
+           missed.first_missed_date,
+           scheduled.loan_id IS NOT NULL AS has_schedule
+    FROM loans
+    LEFT JOIN paid ON paid.loan_id = loans.id
+    LEFT JOIN missed ON missed.loan_id = loans.id
+    LEFT JOIN scheduled ON scheduled.loan_id = loans.id
+    ORDER BY loans.id
+""").bindparams(db.bindparam('statuses', expanding=True))
+
+UPDATE_SQL = db.text("""
+    UPDATE group_loans
+    SET payments_made = :payments_made, payments_missed = :payments_missed,
+        days_overdue = :days_overdue, amount_paid = :amount_paid, updated_date = :now
+    WHERE id = :id
+""")
+
+
+def _as_date(value) -> Optional[datetime.date]:
+    if isinstance(value, str):
+        return datetime.date.fromisoformat(value[:10])
+    if isinstance(value, datetime.datetime):
+        return value.date()
+    return value
+
+
+def _days_overdue(row, as_of: datetime.date) -> int:
+    """Days since the oldest unpaid installment, or since maturity for loans without a schedule."""
+    first_missed = _as_date(row.first_missed_date)
+    if first_missed:
+        return (as_of - first_missed).days
+
+    maturity_date = _as_date(row.maturity_date)
+    if not row.has_schedule and maturity_date and maturity_date < as_of and float(row.outstanding_balance or 0) > 0:
+        return (as_of - maturity_date).days
+    return 0
+
+
+def update_loan_delinquency(as_of: datetime.date = None, chunk_size: int = DEFAULT_CHUNK_SIZE,
+                            progress: Callable[[Dict], None] = None) -> Dict:
+    """
+    Recompute arrears counters for every active loan.
+
+    Args:
+        as_of: Date arrears are measured at (defaults to today)
+        chunk_size: Loans evaluated and committed per chunk
+        progress: Optional callable receiving the running statistics after each chunk
+
+    Returns:
+        Dictionary with loans_processed, loans_updated, loans_overdue and chunks
+    """
+    as_of = as_of or datetime.date.today()
+    stats = {'loans_processed': 0, 'loans_updated': 0, 'loans_overdue': 0, 'chunks': 0}
+    after_id = 0
+
+    while True:
+        rows = db.session.execute(DELINQUENCY_SQL, {
+            'after_id': after_id,
+            'statuses': list(ACTIVE_LOAN_STATUSES),
+            'chunk_size': chunk_size,
+            'as_of': as_of,
+            'tolerance': PAYMENT_TOLERANCE
+        }).fetchall()
+        if not rows:
+            break
+
+        now = datetime.datetime.utcnow()
+        updates = []
+        for row in rows:
+            days_overdue = _days_overdue(row, as_of)
+            new_values = (int(row.payments_made), int(row.payments_missed), days_overdue,
+                          round(float(row.total_paid), 2))
+            old_values = (row.old_payments_made, row.old_payments_missed, row.old_days_overdue,
+                          round(float(row.old_amount_paid or 0), 2))
+            if days_overdue > 0:
+                stats['loans_overdue'] += 1
+            if new_values != old_values:
+                updates.append({
+                    'id': row.id,
+                    'payments_made': new_values[0],
+                    'payments_missed': new_values[1],
+                    'days_overdue': new_values[2],
+                    'amount_paid': new_values[3],
+                    'now': now
+                })
+
+        if updates:
+            db.session.execute(UPDATE_SQL, updates)
+        db.session.commit()
+
+        after_id = rows[-1].id
+        stats['loans_processed'] += len(rows)
+        stats['loans_updated'] += len(updates)
+        stats['chunks'] += 1
+        if progress:
+            progress(stats)
+
+    return stats
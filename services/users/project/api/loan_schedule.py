@@ -0,0 +1,361 @@
+"""
+Loan Schedule
+Vectorized amortization engine and persistence for the loan_installments
+table. Schedules for any number of loans are computed in one pass of NumPy
+array operations (no per-installment Python loop), so the whole portfolio
+can be regenerated in a single batch.
+
+term_months is the number of monthly installments. interest_rate is read
+per the loan's interest_basis:
+- MONTHLY: the rate applies every month
+- TERM:    the rate covers the whole term (total due = principal x (1 + rate)
+           for a flat loan), i.e. rate / term_months per month
+Two methods are supported:
+- FLAT:      interest = principal x monthly rate every month, equal principal parts
+- DECLINING: equal (annuity) payments, interest on the remaining balance
+
+regenerate_loan_schedules() only rebuilds a loan whose schedule adds up to
+its recorded total_amount_due; other loans are skipped and reported.
+"""
+import datetime
+from decimal import Decimal
+from typing import Dict, Iterable, List, Optional
+from sqlalchemy import func
+from project import db
+from project.api.models import GroupLoan, LoanInstallment, LoanRepayment
+from project.api.archival import history_table
+from project.api.balance_service import MONEY
+from project.api.media_backends import backends
+
+
+METHOD_FLAT = 'FLAT'
+METHOD_DECLINING = 'DECLINING'
+
+BASIS_MONTHLY = 'MONTHLY'
+BASIS_TERM = 'TERM'
+
+# Loans whose schedule is fixed and can be generated or regenerated
+SCHEDULED_STATUSES = ('APPROVED', 'DISBURSED', 'REPAYING', 'ACTIVE')
+
+DEFAULT_BATCH_SIZE = 1000
+
+# Rounding allowed between a schedule's total and the loan's total_amount_due
+TOTAL_TOLERANCE = Decimal('0.01')
+
+# One atomic read-modify-write of the loan row, refused if the amount exceeds what is owed
+LOAN_REPAYMENT_SQL = db.text("""
+    UPDATE group_loans
+    SET outstanding_balance = COALESCE(outstanding_balance, total_amount_due) - :amount,
+        amount_paid = COALESCE(amount_paid, 0) + :amount,
+        status = CASE WHEN COALESCE(outstanding_balance, total_amount_due) - :amount <= 0
+                      THEN 'PAID' ELSE status END
+    WHERE id = :loan_id AND COALESCE(outstanding_balance, total_amount_due) >= :amount
+    RETURNING outstanding_balance
+""").bindparams(db.bindparam('amount', type_=MONEY)).columns(outstanding_balance=MONEY)
+
+
+def _numpy():
+    np = backends.get('numpy')
+    if np is None:
+        raise RuntimeError('NumPy is required to generate loan schedules')
+    return np
+
+
+def compute_schedules(principal, rate, term_months, declining, start_dates, term_basis=None) -> Dict:
+    """
+    Compute amortization schedules for many loans at once.
+
+    Args:
+        principal: Principal per loan
+        rate: Interest rate per loan (0.05 = 5%), monthly unless term_basis
+        term_months: Number of installments per loan (>= 1)
+        declining: True per loan for declining-balance, False for flat
+        start_dates: Disbursement (or approval) date per loan
+        term_basis: True per loan whose rate covers the whole term (default all False)
+
+    Returns:
+        Dictionary of flat arrays, one element per installment:
+        loan_index, installment_number, due_date, principal_due,
+        interest_due, amount_due, balance_after
+    """
+    np = _numpy()
+    principal = np.asarray(principal, dtype=np.float64)
+    rate = np.asarray(rate, dtype=np.float64)
+    term = np.maximum(np.asarray(term_months, dtype=np.int64), 1)
+    declining = np.asarray(declining, dtype=bool)
+    term_basis = np.zeros(len(principal), dtype=bool) if term_basis is None else np.asarray(term_basis, dtype=bool)
+    term_rate = np.where(term_basis, rate, 0.0)
+    rate = np.where(term_basis, rate / term, rate)
+    start = np.asarray(start_dates, dtype='datetime64[D]')
+    if not len(principal):
+        empty = np.array([], dtype=np.float64)
+        return {'loan_index': np.array([], dtype=np.int64), 'installment_number': np.array([], dtype=np.int64),
+                'due_date': np.array([], dtype='datetime64[D]'), 'principal_due': empty,
+                'interest_due': empty, 'amount_due': empty, 'balance_after': empty}
+
+    # One row per installment; k is the 1-based installment number within its loan
+    loan_index = np.repeat(np.arange(len(principal)), term)
+    ends = np.cumsum(term)
+    offsets = np.repeat(ends - term, term)
+    k = np.arange(ends[-1]) - offsets + 1
+
+    p = principal[loan_index]
+    r = rate[loan_index]
+    n = term[loan_index]
+
+    # Flat: equal principal parts, interest on the original principal
+    flat_principal = p / n
+    flat_interest = p * r
+
+    # Declining: annuity payment A = P.r / (1 - (1 + r)^-n), balance before period k
+    # B(k-1) = P.(1 + r)^(k-1) - A.((1 + r)^(k-1) - 1) / r
+    with np.errstate(divide='ignore', invalid='ignore'):
+        growth = np.power(1 + r, k - 1)
+        annuity = np.where(r > 0, p * r / (1 - np.power(1 + r, -n)), p / n)
+        opening = np.where(r > 0, p * growth - annuity * (growth - 1) / r, p - annuity * (k - 1))
+    declining_interest = opening * r
+    declining_principal = annuity - declining_interest
+
+    is_declining = declining[loan_index]
+    principal_due = np.round(np.where(is_declining, declining_principal, flat_principal), 2)
+    interest_due = np.round(np.where(is_declining, declining_interest, flat_interest), 2)
+
+    # The last installment absorbs rounding so principal parts sum to the principal
+    starts = ends - term
+    principal_due[ends - 1] += principal - np.add.reduceat(principal_due, starts)
+    principal_due = np.round(principal_due, 2)
+
+    # ...and, for flat loans quoted per term, so interest sums to principal x rate
+    term_flat = term_basis & ~declining
+    term_interest = np.round(principal * term_rate, 2)
+    interest_due[ends - 1] += np.where(term_flat, term_interest - np.add.reduceat(interest_due, starts), 0)
+    interest_due = np.round(interest_due, 2)
+
+    # Principal repaid so far within each loan = running total minus previous loans' totals
+    running = np.cumsum(principal_due)
+    previous_loans = np.concatenate(([0.0], running[ends - 1][:-1]))
+    balance_after = np.round(p - (running - np.repeat(previous_loans, term)), 2)
+
+    # Due dates: same day of month as the start, clamped to the month's length
+    start_months = start.astype('datetime64[M]')
+    start_day = (start - start_months.astype('datetime64[D]')).astype(np.int64)
+    due_months = start_months[loan_index] + k
+    month_length = ((due_months + 1).astype('datetime64[D]') - due_months.astype('datetime64[D]')).astype(np.int64)
+    due_date = due_months.astype('datetime64[D]') + np.minimum(start_day[loan_index], month_length - 1)
+
+    return {
+        'loan_index': loan_index,
+        'installment_number': k,
+        'due_date': due_date,
+        'principal_due': principal_due,
+        'interest_due': interest_due,
+        'amount_due': np.round(principal_due + interest_due, 2),
+        'balance_after': balance_after,
+    }
+
+
+def _schedule_start(loan) -> datetime.date:
+    return loan.disbursement_date or loan.approval_date or loan.application_date or datetime.date.today()
+
+
+def _load_repaid_totals(loan_ids: List[int]) -> Dict[int, Decimal]:
+    repayments = history_table(LoanRepayment)
+    rows = db.session.query(
+        repayments.c.loan_id, func.coalesce(func.sum(repayments.c.repayment_amount), 0)
+    ).filter(repayments.c.loan_id.in_(loan_ids)).group_by(repayments.c.loan_id).all()
+    return {loan_id: Decimal(str(total)) for loan_id, total in rows}
+
+
+def _allocate_payments(rows: List[Dict], repaid: Dict[int, Decimal]):
+    """Fill amount_paid/status of ordered installment rows from each loan's repaid total."""
+    remaining = dict(repaid)
+    for row in rows:
+        available = remaining.get(row['loan_id'], Decimal('0'))
+        paid = min(available, row['amount_due'])
+        remaining[row['loan_id']] = available - paid
+        row['amount_paid'] = paid
+        row['status'] = 'PAID' if paid >= row['amount_due'] else ('PARTIAL' if paid > 0 else 'PENDING')
+
+
+def build_installment_rows(loans: List) -> List[Dict]:
+    """Compute loan_installments rows (without payments applied) for a list of GroupLoan-like rows."""
+    if not loans:
+        return []
+
+    np = _numpy()
+    schedule = compute_schedules(
+        [float(loan.principal) for loan in loans],
+        [float(loan.interest_rate or 0) for loan in loans],
+        [int(loan.term_months or 1) for loan in loans],
+        [(loan.interest_method or METHOD_FLAT).upper() == METHOD_DECLINING for loan in loans],
+        np.array([_schedule_start(loan) for loan in loans], dtype='datetime64[D]'),
+        [(loan.interest_basis or BASIS_MONTHLY).upper() == BASIS_TERM for loan in loans]
+    )
+
+    now = datetime.datetime.utcnow()
+    columns = zip(
+        schedule['loan_index'].tolist(),
+        schedule['installment_number'].tolist(),
+        schedule['due_date'].astype(object),
+        schedule['principal_due'].tolist(),
+        schedule['interest_due'].tolist(),
+        schedule['amount_due'].tolist(),
+        schedule['balance_after'].tolist()
+    )
+    return [{
+        'loan_id': loans[loan_index].id,
+        'group_id': loans[loan_index].group_id,
+        'member_id': loans[loan_index].member_id,
+        'installment_number': number,
+        'due_date': due_date,
+        'principal_due': Decimal(f"{principal_due:.2f}"),
+        'interest_due': Decimal(f"{interest_due:.2f}"),
+        'amount_due': Decimal(f"{amount_due:.2f}"),
+        'balance_after': Decimal(f"{balance_after:.2f}"),
+        'created_date': now,
+    } for loan_index, number, due_date, principal_due, interest_due, amount_due, balance_after in columns]
+
+
+def _replace_schedules(loans: List, rows: Optional[List[Dict]] = None) -> int:
+    """Delete and re-insert the installments of loans, re-applying recorded repayments."""
+    loan_ids = [loan.id for loan in loans]
+    if rows is None:
+        rows = build_installment_rows(loans)
+    _allocate_payments(rows, _load_repaid_totals(loan_ids))
+
+    db.session.execute(LoanInstallment.__table__.delete().where(LoanInstallment.loan_id.in_(loan_ids)))
+    if rows:
+        db.session.execute(LoanInstallment.__table__.insert(), rows)
+    return len(rows)
+
+
+def generate_loan_schedule(loan: GroupLoan, update_totals: bool = True) -> List[LoanInstallment]:
+    """
+    (Re)generate the schedule of one loan. Does not commit.
+
+    Called when a loan is approved or disbursed, where monthly_payment,
+    total_amount_due, outstanding_balance and maturity_date are then set
+    from the schedule (update_totals).
+    """
+    db.session.flush()
+    _replace_schedules([loan])
+    db.session.expire(loan, ['installments'])
+
+    installments = loan.installments
+    if installments and update_totals:
+        total_due = sum((i.amount_due for i in installments), Decimal('0'))
+        repaid = sum((i.amount_paid for i in installments), Decimal('0'))
+        loan.monthly_payment = installments[0].amount_due
+        loan.total_amount_due = total_due
+        loan.outstanding_balance = total_due - repaid
+        loan.maturity_date = installments[-1].due_date
+    return installments
+
+
+def regenerate_loan_schedules(statuses: Iterable[str] = SCHEDULED_STATUSES, group_id: Optional[int] = None,
+                              batch_size: int = DEFAULT_BATCH_SIZE, progress=None) -> Dict:
+    """
+    Regenerate schedules for every loan in the given statuses, in id-ordered batches.
+
+    Contractual totals on group_loans are left as they are; only the
+    installment table is rebuilt, with existing repayments re-applied.
+    A loan whose computed schedule does not add up to its total_amount_due
+    (e.g. a rate recorded on another basis) keeps its installments and is
+    reported in skipped_loan_ids instead.
+
+    Args:
+        statuses: Loan statuses to include
+        group_id: Optional group to restrict to
+        batch_size: Loans per batch (one compute pass, one insert, one commit)
+        progress: Optional callable(loans_done, installments_done)
+
+    Returns:
+        Dictionary with loans, installments and skipped counts, and skipped_loan_ids
+    """
+    columns = (GroupLoan.id, GroupLoan.group_id, GroupLoan.member_id, GroupLoan.principal,
+               GroupLoan.interest_rate, GroupLoan.interest_method, GroupLoan.interest_basis,
+               GroupLoan.term_months, GroupLoan.total_amount_due,
+               GroupLoan.disbursement_date, GroupLoan.approval_date, GroupLoan.application_date)
+    stats = {'loans': 0, 'installments': 0, 'skipped': 0, 'skipped_loan_ids': []}
+    last_id = 0
+
+    while True:
+        query = db.session.query(*columns).filter(
+            GroupLoan.id > last_id, GroupLoan.status.in_(list(statuses))
+        )
+        if group_id is not None:
+            query = query.filter(GroupLoan.group_id == group_id)
+        loans = query.order_by(GroupLoan.id).limit(batch_size).all()
+        if not loans:
+            break
+
+        rows = build_installment_rows(loans)
+        scheduled = {}
+        for row in rows:
+            scheduled[row['loan_id']] = scheduled.get(row['loan_id'], Decimal('0')) + row['amount_due']
+        matching = {loan.id for loan in loans
+                    if abs(scheduled.get(loan.id, Decimal('0')) - Decimal(str(loan.total_amount_due))) <= TOTAL_TOLERANCE}
+        skipped = [loan.id for loan in loans if loan.id not in matching]
+
+        if matching:
+            stats['installments'] += _replace_schedules(
+                [loan for loan in loans if loan.id in matching],
+                [row for row in rows if row['loan_id'] in matching]
+            )
+        stats['loans'] += len(matching)
+        stats['skipped'] += len(skipped)
+        stats['skipped_loan_ids'].extend(skipped)
+        last_id = loans[-1].id
+        db.session.commit()
+
+        if progress:
+            progress(stats['loans'], stats['installments'])
+
+    return stats
+
+
+def sync_installment_payments(loan_id: int):
+    """Re-derive amount_paid/status of a loan's installments after its repayments changed. Does not commit."""
+    installments = LoanInstallment.query.filter_by(loan_id=loan_id).order_by(LoanInstallment.installment_number).all()
+    rows = [{'loan_id': i.loan_id, 'amount_due': i.amount_due} for i in installments]
+    _allocate_payments(rows, _load_repaid_totals([loan_id]))
+    for installment, row in zip(installments, rows):
+        installment.amount_paid = row['amount_paid']
+        installment.status = row['status']
+
+
+def apply_loan_repayment(loan_id: int, amount: Decimal) -> Optional[Decimal]:
+    """
+    Take a repayment off a loan's outstanding_balance (total_amount_due if
+    it was never set) and add it to amount_paid; the loan becomes PAID when
+    nothing is left. Does not commit.
+
+    Returns:
+        The new outstanding balance, or None if the amount exceeds it
+    """
+    return db.session.execute(LOAN_REPAYMENT_SQL, {'loan_id': loan_id, 'amount': amount}).scalar()
+
+
+def split_repayment(loan: GroupLoan, amount) -> Dict[str, Decimal]:
+    """
+    Split a repayment into interest and principal from the loan's schedule.
+
+    Open installments are settled in order, interest before principal within
+    each; anything beyond the scheduled amounts is treated as principal.
+    """
+    remaining = Decimal(str(amount))
+    interest = Decimal('0')
+
+    for installment in loan.installments:
+        if remaining <= 0:
+            break
+        if installment.status == 'PAID':
+            continue
+        interest_open = max(installment.interest_due - min(installment.amount_paid, installment.interest_due), Decimal('0'))
+        total_open = installment.amount_due - installment.amount_paid
+        applied = min(remaining, total_open)
+        interest += min(applied, interest_open)
+        remaining -= applied
+
+    total = Decimal(str(amount))
+    return {'interest_amount': interest, 'principal_amount': total - interest}
@@ -0,0 +1,248 @@
+"""
+Loan Scoring
+Batch loan eligibility engine populating LoanAssessment. Member features
+(savings, attendance, participation, current debt) for a group - or every
+group - are loaded with one aggregate query, scored in a single vectorized
+NumPy pass and written back with one bulk insert.
+
+Scores are on a 0-10 scale:
+- savings:       balance relative to the group average (average member = 5)
+- attendance:    attendance rate / 10
+- participation: average activity participation score
+Eligibility applies GroupSettings.min_months_for_loan, min_attendance_for_loan
+and max_loan_multiplier (times savings, less outstanding loans).
+"""
+import datetime
+from typing import Dict, List, Optional
+from project import db
+from project.api.models import LoanAssessment
+from project.api.media_backends import backends
+from project.api.loan_delinquency import ACTIVE_LOAN_STATUSES
+from project.api.archival import HISTORY_SQL
+
+
+SCORE_WEIGHTS = {'savings': 0.4, 'attendance': 0.4, 'participation': 0.2}
+
+# Defaults for groups without a group_settings row (same as the model defaults)
+DEFAULT_MAX_LOAN_MULTIPLIER = 3.0
+DEFAULT_MIN_MONTHS_FOR_LOAN = 3
+DEFAULT_MIN_ATTENDANCE_FOR_LOAN = 75.0
+
+# Members with a loan this far in arrears are not eligible for another
+MAX_DAYS_OVERDUE_FOR_LOAN = 30
+
+LOW_RISK_SCORE = 7.5
+MEDIUM_RISK_SCORE = 5.0
+
+MEMBER_FEATURES_SQL = """
+    WITH m AS (
+        SELECT gm.id, gm.group_id, gm.joined_date
+        FROM group_members gm
+        WHERE gm.is_active = TRUE {group_filter}
+    ),
+    sv AS (
+        SELECT ms.member_id, SUM(ms.current_balance) AS savings
+        FROM member_savings ms
+        JOIN m ON m.id = ms.member_id
+        GROUP BY ms.member_id
+    ),
+    att AS (
+        SELECT ma.member_id, COUNT(*) AS meetings,
+               COUNT(CASE WHEN ma.is_present = TRUE THEN 1 END) AS attended
+        FROM {meeting_attendance} ma
+        JOIN m ON m.id = ma.member_id
+        GROUP BY ma.member_id
+    ),
+    part AS (
+        SELECT p.member_id, AVG(p.participation_score) AS participation
+        FROM member_activity_participation p
+        JOIN m ON m.id = p.member_id
+        GROUP BY p.member_id
+    ),
+    ln AS (
+        SELECT gl.member_id, SUM(gl.outstanding_balance) AS outstanding,
+               MAX(COALESCE(gl.days_overdue, 0)) AS max_days_overdue
+        FROM group_loans gl
+        JOIN m ON m.id = gl.member_id
+        WHERE gl.status IN :loan_statuses
+        GROUP BY gl.member_id
+    )
+    SELECT m.id AS member_id, m.group_id, m.joined_date,
+           COALESCE(sv.savings, 0) AS savings,
+           COALESCE(att.meetings, 0) AS meetings,
+           COALESCE(att.attended, 0) AS attended,
+           COALESCE(part.participation, 0) AS participation,
+           COALESCE(ln.outstanding, 0) AS outstanding,
+           COALESCE(ln.max_days_overdue, 0) AS max_days_overdue,
+           gs.max_loan_multiplier, gs.min_months_for_loan, gs.min_attendance_for_loan,
+           sg.loan_interest_rate
+    FROM m
+    JOIN savings_groups sg ON sg.id = m.group_id
+    LEFT JOIN group_settings gs ON gs.group_id = m.group_id
+    LEFT JOIN sv ON sv.member_id = m.id
+    LEFT JOIN att ON att.member_id = m.id
+    LEFT JOIN part ON part.member_id = m.id
+    LEFT JOIN ln ON ln.member_id = m.id
+    ORDER BY m.group_id, m.id
+"""
+
+UPDATE_MEMBER_ELIGIBILITY_SQL = db.text("""
+    UPDATE group_members SET is_eligible_for_loans = :is_eligible WHERE id = :member_id
+""")
+
+
+def _load_features(group_ids: Optional[List[int]]):
+    if group_ids is None:
+        sql = db.text(MEMBER_FEATURES_SQL.format(group_filter='', **HISTORY_SQL))
+        params = {}
+    else:
+        sql = db.text(MEMBER_FEATURES_SQL.format(group_filter='AND gm.group_id IN :group_ids', **HISTORY_SQL)) \
+            .bindparams(db.bindparam('group_ids', expanding=True))
+        params = {'group_ids': list(group_ids)}
+    sql = sql.bindparams(db.bindparam('loan_statuses', expanding=True))
+    params['loan_statuses'] = list(ACTIVE_LOAN_STATUSES)
+    return db.session.execute(sql, params).fetchall()
+
+
+def _as_date(value) -> Optional[datetime.date]:
+    if isinstance(value, str):
+        return datetime.date.fromisoformat(value[:10])
+    if isinstance(value, datetime.datetime):
+        return value.date()
+    return value
+
+
+def _column(np, rows, name, default=0.0):
+    return np.array([float(getattr(r, name)) if getattr(r, name) is not None else default for r in rows])
+
+
+def score_members(rows, as_of: datetime.date) -> Dict:
+    """
+    Score member feature rows in one vectorized pass.
+
+    Returns:
+        Dictionary of per-member arrays (scores, eligibility, limits and
+        the individual criteria that failed)
+    """
+    np = backends.get('numpy')
+    if np is None:
+        raise RuntimeError('NumPy is required to score loan eligibility')
+
+    savings = _column(np, rows, 'savings')
+    meetings = _column(np, rows, 'meetings')
+    attended = _column(np, rows, 'attended')
+    participation = _column(np, rows, 'participation')
+    outstanding = _column(np, rows, 'outstanding')
+    max_days_overdue = _column(np, rows, 'max_days_overdue')
+    multiplier = _column(np, rows, 'max_loan_multiplier', DEFAULT_MAX_LOAN_MULTIPLIER)
+    min_months = _column(np, rows, 'min_months_for_loan', DEFAULT_MIN_MONTHS_FOR_LOAN)
+    min_attendance = _column(np, rows, 'min_attendance_for_loan', DEFAULT_MIN_ATTENDANCE_FOR_LOAN)
+
+    joined = np.array([_as_date(r.joined_date) or as_of for r in rows], dtype='datetime64[D]')
+    months_active = np.floor((np.datetime64(as_of, 'D') - joined).astype(np.int64) / 30.4375).clip(min=0)
+
+    attendance_rate = np.divide(attended * 100, meetings, out=np.zeros_like(attended), where=meetings > 0)
+
+    # Savings relative to the member's own group average
+    _, group_index = np.unique([r.group_id for r in rows], return_inverse=True)
+    group_totals = np.bincount(group_index, weights=savings)
+    group_counts = np.bincount(group_index)
+    group_average = (group_totals / group_counts)[group_index]
+    savings_ratio = np.divide(savings, group_average, out=np.zeros_like(savings), where=group_average > 0)
+
+    savings_score = np.clip(savings_ratio * 5, 0, 10)
+    attendance_score = np.clip(attendance_rate / 10, 0, 10)
+    participation_score = np.clip(participation, 0, 10)
+    overall_score = (SCORE_WEIGHTS['savings'] * savings_score
+                     + SCORE_WEIGHTS['attendance'] * attendance_score
+                     + SCORE_WEIGHTS['participation'] * participation_score)
+
+    criteria = {
+        'no_savings': savings <= 0,
+        'too_new': months_active < min_months,
+        'low_attendance': attendance_rate < min_attendance,
+        'loan_in_arrears': max_days_overdue > MAX_DAYS_OVERDUE_FOR_LOAN,
+    }
+    eligible = ~np.logical_or.reduce(list(criteria.values()))
+    max_loan_amount = np.where(eligible, np.clip(savings * multiplier - outstanding, 0, None), 0)
+    eligible &= max_loan_amount > 0
+
+    risk_level = np.where(overall_score >= LOW_RISK_SCORE, 'LOW',
+                          np.where(overall_score >= MEDIUM_RISK_SCORE, 'MEDIUM', 'HIGH'))
+    recommended_term = np.where(eligible, np.where(risk_level == 'LOW', 6, 3), 0)
+
+    return {
+        'savings': savings,
+        'attendance_rate': attendance_rate,
+        'months_active': months_active.astype(np.int64),
+        'savings_score': savings_score,
+        'attendance_score': attendance_score,
+        'participation_score': participation_score,
+        'overall_score': overall_score,
+        'is_eligible': eligible,
+        'max_loan_amount': max_loan_amount,
+        'risk_level': risk_level,
+        'recommended_term_months': recommended_term,
+        'criteria': criteria,
+    }
+
+
+def run_loan_scoring(group_ids: Optional[List[int]] = None, as_of: datetime.date = None) -> Dict:
+    """
+    Assess every active member of the given groups (all groups if None).
+
+    Assessments already written by the engine for the same day are
+    replaced, so re-running after another meeting that day is idempotent.
+    GroupMember.is_eligible_for_loans is updated to match.
+
+    Returns:
+        Dictionary with members_assessed and members_eligible counts
+    """
+    as_of = as_of or datetime.date.today()
+    rows = _load_features(group_ids)
+    if not rows:
+        return {'members_assessed': 0, 'members_eligible': 0}
+
+    scores = score_members(rows, as_of)
+    criteria_names = list(scores['criteria'])
+    criteria_matrix = list(zip(*(scores['criteria'][name].tolist() for name in criteria_names)))
+    member_ids = [r.member_id for r in rows]
+    now = datetime.datetime.utcnow()
+
+    assessments = []
+    eligibility_updates = []
+    for i, row in enumerate(rows):
+        failed = [name for name, hit in zip(criteria_names, criteria_matrix[i]) if hit]
+        is_eligible = bool(scores['is_eligible'][i])
+        assessments.append({
+            'member_id': row.member_id,
+            'assessment_date': as_of,
+            'total_savings': round(float(scores['savings'][i]), 2),
+            'attendance_rate': round(float(scores['attendance_rate'][i]), 2),
+            'months_active': int(scores['months_active'][i]),
+            'savings_score': round(float(scores['savings_score'][i]), 2),
+            'attendance_score': round(float(scores['attendance_score'][i]), 2),
+            'participation_score': round(float(scores['participation_score'][i]), 2),
+            'overall_score': round(float(scores['overall_score'][i]), 2),
+            'is_eligible': is_eligible,
+            'max_loan_amount': round(float(scores['max_loan_amount'][i]), 2),
+            'recommended_term_months': int(scores['recommended_term_months'][i]),
+            'interest_rate': float(row.loan_interest_rate or 0),
+            'risk_level': str(scores['risk_level'][i]),
+            'risk_factors': ', '.join(failed) or None,
+            'assessed_by': None,
+            'assessment_notes': 'Automated assessment',
+            'created_date': now,
+        })
+        eligibility_updates.append({'member_id': row.member_id, 'is_eligible': is_eligible})
+
+    LoanAssessment.query.filter(
+        LoanAssessment.member_id.in_(member_ids),
+        LoanAssessment.assessment_date == as_of,
+        LoanAssessment.assessed_by.is_(None)
+    ).delete(synchronize_session=False)
+    db.session.execute(LoanAssessment.__table__.insert(), assessments)
+    db.session.execute(UPDATE_MEMBER_ELIGIBILITY_SQL, eligibility_updates)
+    db.session.commit()
+
+    return {'members_assessed': len(assessments), 'members_eligible': int(scores['is_eligible'].sum())}
@@ -0,0 +1,119 @@
+"""
+Media Backends
+Capability registry for heavy optional libraries (imaging, PDF, video,
+content sniffing, compression, numerics, JSON). Nothing is imported until a
+backend is first used, so workers that never touch a video never pay the
+moviepy/numpy import cost.
+"""
+import importlib
+import importlib.util
+import threading
+from typing import Callable, Dict, Optional
+
+
+def _load_pil():
+    from PIL import Image
+    return Image
+
+
+def _load_pypdf2():
+    import PyPDF2
+    return PyPDF2
+
+
+def _load_pdf2image():
+    from pdf2image import convert_from_path
+    return convert_from_path
+
+
+def _load_moviepy():
+    from moviepy.editor import VideoFileClip
+    return VideoFileClip
+
+
+def _load_magic():
+    import magic
+    return magic
+
+
+def _load_zstandard():
+    import zstandard
+    return zstandard
+
+
+def _load_numpy():
+    import numpy
+    return numpy
+
+
+def _load_orjson():
+    import orjson
+    return orjson
+
+
+class MediaBackendRegistry:
+    """
+    Lazily imports optional backends on first use and caches the result.
+
+    get() returns the loaded object (module, class or function) or None if
+    the library is not installed; is_available() answers without importing.
+    """
+
+    def __init__(self):
+        self._loaders: Dict[str, Callable] = {}
+        self._distributions: Dict[str, str] = {}
+        self._loaded: Dict[str, object] = {}
+        self._lock = threading.Lock()
+
+    def register(self, name: str, loader: Callable, distribution: str):
+        """
+        Register a backend.
+
+        Args:
+            name: Capability name used by callers (e.g. 'video')
+            loader: Zero-argument callable performing the import
+            distribution: Top-level module name checked by is_available()
+        """
+        self._loaders[name] = loader
+        self._distributions[name] = distribution
+
+    def get(self, name: str) -> Optional[object]:
+        """Import (once) and return a backend, or None if it is unavailable."""
+        if name in self._loaded:
+            return self._loaded[name]
+
+        with self._lock:
+            if name not in self._loaded:
+                try:
+                    self._loaded[name] = self._loaders[name]()
+                except ImportError:
+                    self._loaded[name] = None
+        return self._loaded[name]
+
+    def is_available(self, name: str) -> bool:
+        """Check whether a backend can be loaded, without importing it if not yet loaded."""
+        if name in self._loaded:
+            return self._loaded[name] is not None
+        return importlib.util.find_spec(self._distributions[name]) is not None
+
+    def is_loaded(self, name: str) -> bool:
+        """Whether a backend has already been imported in this process."""
+        return self._loaded.get(name) is not None
+
+    def capabilities(self) -> Dict[str, Dict[str, bool]]:
+        """Availability and load state of every registered backend."""
+        return {
+            name: {'available': self.is_available(name), 'loaded': self.is_loaded(name)}
+            for name in self._loaders
+        }
+
+
+backends = MediaBackendRegistry()
+backends.register('image', _load_pil, 'PIL')
+backends.register('pdf', _load_pypdf2, 'PyPDF2')
+backends.register('pdf_render', _load_pdf2image, 'pdf2image')
+backends.register('video', _load_moviepy, 'moviepy')
+backends.register('magic', _load_magic, 'magic')
+backends.register('zstd', _load_zstandard, 'zstandard')
+backends.register('numpy', _load_numpy, 'numpy')
+backends.register('orjson', _load_orjson, 'orjson')
@@ -0,0 +1,301 @@
+"""
+Meeting Summary
+Computes every MeetingSummary field for a meeting in the database - one
+aggregate subquery per table, combined into a single statement - with
+Decimal arithmetic for money.
+
+The summary row is created when a meeting starts and kept current while it
+runs: every savings, fine, repayment, attendance, training and vote write
+applies an atomic delta UPDATE (apply_summary_delta), so live totals are a
+single-row read and completion only needs to evaluate quorum. The full
+computation is used at start, as an optional verify pass at completion and
+as an idempotent batch repair over any set of meetings.
+
+Loans have no meeting_id, so loans disbursed at a meeting are only known
+from the deltas disburse_loan applies; the full computation leaves
+total_loans_disbursed and loans_disbursed_count as they are.
+"""
+import datetime
+from decimal import Decimal, ROUND_HALF_UP
+from typing import Dict, Iterable, Optional
+from flask import current_app
+from project import db
+from project.api.models import Meeting, MeetingSummary, GroupSettings
+from project.api.archival import HISTORY_SQL
+from project.api.balance_service import MONEY
+
+
+DEFAULT_QUORUM_PERCENTAGE = Decimal('66.67')
+
+CENTS = Decimal('0.01')
+
+MEETING_TOTALS_SQL = db.text(f"""
+    SELECT att.attendance_records, att.members_present,
+           sav.total_deposits, sav.total_withdrawals,
+           fin.total_fines_issued, fin.total_fines_paid,
+           rep.total_loan_repayments, rep.loan_repayments_count,
+           trn.trainings_held, trn.training_attendance_count,
+           vot.voting_sessions_held, vot.votes_cast_count
+    FROM (
+        SELECT COUNT(*) AS attendance_records,
+               COUNT(CASE WHEN is_present = TRUE THEN 1 END) AS members_present
+        FROM {HISTORY_SQL['meeting_attendance']} ma WHERE meeting_id = :meeting_id
+    ) att
+    CROSS JOIN (
+        SELECT COALESCE(SUM(CASE WHEN transaction_type = 'DEPOSIT' THEN amount END), 0) AS total_deposits,
+               COALESCE(SUM(CASE WHEN transaction_type = 'WITHDRAWAL' THEN amount END), 0) AS total_withdrawals
+        FROM {HISTORY_SQL['saving_transactions']} st
+        WHERE meeting_id = :meeting_id AND verification_status = 'VERIFIED'
+    ) sav
+    CROSS JOIN (
+        SELECT COALESCE(SUM(amount), 0) AS total_fines_issued,
+               COALESCE(SUM(paid_amount), 0) AS total_fines_paid
+        FROM {HISTORY_SQL['member_fines']} mf WHERE meeting_id = :meeting_id
+    ) fin
+    CROSS JOIN (
+        SELECT COALESCE(SUM(repayment_amount), 0) AS total_loan_repayments,
+               COUNT(*) AS loan_repayments_count
+        FROM {HISTORY_SQL['loan_repayments']} lr WHERE meeting_id = :meeting_id
+    ) rep
+    CROSS JOIN (
+        SELECT COUNT(*) AS trainings_held,
+               COALESCE(SUM(total_attendees), 0) AS training_attendance_count
+        FROM training_records WHERE meeting_id = :meeting_id
+    ) trn
+    CROSS JOIN (
+        SELECT COUNT(*) AS voting_sessions_held,
+               COALESCE(SUM(COALESCE(yes_count, 0) + COALESCE(no_count, 0) + COALESCE(abstain_count, 0)), 0)
+                   AS votes_cast_count
+        FROM voting_records WHERE meeting_id = :meeting_id
+    ) vot
+""")
+
+
+# MeetingSummary counters maintained incrementally; everything else is derived
+SUMMARY_DELTA_FIELDS = (
+    'members_present', 'members_absent',
+    'total_deposits', 'total_withdrawals',
+    'total_fines_issued', 'total_fines_paid',
+    'total_loan_repayments', 'loan_repayments_count',
+    'total_loans_disbursed', 'loans_disbursed_count',
+    'trainings_held', 'training_attendance_count',
+    'voting_sessions_held', 'votes_cast_count',
+)
+
+MONEY_FIELDS = {
+    'total_deposits', 'total_withdrawals', 'total_fines_issued', 'total_fines_paid', 'total_loan_repayments',
+    'total_loans_disbursed',
+}
+
+
+def _updated(field: str) -> str:
+    # SET expressions see the old row, so derived columns use old value + delta
+    return f'(COALESCE({field}, 0) + :{field})'
+
+
+def _rate_sql(numerator: str, denominator: str) -> str:
+    return f'CASE WHEN {denominator} > 0 THEN ROUND({numerator} * 100.0 / ({denominator}), 2) ELSE 0 END'
+
+
+SUMMARY_DELTA_SQL = db.text(f"""
+    UPDATE meeting_summaries
+    SET {', '.join(f'{field} = {_updated(field)}' for field in SUMMARY_DELTA_FIELDS)},
+        attendance_rate = {_rate_sql(_updated('members_present'),
+                                     _updated('members_present') + ' + ' + _updated('members_absent'))},
+        net_savings = {_updated('total_deposits')} - {_updated('total_withdrawals')},
+        outstanding_fines = {_updated('total_fines_issued')} - {_updated('total_fines_paid')},
+        training_participation_rate = {_rate_sql(_updated('training_attendance_count'),
+                                                 _updated('trainings_held') + ' * COALESCE(total_members, 0)')},
+        voting_participation_rate = {_rate_sql(_updated('votes_cast_count'),
+                                               _updated('voting_sessions_held') + ' * COALESCE(total_members, 0)')},
+        net_cash_flow = {_updated('total_deposits')} + {_updated('total_loan_repayments')}
+                        + {_updated('total_fines_paid')} - {_updated('total_withdrawals')},
+        updated_date = :updated_date
+    WHERE meeting_id = :meeting_id
+""").bindparams(*(db.bindparam(field, type_=MONEY) for field in sorted(MONEY_FIELDS)))
+
+MEETING_DELTA_SQL = db.text("""
+    UPDATE meetings
+    SET members_present = COALESCE(members_present, 0) + :members_present,
+        attendance_count = COALESCE(attendance_count, 0) + :members_present,
+        total_savings_collected = COALESCE(total_savings_collected, 0) + :total_deposits,
+        total_fines_collected = COALESCE(total_fines_collected, 0) + :total_fines_paid,
+        total_loan_repayments = COALESCE(total_loan_repayments, 0) + :total_loan_repayments,
+        loans_disbursed_count = COALESCE(loans_disbursed_count, 0) + :loans_disbursed_count
+    WHERE id = :meeting_id
+""").bindparams(*(db.bindparam(field, type_=MONEY)
+                  for field in ('total_deposits', 'total_fines_paid', 'total_loan_repayments')))
+
+
+def _money(value) -> Decimal:
+    return Decimal(str(value or 0)).quantize(CENTS, rounding=ROUND_HALF_UP)
+
+
+def _rate(numerator, denominator) -> Decimal:
+    if not denominator:
+        return Decimal('0.00')
+    return (Decimal(numerator) * 100 / Decimal(denominator)).quantize(CENTS, rounding=ROUND_HALF_UP)
+
+
+def compute_meeting_summary(meeting: Meeting) -> Dict:
+    """
+    Compute all MeetingSummary fields of a meeting with one query.
+
+    Returns:
+        Dictionary keyed by MeetingSummary column names (Decimal money and rates)
+    """
+    db.session.flush()  # Textual queries don't autoflush pending changes
+    row = db.session.execute(MEETING_TOTALS_SQL, {'meeting_id': meeting.id}).mappings().one()
+    total_members = meeting.total_members or 0
+
+    members_present = int(row['members_present'])
+    total_deposits = _money(row['total_deposits'])
+    total_withdrawals = _money(row['total_withdrawals'])
+    total_fines_issued = _money(row['total_fines_issued'])
+    total_fines_paid = _money(row['total_fines_paid'])
+    total_loan_repayments = _money(row['total_loan_repayments'])
+    trainings_held = int(row['trainings_held'])
+    training_attendance_count = int(row['training_attendance_count'])
+    voting_sessions_held = int(row['voting_sessions_held'])
+    votes_cast_count = int(row['votes_cast_count'])
+
+    return {
+        'total_members': total_members,
+        'members_present': members_present,
+        'members_absent': int(row['attendance_records']) - members_present,
+        'attendance_rate': _rate(members_present, row['attendance_records']),
+        'total_deposits': total_deposits,
+        'total_withdrawals': total_withdrawals,
+        'net_savings': total_deposits - total_withdrawals,
+        'total_fines_issued': total_fines_issued,
+        'total_fines_paid': total_fines_paid,
+        'outstanding_fines': total_fines_issued - total_fines_paid,
+        'total_loan_repayments': total_loan_repayments,
+        'loan_repayments_count': int(row['loan_repayments_count']),
+        'trainings_held': trainings_held,
+        'training_attendance_count': training_attendance_count,
+        'training_participation_rate': _rate(training_attendance_count, trainings_held * total_members),
+        'voting_sessions_held': voting_sessions_held,
+        'votes_cast_count': votes_cast_count,
+        'voting_participation_rate': _rate(votes_cast_count, voting_sessions_held * total_members),
+        'net_cash_flow': total_deposits + total_loan_repayments + total_fines_paid - total_withdrawals,
+    }
+
+
+def _quorum_percentage(group_id: int) -> Decimal:
+    quorum = db.session.query(GroupSettings.quorum_percentage).filter_by(group_id=group_id).scalar()
+    return Decimal(str(quorum)) if quorum else DEFAULT_QUORUM_PERCENTAGE
+
+
+def apply_meeting_summary(meeting: Meeting, quorum_percentage: Optional[Decimal] = None) -> MeetingSummary:
+    """
+    Recompute a meeting's summary and write it to MeetingSummary and the
+    meeting's own total columns. Idempotent; does not commit.
+    """
+    totals = compute_meeting_summary(meeting)
+
+    meeting.members_present = totals['members_present']
+    meeting.attendance_count = totals['members_present']
+    meeting.total_savings_collected = totals['total_deposits']
+    meeting.total_fines_collected = totals['total_fines_paid']
+    meeting.total_loan_repayments = totals['total_loan_repayments']
+    if quorum_percentage is None:
+        quorum_percentage = _quorum_percentage(meeting.group_id)
+    meeting.quorum_met = totals['attendance_rate'] >= quorum_percentage
+    meeting.updated_date = datetime.datetime.utcnow()
+
+    summary = MeetingSummary.query.filter_by(meeting_id=meeting.id).first()
+    if not summary:
+        summary = MeetingSummary(meeting_id=meeting.id)
+        db.session.add(summary)
+    for field, value in totals.items():
+        setattr(summary, field, value)
+    summary.updated_date = datetime.datetime.utcnow()
+    return summary
+
+
+def apply_summary_delta(meeting_id: Optional[int], **deltas):
+    """
+    Add deltas (keyed by SUMMARY_DELTA_FIELDS) to a meeting's running
+    summary and its own total columns. Does not commit.
+
+    Meetings without a summary row yet (not started) only get their own
+    columns updated; start_meeting computes the full summary.
+    """
+    if meeting_id is None:
+        return
+    unknown = set(deltas) - set(SUMMARY_DELTA_FIELDS)
+    if unknown:
+        raise ValueError(f"Unknown summary fields: {', '.join(sorted(unknown))}")
+    # Counts stay integers so the rate expressions round exact numerics
+    params = {field: (_money if field in MONEY_FIELDS else int)(deltas.get(field) or 0)
+              for field in SUMMARY_DELTA_FIELDS}
+    if not any(params.values()):
+        return
+    params['meeting_id'] = meeting_id
+    params['updated_date'] = datetime.datetime.utcnow()
+    db.session.execute(SUMMARY_DELTA_SQL, params)
+    db.session.execute(MEETING_DELTA_SQL, params)
+
+
+def finalize_meeting_summary(meeting: Meeting, verify: bool = False) -> MeetingSummary:
+    """
+    Close out a meeting's running summary at completion. Does not commit.
+
+    The running totals are used as-is and only quorum is evaluated; with
+    verify=True (or when the meeting has no summary row) everything is
+    recomputed from the source tables and any drift is logged.
+    """
+    summary = MeetingSummary.query.filter_by(meeting_id=meeting.id).first()
+    if summary is None:
+        return apply_meeting_summary(meeting)
+
+    if verify:
+        running = {field: Decimal(str(getattr(summary, field) or 0)) for field in SUMMARY_DELTA_FIELDS}
+        summary = apply_meeting_summary(meeting)
+        drift = [field for field in SUMMARY_DELTA_FIELDS
+                 if running[field] != Decimal(str(getattr(summary, field) or 0))]
+        if drift:
+            current_app.logger.warning('Meeting %s running summary drifted on %s; recomputed',
+                                       meeting.id, ', '.join(drift))
+        return summary
+
+    meeting.quorum_met = Decimal(str(summary.attendance_rate or 0)) >= _quorum_percentage(meeting.group_id)
+    meeting.updated_date = datetime.datetime.utcnow()
+    return summary
+
+
+def recompute_meeting_summaries(meeting_ids: Optional[Iterable[int]] = None, group_id: Optional[int] = None,
+                                statuses: Iterable[str] = ('COMPLETED',), batch_size: int = 200,
+                                progress=None) -> int:
+    """
+    Batch repair: recompute summaries of completed meetings (or the given ones).
+
+    Returns:
+        Number of meetings recomputed
+    """
+    query = Meeting.query
+    if meeting_ids is not None:
+        query = query.filter(Meeting.id.in_(list(meeting_ids)))
+    else:
+        query = query.filter(Meeting.status.in_(list(statuses)))
+    if group_id is not None:
+        query = query.filter(Meeting.group_id == group_id)
+
+    quorum_by_group = {}
+    done = 0
+    last_id = 0
+    while True:
+        meetings = query.filter(Meeting.id > last_id).order_by(Meeting.id).limit(batch_size).all()
+        if not meetings:
+            break
+        for meeting in meetings:
+            if meeting.group_id not in quorum_by_group:
+                quorum_by_group[meeting.group_id] = _quorum_percentage(meeting.group_id)
+            apply_meeting_summary(meeting, quorum_by_group[meeting.group_id])
+        db.session.commit()
+        done += len(meetings)
+        last_id = meetings[-1].id
+        if progress:
+            progress(done)
+    return done
@@ -1,7 +1,8 @@
 """Meeting management API endpoints."""
 import datetime
+from decimal import Decimal
 from flask import Blueprint, jsonify, request, current_app
-from sqlalchemy import func, and_, or_
+from sqlalchemy import func, and_, or_, case, select
 from functools import wraps
 import jwt
 from project import db
@@ -10,8 +11,22 @@ from project.api.models import (
     MemberSaving, SavingTransaction, MemberFine, GroupLoan, LoanRepayment,
     TrainingRecord, TrainingAttendance, VotingRecord, MemberVote,
     MeetingSummary, GroupSettings, SavingType, MeetingActivity,
-    ActivityDocument, MemberActivityParticipation, TransactionDocument
+    ActivityDocument, MemberActivityParticipation, TransactionDocument, LoanInstallment
 )
+from project.api.balance_service import apply_deltas, apply_transaction, reverse_transaction
+from project.api.shared_cache import bump_group_version, get_or_compute
+from project.api.serialization import Field, FieldSpec, Money, Number
+from project.api.loan_schedule import (
+    apply_loan_repayment, generate_loan_schedule, split_repayment, sync_installment_payments
+)
+from project.api.loan_scoring import run_loan_scoring
+from project.api.background import run_in_background
+from project.api.member_counters import AttendanceDeltaCollector, apply_contribution_delta, recompute_member_counters
+from project.api.meeting_summary import apply_meeting_summary, apply_summary_delta, finalize_meeting_summary
+from project.api.remote_payments import is_officer_or_admin
+from project.api.sequences import allocate_meeting_numbers
+from project.api.cascade_delete import delete_meeting_records, remove_files_in_background
+from project.api.archival import history_table
 
 meetings_blueprint = Blueprint('meetings', __name__)
 
@@ -45,6 +60,48 @@ def authenticate(f):
     return decorated_function
 
 
+def _apply_savings_summary_delta(meeting_id, transaction_type, amount):
+    """Add a verified (or reversed, negative) savings amount to its meeting's running summary."""
+    if transaction_type == 'DEPOSIT':
+        apply_summary_delta(meeting_id, total_deposits=amount)
+    elif transaction_type == 'WITHDRAWAL':
+        apply_summary_delta(meeting_id, total_withdrawals=amount)
+
+
+MAX_SCHEDULED_MEETINGS = 100
+
+
+def _build_meeting(group, meeting_number, data):
+    """Build a SCHEDULED meeting from a create request body."""
+    return Meeting(
+        group_id=group.id,
+        meeting_number=meeting_number,
+        meeting_date=datetime.datetime.strptime(data.get('meeting_date'), '%Y-%m-%d').date(),
+        meeting_time=datetime.datetime.strptime(data.get('meeting_time', '14:00'), '%H:%M').time() if data.get('meeting_time') else None,
+        meeting_type=data.get('meeting_type', 'REGULAR'),
+        status='SCHEDULED',
+        chairperson_id=data.get('chairperson_id'),
+        secretary_id=data.get('secretary_id'),
+        treasurer_id=data.get('treasurer_id'),
+        agenda=data.get('agenda'),
+        location=data.get('location'),
+        latitude=data.get('latitude'),
+        longitude=data.get('longitude'),
+        total_members=group.members_count
+    )
+
+
+def _meeting_created_dict(meeting):
+    return {
+        'id': meeting.id,
+        'meeting_number': meeting.meeting_number,
+        'meeting_date': meeting.meeting_date.isoformat(),
+        'meeting_time': meeting.meeting_time.isoformat() if meeting.meeting_time else None,
+        'status': meeting.status,
+        'location': meeting.location
+    }
+
+
 @meetings_blueprint.route('/groups/<int:group_id>/meetings', methods=['POST'])
 @authenticate
 def create_meeting(user_id, group_id):
@@ -56,28 +113,10 @@ def create_meeting(user_id, group_id):
     if not group:
         return jsonify({'status': 'error', 'message': 'Group not found'}), 404
     
-    # Get next meeting number
-    last_meeting = Meeting.query.filter_by(group_id=group_id).order_by(Meeting.meeting_number.desc()).first()
-    next_meeting_number = (last_meeting.meeting_number + 1) if last_meeting else 1
-    
     try:
-        # Create meeting
-        meeting = Meeting(
-            group_id=group_id,
-            meeting_number=next_meeting_number,
-            meeting_date=datetime.datetime.strptime(post_data.get('meeting_date'), '%Y-%m-%d').date(),
-            meeting_time=datetime.datetime.strptime(post_data.get('meeting_time', '14:00'), '%H:%M').time() if post_data.get('meeting_time') else None,
-            meeting_type=post_data.get('meeting_type', 'REGULAR'),
-            status='SCHEDULED',
-            chairperson_id=post_data.get('chairperson_id'),
-            secretary_id=post_data.get('secretary_id'),
-            treasurer_id=post_data.get('treasurer_id'),
-            agenda=post_data.get('agenda'),
-            location=post_data.get('location'),
-            latitude=post_data.get('latitude'),
-            longitude=post_data.get('longitude'),
-            total_members=group.members_count
-        )
+        # Next meeting number from the group's sequence (safe under concurrent creates)
+        meeting_number = allocate_meeting_numbers(group_id)[0]
+        meeting = _build_meeting(group, meeting_number, post_data)
         
         db.session.add(meeting)
         db.session.commit()
@@ -85,14 +124,7 @@ def create_meeting(user_id, group_id):
         return jsonify({
             'status': 'success',
             'message': 'Meeting created successfully',
-            'meeting': {
-                'id': meeting.id,
-                'meeting_number': meeting.meeting_number,
-                'meeting_date': meeting.meeting_date.isoformat(),
-                'meeting_time': meeting.meeting_time.isoformat() if meeting.meeting_time else None,
-                'status': meeting.status,
-                'location': meeting.location
-            }
+            'meeting': _meeting_created_dict(meeting)
         }), 201
         
     except Exception as e:
@@ -100,6 +132,51 @@ def create_meeting(user_id, group_id):
         return jsonify({'status': 'error', 'message': str(e)}), 400
 
 
+@meetings_blueprint.route('/groups/<int:group_id>/meetings/bulk', methods=['POST'])
+@authenticate
+def schedule_meetings(user_id, group_id):
+    """
+    Schedule several meetings at once, numbered from one reserved block.
+
+    Body: {"meetings": [<create_meeting body>, ...]}, numbered in the order
+    given.
+    """
+    post_data = request.get_json(silent=True) or {}
+    meetings_data = post_data.get('meetings') or []
+
+    if not meetings_data:
+        return jsonify({'status': 'error', 'message': 'No meetings provided'}), 400
+    if len(meetings_data) > MAX_SCHEDULED_MEETINGS:
+        return jsonify({
+            'status': 'error',
+            'message': f'At most {MAX_SCHEDULED_MEETINGS} meetings can be scheduled at once'
+        }), 400
+
+    group = SavingsGroup.query.get(group_id)
+    if not group:
+        return jsonify({'status': 'error', 'message': 'Group not found'}), 404
+
+    try:
+        meeting_numbers = allocate_meeting_numbers(group_id, len(meetings_data))
+        meetings = [
+            _build_meeting(group, meeting_number, data)
+            for meeting_number, data in zip(meeting_numbers, meetings_data)
+        ]
+
+        db.session.add_all(meetings)
+        db.session.commit()
+
+        return jsonify({
+            'status': 'success',
+            'message': f'{len(meetings)} meetings scheduled successfully',
+            'meetings': [_meeting_created_dict(meeting) for meeting in meetings]
+        }), 201
+
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'status': 'error', 'message': str(e)}), 400
+
+
 @meetings_blueprint.route('/groups/<int:group_id>/meetings', methods=['GET'])
 @authenticate
 def get_group_meetings(user_id, group_id):
@@ -147,41 +224,92 @@ def get_group_meetings(user_id, group_id):
     }), 200
 
 
-@meetings_blueprint.route('/meetings/<int:meeting_id>', methods=['GET'])
-@authenticate
-def get_meeting_detail(user_id, meeting_id):
-    """Get detailed information about a specific meeting."""
-    meeting = Meeting.query.get(meeting_id)
-    if not meeting:
-        return jsonify({'status': 'error', 'message': 'Meeting not found'}), 404
+def _member_name(member):
+    return f"{member.first_name} {member.last_name}" if member else 'Unknown'
 
-    # Get group settings to check what's enabled
-    group_settings = GroupSettings.query.filter_by(group_id=meeting.group_id).first()
 
-    # Get attendance records
-    attendance = MeetingAttendance.query.filter_by(meeting_id=meeting_id).all()
+# Meeting records are read from hot and archived rows alike, so members and
+# member savings are looked up by id (from the identity map once loaded)
+def _member(record):
+    return db.session.get(GroupMember, record.member_id) if record.member_id else None
 
-    # Get savings transactions
-    savings_transactions = SavingTransaction.query.filter_by(meeting_id=meeting_id).all()
 
-    # Get fines
-    fines = MemberFine.query.filter_by(meeting_id=meeting_id).all()
+def _member_saving(record):
+    return db.session.get(MemberSaving, record.member_saving_id) if record.member_saving_id else None
 
-    # Get loan repayments
-    loan_repayments = LoanRepayment.query.filter_by(meeting_id=meeting_id).all()
 
-    # Get training records
-    trainings = TrainingRecord.query.filter_by(meeting_id=meeting_id).all()
+def _meeting_history(model, meeting_id):
+    """Hot and archived rows of model recorded at a meeting."""
+    history = history_table(model)
+    return db.session.execute(
+        select(history).where(history.c.meeting_id == meeting_id).order_by(history.c.id)
+    ).all()
 
-    # Get voting records
-    votings = VotingRecord.query.filter_by(meeting_id=meeting_id).all()
 
-    # Get meeting summary if exists
-    summary = MeetingSummary.query.filter_by(meeting_id=meeting_id).first()
+def _documents(entity_type):
+    return lambda record: [doc.to_dict() for doc in TransactionDocument.get_for_entity(entity_type, record.id)]
 
-    # Get saving types for the group (needed for remote payment submission)
-    # Use raw SQL since group_id is not in the ORM model
-    # Include both group-specific and global (group_id IS NULL) saving types
+
+# Response fields of the meeting detail
+MEETING_FIELDS = FieldSpec(
+    'id', 'group_id', 'meeting_number', 'meeting_date', 'meeting_time', 'meeting_type', 'status', 'location',
+    Number('latitude'), Number('longitude'), 'total_members', 'members_present', 'quorum_met', 'agenda',
+    'minutes', 'decisions_made', 'action_items', 'chairperson_id', 'secretary_id', 'treasurer_id',
+    'created_date', 'updated_date',
+)
+
+ATTENDANCE_FIELDS = FieldSpec(
+    'id', 'member_id', Field('member_name', lambda a: _member_name(_member(a))), 'is_present',
+    Field('status', lambda a: 'present' if a.is_present else 'absent'), 'arrival_time', 'excuse_reason',
+)
+
+SAVINGS_TRANSACTION_FIELDS = FieldSpec(
+    'id',
+    Field('member_id', lambda st: getattr(_member_saving(st), 'member_id', None)),
+    Field('member_name', lambda st: _member_name(getattr(_member_saving(st), 'member', None))),
+    Field('saving_type_id', lambda st: getattr(_member_saving(st), 'saving_type_id', None)),
+    Field('saving_type_name', lambda st: getattr(getattr(_member_saving(st), 'saving_type', None), 'name', 'Unknown')),
+    'transaction_type', Money('amount'), 'transaction_date', 'description', 'reference_number',
+    'verification_status', Field('is_mobile_money', default=False), 'mobile_money_reference',
+    'mobile_money_phone', 'verified_by', 'verified_date', 'notes',
+    Field('documents', _documents('savings')),
+)
+
+FINE_FIELDS = FieldSpec(
+    'id', 'member_id', Field('member_name', lambda f: _member_name(_member(f))), 'fine_type', Money('amount'),
+    'reason', 'fine_date', 'is_paid', Money('paid_amount', default=0), 'payment_date', 'verification_status',
+    Field('documents', _documents('fine')),
+)
+
+LOAN_REPAYMENT_FIELDS = FieldSpec(
+    'id', 'loan_id', 'member_id', Field('member_name', lambda lr: _member_name(_member(lr))),
+    Money('repayment_amount'), Money('principal_amount'), Money('interest_amount'), Money('outstanding_balance'),
+    'repayment_date', 'payment_method', Field('documents', _documents('loan_repayment')),
+)
+
+TRAINING_FIELDS = FieldSpec(
+    'id', 'training_topic', 'training_description', 'trainer_name', 'duration_minutes', 'total_attendees',
+    Field('documents', _documents('training')),
+)
+
+VOTING_FIELDS = FieldSpec(
+    'id', 'vote_topic', 'vote_description', 'vote_type', 'result', 'yes_count', 'no_count', 'abstain_count',
+    'absent_count', Field('documents', _documents('voting')),
+)
+
+MEETING_SUMMARY_FIELDS = FieldSpec(
+    'members_present', Number('attendance_rate'), Money('total_deposits'), Money('total_withdrawals'),
+    Money('net_savings'), Money('total_fines_issued'), Money('total_fines_paid'), Money('total_loans_disbursed'),
+    'loans_disbursed_count', Money('total_loan_repayments'), 'trainings_held', 'voting_sessions_held',
+    Money('net_cash_flow'),
+)
+
+
+def _meeting_saving_types(group_id):
+    """
+    Active saving types of a group for meeting screens. Uses raw SQL since
+    group_id is not in the ORM model; includes global (group_id IS NULL) types.
+    """
     from sqlalchemy import text
     saving_types_query = text("""
         SELECT id, name, code, description, is_mandatory, minimum_amount,
@@ -190,8 +318,8 @@ def get_meeting_detail(user_id, meeting_id):
         WHERE (group_id = :group_id OR group_id IS NULL) AND is_active = TRUE
         ORDER BY name
     """)
-    saving_types_result = db.session.execute(saving_types_query, {'group_id': meeting.group_id})
-    saving_types = [
+    saving_types_result = db.session.execute(saving_types_query, {'group_id': group_id})
+    return [
         {
             'id': row[0],
             'name': row[1],
@@ -206,32 +334,46 @@ def get_meeting_detail(user_id, meeting_id):
         for row in saving_types_result
     ]
 
+
+@meetings_blueprint.route('/meetings/<int:meeting_id>', methods=['GET'])
+@authenticate
+def get_meeting_detail(user_id, meeting_id):
+    """Get detailed information about a specific meeting."""
+    meeting = Meeting.query.get(meeting_id)
+    if not meeting:
+        return jsonify({'status': 'error', 'message': 'Meeting not found'}), 404
+
+    # Get group settings to check what's enabled
+    group_settings = GroupSettings.query.filter_by(group_id=meeting.group_id).first()
+
+    # Get attendance records
+    attendance = _meeting_history(MeetingAttendance, meeting_id)
+
+    # Get savings transactions
+    savings_transactions = _meeting_history(SavingTransaction, meeting_id)
+
+    # Get fines
+    fines = _meeting_history(MemberFine, meeting_id)
+
+    # Get loan repayments
+    loan_repayments = _meeting_history(LoanRepayment, meeting_id)
+
+    # Get training records
+    trainings = TrainingRecord.query.filter_by(meeting_id=meeting_id).all()
+
+    # Get voting records
+    votings = VotingRecord.query.filter_by(meeting_id=meeting_id).all()
+
+    # Get meeting summary if exists
+    summary = MeetingSummary.query.filter_by(meeting_id=meeting_id).first()
+
+    # Get saving types for the group (needed for remote payment submission)
+    saving_types = get_or_compute(meeting.group_id, 'meeting_saving_types',
+                                  lambda: _meeting_saving_types(meeting.group_id))
+
     return jsonify({
         'status': 'success',
-        'meeting': {
-            'id': meeting.id,
-            'group_id': meeting.group_id,
-            'meeting_number': meeting.meeting_number,
-            'meeting_date': meeting.meeting_date.isoformat(),
-            'meeting_time': meeting.meeting_time.isoformat() if meeting.meeting_time else None,
-            'meeting_type': meeting.meeting_type,
-            'status': meeting.status,
-            'location': meeting.location,
-            'latitude': float(meeting.latitude) if meeting.latitude else None,
-            'longitude': float(meeting.longitude) if meeting.longitude else None,
-            'total_members': meeting.total_members,
-            'members_present': meeting.members_present,
-            'quorum_met': meeting.quorum_met,
-            'agenda': meeting.agenda,
-            'minutes': meeting.minutes,
-            'decisions_made': meeting.decisions_made,
-            'action_items': meeting.action_items,
-            'chairperson_id': meeting.chairperson_id,
-            'secretary_id': meeting.secretary_id,
-            'treasurer_id': meeting.treasurer_id,
-            'created_date': meeting.created_date.isoformat(),
-            'updated_date': meeting.updated_date.isoformat()
-        },
+        'meeting': MEETING_FIELDS.dump(meeting),
         'group_settings': {
             'attendance_tracking_enabled': group_settings.attendance_tracking_enabled if group_settings else True,
             'loan_disbursement_enabled': group_settings.loan_disbursement_enabled if group_settings else True,
@@ -240,95 +382,13 @@ def get_meeting_detail(user_id, meeting_id):
             'training_session_enabled': group_settings.training_session_enabled if group_settings else True,
             'fine_collection_enabled': group_settings.fine_collection_enabled if group_settings else True
         },
-        'attendance': [{
-            'id': a.id,
-            'member_id': a.member_id,
-            'member_name': f"{a.member.first_name} {a.member.last_name}" if a.member else 'Unknown',
-            'is_present': a.is_present,
-            'status': 'present' if a.is_present else 'absent',
-            'arrival_time': a.arrival_time.isoformat() if a.arrival_time else None,
-            'excuse_reason': a.excuse_reason
-        } for a in attendance],
-        'savings_transactions': [{
-            'id': st.id,
-            'member_id': st.member_saving.member_id if st.member_saving else None,
-            'member_name': f"{st.member_saving.member.first_name} {st.member_saving.member.last_name}" if st.member_saving and st.member_saving.member else 'Unknown',
-            'saving_type_id': st.member_saving.saving_type_id if st.member_saving else None,
-            'saving_type_name': st.member_saving.saving_type.name if st.member_saving and st.member_saving.saving_type else 'Unknown',
-            'transaction_type': st.transaction_type,
-            'amount': float(st.amount),
-            'transaction_date': st.transaction_date.isoformat() if st.transaction_date else None,
-            'description': st.description,
-            'reference_number': st.reference_number,
-            'verification_status': st.verification_status,
-            'is_mobile_money': st.is_mobile_money or False,
-            'mobile_money_reference': st.mobile_money_reference,
-            'mobile_money_phone': st.mobile_money_phone,
-            'verified_by': st.verified_by,
-            'verified_date': st.verified_date.isoformat() if st.verified_date else None,
-            'notes': st.notes,
-            'documents': [doc.to_dict() for doc in TransactionDocument.get_for_entity('savings', st.id)]
-        } for st in savings_transactions],
-        'fines': [{
-            'id': f.id,
-            'member_id': f.member_id,
-            'member_name': f"{f.member.first_name} {f.member.last_name}" if f.member else 'Unknown',
-            'fine_type': f.fine_type,
-            'amount': float(f.amount),
-            'reason': f.reason,
-            'fine_date': f.fine_date.isoformat() if f.fine_date else None,
-            'is_paid': f.is_paid,
-            'paid_amount': float(f.paid_amount) if f.paid_amount else 0,
-            'payment_date': f.payment_date.isoformat() if f.payment_date else None,
-            'verification_status': f.verification_status,
-            'documents': [doc.to_dict() for doc in TransactionDocument.get_for_entity('fine', f.id)]
-        } for f in fines],
-        'loan_repayments': [{
-            'id': lr.id,
-            'loan_id': lr.loan_id,
-            'member_id': lr.member_id,
-            'member_name': f"{lr.member.first_name} {lr.member.last_name}" if lr.member else 'Unknown',
-            'repayment_amount': float(lr.repayment_amount),
-            'principal_amount': float(lr.principal_amount),
-            'interest_amount': float(lr.interest_amount),
-            'outstanding_balance': float(lr.outstanding_balance),
-            'repayment_date': lr.repayment_date.isoformat() if lr.repayment_date else None,
-            'payment_method': lr.payment_method,
-            'documents': [doc.to_dict() for doc in TransactionDocument.get_for_entity('loan_repayment', lr.id)]
-        } for lr in loan_repayments],
-        'trainings': [{
-            'id': t.id,
-            'training_topic': t.training_topic,
-            'training_description': t.training_description,
-            'trainer_name': t.trainer_name,
-            'duration_minutes': t.duration_minutes,
-            'total_attendees': t.total_attendees,
-            'documents': [doc.to_dict() for doc in TransactionDocument.get_for_entity('training', t.id)]
-        } for t in trainings],
-        'votings': [{
-            'id': v.id,
-            'vote_topic': v.vote_topic,
-            'vote_description': v.vote_description,
-            'vote_type': v.vote_type,
-            'result': v.result,
-            'yes_count': v.yes_count,
-            'no_count': v.no_count,
-            'abstain_count': v.abstain_count,
-            'absent_count': v.absent_count,
-            'documents': [doc.to_dict() for doc in TransactionDocument.get_for_entity('voting', v.id)]
-        } for v in votings],
-        'summary': {
-            'total_deposits': float(summary.total_deposits) if summary else 0,
-            'total_withdrawals': float(summary.total_withdrawals) if summary else 0,
-            'net_savings': float(summary.net_savings) if summary else 0,
-            'total_fines_issued': float(summary.total_fines_issued) if summary else 0,
-            'total_fines_paid': float(summary.total_fines_paid) if summary else 0,
-            'total_loans_disbursed': float(summary.total_loans_disbursed) if summary else 0,
-            'total_loan_repayments': float(summary.total_loan_repayments) if summary else 0,
-            'trainings_held': summary.trainings_held if summary else 0,
-            'voting_sessions_held': summary.voting_sessions_held if summary else 0,
-            'net_cash_flow': float(summary.net_cash_flow) if summary else 0
-        } if summary else None,
+        'attendance': ATTENDANCE_FIELDS.dump_many(attendance),
+        'savings_transactions': SAVINGS_TRANSACTION_FIELDS.dump_many(savings_transactions),
+        'fines': FINE_FIELDS.dump_many(fines),
+        'loan_repayments': LOAN_REPAYMENT_FIELDS.dump_many(loan_repayments),
+        'trainings': TRAINING_FIELDS.dump_many(trainings),
+        'votings': VOTING_FIELDS.dump_many(votings),
+        'summary': MEETING_SUMMARY_FIELDS.dump(summary) if summary else None,
         'saving_types': saving_types
     }), 200
 
@@ -411,46 +471,57 @@ def delete_meeting(user_id, meeting_id):
         return jsonify({'status': 'error', 'message': 'Meeting not found'}), 404
 
     try:
-        # Delete all associated records manually to ensure data integrity
-        # 1. Delete attendance records
-        MeetingAttendance.query.filter_by(meeting_id=meeting_id).delete()
-
-        # 2. Delete savings transactions
-        SavingTransaction.query.filter_by(meeting_id=meeting_id).delete()
-
-        # 3. Delete fines
-        MemberFine.query.filter_by(meeting_id=meeting_id).delete()
-
-        # 4. Delete loan repayments
-        LoanRepayment.query.filter_by(meeting_id=meeting_id).delete()
-
-        # 5. Delete training attendance records first
-        trainings = TrainingRecord.query.filter_by(meeting_id=meeting_id).all()
-        for training in trainings:
-            TrainingAttendance.query.filter_by(training_id=training.id).delete()
-
-        # 6. Delete training records
-        TrainingRecord.query.filter_by(meeting_id=meeting_id).delete()
-
-        # 7. Delete member votes first
-        votings = VotingRecord.query.filter_by(meeting_id=meeting_id).all()
-        for voting in votings:
-            MemberVote.query.filter_by(voting_record_id=voting.id).delete()
-
-        # 8. Delete voting records
-        VotingRecord.query.filter_by(meeting_id=meeting_id).delete()
+        # Members whose attendance/contribution counters change with this meeting
+        attendance, transactions = history_table(MeetingAttendance), history_table(SavingTransaction)
+        affected_member_ids = {
+            member_id for (member_id,) in db.session.query(attendance.c.member_id).filter(
+                attendance.c.meeting_id == meeting_id
+            )
+        } | {
+            member_id for (member_id,) in db.session.query(MemberSaving.member_id).join(
+                transactions, transactions.c.member_saving_id == MemberSaving.id
+            ).filter(transactions.c.meeting_id == meeting_id)
+        }
 
-        # 9. Delete meeting summary
-        MeetingSummary.query.filter_by(meeting_id=meeting_id).delete()
+        # Verified savings being deleted come off their accounts' balances and totals
+        verified = and_(transactions.c.meeting_id == meeting_id, transactions.c.verification_status == 'VERIFIED')
+        fund_deltas = {
+            member_saving_id: (-Decimal(str(deposits or 0)), -Decimal(str(withdrawals or 0)))
+            for member_saving_id, deposits, withdrawals in db.session.query(
+                transactions.c.member_saving_id,
+                func.sum(case((transactions.c.transaction_type == 'DEPOSIT', transactions.c.amount), else_=0)),
+                func.sum(case((transactions.c.transaction_type == 'WITHDRAWAL', transactions.c.amount), else_=0))
+            ).filter(verified).group_by(transactions.c.member_saving_id)
+        }
 
-        # 10. Finally delete the meeting itself
-        db.session.delete(meeting)
+        # Repayments being deleted go back onto their loans
+        repayments = history_table(LoanRepayment)
+        repaid_by_loan = {
+            loan_id: Decimal(str(amount or 0))
+            for loan_id, amount in db.session.query(
+                repayments.c.loan_id, func.sum(repayments.c.repayment_amount)
+            ).filter(repayments.c.meeting_id == meeting_id).group_by(repayments.c.loan_id)
+        }
 
+        group_id = meeting.group_id
+        apply_deltas(fund_deltas)
+        result = delete_meeting_records(meeting_id)
+        for loan in GroupLoan.query.filter(GroupLoan.id.in_(list(repaid_by_loan))):
+            amount = repaid_by_loan[loan.id]
+            loan.outstanding_balance = (loan.outstanding_balance or 0) + amount
+            loan.amount_paid = (loan.amount_paid or 0) - amount
+            if loan.status == 'PAID' and loan.outstanding_balance > 0:
+                loan.status = 'DISBURSED'
+            sync_installment_payments(loan.id)
+        recompute_member_counters(member_ids=affected_member_ids)
         db.session.commit()
+        bump_group_version(group_id)
+        remove_files_in_background(result['file_paths'], group_id)
 
         return jsonify({
             'status': 'success',
-            'message': 'Meeting and all associated records deleted successfully'
+            'message': 'Meeting and all associated records deleted successfully',
+            'data': {'rows_deleted': result['rows_deleted'], 'files_queued': result['file_count']}
         }), 200
 
     except Exception as e:
@@ -472,6 +543,8 @@ def start_meeting(user_id, meeting_id):
     try:
         meeting.status = 'IN_PROGRESS'
         meeting.updated_date = datetime.datetime.utcnow()
+        # Running summary, kept current by each write during the meeting
+        apply_meeting_summary(meeting)
         db.session.commit()
 
         return jsonify({
@@ -487,7 +560,11 @@ def start_meeting(user_id, meeting_id):
 @meetings_blueprint.route('/meetings/<int:meeting_id>/complete', methods=['POST'])
 @authenticate
 def complete_meeting(user_id, meeting_id):
-    """Complete a meeting and generate summary."""
+    """
+    Complete a meeting and close out its running summary.
+
+    Query params: verify (recompute the summary from source records).
+    """
     meeting = Meeting.query.get(meeting_id)
     if not meeting:
         return jsonify({'status': 'error', 'message': 'Meeting not found'}), 404
@@ -509,102 +586,29 @@ def complete_meeting(user_id, meeting_id):
         }), 400
 
     try:
-        # Calculate attendance
-        attendance_records = MeetingAttendance.query.filter_by(meeting_id=meeting_id).all()
-        members_present = sum(1 for a in attendance_records if a.is_present)
-        members_absent = len(attendance_records) - members_present
-        attendance_rate = (members_present / len(attendance_records) * 100) if attendance_records else 0
-
-        # Calculate savings - ONLY count VERIFIED transactions
-        savings_transactions = SavingTransaction.query.filter_by(meeting_id=meeting_id).all()
-        # Filter for VERIFIED transactions only (excludes PENDING and REJECTED remote payments)
-        verified_transactions = [s for s in savings_transactions if s.verification_status == 'VERIFIED']
-        total_deposits = sum(float(s.amount) for s in verified_transactions if s.transaction_type == 'DEPOSIT')
-        total_withdrawals = sum(float(s.amount) for s in verified_transactions if s.transaction_type == 'WITHDRAWAL')
-        net_savings = total_deposits - total_withdrawals
-
-        # Calculate fines
-        fines = MemberFine.query.filter_by(meeting_id=meeting_id).all()
-        total_fines_issued = sum(float(f.amount) for f in fines)
-        total_fines_paid = sum(float(f.paid_amount or 0) for f in fines)
-        outstanding_fines = total_fines_issued - total_fines_paid
-
-        # Calculate loan repayments
-        repayments = LoanRepayment.query.filter_by(meeting_id=meeting_id).all()
-        total_loan_repayments = sum(float(r.repayment_amount) for r in repayments)
-        loan_repayments_count = len(repayments)
-
-        # Calculate training stats
-        trainings = TrainingRecord.query.filter_by(meeting_id=meeting_id).all()
-        trainings_held = len(trainings)
-        training_attendance_count = sum(t.total_attendees for t in trainings)
-        training_participation_rate = (training_attendance_count / (trainings_held * meeting.total_members) * 100) if trainings_held > 0 and meeting.total_members > 0 else 0
-
-        # Calculate voting stats
-        votings = VotingRecord.query.filter_by(meeting_id=meeting_id).all()
-        voting_sessions_held = len(votings)
-        votes_cast_count = sum(v.yes_count + v.no_count + v.abstain_count for v in votings)
-        voting_participation_rate = (votes_cast_count / (voting_sessions_held * meeting.total_members) * 100) if voting_sessions_held > 0 and meeting.total_members > 0 else 0
-
-        # Calculate net cash flow
-        net_cash_flow = total_deposits + total_loan_repayments + total_fines_paid - total_withdrawals
-
-        # Update meeting
         meeting.status = 'COMPLETED'
-        meeting.members_present = members_present
-        meeting.attendance_count = members_present
-        meeting.total_savings_collected = total_deposits
-        meeting.total_fines_collected = total_fines_paid
-        meeting.total_loan_repayments = total_loan_repayments
-        meeting.updated_date = datetime.datetime.utcnow()
-
-        # Check if quorum met (default 66.67%)
-        group_settings = GroupSettings.query.filter_by(group_id=meeting.group_id).first()
-        quorum_percentage = float(group_settings.quorum_percentage) if group_settings and group_settings.quorum_percentage else 66.67
-        meeting.quorum_met = attendance_rate >= quorum_percentage
-
-        # Create or update meeting summary
-        summary = MeetingSummary.query.filter_by(meeting_id=meeting_id).first()
-        if not summary:
-            summary = MeetingSummary(meeting_id=meeting_id)
-            db.session.add(summary)
-
-        summary.total_members = meeting.total_members
-        summary.members_present = members_present
-        summary.members_absent = members_absent
-        summary.attendance_rate = attendance_rate
-        summary.total_deposits = total_deposits
-        summary.total_withdrawals = total_withdrawals
-        summary.net_savings = net_savings
-        summary.total_fines_issued = total_fines_issued
-        summary.total_fines_paid = total_fines_paid
-        summary.outstanding_fines = outstanding_fines
-        summary.total_loan_repayments = total_loan_repayments
-        summary.loan_repayments_count = loan_repayments_count
-        summary.trainings_held = trainings_held
-        summary.training_attendance_count = training_attendance_count
-        summary.training_participation_rate = training_participation_rate
-        summary.voting_sessions_held = voting_sessions_held
-        summary.votes_cast_count = votes_cast_count
-        summary.voting_participation_rate = voting_participation_rate
-        summary.net_cash_flow = net_cash_flow
-        summary.updated_date = datetime.datetime.utcnow()
+        verify = request.args.get('verify', 'false').lower() in ('1', 'true', 'yes')
+        summary = finalize_meeting_summary(meeting, verify=verify)
 
         db.session.commit()
+        bump_group_version(meeting.group_id)
+
+        # Re-assess loan eligibility with this meeting's savings and attendance
+        run_in_background(run_loan_scoring, [meeting.group_id])
 
         return jsonify({
             'status': 'success',
             'message': 'Meeting completed successfully',
             'summary': {
-                'attendance_rate': float(attendance_rate),
-                'total_deposits': float(total_deposits),
-                'total_withdrawals': float(total_withdrawals),
-                'net_savings': float(net_savings),
-                'total_fines_collected': float(total_fines_paid),
-                'total_loan_repayments': float(total_loan_repayments),
-                'trainings_held': trainings_held,
-                'voting_sessions_held': voting_sessions_held,
-                'net_cash_flow': float(net_cash_flow),
+                'attendance_rate': float(summary.attendance_rate),
+                'total_deposits': float(summary.total_deposits),
+                'total_withdrawals': float(summary.total_withdrawals),
+                'net_savings': float(summary.net_savings),
+                'total_fines_collected': float(summary.total_fines_paid),
+                'total_loan_repayments': float(summary.total_loan_repayments),
+                'trainings_held': summary.trainings_held,
+                'voting_sessions_held': summary.voting_sessions_held,
+                'net_cash_flow': float(summary.net_cash_flow),
                 'quorum_met': meeting.quorum_met
             }
         }), 200
@@ -629,6 +633,7 @@ def record_attendance(user_id, meeting_id):
         return jsonify({'status': 'error', 'message': 'No attendance records provided'}), 400
 
     try:
+        counter_deltas = AttendanceDeltaCollector()
         for record in attendance_records:
             member_id = record.get('member_id')
             is_present = record.get('is_present', False)
@@ -657,6 +662,7 @@ def record_attendance(user_id, meeting_id):
 
             if attendance:
                 # Update existing
+                counter_deltas.record(member_id, attendance.is_present, is_present)
                 attendance.is_present = is_present
                 if parsed_arrival_time:
                     attendance.arrival_time = parsed_arrival_time
@@ -674,8 +680,14 @@ def record_attendance(user_id, meeting_id):
                     excuse_reason=excuse_reason
                 )
                 db.session.add(attendance)
+                counter_deltas.record(member_id, None, is_present)
 
+        records_delta, present_delta = counter_deltas.totals()
+        apply_summary_delta(meeting_id, members_present=present_delta,
+                            members_absent=records_delta - present_delta)
+        counter_deltas.apply()
         db.session.commit()
+        bump_group_version(meeting.group_id)
 
         # Calculate attendance stats
         all_attendance = MeetingAttendance.query.filter_by(meeting_id=meeting_id).all()
@@ -753,7 +765,11 @@ def record_savings_transaction(user_id, meeting_id):
         )
 
         db.session.add(transaction)
+        apply_transaction(member_saving.id, transaction_type, amount, meeting.meeting_date)
+        apply_contribution_delta(member.id, transaction_type, amount)
+        _apply_savings_summary_delta(meeting_id, transaction_type, amount)
         db.session.commit()
+        bump_group_version(meeting.group_id)
 
         return jsonify({
             'status': 'success',
@@ -811,7 +827,9 @@ def record_fine(user_id, meeting_id):
         )
 
         db.session.add(fine)
+        apply_summary_delta(meeting_id, total_fines_issued=amount)
         db.session.commit()
+        bump_group_version(meeting.group_id)
 
         return jsonify({
             'status': 'success',
@@ -843,39 +861,54 @@ def record_loan_repayment(user_id, meeting_id):
     post_data = request.get_json()
     loan_id = post_data.get('loan_id')
     repayment_amount = post_data.get('repayment_amount')
-    principal_amount = post_data.get('principal_amount')
-    interest_amount = post_data.get('interest_amount')
 
-    if not all([loan_id, repayment_amount, principal_amount, interest_amount]):
+    if not all([loan_id, repayment_amount]):
         return jsonify({'status': 'error', 'message': 'Missing required fields'}), 400
 
+    try:
+        repayment_amount = Decimal(str(repayment_amount))
+    except ArithmeticError:
+        return jsonify({'status': 'error', 'message': 'Invalid repayment amount'}), 400
+    if repayment_amount <= 0:
+        return jsonify({'status': 'error', 'message': 'Repayment amount must be positive'}), 400
+
     try:
         # Verify loan exists and belongs to the group
         loan = GroupLoan.query.filter_by(id=loan_id, group_id=meeting.group_id).first()
         if not loan:
             return jsonify({'status': 'error', 'message': 'Loan not found in this group'}), 404
 
-        # Calculate new outstanding balance
-        outstanding_balance = float(loan.outstanding_balance or loan.loan_amount) - float(repayment_amount)
+        # Split into interest and principal from the schedule, not from the client
+        if not loan.installments:
+            generate_loan_schedule(loan, update_totals=False)
+        split = split_repayment(loan, repayment_amount)
+
+        # Update loan outstanding balance, amount paid and status in one statement
+        outstanding_balance = apply_loan_repayment(loan.id, repayment_amount)
+        if outstanding_balance is None:
+            db.session.rollback()
+            return jsonify({'status': 'error', 'message': 'Repayment exceeds the outstanding balance'}), 400
+        db.session.expire(loan, ['outstanding_balance', 'amount_paid', 'status'])
 
         # Create repayment record
         repayment = LoanRepayment(
             loan_id=loan_id,
             meeting_id=meeting_id,
+            member_id=loan.member_id,
             repayment_amount=repayment_amount,
-            principal_amount=principal_amount,
-            interest_amount=interest_amount,
+            principal_amount=split['principal_amount'],
+            interest_amount=split['interest_amount'],
             outstanding_balance=outstanding_balance,
-            repayment_date=meeting.meeting_date
+            repayment_date=meeting.meeting_date,
+            recorded_by=user_id
         )
 
-        # Update loan outstanding balance
-        loan.outstanding_balance = outstanding_balance
-        if outstanding_balance <= 0:
-            loan.status = 'PAID'
-
         db.session.add(repayment)
+        db.session.flush()
+        sync_installment_payments(loan.id)
+        apply_summary_delta(meeting_id, total_loan_repayments=repayment_amount, loan_repayments_count=1)
         db.session.commit()
+        bump_group_version(meeting.group_id)
 
         return jsonify({
             'status': 'success',
@@ -884,6 +917,8 @@ def record_loan_repayment(user_id, meeting_id):
                 'repayment_id': repayment.id,
                 'loan_id': loan_id,
                 'repayment_amount': float(repayment_amount),
+                'principal_amount': float(split['principal_amount']),
+                'interest_amount': float(split['interest_amount']),
                 'outstanding_balance': float(outstanding_balance)
             }
         }), 201
@@ -893,6 +928,163 @@ def record_loan_repayment(user_id, meeting_id):
         return jsonify({'status': 'error', 'message': str(e)}), 400
 
 
+@meetings_blueprint.route('/meetings/<int:meeting_id>/due-installments', methods=['GET'])
+@authenticate
+def get_due_installments(user_id, meeting_id):
+    """Get unpaid loan installments due on or before a meeting's date."""
+    meeting = Meeting.query.get(meeting_id)
+    if not meeting:
+        return jsonify({'status': 'error', 'message': 'Meeting not found'}), 404
+
+    rows = db.session.query(LoanInstallment, GroupMember.first_name, GroupMember.last_name).join(
+        GroupMember, GroupMember.id == LoanInstallment.member_id
+    ).filter(
+        LoanInstallment.group_id == meeting.group_id,
+        LoanInstallment.status.in_(['PENDING', 'PARTIAL']),
+        LoanInstallment.due_date <= meeting.meeting_date
+    ).order_by(LoanInstallment.due_date, LoanInstallment.member_id).all()
+
+    installments = []
+    for installment, first_name, last_name in rows:
+        installments.append({
+            'installment_id': installment.id,
+            'loan_id': installment.loan_id,
+            'member_id': installment.member_id,
+            'member_name': f"{first_name} {last_name}",
+            'installment_number': installment.installment_number,
+            'due_date': installment.due_date.isoformat(),
+            'principal_due': float(installment.principal_due),
+            'interest_due': float(installment.interest_due),
+            'amount_due': float(installment.amount_due),
+            'amount_paid': float(installment.amount_paid),
+            'amount_outstanding': float(installment.amount_due - installment.amount_paid),
+            'status': installment.status,
+            'is_overdue': installment.due_date < meeting.meeting_date
+        })
+
+    return jsonify({
+        'status': 'success',
+        'data': {
+            'meeting_id': meeting_id,
+            'meeting_date': meeting.meeting_date.isoformat(),
+            'installments': installments,
+            'total_due': sum(i['amount_outstanding'] for i in installments)
+        }
+    }), 200
+
+
+def _is_own_loan(user_id, loan):
+    return db.session.query(GroupMember.id).filter_by(id=loan.member_id, user_id=user_id).first() is not None
+
+
+@meetings_blueprint.route('/loans/<int:loan_id>/approve', methods=['POST'])
+@authenticate
+def approve_loan(user_id, loan_id):
+    """Approve a pending loan and generate its installment schedule."""
+    loan = GroupLoan.query.get(loan_id)
+    if not loan:
+        return jsonify({'status': 'error', 'message': 'Loan not found'}), 404
+
+    if not is_officer_or_admin(user_id, loan.group_id):
+        return jsonify({'status': 'error', 'message': 'Only officers and admins can approve loans'}), 403
+
+    if _is_own_loan(user_id, loan):
+        return jsonify({'status': 'error', 'message': 'You cannot approve your own loan'}), 403
+
+    if loan.status != 'PENDING':
+        return jsonify({'status': 'error', 'message': f'Loan is already {loan.status.lower()}'}), 400
+
+    data = request.get_json(silent=True) or {}
+
+    try:
+        loan.status = 'APPROVED'
+        loan.approval_date = datetime.date.today()
+        loan.approved_by = user_id
+        if data.get('interest_method'):
+            loan.interest_method = data['interest_method'].upper()
+        if data.get('interest_basis'):
+            loan.interest_basis = data['interest_basis'].upper()
+
+        installments = generate_loan_schedule(loan)
+        db.session.commit()
+        bump_group_version(loan.group_id)
+
+        return jsonify({
+            'status': 'success',
+            'message': 'Loan approved successfully',
+            'data': {
+                'loan_id': loan.id,
+                'monthly_payment': float(loan.monthly_payment),
+                'total_amount_due': float(loan.total_amount_due),
+                'installments': len(installments)
+            }
+        }), 200
+
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'status': 'error', 'message': str(e)}), 400
+
+
+@meetings_blueprint.route('/loans/<int:loan_id>/disburse', methods=['POST'])
+@authenticate
+def disburse_loan(user_id, loan_id):
+    """Disburse an approved loan; the schedule is regenerated from the disbursement date."""
+    loan = GroupLoan.query.get(loan_id)
+    if not loan:
+        return jsonify({'status': 'error', 'message': 'Loan not found'}), 404
+
+    if not is_officer_or_admin(user_id, loan.group_id):
+        return jsonify({'status': 'error', 'message': 'Only officers and admins can disburse loans'}), 403
+
+    if loan.status not in ('PENDING', 'APPROVED'):
+        return jsonify({'status': 'error', 'message': f'Loan is already {loan.status.lower()}'}), 400
+
+    # Disbursing a pending loan approves it too
+    if loan.status == 'PENDING' and _is_own_loan(user_id, loan):
+        return jsonify({'status': 'error', 'message': 'You cannot approve your own loan'}), 403
+
+    data = request.get_json(silent=True) or {}
+
+    try:
+        disbursement_date = datetime.date.today()
+        meeting = None
+        if data.get('meeting_id'):
+            meeting = Meeting.query.filter_by(id=data['meeting_id'], group_id=loan.group_id).first()
+            if not meeting:
+                return jsonify({'status': 'error', 'message': 'Meeting not found in this group'}), 404
+            disbursement_date = meeting.meeting_date
+
+        loan.status = 'DISBURSED'
+        loan.disbursement_date = disbursement_date
+        loan.disbursed_by = user_id
+        if not loan.approval_date:
+            loan.approval_date = disbursement_date
+            loan.approved_by = user_id
+
+        installments = generate_loan_schedule(loan)
+        if meeting:
+            apply_summary_delta(meeting.id, total_loans_disbursed=loan.principal, loans_disbursed_count=1)
+        db.session.commit()
+        bump_group_version(loan.group_id)
+
+        return jsonify({
+            'status': 'success',
+            'message': 'Loan disbursed successfully',
+            'data': {
+                'loan_id': loan.id,
+                'disbursement_date': loan.disbursement_date.isoformat(),
+                'maturity_date': loan.maturity_date.isoformat() if loan.maturity_date else None,
+                'monthly_payment': float(loan.monthly_payment),
+                'total_amount_due': float(loan.total_amount_due),
+                'installments': len(installments)
+            }
+        }), 200
+
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'status': 'error', 'message': str(e)}), 400
+
+
 @meetings_blueprint.route('/meetings/<int:meeting_id>/trainings', methods=['POST'])
 @authenticate
 def create_training_session(user_id, meeting_id):
@@ -925,6 +1117,7 @@ def create_training_session(user_id, meeting_id):
         )
 
         db.session.add(training)
+        apply_summary_delta(meeting_id, trainings_held=1)
         db.session.commit()
 
         return jsonify({
@@ -984,6 +1177,8 @@ def record_training_attendance(user_id, training_id):
                 total_attended += 1
 
         # Update total attendees count
+        apply_summary_delta(training.meeting_id,
+                            training_attendance_count=total_attended - (training.total_attendees or 0))
         training.total_attendees = total_attended
 
         db.session.commit()
@@ -1036,6 +1231,7 @@ def create_voting_session(user_id, meeting_id):
         )
 
         db.session.add(voting)
+        apply_summary_delta(meeting_id, voting_sessions_held=1)
         db.session.commit()
 
         return jsonify({
@@ -1109,6 +1305,9 @@ def record_member_votes(user_id, voting_id):
                 absent_count += 1
 
         # Update vote counts
+        old_votes_cast = (voting.yes_count or 0) + (voting.no_count or 0) + (voting.abstain_count or 0)
+        apply_summary_delta(voting.meeting_id,
+                            votes_cast_count=yes_count + no_count + abstain_count - old_votes_cast)
         voting.yes_count = yes_count
         voting.no_count = no_count
         voting.abstain_count = abstain_count
@@ -1164,8 +1363,10 @@ def update_savings_transaction(user_id, transaction_id):
     data = request.get_json()
 
     try:
-        # Store old amount for balance adjustment
-        old_amount = float(transaction.amount)
+        # Store old values for balance adjustment
+        old_amount = transaction.amount
+        old_type = transaction.transaction_type
+        was_verified = transaction.verification_status == 'VERIFIED'
 
         # Update transaction fields
         if 'amount' in data:
@@ -1179,19 +1380,25 @@ def update_savings_transaction(user_id, transaction_id):
         if 'verification_status' in data:
             transaction.verification_status = data['verification_status']
 
-        # Update member_saving balance if amount changed
-        if 'amount' in data and old_amount != float(data['amount']):
-            member_saving = MemberSaving.query.get(transaction.member_saving_id)
-            if member_saving:
-                amount_diff = float(data['amount']) - old_amount
-                if transaction.transaction_type == 'DEPOSIT':
-                    member_saving.current_balance += amount_diff
-                    member_saving.total_deposits += amount_diff
-                elif transaction.transaction_type == 'WITHDRAWAL':
-                    member_saving.current_balance -= amount_diff
-                    member_saving.total_withdrawals += amount_diff
+        # Move the balance, member counters and meeting summary from the old to the new values
+        is_verified = transaction.verification_status == 'VERIFIED'
+        unchanged = (was_verified == is_verified and old_type == transaction.transaction_type
+                     and Decimal(str(old_amount)) == Decimal(str(transaction.amount)))
+        if not unchanged:
+            member_id = db.session.query(MemberSaving.member_id).filter_by(id=transaction.member_saving_id).scalar()
+            if was_verified:
+                reverse_transaction(transaction.member_saving_id, old_type, old_amount)
+                apply_contribution_delta(member_id, old_type, -old_amount)
+                _apply_savings_summary_delta(transaction.meeting_id, old_type, -old_amount)
+            if is_verified:
+                apply_transaction(transaction.member_saving_id, transaction.transaction_type, transaction.amount)
+                apply_contribution_delta(member_id, transaction.transaction_type, transaction.amount)
+                _apply_savings_summary_delta(transaction.meeting_id, transaction.transaction_type, transaction.amount)
 
         db.session.commit()
+        bump_group_version(db.session.query(GroupMember.group_id).join(
+            MemberSaving, MemberSaving.member_id == GroupMember.id
+        ).filter(MemberSaving.id == transaction.member_saving_id).scalar())
 
         return jsonify({
             'status': 'success',
@@ -1221,6 +1428,9 @@ def update_fine(user_id, fine_id):
     data = request.get_json()
 
     try:
+        old_amount = float(fine.amount or 0)
+        old_paid_amount = float(fine.paid_amount or 0)
+
         if 'fine_type' in data:
             fine.fine_type = data['fine_type']
         if 'reason' in data:
@@ -1234,7 +1444,11 @@ def update_fine(user_id, fine_id):
         if 'notes' in data:
             fine.notes = data['notes']
 
+        apply_summary_delta(fine.meeting_id,
+                            total_fines_issued=float(fine.amount or 0) - old_amount,
+                            total_fines_paid=float(fine.paid_amount or 0) - old_paid_amount)
         db.session.commit()
+        bump_group_version(db.session.query(GroupMember.group_id).filter_by(id=fine.member_id).scalar())
 
         return jsonify({
             'status': 'success',
@@ -1266,6 +1480,8 @@ def update_loan_repayment(user_id, repayment_id):
     data = request.get_json()
 
     try:
+        old_repayment_amount = float(repayment.repayment_amount or 0)
+
         if 'repayment_amount' in data:
             repayment.repayment_amount = data['repayment_amount']
         if 'principal_amount' in data:
@@ -1277,7 +1493,12 @@ def update_loan_repayment(user_id, repayment_id):
         if 'payment_method' in data:
             repayment.payment_method = data['payment_method']
 
+        db.session.flush()
+        sync_installment_payments(repayment.loan_id)
+        apply_summary_delta(repayment.meeting_id,
+                            total_loan_repayments=float(repayment.repayment_amount or 0) - old_repayment_amount)
         db.session.commit()
+        bump_group_version(db.session.query(GroupLoan.group_id).filter_by(id=repayment.loan_id).scalar())
 
         return jsonify({
             'status': 'success',
@@ -0,0 +1,171 @@
+"""
+Member Counters
+Incremental maintenance of the denormalized GroupMember counters that
+member lists and dashboards display and sort on:
+- attendance_percentage, from running meetings_attended / meetings_total
+- total_contributions, the sum of verified deposits
+- share_balance, verified deposits less withdrawals
+
+Write paths apply O(1) delta UPDATEs (computed from the old row values in
+the same statement, so concurrent writers don't lose updates);
+recompute_member_counters() rebuilds everything from history for backfill.
+"""
+from collections import defaultdict
+from decimal import Decimal
+from typing import Dict, Iterable, Optional, Tuple
+from project import db
+from project.api.archival import HISTORY_SQL
+from project.api.balance_service import MONEY
+
+
+ATTENDANCE_DELTA_SQL = db.text("""
+    UPDATE group_members
+    SET meetings_total = COALESCE(meetings_total, 0) + :total_delta,
+        meetings_attended = COALESCE(meetings_attended, 0) + :present_delta,
+        attendance_percentage = CASE
+            WHEN COALESCE(meetings_total, 0) + :total_delta > 0
+            THEN ROUND((COALESCE(meetings_attended, 0) + :present_delta) * 100.0
+                       / (COALESCE(meetings_total, 0) + :total_delta), 2)
+            ELSE 0
+        END
+    WHERE id = :member_id
+""")
+
+CONTRIBUTION_DELTA_SQL = db.text("""
+    UPDATE group_members
+    SET total_contributions = COALESCE(total_contributions, 0) + :deposit_delta,
+        share_balance = COALESCE(share_balance, 0) + :deposit_delta - :withdrawal_delta
+    WHERE id = :member_id
+""").bindparams(db.bindparam('deposit_delta', type_=MONEY), db.bindparam('withdrawal_delta', type_=MONEY))
+
+_VERIFIED_AMOUNT = f"""
+    SELECT COALESCE(SUM(st.amount), 0)
+    FROM {HISTORY_SQL['saving_transactions']} st
+    JOIN member_savings ms ON ms.id = st.member_saving_id
+    WHERE ms.member_id = group_members.id
+    AND st.verification_status = 'VERIFIED' AND st.transaction_type = '{{transaction_type}}'
+"""
+
+RECOMPUTE_COUNTS_SQL = f"""
+    UPDATE group_members
+    SET meetings_total = (SELECT COUNT(*) FROM {HISTORY_SQL['meeting_attendance']} ma
+                          WHERE ma.member_id = group_members.id),
+        meetings_attended = (SELECT COUNT(*) FROM {HISTORY_SQL['meeting_attendance']} ma
+                             WHERE ma.member_id = group_members.id AND ma.is_present = TRUE),
+        total_contributions = ({_VERIFIED_AMOUNT.format(transaction_type='DEPOSIT')}),
+        share_balance = ({_VERIFIED_AMOUNT.format(transaction_type='DEPOSIT')})
+                        - ({_VERIFIED_AMOUNT.format(transaction_type='WITHDRAWAL')})
+    {{where}}
+"""
+
+RECOMPUTE_PERCENTAGE_SQL = """
+    UPDATE group_members
+    SET attendance_percentage = CASE
+        WHEN meetings_total > 0 THEN ROUND(meetings_attended * 100.0 / meetings_total, 2)
+        ELSE 0
+    END
+    {where}
+"""
+
+
+def apply_attendance_deltas(deltas: Dict[int, Tuple[int, int]]):
+    """
+    Apply attendance changes to member counters. Does not commit.
+
+    Args:
+        deltas: member_id -> (meetings_total delta, meetings_attended delta)
+    """
+    params = [
+        {'member_id': member_id, 'total_delta': total, 'present_delta': present}
+        for member_id, (total, present) in deltas.items() if total or present
+    ]
+    if params:
+        db.session.execute(ATTENDANCE_DELTA_SQL, params)
+
+
+def _decimal(value) -> Decimal:
+    return value if isinstance(value, Decimal) else Decimal(str(value or 0))
+
+
+def apply_contribution_delta(member_id: int, transaction_type: str, amount):
+    """
+    Apply a newly verified (or reversed, with a negative amount) savings
+    transaction to the member's contribution counters. Does not commit.
+    """
+    amount = _decimal(amount)
+    if not amount or transaction_type not in ('DEPOSIT', 'WITHDRAWAL'):
+        return
+    db.session.execute(CONTRIBUTION_DELTA_SQL, {
+        'member_id': member_id,
+        'deposit_delta': amount if transaction_type == 'DEPOSIT' else Decimal('0'),
+        'withdrawal_delta': amount if transaction_type == 'WITHDRAWAL' else Decimal('0')
+    })
+
+
+def apply_contribution_deltas(deltas: Dict[int, Tuple[Decimal, Decimal]]):
+    """
+    Apply summed contribution changes for many members at once. Does not commit.
+
+    Args:
+        deltas: member_id -> (verified deposits delta, verified withdrawals delta)
+    """
+    params = [
+        {'member_id': member_id, 'deposit_delta': _decimal(deposits), 'withdrawal_delta': _decimal(withdrawals)}
+        for member_id, (deposits, withdrawals) in deltas.items() if deposits or withdrawals
+    ]
+    if params:
+        db.session.execute(CONTRIBUTION_DELTA_SQL, params)
+
+
+class AttendanceDeltaCollector:
+    """Accumulates per-member attendance deltas for a batch of upserts."""
+
+    def __init__(self):
+        self.deltas = defaultdict(lambda: [0, 0])
+
+    def record(self, member_id: int, was_present: Optional[bool], is_present: bool):
+        """Record one upsert; was_present is None for a newly created attendance row."""
+        delta = self.deltas[member_id]
+        if was_present is None:
+            delta[0] += 1
+            delta[1] += 1 if is_present else 0
+        else:
+            delta[1] += (1 if is_present else 0) - (1 if was_present else 0)
+
+    def totals(self) -> Tuple[int, int]:
+        """(attendance records delta, members present delta) across all members."""
+        return (sum(d[0] for d in self.deltas.values()), sum(d[1] for d in self.deltas.values()))
+
+    def apply(self):
+        apply_attendance_deltas({member_id: tuple(d) for member_id, d in self.deltas.items()})
+        self.deltas.clear()
+
+
+def recompute_member_counters(group_id: Optional[int] = None, member_ids: Optional[Iterable[int]] = None) -> int:
+    """
+    Rebuild member counters from attendance and verified savings history.
+
+    Args:
+        group_id: Only recompute members of this group
+        member_ids: Only recompute these members
+
+    Returns:
+        Number of members updated
+    """
+    if member_ids is not None:
+        member_ids = list(member_ids)
+        if not member_ids:
+            return 0
+        where, params = 'WHERE id IN :member_ids', {'member_ids': member_ids}
+    elif group_id is not None:
+        where, params = 'WHERE group_id = :group_id', {'group_id': group_id}
+    else:
+        where, params = '', {}
+
+    statements = [db.text(sql.format(where=where)) for sql in (RECOMPUTE_COUNTS_SQL, RECOMPUTE_PERCENTAGE_SQL)]
+    if member_ids is not None:
+        statements = [s.bindparams(db.bindparam('member_ids', expanding=True)) for s in statements]
+
+    result = db.session.execute(statements[0], params)
+    db.session.execute(statements[1], params)
+    return result.rowcount
@@ -3,6 +3,7 @@ from flask import Blueprint, request, jsonify, current_app
 from sqlalchemy import exc, func, text, or_
 from project import db
 from project.api.models import GroupMember, SavingsGroup, User
+from project.api.archival import HISTORY_SQL
 from datetime import datetime
 from functools import wraps
 import json
@@ -653,7 +654,7 @@ def get_member_financial(user_id, group_id, member_id):
             }), 404
 
         # Get savings by fund type
-        savings_query = text("""
+        savings_query = text(f"""
             SELECT
                 st.name as fund_name,
                 st.description as fund_description,
@@ -662,7 +663,7 @@ def get_member_financial(user_id, group_id, member_id):
                 COALESCE(SUM(CASE WHEN sav_t.transaction_type = 'DEPOSIT' THEN sav_t.amount ELSE -sav_t.amount END), 0) as balance
             FROM member_savings ms
             LEFT JOIN saving_types st ON ms.saving_type_id = st.id
-            LEFT JOIN saving_transactions sav_t ON sav_t.member_saving_id = ms.id
+            LEFT JOIN {HISTORY_SQL['saving_transactions']} sav_t ON sav_t.member_saving_id = ms.id
             WHERE ms.member_id = :member_id
             GROUP BY st.id, st.name, st.description
             ORDER BY st.name
@@ -720,7 +721,7 @@ def get_member_financial(user_id, group_id, member_id):
             loans.append(loan_data)
 
         # Get fines
-        fines_query = text("""
+        fines_query = text(f"""
             SELECT
                 id,
                 fine_type,
@@ -728,9 +729,9 @@ def get_member_financial(user_id, group_id, member_id):
                 amount,
                 is_paid,
                 paid_amount,
-                paid_date,
+                payment_date AS paid_date,
                 created_date
-            FROM member_fines
+            FROM {HISTORY_SQL['member_fines']} mf
             WHERE member_id = :member_id
             ORDER BY created_date DESC
         """)
@@ -793,7 +794,7 @@ def get_member_attendance(user_id, group_id, member_id):
             }), 404
 
         # Get attendance records
-        attendance_query = text("""
+        attendance_query = text(f"""
             SELECT
                 ma.id,
                 ma.meeting_id,
@@ -802,10 +803,8 @@ def get_member_attendance(user_id, group_id, member_id):
                 ma.is_present,
                 ma.arrival_time,
                 ma.excuse_reason,
-                ma.fine_applied,
-                ma.fine_amount,
                 ma.created_date
-            FROM meeting_attendance ma
+            FROM {HISTORY_SQL['meeting_attendance']} ma
             LEFT JOIN meetings m ON ma.meeting_id = m.id
             WHERE ma.member_id = :member_id
             ORDER BY m.meeting_date DESC
@@ -825,9 +824,6 @@ def get_member_attendance(user_id, group_id, member_id):
                 elif hasattr(value, 'isoformat'):
                     record[key] = value.isoformat()
 
-            if record.get('fine_amount'):
-                record['fine_amount'] = float(record['fine_amount'])
-
             total_meetings += 1
             if record.get('is_present'):
                 attended_meetings += 1
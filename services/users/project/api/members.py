@@ -4,9 +4,10 @@ from sqlalchemy import exc, func
 from project import db
 from project.api.models import (
     GroupMember, SavingsGroup, MemberSaving, SavingType,
-    MeetingAttendance, MemberFine, GroupLoan, LoanAssessment,
-    User
+    GroupLoan, User
 )
+from project.api.shared_cache import get_or_compute
+from project.api.archival import HISTORY_SQL
 from functools import wraps
 import jwt
 from flask import current_app
@@ -15,6 +16,60 @@ from flask import current_app
 members_blueprint = Blueprint('members', __name__)
 
 
+# Per-member aggregates for the dashboard; each CTE yields exactly one row
+MEMBER_DASHBOARD_STATS_SQL = db.text(f"""
+    WITH loans AS (
+        SELECT COUNT(*) AS active_loans_count,
+               COALESCE(SUM(principal), 0) AS total_loan_amount,
+               COALESCE(SUM(outstanding_balance), 0) AS total_outstanding
+        FROM group_loans
+        WHERE member_id = :member_id
+        AND status IN ('PENDING', 'APPROVED', 'DISBURSED', 'REPAYING')
+    ),
+    attendance AS (
+        SELECT COUNT(*) AS total_meetings,
+               COUNT(CASE WHEN is_present = TRUE THEN 1 END) AS attended_meetings
+        FROM {HISTORY_SQL['meeting_attendance']} ma
+        WHERE member_id = :member_id
+    ),
+    fines AS (
+        SELECT COALESCE(SUM(amount), 0) AS total_fines,
+               COALESCE(SUM(CASE WHEN is_paid = TRUE THEN paid_amount ELSE 0 END), 0) AS paid_fines
+        FROM {HISTORY_SQL['member_fines']} mf
+        WHERE member_id = :member_id
+    ),
+    assessment AS (
+        SELECT is_eligible, max_loan_amount, overall_score, risk_level
+        FROM loan_assessments
+        WHERE member_id = :member_id
+        ORDER BY assessment_date DESC
+        LIMIT 1
+    )
+    SELECT loans.*, attendance.*, fines.*,
+           assessment.is_eligible, assessment.max_loan_amount,
+           assessment.overall_score, assessment.risk_level
+    FROM loans
+    CROSS JOIN attendance
+    CROSS JOIN fines
+    LEFT JOIN assessment ON 1 = 1
+""")
+
+
+def _load_group_averages(group_id):
+    """Average contributions and attendance of a group's active members."""
+    avg_savings, avg_attendance = db.session.query(
+        func.avg(GroupMember.total_contributions),
+        func.avg(GroupMember.attendance_percentage)
+    ).filter(
+        GroupMember.group_id == group_id,
+        GroupMember.is_active == True
+    ).one()
+    return {
+        'avg_savings': float(avg_savings or 0),
+        'avg_attendance': float(avg_attendance or 0)
+    }
+
+
 def authenticate(f):
     """Decorator to authenticate requests."""
     @wraps(f)
@@ -92,109 +147,65 @@ def get_member(user_id, member_id):
 def get_member_dashboard(user_id, member_id):
     """Get comprehensive member dashboard data."""
     try:
-        member = GroupMember.query.filter_by(id=member_id).first()
-        if not member:
+        row = db.session.query(GroupMember, SavingsGroup).outerjoin(
+            SavingsGroup, SavingsGroup.id == GroupMember.group_id
+        ).filter(GroupMember.id == member_id).first()
+        if not row:
             return jsonify({
                 'status': 'fail',
                 'message': 'Member not found.'
             }), 404
-        
-        group = SavingsGroup.query.filter_by(id=member.group_id).first()
-        
-        # 1. SAVINGS DATA - Get savings by fund type
-        # Get all member savings for this member
-        member_savings = MemberSaving.query.filter_by(member_id=member_id).all()
 
-        # Build savings by fund dictionary
+        member, group = row
+
+        # 1. SAVINGS DATA - Get savings by fund type in one join
+        fund_rows = db.session.query(MemberSaving, SavingType).join(
+            SavingType, SavingType.id == MemberSaving.saving_type_id
+        ).filter(MemberSaving.member_id == member_id).all()
+
         savings_by_fund_dict = {}
-        for ms in member_savings:
-            saving_type = SavingType.query.filter_by(id=ms.saving_type_id).first()
-            if saving_type:
-                balance = float(ms.total_deposits or 0) - float(ms.total_withdrawals or 0)
-                savings_by_fund_dict[saving_type.name] = {
-                    'name': saving_type.name,
-                    'description': saving_type.description,
-                    'total_deposits': float(ms.total_deposits or 0),
-                    'total_withdrawals': float(ms.total_withdrawals or 0),
-                    'balance': balance
-                }
+        for ms, saving_type in fund_rows:
+            balance = float(ms.total_deposits or 0) - float(ms.total_withdrawals or 0)
+            savings_by_fund_dict[saving_type.name] = {
+                'name': saving_type.name,
+                'description': saving_type.description,
+                'total_deposits': float(ms.total_deposits or 0),
+                'total_withdrawals': float(ms.total_withdrawals or 0),
+                'balance': balance
+            }
 
         funds = list(savings_by_fund_dict.values())
         total_savings = sum([f['balance'] for f in funds])
-        
-        # 2. LOAN STATUS - Get loan eligibility and current loans
-        loan_assessment = LoanAssessment.query.filter_by(
-            member_id=member_id
-        ).order_by(LoanAssessment.assessment_date.desc()).first()
 
-        # Query loans using raw SQL to avoid ORM mismatch
-        active_loans_query = db.session.execute(
-            db.text("""
-                SELECT principal, outstanding_balance
-                FROM group_loans
-                WHERE member_id = :member_id
-                AND status IN ('PENDING', 'APPROVED', 'DISBURSED', 'REPAYING')
-            """),
-            {'member_id': member_id}
-        )
-        active_loans = active_loans_query.fetchall()
+        # 2-4. LOANS, ASSESSMENT, ATTENDANCE AND FINES in a single round trip
+        stats = db.session.execute(MEMBER_DASHBOARD_STATS_SQL, {'member_id': member_id}).first()
 
-        total_loan_amount = sum([float(loan[0] or 0) for loan in active_loans])
-        total_outstanding = sum([float(loan[1] or 0) for loan in active_loans])
-        
         loan_status = {
-            'is_eligible': loan_assessment.is_eligible if loan_assessment else False,
-            'max_loan_amount': float(loan_assessment.max_loan_amount or 0) if loan_assessment else 0,
-            'overall_score': float(loan_assessment.overall_score or 0) if loan_assessment else 0,
-            'risk_level': loan_assessment.risk_level if loan_assessment else 'UNKNOWN',
-            'active_loans_count': len(active_loans),
-            'total_loan_amount': total_loan_amount,
-            'total_outstanding': total_outstanding
+            'is_eligible': bool(stats.is_eligible) if stats.is_eligible is not None else False,
+            'max_loan_amount': float(stats.max_loan_amount or 0),
+            'overall_score': float(stats.overall_score or 0),
+            'risk_level': stats.risk_level or 'UNKNOWN',
+            'active_loans_count': int(stats.active_loans_count or 0),
+            'total_loan_amount': float(stats.total_loan_amount or 0),
+            'total_outstanding': float(stats.total_outstanding or 0)
         }
-        
-        # 3. ATTENDANCE & PERFORMANCE
-        total_meetings = db.session.query(func.count(MeetingAttendance.id)).filter(
-            MeetingAttendance.member_id == member_id
-        ).scalar() or 0
-        
-        attended_meetings = db.session.query(func.count(MeetingAttendance.id)).filter(
-            MeetingAttendance.member_id == member_id,
-            MeetingAttendance.is_present == True
-        ).scalar() or 0
-        
+
+        total_meetings = int(stats.total_meetings or 0)
+        attended_meetings = int(stats.attended_meetings or 0)
         attendance_rate = (attended_meetings / total_meetings * 100) if total_meetings > 0 else 0
-        
-        # 4. FINES
-        total_fines = db.session.query(
-            func.coalesce(func.sum(MemberFine.amount), 0)
-        ).filter(
-            MemberFine.member_id == member_id
-        ).scalar() or 0
-        
-        paid_fines = db.session.query(
-            func.coalesce(func.sum(MemberFine.paid_amount), 0)
-        ).filter(
-            MemberFine.member_id == member_id,
-            MemberFine.is_paid == True
-        ).scalar() or 0
-        
-        outstanding_fines = float(total_fines) - float(paid_fines)
-        
-        # 5. GROUP AVERAGES FOR COMPARISON
-        group_avg_savings = db.session.query(
-            func.avg(GroupMember.total_contributions)
-        ).filter(
-            GroupMember.group_id == member.group_id,
-            GroupMember.is_active == True
-        ).scalar() or 0
-        
-        group_avg_attendance = db.session.query(
-            func.avg(GroupMember.attendance_percentage)
-        ).filter(
-            GroupMember.group_id == member.group_id,
-            GroupMember.is_active == True
-        ).scalar() or 0
-        
+
+        total_fines = float(stats.total_fines or 0)
+        paid_fines = float(stats.paid_fines or 0)
+        outstanding_fines = total_fines - paid_fines
+
+        # 5. GROUP AVERAGES FOR COMPARISON - shared by every member, cached per group across workers
+        group_averages = get_or_compute(
+            member.group_id, 'dashboard_averages',
+            lambda: _load_group_averages(member.group_id)
+        )
+        group_avg_savings = group_averages['avg_savings']
+        group_avg_attendance = group_averages['avg_attendance']
+
         # 6. IGA PARTICIPATION (placeholder for Phase 1.5)
         iga_participation = {
             'active_campaigns': 0,
@@ -240,8 +251,8 @@ def get_member_dashboard(user_id, member_id):
                 'group_avg_attendance': float(group_avg_attendance or 0)
             },
             'fines': {
-                'total': float(total_fines),
-                'paid': float(paid_fines),
+                'total': total_fines,
+                'paid': paid_fines,
                 'outstanding': outstanding_fines
             },
             'iga': iga_participation
@@ -1,7 +1,7 @@
 """Database models for the microfinance application."""
 import datetime
 import jwt
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, Date, Time, Numeric, Text, ForeignKey, Enum
+from sqlalchemy import Column, Integer, BigInteger, String, Boolean, DateTime, Date, Time, Numeric, Text, ForeignKey, Enum, UniqueConstraint, Index
 from sqlalchemy.orm import relationship
 from project import db, bcrypt
 from flask import current_app
@@ -125,6 +125,11 @@ class GroupMember(db.Model):
     """Group member model."""
     
     __tablename__ = 'group_members'
+    __table_args__ = (
+        # Member lists are sorted by these within a group (member_profile.get_group_members_enhanced)
+        Index('ix_group_members_group_contributions', 'group_id', 'total_contributions'),
+        Index('ix_group_members_group_attendance', 'group_id', 'attendance_percentage'),
+    )
     
     id = Column(Integer, primary_key=True, autoincrement=True)
     group_id = Column(Integer, ForeignKey('savings_groups.id'), nullable=False)
@@ -145,6 +150,8 @@ class GroupMember(db.Model):
     total_contributions = Column(Numeric(15, 2), default=0)
     target_amount = Column(Numeric(12, 2), default=0.00)
     attendance_percentage = Column(Numeric(5, 2), default=0)
+    meetings_attended = Column(Integer, default=0)  # Running counts behind attendance_percentage
+    meetings_total = Column(Integer, default=0)
     is_eligible_for_loans = Column(Boolean, default=False)
     created_date = Column(DateTime, default=datetime.datetime.utcnow)
     updated_date = Column(DateTime, default=datetime.datetime.utcnow, onupdate=datetime.datetime.utcnow)
@@ -227,7 +234,7 @@ class SavingTransaction(db.Model):
     __tablename__ = 'saving_transactions'
 
     id = Column(Integer, primary_key=True, autoincrement=True)
-    member_saving_id = Column(Integer, ForeignKey('member_savings.id', ondelete='CASCADE'), nullable=False)
+    member_saving_id = Column(Integer, ForeignKey('member_savings.id', ondelete='CASCADE'), nullable=False, index=True)
     amount = Column(Numeric(12, 2), nullable=False)
     transaction_type = Column(String(50), nullable=False)  # 'DEPOSIT' or 'WITHDRAWAL'
     transaction_date = Column(Date, default=datetime.date.today)
@@ -239,7 +246,7 @@ class SavingTransaction(db.Model):
     verification_status = Column(String(50), default='PENDING')
     verified_by = Column(Integer, ForeignKey('users.id'))
     verified_date = Column(DateTime)
-    meeting_id = Column(Integer, ForeignKey('meetings.id'))
+    meeting_id = Column(Integer, ForeignKey('meetings.id'), index=True)
     activity_id = Column(Integer)
     notes = Column(Text)
     created_date = Column(DateTime, default=datetime.datetime.utcnow, nullable=False)
@@ -254,10 +261,13 @@ class Meeting(db.Model):
     """Meeting model."""
 
     __tablename__ = 'meetings'
+    __table_args__ = (
+        UniqueConstraint('group_id', 'meeting_number', name='uq_meetings_group_number'),
+    )
 
     id = Column(Integer, primary_key=True, autoincrement=True)
     group_id = Column(Integer, ForeignKey('savings_groups.id'), nullable=False)
-    meeting_number = Column(Integer, nullable=False)
+    meeting_number = Column(Integer, nullable=False)  # Allocated via project.api.sequences
     meeting_date = Column(Date, nullable=False)
     meeting_time = Column(Time)
     meeting_type = Column(String(50), default='REGULAR')
@@ -291,6 +301,16 @@ class Meeting(db.Model):
     attendance_records = relationship('MeetingAttendance', back_populates='meeting', lazy='dynamic')
 
 
+class GroupSequence(db.Model):
+    """Per-group counter (e.g. meeting numbers), allocated atomically."""
+
+    __tablename__ = 'group_sequences'
+
+    group_id = Column(Integer, ForeignKey('savings_groups.id', ondelete='CASCADE'), primary_key=True)
+    name = Column(String(50), primary_key=True)
+    last_value = Column(Integer, nullable=False, default=0)
+
+
 class MeetingAttendance(db.Model):
     """Meeting attendance model."""
 
@@ -308,7 +328,7 @@ class MeetingAttendance(db.Model):
     contributed_to_savings = Column(Boolean, default=False)
     voted_on_decisions = Column(Boolean, default=False)
     participation_score = Column(Numeric(3, 1), default=0.0)
-    meeting_id = Column(Integer, ForeignKey('meetings.id'))
+    meeting_id = Column(Integer, ForeignKey('meetings.id'), index=True)
     created_date = Column(DateTime, default=datetime.datetime.utcnow, nullable=False)
 
     # Relationships
@@ -336,7 +356,7 @@ class MemberFine(db.Model):
     verification_status = Column(String(50), default='PENDING')
     verified_by = Column(Integer, ForeignKey('users.id'))
     verified_date = Column(DateTime)
-    meeting_id = Column(Integer)
+    meeting_id = Column(Integer, index=True)
     imposed_by = Column(Integer, ForeignKey('users.id'))
     notes = Column(Text)
     created_date = Column(DateTime, default=datetime.datetime.utcnow, nullable=False)
@@ -354,7 +374,9 @@ class GroupLoan(db.Model):
     group_id = Column(Integer, ForeignKey('savings_groups.id'), nullable=False)
     member_id = Column(Integer, ForeignKey('group_members.id'), nullable=False)
     principal = Column(Numeric(15, 2), nullable=False)
-    interest_rate = Column(Numeric(5, 4), nullable=False)
+    interest_rate = Column(Numeric(5, 4), nullable=False)  # Per month or per term, see interest_basis
+    interest_method = Column(String(20), default='FLAT')  # FLAT, DECLINING
+    interest_basis = Column(String(20), default='MONTHLY')  # MONTHLY, TERM (rate covers the whole term)
     term_months = Column(Integer, nullable=False)
     monthly_payment = Column(Numeric(12, 2), nullable=False)
     status = Column(String(50), default='PENDING')
@@ -375,6 +397,44 @@ class GroupLoan(db.Model):
 
     # Relationships
     member = relationship('GroupMember', back_populates='loans')
+    installments = relationship('LoanInstallment', back_populates='loan', order_by='LoanInstallment.installment_number',
+                                cascade='all, delete-orphan', passive_deletes=True)
+
+
+class LoanInstallment(db.Model):
+    """
+    Precomputed loan amortization schedule (see loan_schedule.py).
+
+    One row per installment, generated when a loan is approved or disbursed.
+    amount_paid is re-derived from the loan's repayments, applied to
+    installments in order (interest before principal within each).
+    """
+
+    __tablename__ = 'loan_installments'
+    __table_args__ = (
+        UniqueConstraint('loan_id', 'installment_number', name='uq_loan_installments_loan_number'),
+        Index('ix_loan_installments_group_due', 'group_id', 'status', 'due_date'),
+    )
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    loan_id = Column(Integer, ForeignKey('group_loans.id', ondelete='CASCADE'), nullable=False)
+    group_id = Column(Integer, ForeignKey('savings_groups.id'), nullable=False)
+    member_id = Column(Integer, ForeignKey('group_members.id'), nullable=False)
+    installment_number = Column(Integer, nullable=False)
+    due_date = Column(Date, nullable=False)
+    principal_due = Column(Numeric(15, 2), nullable=False)
+    interest_due = Column(Numeric(15, 2), nullable=False)
+    amount_due = Column(Numeric(15, 2), nullable=False)
+    balance_after = Column(Numeric(15, 2), nullable=False)  # Principal outstanding after this installment
+    amount_paid = Column(Numeric(15, 2), default=0.00, nullable=False)
+    status = Column(String(20), default='PENDING', nullable=False)  # PENDING, PARTIAL, PAID
+    created_date = Column(DateTime, default=datetime.datetime.utcnow, nullable=False)
+
+    # Relationships
+    loan = relationship('GroupLoan', back_populates='installments')
+
+    def __repr__(self):
+        return f'<LoanInstallment loan={self.loan_id} #{self.installment_number} {self.due_date}>'
 
 
 class LoanAssessment(db.Model):
@@ -696,7 +756,7 @@ class TrainingRecord(db.Model):
     __tablename__ = 'training_records'
 
     id = Column(Integer, primary_key=True, autoincrement=True)
-    meeting_id = Column(Integer, ForeignKey('meetings.id'), nullable=False)
+    meeting_id = Column(Integer, ForeignKey('meetings.id'), nullable=False, index=True)
     training_topic = Column(String(255), nullable=False)
     training_description = Column(Text)
     trainer_name = Column(String(255))
@@ -718,7 +778,7 @@ class TrainingAttendance(db.Model):
     __tablename__ = 'training_attendance'
 
     id = Column(Integer, primary_key=True, autoincrement=True)
-    training_id = Column(Integer, ForeignKey('training_records.id'), nullable=False)
+    training_id = Column(Integer, ForeignKey('training_records.id'), nullable=False, index=True)
     member_id = Column(Integer, ForeignKey('group_members.id'), nullable=False)
     attended = Column(Boolean, default=False)
     notes = Column(Text)
@@ -735,7 +795,7 @@ class VotingRecord(db.Model):
     __tablename__ = 'voting_records'
 
     id = Column(Integer, primary_key=True, autoincrement=True)
-    meeting_id = Column(Integer, ForeignKey('meetings.id'), nullable=False)
+    meeting_id = Column(Integer, ForeignKey('meetings.id'), nullable=False, index=True)
     vote_topic = Column(String(255), nullable=False)
     vote_description = Column(Text)
     vote_type = Column(String(50), default='SIMPLE_MAJORITY')  # SIMPLE_MAJORITY, TWO_THIRDS, UNANIMOUS
@@ -760,7 +820,7 @@ class MemberVote(db.Model):
     __tablename__ = 'member_votes'
 
     id = Column(Integer, primary_key=True, autoincrement=True)
-    voting_record_id = Column(Integer, ForeignKey('voting_records.id'), nullable=False)
+    voting_record_id = Column(Integer, ForeignKey('voting_records.id'), nullable=False, index=True)
     member_id = Column(Integer, ForeignKey('group_members.id'), nullable=False)
     vote_cast = Column(String(20), nullable=False)  # YES, NO, ABSTAIN, ABSENT
     notes = Column(Text)
@@ -778,7 +838,7 @@ class LoanRepayment(db.Model):
 
     id = Column(Integer, primary_key=True, autoincrement=True)
     loan_id = Column(Integer, ForeignKey('group_loans.id'), nullable=False)
-    meeting_id = Column(Integer, ForeignKey('meetings.id'))
+    meeting_id = Column(Integer, ForeignKey('meetings.id'), index=True)
     member_id = Column(Integer, ForeignKey('group_members.id'), nullable=False)
     repayment_amount = Column(Numeric(12, 2), nullable=False)
     principal_amount = Column(Numeric(12, 2), nullable=False)
@@ -855,7 +915,7 @@ class MeetingActivity(db.Model):
     __tablename__ = 'meeting_activities'
 
     id = Column(Integer, primary_key=True, autoincrement=True)
-    meeting_id = Column(Integer, ForeignKey('meetings.id', ondelete='CASCADE'), nullable=False)
+    meeting_id = Column(Integer, ForeignKey('meetings.id', ondelete='CASCADE'), nullable=False, index=True)
     activity_type = Column(String(50), nullable=False)  # SAVINGS, FINE, LOAN_REPAYMENT, TRAINING, VOTING, etc.
     activity_name = Column(String(255), nullable=False)
     description = Column(Text)
@@ -883,7 +943,7 @@ class ActivityDocument(db.Model):
     __tablename__ = 'activity_documents'
 
     id = Column(Integer, primary_key=True, autoincrement=True)
-    activity_id = Column(Integer, ForeignKey('meeting_activities.id', ondelete='CASCADE'), nullable=False)
+    activity_id = Column(Integer, ForeignKey('meeting_activities.id', ondelete='CASCADE'), nullable=False, index=True)
     document_name = Column(String(255), nullable=False)
     document_type = Column(String(50), nullable=False)  # RECEIPT, INVOICE, PHOTO, REPORT, OTHER
     file_path = Column(String(500), nullable=False)
@@ -940,7 +1000,7 @@ class MemberActivityParticipation(db.Model):
     __tablename__ = 'member_activity_participation'
 
     id = Column(Integer, primary_key=True, autoincrement=True)
-    activity_id = Column(Integer, ForeignKey('meeting_activities.id', ondelete='CASCADE'), nullable=False)
+    activity_id = Column(Integer, ForeignKey('meeting_activities.id', ondelete='CASCADE'), nullable=False, index=True)
     member_id = Column(Integer, ForeignKey('group_members.id'), nullable=False)
     is_present = Column(Boolean, default=False)
     participation_type = Column(String(50))
@@ -1116,6 +1176,31 @@ class TransactionDocument(db.Model):
             is_deleted=False
         ).order_by(TransactionDocument.upload_date.desc()).all()
 
+    @staticmethod
+    def get_for_entities(entity_type, entity_ids):
+        """
+        Get non-deleted documents for many entities of one type in one query.
+
+        Args:
+            entity_type (str): Type of entity ('training', 'voting', etc.)
+            entity_ids (list): IDs of the entities
+
+        Returns:
+            dict: entity_id -> list of TransactionDocument objects (newest first);
+                  entities without documents are absent
+        """
+        documents = {}
+        entity_ids = list(entity_ids)
+        if not entity_ids:
+            return documents
+        for document in TransactionDocument.query.filter(
+            TransactionDocument.entity_type == entity_type,
+            TransactionDocument.entity_id.in_(entity_ids),
+            TransactionDocument.is_deleted == False
+        ).order_by(TransactionDocument.upload_date.desc()):
+            documents.setdefault(document.entity_id, []).append(document)
+        return documents
+
     @staticmethod
     def get_entity_types():
         """
@@ -1180,3 +1265,176 @@ class TransactionDocument(db.Model):
     def __repr__(self):
         return f'<TransactionDocument {self.id}: {self.document_name} for {self.entity_type}#{self.entity_id}>'
 
+
+class StorageUsage(db.Model):
+    """
+    Storage usage ledger, updated on every upload/delete (see storage_ledger.py).
+
+    One row per (scope, entity_type, entity_id, file_category):
+    - ENTITY: files of one entity directory (e.g. activity 12)
+    - GROUP:  rollup of all entities of one group (entity_id = group id)
+    - GLOBAL: rollup across all groups (entity_id = 0)
+    """
+
+    __tablename__ = 'storage_usage'
+    __table_args__ = (
+        UniqueConstraint('scope', 'entity_type', 'entity_id', 'file_category', name='uq_storage_usage_key'),
+    )
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    scope = Column(String(20), nullable=False)  # ENTITY, GROUP, GLOBAL
+    entity_type = Column(String(50), nullable=False)
+    entity_id = Column(Integer, nullable=False)
+    file_category = Column(String(50), nullable=False)
+    group_id = Column(Integer, index=True)
+    file_count = Column(Integer, default=0, nullable=False)
+    total_size = Column(BigInteger, default=0, nullable=False)
+    updated_date = Column(DateTime, default=datetime.datetime.utcnow, onupdate=datetime.datetime.utcnow, nullable=False)
+
+    def __repr__(self):
+        return f'<StorageUsage {self.scope} {self.entity_type}#{self.entity_id} {self.file_category}>'
+
+
+class ReportSnapshot(db.Model):
+    """
+    Cached result of a portfolio report for one reporting date (see portfolio_report.py).
+
+    data holds the report as JSON; a report is computed once per date and
+    served from here afterwards unless explicitly refreshed.
+    """
+
+    __tablename__ = 'report_snapshots'
+    __table_args__ = (
+        UniqueConstraint('report_type', 'report_date', name='uq_report_snapshots_type_date'),
+    )
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    report_type = Column(String(50), nullable=False)  # PORTFOLIO_AT_RISK
+    report_date = Column(Date, nullable=False)
+    data = Column(Text, nullable=False)
+    generated_by = Column(Integer, ForeignKey('users.id'))
+    created_date = Column(DateTime, default=datetime.datetime.utcnow, nullable=False)
+
+    def __repr__(self):
+        return f'<ReportSnapshot {self.report_type} {self.report_date}>'
+
+
+
+class ShareOut(db.Model):
+    """
+    End-of-cycle distribution of a group's savings and profits (see share_out.py).
+
+    Computed as a DRAFT that officers review and can recompute; posting
+    withdraws every member's cycle savings in one transaction and makes it
+    POSTED, after which it never changes.
+    """
+
+    __tablename__ = 'share_outs'
+    __table_args__ = (
+        UniqueConstraint('group_id', 'cycle_start', name='uq_share_outs_group_cycle'),
+    )
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    group_id = Column(Integer, ForeignKey('savings_groups.id', ondelete='CASCADE'), nullable=False)
+    cycle_number = Column(Integer, nullable=False)
+    cycle_start = Column(Date, nullable=False)
+    cycle_end = Column(Date, nullable=False)  # exclusive
+    status = Column(String(20), default='DRAFT', nullable=False)  # DRAFT, POSTED
+    members_count = Column(Integer, default=0, nullable=False)
+    total_savings = Column(Numeric(15, 2), default=0, nullable=False)
+    interest_income = Column(Numeric(15, 2), default=0, nullable=False)
+    fine_income = Column(Numeric(15, 2), default=0, nullable=False)
+    profit_pool = Column(Numeric(15, 2), default=0, nullable=False)
+    total_payout = Column(Numeric(15, 2), default=0, nullable=False)
+    total_share_days = Column(Numeric(20, 2), default=0, nullable=False)
+    created_by = Column(Integer, ForeignKey('users.id'))
+    posted_by = Column(Integer, ForeignKey('users.id'))
+    posted_date = Column(DateTime)
+    created_date = Column(DateTime, default=datetime.datetime.utcnow, nullable=False)
+    updated_date = Column(DateTime, default=datetime.datetime.utcnow, onupdate=datetime.datetime.utcnow, nullable=False)
+
+    items = relationship('ShareOutItem', back_populates='share_out', lazy='dynamic', cascade='all, delete-orphan')
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'group_id': self.group_id,
+            'cycle_number': self.cycle_number,
+            'cycle_start': self.cycle_start.isoformat(),
+            'cycle_end': self.cycle_end.isoformat(),
+            'status': self.status,
+            'members_count': self.members_count,
+            'total_savings': float(self.total_savings or 0),
+            'interest_income': float(self.interest_income or 0),
+            'fine_income': float(self.fine_income or 0),
+            'profit_pool': float(self.profit_pool or 0),
+            'total_payout': float(self.total_payout or 0),
+            'total_share_days': float(self.total_share_days or 0),
+            'created_by': self.created_by,
+            'posted_by': self.posted_by,
+            'posted_date': self.posted_date.isoformat() if self.posted_date else None,
+            'created_date': self.created_date.isoformat() if self.created_date else None,
+            'updated_date': self.updated_date.isoformat() if self.updated_date else None,
+        }
+
+
+class ShareOutItem(db.Model):
+    """One member's line of a share-out."""
+
+    __tablename__ = 'share_out_items'
+    __table_args__ = (
+        UniqueConstraint('share_out_id', 'member_id', name='uq_share_out_items_member'),
+    )
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    share_out_id = Column(Integer, ForeignKey('share_outs.id', ondelete='CASCADE'), nullable=False)
+    member_id = Column(Integer, ForeignKey('group_members.id'), nullable=False)
+    opening_balance = Column(Numeric(15, 2), default=0, nullable=False)
+    deposits = Column(Numeric(15, 2), default=0, nullable=False)
+    withdrawals = Column(Numeric(15, 2), default=0, nullable=False)
+    closing_balance = Column(Numeric(15, 2), default=0, nullable=False)
+    share_days = Column(Numeric(20, 2), default=0, nullable=False)  # balance x days held during the cycle
+    share_percentage = Column(Numeric(7, 4), default=0, nullable=False)
+    profit_share = Column(Numeric(15, 2), default=0, nullable=False)
+    payout_amount = Column(Numeric(15, 2), default=0, nullable=False)
+    outstanding_loans = Column(Numeric(15, 2), default=0, nullable=False)
+
+    share_out = relationship('ShareOut', back_populates='items')
+    member = relationship('GroupMember')
+
+    def to_dict(self):
+        return {
+            'member_id': self.member_id,
+            'opening_balance': float(self.opening_balance or 0),
+            'deposits': float(self.deposits or 0),
+            'withdrawals': float(self.withdrawals or 0),
+            'closing_balance': float(self.closing_balance or 0),
+            'share_days': float(self.share_days or 0),
+            'share_percentage': float(self.share_percentage or 0),
+            'profit_share': float(self.profit_share or 0),
+            'payout_amount': float(self.payout_amount or 0),
+            'outstanding_loans': float(self.outstanding_loans or 0),
+        }
+
+# Columns of archived rows that history queries filter and join on
+ARCHIVE_INDEXED_COLUMNS = ('member_saving_id', 'meeting_id', 'member_id', 'group_id', 'loan_id')
+
+
+def _archive_table(model):
+    """
+    Cold-storage twin of a transaction table, holding rows of closed saving
+    cycles (see archival.py): the same columns, without foreign keys.
+    """
+    columns = [
+        Column(column.name, column.type, primary_key=column.primary_key, autoincrement=False,
+               index=column.name in ARCHIVE_INDEXED_COLUMNS or None)
+        for column in model.__table__.columns
+    ]
+    return db.Table(f'{model.__tablename__}_archive', db.metadata, *columns)
+
+
+# Archive tables, keyed by the hot table whose closed cycles they hold
+ARCHIVE_TABLES = {
+    model.__tablename__: _archive_table(model)
+    for model in (SavingTransaction, MeetingAttendance, MemberFine, LoanRepayment)
+}
@@ -0,0 +1,184 @@
+"""
+Portfolio Report
+Portfolio-at-risk (PAR30/60/90) and arrears aging across all groups.
+
+Outstanding balances of active loans are bucketed by days_overdue in one
+grouped query per group (days_overdue is maintained by the nightly
+update_loan_delinquency job); the group rows are then rolled up the
+location hierarchy (parish -> district -> region -> portfolio) in Python,
+which is exact because every figure is a sum. Each report is stored in
+report_snapshots under its reporting date and served from there.
+"""
+import json
+import datetime
+from decimal import Decimal
+from typing import Dict, List, Optional
+from project import db
+from project.api.models import ReportSnapshot
+from project.api.loan_delinquency import ACTIVE_LOAN_STATUSES
+
+
+REPORT_TYPE_PAR = 'PORTFOLIO_AT_RISK'
+
+# (key, lower bound exclusive, upper bound inclusive) in days overdue
+AGING_BUCKETS = [
+    ('current', None, 0),
+    ('days_1_30', 0, 30),
+    ('days_31_60', 30, 60),
+    ('days_61_90', 60, 90),
+    ('days_over_90', 90, None),
+]
+
+PAR_THRESHOLDS = (30, 60, 90)
+
+# Location levels, innermost first; a level's key includes all outer levels
+LOCATION_LEVELS = ['parish', 'district', 'region']
+UNKNOWN_LOCATION = 'Unknown'
+
+
+def _bucket_condition(lower, upper) -> str:
+    clauses = []
+    if lower is not None:
+        clauses.append(f'COALESCE(gl.days_overdue, 0) > {lower}')
+    if upper is not None:
+        clauses.append(f'COALESCE(gl.days_overdue, 0) <= {upper}')
+    return ' AND '.join(clauses)
+
+
+_BUCKET_COLUMNS = ',\n'.join(
+    f"SUM(CASE WHEN {_bucket_condition(lower, upper)} THEN gl.outstanding_balance ELSE 0 END) AS {key}_balance,\n"
+    f"COUNT(CASE WHEN {_bucket_condition(lower, upper)} THEN 1 END) AS {key}_loans"
+    for key, lower, upper in AGING_BUCKETS
+)
+
+_PAR_COLUMNS = ',\n'.join(
+    f"SUM(CASE WHEN COALESCE(gl.days_overdue, 0) > {days} THEN gl.outstanding_balance ELSE 0 END) AS par{days}_balance,\n"
+    f"COUNT(CASE WHEN COALESCE(gl.days_overdue, 0) > {days} THEN 1 END) AS par{days}_loans"
+    for days in PAR_THRESHOLDS
+)
+
+PAR_BY_GROUP_SQL = db.text(f"""
+    SELECT sg.id AS group_id, sg.name AS group_name,
+           sg.region, sg.district, sg.parish,
+           COUNT(gl.id) AS active_loans,
+           COALESCE(SUM(gl.outstanding_balance), 0) AS outstanding_balance,
+           {_BUCKET_COLUMNS},
+           {_PAR_COLUMNS}
+    FROM group_loans gl
+    JOIN savings_groups sg ON sg.id = gl.group_id
+    WHERE gl.status IN :statuses AND gl.outstanding_balance > 0
+    GROUP BY sg.id, sg.name, sg.region, sg.district, sg.parish
+    ORDER BY sg.region, sg.district, sg.parish, sg.name
+""").bindparams(db.bindparam('statuses', expanding=True))
+
+_SUM_FIELDS = (
+    ['active_loans', 'outstanding_balance']
+    + [f'{key}_{kind}' for key, _, _ in AGING_BUCKETS for kind in ('balance', 'loans')]
+    + [f'par{days}_{kind}' for days in PAR_THRESHOLDS for kind in ('balance', 'loans')]
+)
+
+
+def _empty_totals() -> Dict:
+    return {field: Decimal('0') if field.endswith('balance') else 0 for field in _SUM_FIELDS}
+
+
+def _add(totals: Dict, row: Dict):
+    for field in _SUM_FIELDS:
+        totals[field] += row[field]
+
+
+def _finish(entry: Dict) -> Dict:
+    """Convert sums to JSON-friendly numbers and add PAR ratios."""
+    outstanding = entry['outstanding_balance']
+    result = {k: v for k, v in entry.items() if k not in _SUM_FIELDS}
+    result['active_loans'] = entry['active_loans']
+    result['outstanding_balance'] = float(outstanding)
+    result['aging'] = {
+        key: {'balance': float(entry[f'{key}_balance']), 'loans': entry[f'{key}_loans']}
+        for key, _, _ in AGING_BUCKETS
+    }
+    for days in PAR_THRESHOLDS:
+        balance = entry[f'par{days}_balance']
+        result[f'par{days}'] = {
+            'balance': float(balance),
+            'loans': entry[f'par{days}_loans'],
+            'ratio': round(float(balance / outstanding * 100), 2) if outstanding else 0.0
+        }
+    return result
+
+
+def compute_portfolio_at_risk(report_date: datetime.date) -> Dict:
+    """
+    Compute the PAR/aging report from current loan arrears.
+
+    Returns:
+        Dictionary with report_date, portfolio totals and per-level rows
+        (groups, parishes, districts, regions)
+    """
+    rows = db.session.execute(PAR_BY_GROUP_SQL, {'statuses': list(ACTIVE_LOAN_STATUSES)}).mappings().all()
+
+    groups = []
+    rollups = {level: {} for level in LOCATION_LEVELS}
+    portfolio = _empty_totals()
+
+    for row in rows:
+        values = {field: Decimal(str(row[field] or 0)) if field.endswith('balance') else int(row[field] or 0)
+                  for field in _SUM_FIELDS}
+        location = {level: row[level] or UNKNOWN_LOCATION for level in LOCATION_LEVELS}
+
+        groups.append({'group_id': row['group_id'], 'group_name': row['group_name'], **location, **values})
+        _add(portfolio, values)
+
+        for i, level in enumerate(LOCATION_LEVELS):
+            outer = {name: location[name] for name in LOCATION_LEVELS[i:]}
+            key = tuple(outer.values())
+            if key not in rollups[level]:
+                rollups[level][key] = {**outer, 'groups': 0, **_empty_totals()}
+            rollups[level][key]['groups'] += 1
+            _add(rollups[level][key], values)
+
+    return {
+        'report_type': REPORT_TYPE_PAR,
+        'report_date': report_date.isoformat(),
+        'generated_at': datetime.datetime.utcnow().isoformat(),
+        'portfolio': _finish({'groups': len(groups), **portfolio}),
+        'regions': [_finish(e) for e in rollups['region'].values()],
+        'districts': [_finish(e) for e in rollups['district'].values()],
+        'parishes': [_finish(e) for e in rollups['parish'].values()],
+        'groups': [_finish(e) for e in groups],
+    }
+
+
+def get_portfolio_at_risk(report_date: datetime.date = None, refresh: bool = False,
+                          user_id: Optional[int] = None) -> Optional[Dict]:
+    """
+    Return the PAR report for a reporting date, from its snapshot if one exists.
+
+    Reports are computed from current arrears, so a missing snapshot can
+    only be generated for today; past dates without a snapshot return None.
+    """
+    today = datetime.date.today()
+    report_date = report_date or today
+
+    snapshot = ReportSnapshot.query.filter_by(report_type=REPORT_TYPE_PAR, report_date=report_date).first()
+    if snapshot and not refresh:
+        return json.loads(snapshot.data)
+    if report_date != today:
+        return json.loads(snapshot.data) if snapshot else None
+
+    report = compute_portfolio_at_risk(report_date)
+    if snapshot is None:
+        snapshot = ReportSnapshot(report_type=REPORT_TYPE_PAR, report_date=report_date)
+        db.session.add(snapshot)
+    snapshot.data = json.dumps(report)
+    snapshot.generated_by = user_id
+    snapshot.created_date = datetime.datetime.utcnow()
+    db.session.commit()
+    return report
+
+
+def list_report_dates(report_type: str = REPORT_TYPE_PAR) -> List[str]:
+    """Reporting dates with a stored snapshot, newest first."""
+    dates = db.session.query(ReportSnapshot.report_date).filter_by(report_type=report_type) \
+        .order_by(ReportSnapshot.report_date.desc()).all()
+    return [d.isoformat() for (d,) in dates]
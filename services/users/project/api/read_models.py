@@ -0,0 +1,40 @@
+"""
+Read Models
+Lightweight projections for list endpoints. A ReadModel names the handful
+of columns a list needs; rows come from one column-only SELECT into
+__slots__ objects, without ORM identity-map hydration of the wide models
+(SavingsGroup, GroupDocument) they are read from.
+
+    class GroupListItem(ReadModel):
+        columns = (SavingsGroup.id, SavingsGroup.name)
+        __slots__ = ReadModel.slots(columns)
+
+    GroupListItem.fetch(GroupListItem.select().where(...))
+"""
+from typing import Dict, Iterable, List, Optional, Tuple
+from sqlalchemy import select
+from project import db
+
+
+class ReadModel:
+    """Base for __slots__ row objects built from a column-only select."""
+
+    __slots__ = ()
+    columns: Tuple = ()
+
+    @staticmethod
+    def slots(columns: Iterable) -> Tuple[str, ...]:
+        """Attribute names for the columns (their keys or labels)."""
+        return tuple(column.key for column in columns)
+
+    def __init__(self, *values):
+        for name, value in zip(self.__slots__, values):
+            setattr(self, name, value)
+
+    @classmethod
+    def select(cls):
+        return select(*cls.columns)
+
+    @classmethod
+    def fetch(cls, statement, params: Optional[Dict] = None) -> List['ReadModel']:
+        return [cls(*row) for row in db.session.execute(statement, params or {})]
@@ -0,0 +1,242 @@
+"""
+Read Routing
+Sends read-only work to read replicas so month-end dashboards and reports
+scale out instead of loading the primary.
+
+Replicas are extra binds named replica_<n> (DATABASE_REPLICA_URLS, see
+config.py). A GET/HEAD request, or a block run under read_from_replica()
+such as a report CLI, picks one replica for its whole session; every plain
+SELECT then goes there. The first write, flush or locking read pins the
+rest of the session to the primary, so a handler that writes reads its own
+changes back.
+
+Replicas are only used while their replication lag is under
+REPLICA_MAX_LAG_SECONDS (checked at most every REPLICA_LAG_CHECK_SECONDS
+per worker); lagging or unreachable replicas fall back to the primary.
+After a user's own write, their reads stay on the primary for
+READ_YOUR_WRITES_SECONDS, so they see what they just saved. That window is
+per worker; a worker that did not handle the write still serves reads at
+most REPLICA_MAX_LAG_SECONDS old.
+
+GET/HEAD requests also run on the read path, with or without replicas:
+READ ONLY transactions (PostgreSQL), no autoflush and no expiry of loaded
+objects on commit. GET views that do write are marked @allows_writes and
+run on the primary in a normal session.
+"""
+import random
+import re
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Tuple
+import jwt
+from flask import current_app, g, request
+from flask_sqlalchemy.session import Session
+from sqlalchemy import event, text
+from sqlalchemy.sql.elements import TextClause
+from sqlalchemy.sql.selectable import TextualSelect
+
+
+READ_METHODS = ('GET', 'HEAD')
+REPLICA_BIND_PREFIX = 'replica_'
+
+_READ_SQL = re.compile(r'^\s*(SELECT|WITH)\b', re.IGNORECASE)
+_WRITE_SQL = re.compile(r'\b(INSERT|UPDATE|DELETE|MERGE|LOCK|NEXTVAL|SETVAL)\b', re.IGNORECASE)
+
+# Seconds the replica is behind; 0 on a primary or a caught-up standby
+POSTGRES_LAG_SQL = text("""
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+    END
+""")
+
+
+def _is_read(clause) -> bool:
+    """Whether a statement only reads and may run on a replica."""
+    if clause is None:
+        return False
+    if isinstance(clause, TextualSelect):  # text(...).columns(...), e.g. UPDATE ... RETURNING
+        clause = clause.element
+    if isinstance(clause, TextClause):
+        return bool(_READ_SQL.match(clause.text)) and not _WRITE_SQL.search(clause.text)
+    return bool(getattr(clause, 'is_select', False)) and getattr(clause, '_for_update_arg', None) is None
+
+
+class RoutingSession(Session):
+    """
+    Session that runs reads on the replica in session.info['replica'], if
+    any, and everything else on the primary.
+    """
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None:
+            reading = not self._flushing and _is_read(clause)
+            if reading and self.info.get('replica'):
+                return self._db.engines[self.info['replica']]
+            if not reading:
+                # The rest of the session reads its own changes back from the primary
+                self.info['replica'] = None
+                if self._flushing or clause is not None:
+                    self.info['wrote'] = True
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+class ReplicaMonitor:
+    """Per-worker cache of each replica's replication lag."""
+
+    def __init__(self):
+        self._lags: Dict[str, Tuple[float, Optional[float]]] = {}
+        self._lock = threading.Lock()
+
+    def lag(self, engine, bind_key: str, check_interval: float) -> Optional[float]:
+        """Replication lag in seconds, or None if the replica is unreachable."""
+        checked = self._lags.get(bind_key)
+        if checked and checked[0] > time.monotonic():
+            return checked[1]
+        with self._lock:
+            checked = self._lags.get(bind_key)
+            if checked and checked[0] > time.monotonic():
+                return checked[1]
+            try:
+                with engine.connect() as connection:
+                    if engine.dialect.name == 'postgresql':
+                        lag = float(connection.execute(POSTGRES_LAG_SQL).scalar() or 0)
+                    else:
+                        connection.execute(text('SELECT 1'))
+                        lag = 0.0
+            except Exception as e:
+                current_app.logger.warning(f'Read replica {bind_key} unavailable: {e}')
+                lag = None
+            self._lags[bind_key] = (time.monotonic() + check_interval, lag)
+            return lag
+
+    def clear(self):
+        with self._lock:
+            self._lags.clear()
+
+
+class RecentWriters:
+    """Users who wrote recently, whose reads must see the primary."""
+
+    def __init__(self):
+        self._until: Dict[int, float] = {}
+        self._lock = threading.Lock()
+
+    def mark(self, user_id: int, seconds: float):
+        now = time.monotonic()
+        with self._lock:
+            if len(self._until) > 10000:
+                self._until = {u: t for u, t in self._until.items() if t > now}
+            self._until[user_id] = now + seconds
+
+    def is_recent(self, user_id: int) -> bool:
+        return self._until.get(user_id, 0) > time.monotonic()
+
+
+replica_monitor = ReplicaMonitor()
+recent_writers = RecentWriters()
+
+
+def _db():
+    return current_app.extensions['sqlalchemy']
+
+
+def replica_keys() -> List[str]:
+    binds = current_app.config.get('SQLALCHEMY_BINDS') or {}
+    return sorted(key for key in binds if key and key.startswith(REPLICA_BIND_PREFIX))
+
+
+def choose_replica(user_id: Optional[int] = None) -> Optional[str]:
+    """
+    A replica bind to read from, or None to read from the primary (no
+    replica configured or within lag, or the user wrote recently).
+    """
+    keys = replica_keys()
+    if not keys or (user_id is not None and recent_writers.is_recent(user_id)):
+        return None
+    config = current_app.config
+    max_lag = config.get('REPLICA_MAX_LAG_SECONDS', 5)
+    interval = config.get('REPLICA_LAG_CHECK_SECONDS', 5)
+    engines = _db().engines
+    usable = []
+    for key in keys:
+        lag = replica_monitor.lag(engines[key], key, interval)
+        if lag is not None and lag <= max_lag:
+            usable.append(key)
+    return random.choice(usable) if usable else None
+
+
+@contextmanager
+def read_from_replica():
+    """Run the block's reads on a replica when one is usable (for report jobs)."""
+    session = _db().session
+    session.info['replica'] = choose_replica()
+    try:
+        yield session.info['replica']
+    finally:
+        session.info['replica'] = None
+
+
+def _token_user_id() -> Optional[int]:
+    """The authenticated user of the request, read from its bearer token."""
+    if 'token_user_id' not in g:
+        g.token_user_id = None
+        auth_header = request.headers.get('Authorization', '')
+        if auth_header.startswith('Bearer '):
+            try:
+                payload = jwt.decode(auth_header.split(' ')[1], current_app.config.get('SECRET_KEY'),
+                                     algorithms=['HS256'])
+                g.token_user_id = payload.get('sub')
+            except jwt.InvalidTokenError:
+                pass
+    return g.token_user_id
+
+
+def allows_writes(view):
+    """
+    Mark a GET view that writes (download counters, reports generated on
+    first read): it runs on the primary in a normal read/write session.
+    """
+    view.allows_writes = True
+    return view
+
+
+def _is_read_request() -> bool:
+    if request.method not in READ_METHODS:
+        return False
+    view = current_app.view_functions.get(request.endpoint)
+    return not getattr(view, 'allows_writes', False)
+
+
+def _route_request():
+    session = _db().session()
+    reading = _is_read_request()
+    session.autoflush = not reading
+    session.expire_on_commit = not reading
+    session.info['read_only'] = reading
+    session.info['wrote'] = False
+    session.info['replica'] = choose_replica(_token_user_id()) if reading and replica_keys() else None
+
+
+def _remember_writer(response):
+    if not replica_keys() or response.status_code >= 400:
+        return response
+    if request.method not in READ_METHODS or _db().session.info.get('wrote'):
+        user_id = _token_user_id()
+        if user_id is not None:
+            recent_writers.mark(user_id, current_app.config.get('READ_YOUR_WRITES_SECONDS', 10))
+    return response
+
+
+@event.listens_for(RoutingSession, 'after_begin')
+def _begin_read_only(session, transaction, connection):
+    if session.info.get('read_only') and connection.dialect.name == 'postgresql':
+        connection.exec_driver_sql('SET TRANSACTION READ ONLY')
+
+
+def init_read_routing(app):
+    """Run GET requests on the read path, on replicas when configured."""
+    app.before_request(_route_request)
+    app.after_request(_remember_writer)
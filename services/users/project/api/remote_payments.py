@@ -2,16 +2,27 @@
 Remote Mobile Money Payment API
 Handles remote savings contributions submitted via mobile money with verification workflow.
 """
-import datetime
+import io
+from collections import defaultdict
+from decimal import Decimal
 from flask import Blueprint, jsonify, request
 from functools import wraps
 import jwt
 from flask import current_app
+from sqlalchemy import func, select
 from project import db
 from project.api.models import (
     SavingTransaction, Meeting, GroupMember, MemberSaving,
-    SavingType, MeetingAttendance, TransactionDocument, MeetingSummary
+    SavingType, MeetingAttendance, TransactionDocument
 )
+from project.api.balance_service import (
+    apply_deltas, apply_transaction, settle_pending_transaction, settle_pending_transactions
+)
+from project.api.archival import history_table
+from project.api.shared_cache import bump_group_version
+from project.api.member_counters import apply_contribution_delta, apply_contribution_deltas
+from project.api.meeting_summary import apply_summary_delta
+from project.api.statement_reconciliation import DEFAULT_WINDOW_HOURS, StatementFormatError, reconcile_statement
 
 remote_payments_blueprint = Blueprint('remote_payments', __name__)
 
@@ -253,51 +264,35 @@ def verify_remote_payment(user_id, transaction_id):
         }), 400
     
     try:
-        if action == 'VERIFY':
-            # Verify the payment
-            transaction.verification_status = 'VERIFIED'
-            transaction.verified_by = user_id
-            transaction.verified_date = datetime.datetime.utcnow()
-            transaction.notes = notes or transaction.notes
-            
-            # Update member_saving balance (now that it's verified)
-            member_saving.current_balance = float(member_saving.current_balance or 0) + float(transaction.amount)
-            member_saving.total_deposits = float(member_saving.total_deposits or 0) + float(transaction.amount)
-
-            # If meeting is already completed, update the meeting summary
-            if meeting.status == 'COMPLETED':
-                summary = MeetingSummary.query.filter_by(meeting_id=meeting.id).first()
-                if summary:
-                    # Recalculate totals including this newly verified payment
-                    all_verified_transactions = SavingTransaction.query.filter_by(
-                        meeting_id=meeting.id,
-                        verification_status='VERIFIED'
-                    ).all()
+        status = 'VERIFIED' if action == 'VERIFY' else 'REJECTED'
+        if action == 'REJECT':
+            notes = notes or 'Payment rejected'
 
-                    total_deposits = sum(float(t.amount) for t in all_verified_transactions if t.transaction_type == 'DEPOSIT')
-                    total_withdrawals = sum(float(t.amount) for t in all_verified_transactions if t.transaction_type == 'WITHDRAWAL')
+        # Settle atomically; a concurrent verification of the same payment loses here
+        if not settle_pending_transaction(transaction.id, status, user_id, notes):
+            db.session.rollback()
+            return jsonify({
+                'status': 'error',
+                'message': 'Transaction was already verified or rejected'
+            }), 409
 
-                    summary.total_deposits = total_deposits
-                    summary.total_withdrawals = total_withdrawals
-                    summary.net_savings = total_deposits - total_withdrawals
+        if action == 'VERIFY':
+            # Update member_saving balance (now that it's verified)
+            apply_transaction(member_saving.id, transaction.transaction_type, transaction.amount,
+                              transaction.transaction_date)
+            apply_contribution_delta(member_saving.member_id, transaction.transaction_type, transaction.amount)
 
-                    # Also update meeting totals
-                    meeting.total_savings_collected = total_deposits
+            # Add to the meeting's running (or, if completed, final) summary
+            apply_summary_delta(meeting.id, total_deposits=transaction.amount)
 
             message = 'Payment verified successfully'
             
         else:  # REJECT
-            # Reject the payment
-            transaction.verification_status = 'REJECTED'
-            transaction.verified_by = user_id
-            transaction.verified_date = datetime.datetime.utcnow()
-            transaction.notes = notes or 'Payment rejected'
-            
             # Do NOT update balances for rejected payments
-            
             message = 'Payment rejected'
         
         db.session.commit()
+        bump_group_version(meeting.group_id)
         
         return jsonify({
             'status': 'success',
@@ -316,6 +311,208 @@ def verify_remote_payment(user_id, transaction_id):
         return jsonify({'status': 'error', 'message': str(e)}), 400
 
 
+MAX_BULK_VERIFICATIONS = 500
+
+
+def settle_remote_payments(user_id, transaction_ids, action, notes=None):
+    """
+    Verify or reject many remote payments for user_id, and commit.
+
+    Permissions are checked once per group; balances, member counters and
+    meeting summaries get one summed update per fund, member and meeting.
+
+    Returns:
+        Dictionary with settled ids and amount, and skipped ids with a reason
+    """
+    rows = db.session.query(
+        SavingTransaction.id, SavingTransaction.amount, SavingTransaction.transaction_type,
+        SavingTransaction.transaction_date, SavingTransaction.is_mobile_money,
+        SavingTransaction.verification_status, SavingTransaction.meeting_id,
+        SavingTransaction.member_saving_id, MemberSaving.member_id, Meeting.group_id
+    ).join(
+        MemberSaving, MemberSaving.id == SavingTransaction.member_saving_id
+    ).outerjoin(
+        Meeting, Meeting.id == SavingTransaction.meeting_id
+    ).filter(SavingTransaction.id.in_(transaction_ids)).all()
+    rows_by_id = {row.id: row for row in rows}
+    
+    # Officer role and own member id, once per group
+    verifier_by_group = {}
+    for group_id in {row.group_id for row in rows if row.group_id is not None}:
+        if is_officer_or_admin(user_id, group_id):
+            verifier_by_group[group_id] = GroupMember.query.filter_by(
+                user_id=user_id, group_id=group_id
+            ).with_entities(GroupMember.id).scalar()
+    
+    skipped = []
+    candidates = []
+    for transaction_id in transaction_ids:
+        row = rows_by_id.get(transaction_id)
+        if not row:
+            reason = 'Transaction not found'
+        elif not row.is_mobile_money:
+            reason = 'Not a remote payment transaction'
+        elif row.group_id is None:
+            reason = 'Meeting not found'
+        elif row.group_id not in verifier_by_group:
+            reason = 'Only officers and admins can verify payments'
+        elif verifier_by_group[row.group_id] == row.member_id:
+            reason = 'You cannot verify your own payment'
+        elif row.verification_status != 'PENDING':
+            reason = f'Transaction already {row.verification_status.lower()}'
+        else:
+            candidates.append(transaction_id)
+            continue
+        skipped.append({'transaction_id': transaction_id, 'reason': reason})
+    
+    status = 'VERIFIED' if action == 'VERIFY' else 'REJECTED'
+    if action == 'REJECT':
+        notes = notes or 'Payment rejected'
+    
+    # One conditional UPDATE; anything settled concurrently meanwhile drops out here
+    settled = settle_pending_transactions(candidates, status, user_id, notes)
+    skipped.extend({'transaction_id': transaction_id, 'reason': 'Transaction was already verified or rejected'}
+                   for transaction_id in candidates if transaction_id not in settled)
+    
+    if action == 'VERIFY' and settled:
+        fund_deltas = defaultdict(lambda: [Decimal('0'), Decimal('0')])
+        member_deltas = defaultdict(lambda: [Decimal('0'), Decimal('0')])
+        meeting_deposits = defaultdict(Decimal)
+        meeting_withdrawals = defaultdict(Decimal)
+        for transaction_id in settled:
+            row = rows_by_id[transaction_id]
+            amount = Decimal(str(row.amount))
+            side = 0 if row.transaction_type == 'DEPOSIT' else 1
+            fund_deltas[row.member_saving_id][side] += amount
+            member_deltas[row.member_id][side] += amount
+            if row.transaction_type == 'DEPOSIT':
+                meeting_deposits[row.meeting_id] += amount
+            else:
+                meeting_withdrawals[row.meeting_id] += amount
+        
+        apply_deltas({k: tuple(v) for k, v in fund_deltas.items()})
+        apply_contribution_deltas({k: tuple(v) for k, v in member_deltas.items()})
+        for meeting_id in set(meeting_deposits) | set(meeting_withdrawals):
+            apply_summary_delta(meeting_id, total_deposits=meeting_deposits.get(meeting_id),
+                                total_withdrawals=meeting_withdrawals.get(meeting_id))
+    
+    db.session.commit()
+    for group_id in {rows_by_id[transaction_id].group_id for transaction_id in settled}:
+        bump_group_version(group_id)
+    
+    settled_ids = [transaction_id for transaction_id in transaction_ids if transaction_id in settled]
+    return {
+        'verification_status': status,
+        'settled_count': len(settled_ids),
+        'settled_amount': float(sum(Decimal(str(rows_by_id[t].amount)) for t in settled_ids)),
+        'settled_transaction_ids': settled_ids,
+        'skipped': skipped
+    }
+
+
+@remote_payments_blueprint.route('/savings-transactions/verify', methods=['PUT'])
+@authenticate
+def bulk_verify_remote_payments(user_id):
+    """
+    Verify or reject many remote payments at once (officers/admins only).
+    
+    Request Body:
+    {
+        "transaction_ids": [101, 102, 103],
+        "action": "VERIFY",  // or "REJECT"
+        "notes": "Cleared against MTN month-end statement"
+    }
+    
+    Transactions that cannot be settled are returned in "skipped" with a reason.
+    """
+    post_data = request.get_json(silent=True) or {}
+    action = (post_data.get('action') or '').upper()
+    notes = post_data.get('notes', '')
+    transaction_ids = post_data.get('transaction_ids') or []
+    
+    if action not in ['VERIFY', 'REJECT']:
+        return jsonify({
+            'status': 'error',
+            'message': 'Invalid action. Must be VERIFY or REJECT'
+        }), 400
+    
+    try:
+        transaction_ids = list(dict.fromkeys(int(t) for t in transaction_ids))
+    except (ValueError, TypeError):
+        return jsonify({'status': 'error', 'message': 'transaction_ids must be a list of integers'}), 400
+    
+    if not transaction_ids:
+        return jsonify({'status': 'error', 'message': 'No transaction_ids provided'}), 400
+    if len(transaction_ids) > MAX_BULK_VERIFICATIONS:
+        return jsonify({
+            'status': 'error',
+            'message': f'At most {MAX_BULK_VERIFICATIONS} transactions can be settled at once'
+        }), 400
+    
+    try:
+        data = settle_remote_payments(user_id, transaction_ids, action, notes)
+        return jsonify({
+            'status': 'success',
+            'message': f"{data['settled_count']} payment(s) {data['verification_status'].lower()}, "
+                       f"{len(data['skipped'])} skipped",
+            'data': data
+        }), 200
+
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'status': 'error', 'message': str(e)}), 400
+
+
+@remote_payments_blueprint.route('/groups/<int:group_id>/remote-payments/reconcile', methods=['POST'])
+@authenticate
+def reconcile_remote_payments(user_id, group_id):
+    """
+    Match a mobile money provider statement against pending remote payments
+    (officers/admins only).
+    
+    Upload the statement CSV as multipart field "statement" (or as a text/csv
+    body). It needs an amount column and a reference and/or phone column;
+    a timestamp column narrows phone + amount matches.
+    
+    Query params: window_hours (default 72), auto_verify (verify payments
+    matched exactly by reference and amount).
+    """
+    if not is_officer_or_admin(user_id, group_id):
+        return jsonify({
+            'status': 'error',
+            'message': 'Only officers and admins can reconcile payments'
+        }), 403
+    
+    if 'statement' in request.files:
+        stream = request.files['statement'].stream
+    elif request.mimetype in ('text/csv', 'text/plain', 'application/octet-stream'):
+        stream = request.stream
+    else:
+        return jsonify({'status': 'error', 'message': 'No statement file provided'}), 400
+    
+    window_hours = request.args.get('window_hours', DEFAULT_WINDOW_HOURS, type=int)
+    auto_verify = request.args.get('auto_verify', 'false').lower() in ('1', 'true', 'yes')
+    
+    try:
+        text_stream = io.TextIOWrapper(stream, encoding='utf-8-sig', errors='replace', newline='')
+        result = reconcile_statement(group_id, text_stream, window_hours=window_hours)
+    except StatementFormatError as e:
+        return jsonify({'status': 'error', 'message': str(e)}), 400
+    
+    try:
+        if auto_verify:
+            exact_ids = [m['payment']['transaction_id'] for m in result['matched'] if m['exact']]
+            result['auto_verified'] = settle_remote_payments(
+                user_id, exact_ids, 'VERIFY', 'Auto-verified against provider statement'
+            ) if exact_ids else None
+        
+        return jsonify({'status': 'success', 'data': result}), 200
+    
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'status': 'error', 'message': str(e)}), 400
+
+
 @remote_payments_blueprint.route('/meetings/<int:meeting_id>/pending-payments', methods=['GET'])
 @authenticate
 def get_pending_payments(user_id, meeting_id):
@@ -336,37 +533,34 @@ def get_pending_payments(user_id, meeting_id):
         }), 403
     
     try:
-        # Get all remote payments for this meeting
-        remote_payments = SavingTransaction.query.filter_by(
-            meeting_id=meeting_id,
-            is_mobile_money=True
-        ).order_by(SavingTransaction.created_date.asc()).all()
+        # All remote payments (verified ones may be archived) with member and saving type in one joined query
+        transactions = history_table(SavingTransaction)
+        remote_payments = db.session.execute(
+            select(transactions, GroupMember, MemberSaving.saving_type_id, SavingType.name.label('saving_type_name'))
+            .select_from(transactions)
+            .join(MemberSaving, MemberSaving.id == transactions.c.member_saving_id)
+            .join(GroupMember, GroupMember.id == MemberSaving.member_id)
+            .outerjoin(SavingType, SavingType.id == MemberSaving.saving_type_id)
+            .where(
+                transactions.c.meeting_id == meeting_id,
+                transactions.c.is_mobile_money == True
+            ).order_by(transactions.c.created_date.asc())
+        ).all()
+        
+        # Documents for every payment in one query
+        documents = TransactionDocument.get_for_entities('savings', [t.id for t in remote_payments])
         
         # Separate by status
-        pending_payments = []
-        verified_payments = []
-        rejected_payments = []
+        payments_by_status = {'PENDING': [], 'VERIFIED': [], 'REJECTED': []}
         
         for transaction in remote_payments:
-            member_saving = MemberSaving.query.get(transaction.member_saving_id)
-            if not member_saving:
-                continue
-            
-            member = GroupMember.query.get(member_saving.member_id)
-            if not member:
-                continue
-            
-            saving_type = SavingType.query.get(member_saving.saving_type_id)
-            
-            # Get documents
-            documents = TransactionDocument.get_for_entity('savings', transaction.id)
-            
+            member = transaction.GroupMember
             payment_data = {
                 'id': transaction.id,
                 'member_id': member.id,
                 'member_name': f"{member.first_name} {member.last_name}",
-                'saving_type_id': member_saving.saving_type_id,
-                'saving_type_name': saving_type.name if saving_type else 'Unknown',
+                'saving_type_id': transaction.saving_type_id,
+                'saving_type_name': transaction.saving_type_name or 'Unknown',
                 'amount': float(transaction.amount),
                 'mobile_money_reference': transaction.mobile_money_reference,
                 'mobile_money_phone': transaction.mobile_money_phone,
@@ -376,31 +570,45 @@ def get_pending_payments(user_id, meeting_id):
                 'verified_by': transaction.verified_by,
                 'verified_date': transaction.verified_date.isoformat() if transaction.verified_date else None,
                 'notes': transaction.notes,
-                'documents': [doc.to_dict() for doc in documents]
+                'documents': [doc.to_dict() for doc in documents.get(transaction.id, [])]
             }
             
-            if transaction.verification_status == 'PENDING':
-                pending_payments.append(payment_data)
-            elif transaction.verification_status == 'VERIFIED':
-                verified_payments.append(payment_data)
-            elif transaction.verification_status == 'REJECTED':
-                rejected_payments.append(payment_data)
+            if transaction.verification_status in payments_by_status:
+                payments_by_status[transaction.verification_status].append(payment_data)
+        
+        # Counts and totals per status in SQL
+        totals = {
+            row.verification_status: row for row in db.session.query(
+                transactions.c.verification_status,
+                func.count(transactions.c.id).label('count'),
+                func.coalesce(func.sum(transactions.c.amount), 0).label('amount')
+            ).join(
+                MemberSaving, MemberSaving.id == transactions.c.member_saving_id
+            ).join(
+                GroupMember, GroupMember.id == MemberSaving.member_id
+            ).filter(
+                transactions.c.meeting_id == meeting_id,
+                transactions.c.is_mobile_money == True
+            ).group_by(transactions.c.verification_status)
+        }
+        
+        def count_for(status):
+            return totals[status].count if status in totals else 0
         
-        # Calculate totals
-        pending_amount = sum([p['amount'] for p in pending_payments])
-        verified_amount = sum([p['amount'] for p in verified_payments])
+        def amount_for(status):
+            return float(totals[status].amount) if status in totals else 0.0
         
         return jsonify({
             'status': 'success',
             'data': {
-                'pending_count': len(pending_payments),
-                'verified_count': len(verified_payments),
-                'rejected_count': len(rejected_payments),
-                'total_pending_amount': float(pending_amount),
-                'total_verified_amount': float(verified_amount),
-                'pending_payments': pending_payments,
-                'verified_payments': verified_payments,
-                'rejected_payments': rejected_payments
+                'pending_count': count_for('PENDING'),
+                'verified_count': count_for('VERIFIED'),
+                'rejected_count': count_for('REJECTED'),
+                'total_pending_amount': amount_for('PENDING'),
+                'total_verified_amount': amount_for('VERIFIED'),
+                'pending_payments': payments_by_status['PENDING'],
+                'verified_payments': payments_by_status['VERIFIED'],
+                'rejected_payments': payments_by_status['REJECTED']
             }
         }), 200
         
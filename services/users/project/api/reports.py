@@ -0,0 +1,77 @@
+"""Portfolio reports blueprint."""
+import datetime
+from flask import Blueprint, request, jsonify
+from functools import wraps
+from project.api.models import User
+from project.api.portfolio_report import get_portfolio_at_risk, list_report_dates
+from project.api.read_routing import allows_writes
+
+
+reports_blueprint = Blueprint('reports', __name__)
+
+REPORT_LEVELS = ['groups', 'parishes', 'districts', 'regions']
+
+
+def authenticate_admin(f):
+    """Decorator to check authentication; portfolio reports span all groups, so admins only."""
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        auth_header = request.headers.get('Authorization')
+        if not auth_header:
+            return jsonify({'status': 'fail', 'message': 'Provide a valid auth token.'}), 401
+
+        try:
+            auth_token = auth_header.split(' ')[1]
+            user_id = User.decode_token(auth_token)
+            if isinstance(user_id, str):
+                return jsonify({'status': 'fail', 'message': user_id}), 401
+        except IndexError:
+            return jsonify({'status': 'fail', 'message': 'Invalid token format.'}), 401
+
+        user = User.query.get(user_id)
+        if not (user and (user.is_super_admin or user.admin)):
+            return jsonify({'status': 'fail', 'message': 'Admin access required.'}), 403
+
+        return f(user_id, *args, **kwargs)
+    return decorated_function
+
+
+@reports_blueprint.route('/portfolio-at-risk', methods=['GET'])
+@allows_writes
+@authenticate_admin
+def portfolio_at_risk(user_id):
+    """
+    Get PAR30/60/90 and aging buckets by group, parish, district and region.
+
+    Query params: date (YYYY-MM-DD, default today), level (groups, parishes,
+    districts, regions; default all), refresh (recompute today's report).
+    """
+    try:
+        report_date = datetime.date.fromisoformat(request.args['date']) if request.args.get('date') else None
+    except ValueError:
+        return jsonify({'status': 'fail', 'message': 'Invalid date, expected YYYY-MM-DD.'}), 400
+
+    level = request.args.get('level')
+    if level and level not in REPORT_LEVELS:
+        return jsonify({'status': 'fail', 'message': f"Invalid level, expected one of {', '.join(REPORT_LEVELS)}."}), 400
+
+    refresh = request.args.get('refresh', 'false').lower() in ('1', 'true', 'yes')
+    report = get_portfolio_at_risk(report_date, refresh=refresh, user_id=user_id)
+    if report is None:
+        return jsonify({
+            'status': 'fail',
+            'message': 'No report stored for this date.',
+            'available_dates': list_report_dates()
+        }), 404
+
+    if level:
+        report = {key: value for key, value in report.items() if key not in REPORT_LEVELS or key == level}
+
+    return jsonify({'status': 'success', 'data': report}), 200
+
+
+@reports_blueprint.route('/portfolio-at-risk/dates', methods=['GET'])
+@authenticate_admin
+def portfolio_at_risk_dates(user_id):
+    """List reporting dates with a stored PAR report."""
+    return jsonify({'status': 'success', 'data': {'dates': list_report_dates()}}), 200
@@ -0,0 +1,89 @@
+"""
+Saving Cycles
+A group saves in cycles of saving_cycle_months, counted from its formation
+date (or its first meeting when that was not recorded). A cycle is the
+unit that is shared out at its end and, once closed, archived.
+"""
+import calendar
+import datetime
+from typing import Dict, Iterable, NamedTuple, Optional
+from sqlalchemy import Date, Integer
+from project import db
+
+
+DEFAULT_CYCLE_MONTHS = 12
+
+CYCLE_ANCHORS_SQL = """
+    SELECT g.id, g.saving_cycle_months, COALESCE(g.formation_date, MIN(m.meeting_date)) AS anchor
+    FROM savings_groups g
+    LEFT JOIN meetings m ON m.group_id = g.id
+    {where}
+    GROUP BY g.id, g.saving_cycle_months, g.formation_date
+"""
+
+
+class SavingCycle(NamedTuple):
+    group_id: int
+    anchor: datetime.date
+    cycle_months: int
+    number: int
+    start: datetime.date
+    end: datetime.date  # exclusive
+
+    def shifted(self, cycles: int) -> 'SavingCycle':
+        """The cycle this many cycles later (negative for earlier)."""
+        months = cycles * self.cycle_months
+        return self._replace(number=self.number + cycles, start=add_months(self.start, months),
+                             end=add_months(self.end, months))
+
+
+def add_months(date: datetime.date, months: int) -> datetime.date:
+    """Same day of the month, clamped to the month's length."""
+    month_index = date.year * 12 + date.month - 1 + months
+    year, month = divmod(month_index, 12)
+    return datetime.date(year, month + 1, min(date.day, calendar.monthrange(year, month + 1)[1]))
+
+
+def cycle_containing(group_id: int, anchor: datetime.date, cycle_months: Optional[int],
+                     as_of: datetime.date) -> SavingCycle:
+    """The cycle (numbered from 1) that as_of falls in; the first cycle if as_of precedes the anchor."""
+    cycle_months = cycle_months or DEFAULT_CYCLE_MONTHS
+    elapsed = (as_of.year - anchor.year) * 12 + as_of.month - anchor.month
+    if add_months(anchor, elapsed) > as_of:
+        elapsed -= 1
+    index = max(elapsed // cycle_months, 0)
+    start = add_months(anchor, index * cycle_months)
+    return SavingCycle(group_id, anchor, cycle_months, index + 1, start, add_months(start, cycle_months))
+
+
+def current_cycles(group_ids: Optional[Iterable[int]] = None,
+                   as_of: Optional[datetime.date] = None) -> Dict[int, SavingCycle]:
+    """
+    Current saving cycle of each group, in one query.
+
+    Groups with neither a formation date nor any meeting have no cycle yet
+    and are omitted.
+    """
+    as_of = as_of or datetime.date.today()
+    params = {}
+    where = ''
+    if group_ids is not None:
+        group_ids = list(group_ids)
+        if not group_ids:
+            return {}
+        where, params = 'WHERE g.id IN :group_ids', {'group_ids': group_ids}
+
+    query = db.text(CYCLE_ANCHORS_SQL.format(where=where))
+    if group_ids is not None:
+        query = query.bindparams(db.bindparam('group_ids', expanding=True))
+    query = query.columns(id=Integer, saving_cycle_months=Integer, anchor=Date)
+
+    return {
+        row.id: cycle_containing(row.id, row.anchor, row.saving_cycle_months, as_of)
+        for row in db.session.execute(query, params) if row.anchor is not None
+    }
+
+
+def current_cycle(group_id: int, as_of: Optional[datetime.date] = None) -> Optional[SavingCycle]:
+    """Current saving cycle of one group, or None if it has not started saving."""
+    return current_cycles([group_id], as_of).get(group_id)
@@ -7,6 +7,8 @@ import jwt
 
 from project import db
 from project.api.models import SavingType
+from project.api.archival import HISTORY_SQL
+from project.api.shared_cache import bump_group_version, cached_json_response
 
 saving_types_blueprint = Blueprint('saving_types', __name__)
 
@@ -40,65 +42,69 @@ def authenticate(f):
     return decorated_function
 
 
+def _group_saving_types_data(group_id):
+    """Saving types available to a group, with the group's overrides applied."""
+    # Query to get all saving types for this group
+    query = text("""
+        SELECT 
+            st.id,
+            st.name,
+            st.description,
+            st.code,
+            st.is_mandatory,
+            st.is_system,
+            st.group_id AS owner_group_id,
+            COALESCE(gsts.minimum_amount, st.minimum_amount) AS minimum_amount,
+            COALESCE(gsts.maximum_amount, st.maximum_amount) AS maximum_amount,
+            COALESCE(gsts.allows_withdrawal, st.allows_withdrawal) AS allows_withdrawal,
+            COALESCE(gsts.withdrawal_notice_days, st.withdrawal_notice_days) AS withdrawal_notice_days,
+            COALESCE(gsts.interest_rate, st.interest_rate) AS interest_rate,
+            COALESCE(gsts.is_enabled, TRUE) AS is_enabled,
+            COALESCE(gsts.display_order, 0) AS display_order,
+            st.is_active
+        FROM saving_types st
+        LEFT JOIN group_saving_type_settings gsts 
+            ON st.id = gsts.saving_type_id AND gsts.group_id = :group_id
+        WHERE (st.is_system = TRUE OR st.group_id = :group_id)
+            AND st.is_active = TRUE
+        ORDER BY display_order, st.name
+    """)
+    
+    result = db.session.execute(query, {'group_id': group_id})
+    saving_types = []
+    
+    for row in result:
+        saving_types.append({
+            'id': row[0],
+            'name': row[1],
+            'description': row[2],
+            'code': row[3],
+            'is_mandatory': row[4],
+            'is_system': row[5],
+            'owner_group_id': row[6],
+            'minimum_amount': float(row[7]) if row[7] else None,
+            'maximum_amount': float(row[8]) if row[8] else None,
+            'allows_withdrawal': row[9],
+            'withdrawal_notice_days': row[10],
+            'interest_rate': float(row[11]) if row[11] else 0.0,
+            'is_enabled': row[12],
+            'display_order': row[13],
+            'is_active': row[14],
+            'can_delete': not row[5]  # Can only delete non-system types
+        })
+    return saving_types
+
+
 @saving_types_blueprint.route('/groups/<int:group_id>/saving-types', methods=['GET'])
 @authenticate
 def get_group_saving_types(user_id, group_id):
-    """Get all saving types available for a group (system + group-specific)."""
+    """
+    Get all saving types available for a group (system + group-specific).
+    Served from the shared cache with an ETag (304 if unchanged).
+    """
     try:
-        # Query to get all saving types for this group
-        query = text("""
-            SELECT 
-                st.id,
-                st.name,
-                st.description,
-                st.code,
-                st.is_mandatory,
-                st.is_system,
-                st.group_id AS owner_group_id,
-                COALESCE(gsts.minimum_amount, st.minimum_amount) AS minimum_amount,
-                COALESCE(gsts.maximum_amount, st.maximum_amount) AS maximum_amount,
-                COALESCE(gsts.allows_withdrawal, st.allows_withdrawal) AS allows_withdrawal,
-                COALESCE(gsts.withdrawal_notice_days, st.withdrawal_notice_days) AS withdrawal_notice_days,
-                COALESCE(gsts.interest_rate, st.interest_rate) AS interest_rate,
-                COALESCE(gsts.is_enabled, TRUE) AS is_enabled,
-                COALESCE(gsts.display_order, 0) AS display_order,
-                st.is_active
-            FROM saving_types st
-            LEFT JOIN group_saving_type_settings gsts 
-                ON st.id = gsts.saving_type_id AND gsts.group_id = :group_id
-            WHERE (st.is_system = TRUE OR st.group_id = :group_id)
-                AND st.is_active = TRUE
-            ORDER BY display_order, st.name
-        """)
-        
-        result = db.session.execute(query, {'group_id': group_id})
-        saving_types = []
-        
-        for row in result:
-            saving_types.append({
-                'id': row[0],
-                'name': row[1],
-                'description': row[2],
-                'code': row[3],
-                'is_mandatory': row[4],
-                'is_system': row[5],
-                'owner_group_id': row[6],
-                'minimum_amount': float(row[7]) if row[7] else None,
-                'maximum_amount': float(row[8]) if row[8] else None,
-                'allows_withdrawal': row[9],
-                'withdrawal_notice_days': row[10],
-                'interest_rate': float(row[11]) if row[11] else 0.0,
-                'is_enabled': row[12],
-                'display_order': row[13],
-                'is_active': row[14],
-                'can_delete': not row[5]  # Can only delete non-system types
-            })
-        
-        return jsonify({
-            'status': 'success',
-            'data': saving_types
-        }), 200
-        
+        return cached_json_response(group_id, 'saving_types', lambda: _group_saving_types_data(group_id))
+
     except Exception as e:
         return jsonify({
             'status': 'fail',
@@ -195,6 +201,7 @@ def create_saving_type(user_id, group_id):
             'saving_type_id': new_id
         })
         db.session.commit()
+        bump_group_version(group_id)
         
         return jsonify({
             'status': 'success',
@@ -310,6 +317,7 @@ def update_saving_type(user_id, group_id, type_id):
             })
         
         db.session.commit()
+        bump_group_version(group_id)
 
         return jsonify({
             'status': 'success',
@@ -360,10 +368,12 @@ def delete_saving_type(user_id, group_id, type_id):
             }), 403
 
         # Check if there are any transactions or balances
-        check_usage_query = text("""
+        check_usage_query = text(f"""
             SELECT
                 (SELECT COUNT(*) FROM member_savings WHERE saving_type_id = :type_id) AS savings_count,
-                (SELECT COUNT(*) FROM saving_transactions WHERE saving_type_id = :type_id) AS transactions_count
+                (SELECT COUNT(*) FROM {HISTORY_SQL['saving_transactions']} sav_t
+                 JOIN member_savings ms ON ms.id = sav_t.member_saving_id
+                 WHERE ms.saving_type_id = :type_id) AS transactions_count
         """)
         usage = db.session.execute(check_usage_query, {'type_id': type_id}).fetchone()
 
@@ -384,6 +394,7 @@ def delete_saving_type(user_id, group_id, type_id):
         """)
         db.session.execute(delete_query, {'type_id': type_id})
         db.session.commit()
+        bump_group_version(group_id)
 
         response_data = {
             'status': 'success',
@@ -408,7 +419,7 @@ def delete_saving_type(user_id, group_id, type_id):
 def get_saving_type_usage(user_id, group_id, type_id):
     """Get usage statistics for a saving type before deletion."""
     try:
-        query = text("""
+        query = text(f"""
             SELECT
                 st.name,
                 st.is_system,
@@ -416,12 +427,15 @@ def get_saving_type_usage(user_id, group_id, type_id):
                  WHERE ms.saving_type_id = :type_id) AS members_using,
                 (SELECT COALESCE(SUM(current_balance), 0) FROM member_savings ms
                  WHERE ms.saving_type_id = :type_id) AS total_balance,
-                (SELECT COUNT(*) FROM saving_transactions st
-                 WHERE st.saving_type_id = :type_id) AS total_transactions,
-                (SELECT COALESCE(SUM(amount), 0) FROM saving_transactions st
-                 WHERE st.saving_type_id = :type_id AND transaction_type = 'DEPOSIT') AS total_deposits,
-                (SELECT COALESCE(SUM(amount), 0) FROM saving_transactions st
-                 WHERE st.saving_type_id = :type_id AND transaction_type = 'WITHDRAWAL') AS total_withdrawals
+                (SELECT COUNT(*) FROM {HISTORY_SQL['saving_transactions']} sav_t
+                 JOIN member_savings ms ON ms.id = sav_t.member_saving_id
+                 WHERE ms.saving_type_id = :type_id) AS total_transactions,
+                (SELECT COALESCE(SUM(sav_t.amount), 0) FROM {HISTORY_SQL['saving_transactions']} sav_t
+                 JOIN member_savings ms ON ms.id = sav_t.member_saving_id
+                 WHERE ms.saving_type_id = :type_id AND sav_t.transaction_type = 'DEPOSIT') AS total_deposits,
+                (SELECT COALESCE(SUM(sav_t.amount), 0) FROM {HISTORY_SQL['saving_transactions']} sav_t
+                 JOIN member_savings ms ON ms.id = sav_t.member_saving_id
+                 WHERE ms.saving_type_id = :type_id AND sav_t.transaction_type = 'WITHDRAWAL') AS total_withdrawals
             FROM saving_types st
             WHERE st.id = :type_id
         """)
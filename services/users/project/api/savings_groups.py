@@ -1,18 +1,70 @@
 """Savings groups blueprint."""
 from flask import Blueprint, request, jsonify
-from sqlalchemy import exc, func
+from sqlalchemy import exc, func, select
 from project import db
 from project.api.models import (
     SavingsGroup, GroupMember, User, MemberSaving, MemberFine,
     GroupLoan, Meeting, MeetingAttendance, TrainingRecord,
     TrainingAttendance, VotingRecord, MemberVote, SavingType
 )
+from project.api.archival import history_table
+from project.api.loan_delinquency import ACTIVE_LOAN_STATUSES
+from project.api.read_models import ReadModel
+from project.api.serialization import Field, FieldSpec, Number
 from functools import wraps
 
 
 savings_groups_blueprint = Blueprint('savings_groups', __name__)
 
 
+class GroupListItem(ReadModel):
+    """The SavingsGroup columns the group list shows, with its member count."""
+
+    columns = (
+        SavingsGroup.id, SavingsGroup.name, SavingsGroup.description, SavingsGroup.status,
+        SavingsGroup.state, SavingsGroup.country, SavingsGroup.region, SavingsGroup.district,
+        SavingsGroup.parish, SavingsGroup.village, SavingsGroup.meeting_location, SavingsGroup.meeting_day,
+        SavingsGroup.meeting_frequency, SavingsGroup.meeting_time, SavingsGroup.formation_date,
+        SavingsGroup.currency, SavingsGroup.share_value, SavingsGroup.max_members,
+        SavingsGroup.savings_balance, SavingsGroup.created_date,
+        select(func.count(GroupMember.id)).where(GroupMember.group_id == SavingsGroup.id)
+        .correlate(SavingsGroup).scalar_subquery().label('member_count'),
+    )
+    __slots__ = ReadModel.slots(columns)
+
+    fields = FieldSpec(
+        'id', 'name', 'description', Field('status', lambda g: g.status or g.state), 'country', 'region',
+        'district', 'parish', 'village', 'meeting_location', 'meeting_day', 'meeting_frequency',
+        'meeting_time', 'formation_date', 'currency', Field('share_value', lambda g: str(g.share_value or 0)),
+        Field('total_members', 'member_count'), 'max_members',
+        Field('total_savings', lambda g: str(g.savings_balance or 0)), 'created_date',
+    )
+
+    def to_dict(self):
+        return self.fields.dump(self)
+
+
+class MemberListItem(ReadModel):
+    """The GroupMember columns member lists show."""
+
+    columns = (
+        GroupMember.id, GroupMember.first_name, GroupMember.last_name, GroupMember.email,
+        GroupMember.phone_number, GroupMember.role, GroupMember.status, GroupMember.share_balance,
+        GroupMember.total_contributions, GroupMember.attendance_percentage, GroupMember.is_eligible_for_loans,
+    )
+    __slots__ = ReadModel.slots(columns)
+
+    fields = FieldSpec(
+        'id', 'first_name', 'last_name', 'email', 'phone_number', 'role', 'status',
+        Field('share_balance', lambda m: str(m.share_balance or 0)),
+        Field('total_contributions', lambda m: str(m.total_contributions or 0)),
+        Number('attendance_percentage', default=0.0), 'is_eligible_for_loans',
+    )
+
+    def to_dict(self):
+        return self.fields.dump(self)
+
+
 def authenticate(f):
     """Decorator to check authentication."""
     @wraps(f)
@@ -41,36 +93,10 @@ def get_all_groups():
         limit = request.args.get('limit', 50, type=int)
         offset = request.args.get('offset', 0, type=int)
         
-        groups = SavingsGroup.query.limit(limit).offset(offset).all()
-        total = SavingsGroup.query.count()
-        
-        groups_list = []
-        for group in groups:
-            # Calculate actual member count
-            actual_member_count = GroupMember.query.filter_by(group_id=group.id).count()
-
-            groups_list.append({
-                'id': group.id,
-                'name': group.name,
-                'description': group.description,
-                'status': group.status or group.state,
-                'country': group.country,
-                'region': group.region,
-                'district': group.district,
-                'parish': group.parish,
-                'village': group.village,
-                'meeting_location': group.meeting_location,
-                'meeting_day': group.meeting_day,
-                'meeting_frequency': group.meeting_frequency,
-                'meeting_time': group.meeting_time.isoformat() if group.meeting_time else None,
-                'formation_date': group.formation_date.isoformat() if group.formation_date else None,
-                'currency': group.currency,
-                'share_value': str(group.share_value or 0),
-                'total_members': actual_member_count,
-                'max_members': group.max_members,
-                'total_savings': str(group.savings_balance or 0),
-                'created_date': group.created_date.isoformat() if group.created_date else None
-            })
+        groups_list = GroupListItem.fields.dump_many(GroupListItem.fetch(
+            GroupListItem.select().order_by(SavingsGroup.id).limit(limit).offset(offset)
+        ))
+        total = db.session.execute(select(func.count(SavingsGroup.id))).scalar()
         
         return jsonify({
             'status': 'success',
@@ -101,22 +127,9 @@ def get_single_group(group_id):
             }), 404
         
         # Get members
-        members = GroupMember.query.filter_by(group_id=group_id).all()
-        members_list = []
-        for member in members:
-            members_list.append({
-                'id': member.id,
-                'first_name': member.first_name,
-                'last_name': member.last_name,
-                'email': member.email,
-                'phone_number': member.phone_number,
-                'role': member.role,
-                'status': member.status,
-                'share_balance': str(member.share_balance or 0),
-                'total_contributions': str(member.total_contributions or 0),
-                'attendance_percentage': float(member.attendance_percentage or 0),
-                'is_eligible_for_loans': member.is_eligible_for_loans
-            })
+        members_list = MemberListItem.fields.dump_many(MemberListItem.fetch(
+            MemberListItem.select().where(GroupMember.group_id == group_id).order_by(GroupMember.id)
+        ))
         
         # Calculate financial summary
         total_savings = db.session.query(func.sum(GroupMember.total_contributions)).filter_by(group_id=group_id).scalar() or 0
@@ -225,22 +238,9 @@ def create_group():
 def get_group_members(group_id):
     """Get all members of a group."""
     try:
-        members = GroupMember.query.filter_by(group_id=group_id).all()
-        members_list = []
-        for member in members:
-            members_list.append({
-                'id': member.id,
-                'first_name': member.first_name,
-                'last_name': member.last_name,
-                'email': member.email,
-                'phone_number': member.phone_number,
-                'role': member.role,
-                'status': member.status,
-                'share_balance': str(member.share_balance or 0),
-                'total_contributions': str(member.total_contributions or 0),
-                'attendance_percentage': float(member.attendance_percentage or 0),
-                'is_eligible_for_loans': member.is_eligible_for_loans
-            })
+        members_list = MemberListItem.fields.dump_many(MemberListItem.fetch(
+            MemberListItem.select().where(GroupMember.group_id == group_id).order_by(GroupMember.id)
+        ))
         
         return jsonify({
             'status': 'success',
@@ -386,34 +386,35 @@ def get_group_dashboard(group_id):
             }
             total_savings += net_savings
 
-        # Calculate total fines (join through GroupMember to filter by group)
-        total_fines_issued = db.session.query(func.sum(MemberFine.amount)).join(
-            GroupMember, MemberFine.member_id == GroupMember.id
+        # Calculate total fines (join through GroupMember to filter by group), archived cycles included
+        fines = history_table(MemberFine)
+        total_fines_issued = db.session.query(func.sum(fines.c.amount)).select_from(fines).join(
+            GroupMember, fines.c.member_id == GroupMember.id
         ).filter(
             GroupMember.group_id == group_id
         ).scalar() or 0
 
-        total_fines_paid = db.session.query(func.sum(MemberFine.paid_amount)).join(
-            GroupMember, MemberFine.member_id == GroupMember.id
+        total_fines_paid = db.session.query(func.sum(fines.c.paid_amount)).select_from(fines).join(
+            GroupMember, fines.c.member_id == GroupMember.id
         ).filter(
             GroupMember.group_id == group_id,
-            MemberFine.is_paid == True
+            fines.c.is_paid == True
         ).scalar() or 0
 
         # Calculate loan statistics
         total_loans_disbursed = db.session.query(func.sum(GroupLoan.principal)).filter(
             GroupLoan.group_id == group_id,
-            GroupLoan.status.in_(['ACTIVE', 'DISBURSED', 'COMPLETED'])
+            GroupLoan.status.in_(ACTIVE_LOAN_STATUSES + ('COMPLETED',))
         ).scalar() or 0
 
         total_loans_outstanding = db.session.query(func.sum(GroupLoan.outstanding_balance)).filter(
             GroupLoan.group_id == group_id,
-            GroupLoan.status == 'ACTIVE'
+            GroupLoan.status.in_(ACTIVE_LOAN_STATUSES)
         ).scalar() or 0
 
-        active_loans_count = GroupLoan.query.filter_by(
-            group_id=group_id,
-            status='ACTIVE'
+        active_loans_count = GroupLoan.query.filter(
+            GroupLoan.group_id == group_id,
+            GroupLoan.status.in_(ACTIVE_LOAN_STATUSES)
         ).count()
 
         # Calculate meeting statistics
@@ -430,12 +431,15 @@ def get_group_dashboard(group_id):
             status='COMPLETED'
         ).all()
 
+        attendance = history_table(MeetingAttendance)
+        present_counts = dict(db.session.query(attendance.c.meeting_id, func.count()).filter(
+            attendance.c.meeting_id.in_([meeting.id for meeting in completed_meetings_list]),
+            attendance.c.is_present == True
+        ).group_by(attendance.c.meeting_id).all())
+
+        total_members = GroupMember.query.filter_by(group_id=group_id).count()
         for meeting in completed_meetings_list:
-            total_members = GroupMember.query.filter_by(group_id=group_id).count()
-            present_count = MeetingAttendance.query.filter_by(
-                meeting_id=meeting.id,
-                is_present=True
-            ).count()
+            present_count = present_counts.get(meeting.id, 0)
             if total_members > 0:
                 attendance_rates.append((present_count / total_members) * 100)
 
@@ -0,0 +1,59 @@
+"""
+Group Sequences
+Race-free per-group number allocation (meeting numbers) from a counter row
+in group_sequences. Each allocation is a single UPDATE ... RETURNING, which
+row-locks only that group's counter until the caller's transaction commits,
+so concurrent creators in the same group queue briefly while other groups
+are unaffected; a rolled-back transaction releases its numbers.
+
+A counter row is seeded on first use from the numbers already in the
+table, so existing groups continue where they left off.
+"""
+from typing import Dict
+from project import db
+
+
+MEETING_NUMBER = 'meeting_number'
+
+# Current maximum for each sequence, used to seed its counter row
+SEQUENCE_SEEDS: Dict[str, str] = {
+    MEETING_NUMBER: 'SELECT COALESCE(MAX(meeting_number), 0) FROM meetings WHERE group_id = :group_id',
+}
+
+ALLOCATE_SQL = db.text("""
+    UPDATE group_sequences
+    SET last_value = last_value + :count
+    WHERE group_id = :group_id AND name = :name
+    RETURNING last_value
+""")
+
+SEED_SQL = """
+    INSERT INTO group_sequences (group_id, name, last_value)
+    VALUES (:group_id, :name, ({seed}))
+    ON CONFLICT (group_id, name) DO NOTHING
+"""
+
+
+def allocate(group_id: int, name: str, count: int = 1) -> range:
+    """
+    Reserve count consecutive numbers of a group sequence. Does not commit.
+
+    Returns:
+        The reserved numbers, e.g. range(13, 16) for three numbers
+    """
+    if count < 1:
+        raise ValueError('count must be at least 1')
+    if name not in SEQUENCE_SEEDS:
+        raise ValueError(f'Unknown sequence: {name}')
+
+    params = {'group_id': group_id, 'name': name, 'count': count}
+    last_value = db.session.execute(ALLOCATE_SQL, params).scalar()
+    if last_value is None:
+        db.session.execute(db.text(SEED_SQL.format(seed=SEQUENCE_SEEDS[name])), params)
+        last_value = db.session.execute(ALLOCATE_SQL, params).scalar()
+    return range(last_value - count + 1, last_value + 1)
+
+
+def allocate_meeting_numbers(group_id: int, count: int = 1) -> range:
+    """Reserve the next count meeting numbers of a group. Does not commit."""
+    return allocate(group_id, MEETING_NUMBER, count)
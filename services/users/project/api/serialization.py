@@ -0,0 +1,144 @@
+"""
+Serialization
+JSON for API responses: a Flask JSON provider that encodes with orjson when
+it is installed (stdlib json otherwise), and compiled field specs that turn
+model rows into response dicts.
+
+Dates, times and datetimes are encoded as ISO 8601 by the provider, so
+views pass them through instead of calling isoformat(); raw Decimals are
+encoded as strings, as Flask does.
+
+A FieldSpec names a model's response fields once, at import:
+
+    MEMBER_FIELDS = FieldSpec('id', 'first_name', Money('share_balance', default=0),
+                              Field('member_name', lambda m: f'{m.first_name} {m.last_name}'))
+    MEMBER_FIELDS.dump_many(members)
+
+Money fields are floats by default. A client that sends
+X-Money-Format: string gets them as exact decimal strings ("1500.00").
+"""
+import datetime
+import decimal
+from operator import attrgetter
+from typing import Any, Callable, Dict, Iterable, List, Optional, Union
+from flask import has_request_context, request
+from flask.json.provider import DefaultJSONProvider
+from project.api.media_backends import backends
+
+
+MONEY_FORMAT_HEADER = 'X-Money-Format'
+
+
+def exact_money() -> bool:
+    """Whether the client asked for money as exact decimal strings."""
+    return has_request_context() and request.headers.get(MONEY_FORMAT_HEADER, '').lower() == 'string'
+
+
+class Field:
+    """A response field read from an attribute (or computed by a callable), None replaced by default."""
+
+    def __init__(self, key: str, source: Union[str, Callable, None] = None, default: Any = None):
+        self.key = key
+        self.getter = source if callable(source) else attrgetter(source or key)
+        self.default = default
+
+    def converter(self, exact: bool) -> Optional[Callable]:
+        default = self.default
+        if default is None:
+            return None
+        return lambda value: default if value is None else value
+
+
+class Number(Field):
+    """A Decimal rendered as a float (rates, percentages, coordinates)."""
+
+    def converter(self, exact: bool) -> Callable:
+        default = self.default
+        return lambda value: default if value is None else float(value)
+
+
+class Money(Field):
+    """An amount: a float, or an exact decimal string if the client asked for one."""
+
+    def converter(self, exact: bool) -> Callable:
+        default = self.default
+        if not exact:
+            return lambda value: default if value is None else float(value)
+        default = None if default is None else str(default)
+        return lambda value: default if value is None else str(value)
+
+
+class FieldSpec:
+    """The response fields of a model, compiled to (key, getter, converter) tuples."""
+
+    def __init__(self, *fields: Union[str, Field]):
+        self.fields = tuple(f if isinstance(f, Field) else Field(f) for f in fields)
+        self._compiled = {
+            exact: tuple((f.key, f.getter, f.converter(exact)) for f in self.fields)
+            for exact in (False, True)
+        }
+
+    def dump(self, obj, exact: Optional[bool] = None) -> Dict[str, Any]:
+        data = {}
+        for key, getter, convert in self._compiled[exact_money() if exact is None else exact]:
+            value = getter(obj)
+            data[key] = convert(value) if convert else value
+        return data
+
+    def dump_many(self, objs: Iterable) -> List[Dict[str, Any]]:
+        exact = exact_money()
+        return [self.dump(obj, exact) for obj in objs]
+
+
+def _default(o):
+    if isinstance(o, (datetime.date, datetime.time)):
+        return o.isoformat()
+    if isinstance(o, decimal.Decimal):
+        return str(o)
+    return DefaultJSONProvider.default(o)
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """
+    Flask JSON provider encoding with orjson (dates as ISO 8601, Decimals as
+    strings); falls back to stdlib json when orjson is not installed, when
+    called with json.dumps keyword arguments, or for values orjson cannot
+    encode (e.g. integers beyond 64 bits).
+    """
+
+    default = staticmethod(_default)
+
+    def _orjson_dumps(self, obj, indent: bool = False) -> Optional[bytes]:
+        orjson = backends.get('orjson')
+        if orjson is None:
+            return None
+        option = orjson.OPT_NON_STR_KEYS
+        if self.sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        try:
+            return orjson.dumps(obj, default=_default, option=option)
+        except orjson.JSONEncodeError:
+            return None
+
+    def dumps(self, obj, **kwargs) -> str:
+        if not kwargs:
+            encoded = self._orjson_dumps(obj)
+            if encoded is not None:
+                return encoded.decode()
+        return super().dumps(obj, **kwargs)
+
+    def loads(self, s, **kwargs):
+        orjson = backends.get('orjson')
+        if orjson is None or kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        indent = (self.compact is None and self._app.debug) or self.compact is False
+        encoded = self._orjson_dumps(obj, indent=indent)
+        if encoded is None:
+            return super().response(obj)
+        return self._app.response_class(encoded + b'\n', mimetype=self.mimetype)
@@ -0,0 +1,421 @@
+"""
+Share-Out
+End-of-cycle distribution of a group's savings and profits. At the end of
+each saving cycle members take out their savings plus a share of what the
+group earned during the cycle (loan interest and paid fines).
+
+Profit is shared by time-weighted savings ("share-days"): every amount
+counts for the days it was held in the cycle, so money saved in the first
+week earns more than the same amount saved in the last. For each account
+
+    share_days = opening x cycle_days + sum(signed amount x days to cycle end)
+
+The transaction history of every group being shared out is loaded once
+and weighted in NumPy array operations, with amounts held in integer
+cents. Profit is split pro-rata by share-days and rounded to cents by
+largest remainder, so the shares add up to the profit pool exactly.
+
+Retained funds (SOCIAL, ECD) stay with the group and are not shared out.
+
+A share-out is computed as a DRAFT that officers review (and may recompute
+as late payments come in), then posted: the cycle's savings are withdrawn
+from every account in one transaction and the draft becomes POSTED.
+"""
+import datetime
+from decimal import Decimal
+from typing import Dict, Iterable, List, Optional
+from sqlalchemy import Date, Integer, Numeric, String
+from project import db
+from project.api.archival import HISTORY_SQL
+from project.api.balance_service import apply_deltas
+from project.api.loan_delinquency import ACTIVE_LOAN_STATUSES
+from project.api.media_backends import backends
+from project.api.member_counters import apply_contribution_deltas
+from project.api.models import GroupTransaction, SavingTransaction, ShareOut, ShareOutItem
+from project.api.saving_cycles import SavingCycle, add_months, current_cycles
+
+
+RETAINED_FUND_CODES = ('SOCIAL', 'ECD')
+
+_TRANSACTION_DATE = 'COALESCE(st.transaction_date, DATE(st.created_date))'
+
+CYCLE_TRANSACTIONS_SQL = f"""
+    SELECT gm.group_id, ms.member_id, st.member_saving_id, st.transaction_type, st.amount,
+           {_TRANSACTION_DATE} AS transaction_date
+    FROM {HISTORY_SQL['saving_transactions']} st
+    JOIN member_savings ms ON ms.id = st.member_saving_id
+    JOIN saving_types sty ON sty.id = ms.saving_type_id
+    JOIN group_members gm ON gm.id = ms.member_id
+    WHERE gm.group_id IN :group_ids
+    AND st.verification_status = 'VERIFIED'
+    AND sty.code NOT IN :retained_codes
+    AND {_TRANSACTION_DATE} >= :window_start AND {_TRANSACTION_DATE} < :window_end
+"""
+
+OPENING_BALANCES_SQL = f"""
+    SELECT gm.group_id, ms.member_id, st.member_saving_id,
+           SUM(CASE WHEN st.transaction_type = 'DEPOSIT' THEN st.amount ELSE -st.amount END) AS amount
+    FROM {HISTORY_SQL['saving_transactions']} st
+    JOIN member_savings ms ON ms.id = st.member_saving_id
+    JOIN saving_types sty ON sty.id = ms.saving_type_id
+    JOIN group_members gm ON gm.id = ms.member_id
+    WHERE gm.group_id IN :group_ids
+    AND st.verification_status = 'VERIFIED'
+    AND sty.code NOT IN :retained_codes
+    AND {_TRANSACTION_DATE} < :window_start
+    GROUP BY gm.group_id, ms.member_id, st.member_saving_id
+"""
+
+# Daily income per group: loan interest received and fines paid
+CYCLE_INCOME_SQL = f"""
+    SELECT l.group_id, 'INTEREST' AS source, lr.repayment_date AS income_date, SUM(lr.interest_amount) AS amount
+    FROM {HISTORY_SQL['loan_repayments']} lr
+    JOIN group_loans l ON l.id = lr.loan_id
+    WHERE l.group_id IN :group_ids
+    AND lr.repayment_date >= :window_start AND lr.repayment_date < :window_end
+    GROUP BY l.group_id, lr.repayment_date
+    UNION ALL
+    SELECT gm.group_id, 'FINES' AS source, COALESCE(mf.payment_date, mf.fine_date) AS income_date,
+           SUM(CASE WHEN mf.paid_amount > 0 THEN mf.paid_amount ELSE mf.amount END) AS amount
+    FROM {HISTORY_SQL['member_fines']} mf
+    JOIN group_members gm ON gm.id = mf.member_id
+    WHERE gm.group_id IN :group_ids
+    AND mf.is_paid = TRUE
+    AND COALESCE(mf.payment_date, mf.fine_date) >= :window_start
+    AND COALESCE(mf.payment_date, mf.fine_date) < :window_end
+    GROUP BY gm.group_id, COALESCE(mf.payment_date, mf.fine_date)
+"""
+
+OUTSTANDING_LOANS_SQL = db.text("""
+    SELECT member_id, SUM(outstanding_balance) AS outstanding
+    FROM group_loans
+    WHERE group_id IN :group_ids AND status IN :loan_statuses AND outstanding_balance > 0
+    GROUP BY member_id
+""").bindparams(
+    db.bindparam('group_ids', expanding=True), db.bindparam('loan_statuses', expanding=True)
+).columns(member_id=Integer, outstanding=Numeric(15, 2))
+
+POST_SHARE_OUT_SQL = db.text("""
+    UPDATE share_outs
+    SET status = 'POSTED', posted_by = :posted_by, posted_date = :posted_date, updated_date = :posted_date
+    WHERE id = :share_out_id AND status = 'DRAFT'
+    RETURNING id
+""")
+
+DELETE_DRAFT_ITEMS_SQL = db.text("""
+    DELETE FROM share_out_items WHERE share_out_id IN (
+        SELECT id FROM share_outs WHERE group_id = :group_id AND cycle_start = :cycle_start AND status = 'DRAFT'
+    )
+""")
+
+DELETE_DRAFT_SQL = db.text(
+    "DELETE FROM share_outs WHERE group_id = :group_id AND cycle_start = :cycle_start AND status = 'DRAFT'"
+)
+
+
+class ShareOutConflict(Exception):
+    """The share-out cannot be created or posted in its current state."""
+
+
+def _numpy():
+    np = backends.get('numpy')
+    if np is None:
+        raise RuntimeError('NumPy is required to compute share-outs')
+    return np
+
+
+def _query(sql: str, **columns):
+    binds = [db.bindparam(name, expanding=True) for name in ('group_ids', 'retained_codes') if f':{name}' in sql]
+    return db.text(sql).bindparams(*binds).columns(**columns)
+
+
+def _cents(value) -> int:
+    return int((Decimal(str(value or 0)) * 100).to_integral_value())
+
+
+def _money(cents) -> Decimal:
+    return Decimal(int(cents)) / 100
+
+
+def closing_cycles(month: datetime.date, group_ids: Optional[Iterable[int]] = None) -> Dict[int, SavingCycle]:
+    """Saving cycles whose last day falls in the month of the given date, per group."""
+    month_start = month.replace(day=1)
+    next_month = add_months(month_start, 1)
+    return {
+        group_id: cycle.shifted(-1)
+        for group_id, cycle in current_cycles(group_ids, next_month).items()
+        if cycle.number > 1 and month_start < cycle.start <= next_month
+    }
+
+
+def last_closed_cycle(group_id: int, as_of: Optional[datetime.date] = None) -> Optional[SavingCycle]:
+    """The most recent cycle of the group that has ended, or None if it is still in its first."""
+    cycle = current_cycles([group_id], as_of).get(group_id)
+    return cycle.shifted(-1) if cycle and cycle.number > 1 else None
+
+
+def compute_share_outs(cycles: Dict[int, SavingCycle]) -> Dict[int, Dict]:
+    """
+    Compute the share-out of each group for the given cycle, in one pass.
+
+    Args:
+        cycles: group_id -> cycle being shared out
+
+    Returns:
+        group_id -> dictionary with the cycle, group totals (Decimal),
+        items (one per member with savings in the cycle) and
+        account_closings (member_saving_id -> (member_id, closing balance))
+    """
+    np = _numpy()
+    if not cycles:
+        return {}
+    group_ids = sorted(cycles)
+    window = {
+        'group_ids': group_ids,
+        'retained_codes': list(RETAINED_FUND_CODES),
+        'window_start': min(c.start for c in cycles.values()),
+        'window_end': max(c.end for c in cycles.values()),
+    }
+
+    opening_rows = db.session.execute(_query(
+        OPENING_BALANCES_SQL, group_id=Integer, member_id=Integer, member_saving_id=Integer, amount=Numeric(15, 2)
+    ), window).fetchall()
+    transaction_rows = db.session.execute(_query(
+        CYCLE_TRANSACTIONS_SQL, group_id=Integer, member_id=Integer, member_saving_id=Integer,
+        transaction_type=String, amount=Numeric(12, 2), transaction_date=Date
+    ), window).fetchall()
+    income_rows = db.session.execute(_query(
+        CYCLE_INCOME_SQL, group_id=Integer, source=String, income_date=Date, amount=Numeric(15, 2)
+    ), window).fetchall()
+    outstanding = {
+        row.member_id: row.outstanding for row in db.session.execute(
+            OUTSTANDING_LOANS_SQL, {'group_ids': group_ids, 'loan_statuses': list(ACTIVE_LOAN_STATUSES)})
+    }
+
+    # Dense indexes: groups, member savings accounts and members
+    group_index = {group_id: i for i, group_id in enumerate(group_ids)}
+    accounts = {}
+    for row in list(opening_rows) + list(transaction_rows):
+        accounts.setdefault(row.member_saving_id, (row.group_id, row.member_id))
+    account_ids = list(accounts)
+    account_index = {account_id: i for i, account_id in enumerate(account_ids)}
+    member_ids = sorted({member_id for _, member_id in accounts.values()})
+    member_index = {member_id: i for i, member_id in enumerate(member_ids)}
+    member_group = np.array([0] * len(member_ids), dtype=np.int64)
+    for group_id, member_id in accounts.values():
+        member_group[member_index[member_id]] = group_index[group_id]
+    account_member = np.array([member_index[accounts[a][1]] for a in account_ids], dtype=np.int64)
+    account_group = member_group[account_member]
+
+    starts = np.array([cycles[g].start for g in group_ids], dtype='datetime64[D]')
+    ends = np.array([cycles[g].end for g in group_ids], dtype='datetime64[D]')
+    cycle_days = (ends - starts).astype(np.int64)
+
+    n_accounts, n_members, n_groups = len(account_ids), len(member_ids), len(group_ids)
+    opening = np.zeros(n_accounts, dtype=np.int64)
+    for row in opening_rows:
+        opening[account_index[row.member_saving_id]] += _cents(row.amount)
+
+    # Rows dated before their group's cycle (the window starts at the earliest cycle) are opening balance
+    tx_account = np.array([account_index[r.member_saving_id] for r in transaction_rows], dtype=np.int64)
+    tx_date = np.array([r.transaction_date for r in transaction_rows], dtype='datetime64[D]')
+    tx_amount = np.array([_cents(r.amount) for r in transaction_rows], dtype=np.int64)
+    tx_deposit = np.array([r.transaction_type == 'DEPOSIT' for r in transaction_rows], dtype=bool)
+    tx_signed = np.where(tx_deposit, tx_amount, -tx_amount)
+    tx_group = account_group[tx_account]
+    before = tx_date < starts[tx_group]
+    in_cycle = ~before & (tx_date < ends[tx_group])
+
+    opening += np.bincount(tx_account[before], weights=tx_signed[before], minlength=n_accounts).astype(np.int64)
+    deposits = np.bincount(tx_account[in_cycle & tx_deposit], weights=tx_amount[in_cycle & tx_deposit],
+                           minlength=n_accounts).astype(np.int64)
+    withdrawals = np.bincount(tx_account[in_cycle & ~tx_deposit], weights=tx_amount[in_cycle & ~tx_deposit],
+                              minlength=n_accounts).astype(np.int64)
+    closing = opening + deposits - withdrawals
+
+    days_held = (ends[tx_group] - tx_date).astype(np.int64)
+    weighted = opening * cycle_days[account_group] + np.bincount(
+        tx_account[in_cycle], weights=(tx_signed * days_held)[in_cycle], minlength=n_accounts).astype(np.int64)
+
+    def per_member(values):
+        return np.bincount(account_member, weights=values, minlength=n_members).astype(np.int64)
+
+    member_opening, member_deposits = per_member(opening), per_member(deposits)
+    member_withdrawals, member_closing = per_member(withdrawals), per_member(closing)
+    share_days = np.clip(per_member(weighted), 0, None)
+
+    income_group = np.array([group_index[r.group_id] for r in income_rows], dtype=np.int64)
+    income_date = np.array([r.income_date for r in income_rows], dtype='datetime64[D]')
+    income_amount = np.array([_cents(r.amount) for r in income_rows], dtype=np.int64)
+    income_interest = np.array([r.source == 'INTEREST' for r in income_rows], dtype=bool)
+    income_in_cycle = (income_date >= starts[income_group]) & (income_date < ends[income_group])
+    interest = np.bincount(income_group[income_in_cycle & income_interest],
+                           weights=income_amount[income_in_cycle & income_interest], minlength=n_groups)
+    fines = np.bincount(income_group[income_in_cycle & ~income_interest],
+                        weights=income_amount[income_in_cycle & ~income_interest], minlength=n_groups)
+    profit_pool = (interest + fines).astype(np.int64)
+
+    # Pro-rata profit, floored to cents; the leftover cents go to the largest remainders
+    total_share_days = np.bincount(member_group, weights=share_days, minlength=n_groups)
+    group_share_days = total_share_days[member_group]
+    fraction = np.divide(share_days, group_share_days, out=np.zeros(n_members), where=group_share_days > 0)
+    exact = profit_pool[member_group] * fraction
+    profit = np.floor(exact).astype(np.int64)
+    leftover = np.where(total_share_days > 0,
+                        profit_pool - np.bincount(member_group, weights=profit, minlength=n_groups), 0)
+    order = np.lexsort((-(exact - profit), member_group))
+    first_in_group = np.searchsorted(member_group[order], np.arange(n_groups))
+    rank = np.empty(n_members, dtype=np.int64)
+    rank[order] = np.arange(n_members) - first_in_group[member_group[order]]
+    profit += rank < leftover[member_group]
+
+    results = {
+        group_id: {
+            'cycle': cycles[group_id],
+            'interest_income': _money(interest[i]),
+            'fine_income': _money(fines[i]),
+            'profit_pool': _money(profit_pool[i]),
+            'total_share_days': _money(total_share_days[i]),
+            'items': [],
+            'account_closings': {},
+        } for group_id, i in group_index.items()
+    }
+    for member_id, m in member_index.items():
+        if not member_closing[m] and not share_days[m]:
+            continue
+        results[group_ids[member_group[m]]]['items'].append({
+            'member_id': member_id,
+            'opening_balance': _money(member_opening[m]),
+            'deposits': _money(member_deposits[m]),
+            'withdrawals': _money(member_withdrawals[m]),
+            'closing_balance': _money(member_closing[m]),
+            'share_days': _money(share_days[m]),
+            'share_percentage': round(Decimal(str(fraction[m] * 100)), 4),
+            'profit_share': _money(profit[m]),
+            'payout_amount': _money(max(member_closing[m], 0) + profit[m]),
+            'outstanding_loans': Decimal(str(outstanding.get(member_id) or 0)),
+        })
+    for account_id, a in account_index.items():
+        group_id, member_id = accounts[account_id]
+        if closing[a] > 0:
+            results[group_id]['account_closings'][account_id] = (member_id, _money(closing[a]))
+
+    for result in results.values():
+        items = result['items']
+        result['members_count'] = len(items)
+        result['total_savings'] = sum((i['closing_balance'] for i in items), Decimal('0'))
+        result['total_payout'] = sum((i['payout_amount'] for i in items), Decimal('0'))
+    return results
+
+
+def create_drafts(cycles: Dict[int, SavingCycle], created_by: Optional[int] = None) -> List[ShareOut]:
+    """
+    Compute and store DRAFT share-outs, replacing any earlier draft of the
+    same cycle. Cycles already POSTED are skipped. Does not commit.
+
+    Returns:
+        The drafts created
+    """
+    posted = {
+        (row.group_id, row.cycle_start) for row in ShareOut.query.filter(
+            ShareOut.group_id.in_(list(cycles)), ShareOut.status == 'POSTED'
+        ).with_entities(ShareOut.group_id, ShareOut.cycle_start)
+    } if cycles else set()
+    cycles = {g: c for g, c in cycles.items() if (g, c.start) not in posted}
+
+    drafts = []
+    for group_id, result in sorted(compute_share_outs(cycles).items()):
+        cycle = result['cycle']
+        params = {'group_id': group_id, 'cycle_start': cycle.start}
+        db.session.execute(DELETE_DRAFT_ITEMS_SQL, params)
+        db.session.execute(DELETE_DRAFT_SQL, params)
+
+        share_out = ShareOut(
+            group_id=group_id, cycle_number=cycle.number, cycle_start=cycle.start, cycle_end=cycle.end,
+            status='DRAFT', members_count=result['members_count'], total_savings=result['total_savings'],
+            interest_income=result['interest_income'], fine_income=result['fine_income'],
+            profit_pool=result['profit_pool'], total_payout=result['total_payout'],
+            total_share_days=result['total_share_days'], created_by=created_by
+        )
+        db.session.add(share_out)
+        db.session.flush()
+        if result['items']:
+            db.session.execute(ShareOutItem.__table__.insert(), [
+                dict(item, share_out_id=share_out.id) for item in result['items']
+            ])
+        drafts.append(share_out)
+    return drafts
+
+
+def post_share_out(share_out: ShareOut, posted_by: int) -> Dict:
+    """
+    Pay out a DRAFT share-out: withdraw every member's cycle savings,
+    record the group's payout and mark it POSTED. Does not commit; the
+    caller commits (or rolls back on ShareOutConflict) once.
+
+    Raises:
+        ShareOutConflict: Already posted, loans still outstanding, or
+            savings changed since the draft was computed
+    """
+    if share_out.status != 'DRAFT':
+        raise ShareOutConflict(f'Share-out is already {share_out.status}')
+
+    # Claim the draft first, so of two officers posting at once exactly one gets here
+    now = datetime.datetime.utcnow()
+    claimed = db.session.execute(POST_SHARE_OUT_SQL, {
+        'share_out_id': share_out.id, 'posted_by': posted_by, 'posted_date': now
+    }).first()
+    if claimed is None:
+        raise ShareOutConflict('Share-out is already posted')
+
+    cycle = SavingCycle(share_out.group_id, share_out.cycle_start, 0, share_out.cycle_number,
+                        share_out.cycle_start, share_out.cycle_end)
+    result = compute_share_outs({share_out.group_id: cycle})[share_out.group_id]
+
+    with_loans = [i['member_id'] for i in result['items'] if i['outstanding_loans'] > 0]
+    if with_loans:
+        raise ShareOutConflict(f'{len(with_loans)} member(s) still have outstanding loans')
+
+    drafted = {item.member_id: item for item in share_out.items}
+    computed = {i['member_id']: i for i in result['items']}
+    if (set(drafted) != set(computed) or result['profit_pool'] != share_out.profit_pool
+            or any(drafted[m].closing_balance != i['closing_balance']
+                   or drafted[m].profit_share != i['profit_share'] for m, i in computed.items())):
+        raise ShareOutConflict('Savings or income changed since the draft was computed; recompute it')
+
+    payout_date = share_out.cycle_end - datetime.timedelta(days=1)
+    reference = f'SHAREOUT-{share_out.id}'
+    closings = result['account_closings']
+    if closings:
+        db.session.execute(SavingTransaction.__table__.insert(), [{
+            'member_saving_id': account_id,
+            'amount': amount,
+            'transaction_type': 'WITHDRAWAL',
+            'transaction_date': payout_date,
+            'description': f'Cycle {share_out.cycle_number} share-out',
+            'reference_number': reference,
+            'is_mobile_money': False,
+            'verification_status': 'VERIFIED',
+            'verified_by': posted_by,
+            'verified_date': now,
+            'created_date': now,
+        } for account_id, (_, amount) in closings.items()])
+        apply_deltas({account_id: (Decimal('0'), amount) for account_id, (_, amount) in closings.items()},
+                     payout_date)
+
+        member_withdrawals = {}
+        for member_id, amount in closings.values():
+            member_withdrawals[member_id] = member_withdrawals.get(member_id, Decimal('0')) + amount
+        apply_contribution_deltas({member_id: (0, amount) for member_id, amount in member_withdrawals.items()})
+
+    db.session.add(GroupTransaction(
+        group_id=share_out.group_id, transaction_type='SHARE_OUT', amount=share_out.total_payout,
+        description=f'Cycle {share_out.cycle_number} share-out to {share_out.members_count} members',
+        reference_number=reference, status='COMPLETED', created_by=posted_by
+    ))
+    return {
+        'share_out_id': share_out.id,
+        'members_paid': share_out.members_count,
+        'accounts_withdrawn': len(closings),
+        'total_payout': float(share_out.total_payout),
+    }
@@ -0,0 +1,170 @@
+"""
+Share-Out API
+Draft, review and post the end-of-cycle share-out of a group (see share_out.py).
+"""
+import datetime
+from flask import Blueprint, jsonify, request
+from functools import wraps
+import jwt
+from flask import current_app
+from project import db
+from project.api.models import ShareOut
+from project.api.shared_cache import bump_group_version
+from project.api.remote_payments import is_officer_or_admin
+from project.api.share_out import ShareOutConflict, closing_cycles, create_drafts, last_closed_cycle, post_share_out
+
+share_outs_blueprint = Blueprint('share_outs', __name__)
+
+
+def authenticate(f):
+    """Decorator to authenticate requests."""
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        auth_header = request.headers.get('Authorization')
+        if not auth_header:
+            return jsonify({
+                'status': 'fail',
+                'message': 'Provide a valid auth token.'
+            }), 401
+
+        try:
+            auth_token = auth_header.split(' ')[1]
+            payload = jwt.decode(
+                auth_token,
+                current_app.config.get('SECRET_KEY'),
+                algorithms=['HS256']
+            )
+            user_id = payload['sub']
+            return f(user_id, *args, **kwargs)
+        except (jwt.ExpiredSignatureError, jwt.InvalidTokenError, IndexError):
+            return jsonify({
+                'status': 'fail',
+                'message': 'Invalid token.'
+            }), 401
+
+    return decorated_function
+
+
+def _share_out_data(share_out):
+    data = share_out.to_dict()
+    data['items'] = [item.to_dict() for item in share_out.items.order_by('member_id')]
+    return data
+
+
+@share_outs_blueprint.route('/groups/<int:group_id>/share-outs', methods=['GET'])
+@authenticate
+def list_share_outs(user_id, group_id):
+    """List a group's share-outs, most recent cycle first (officers/admins only)."""
+    if not is_officer_or_admin(user_id, group_id):
+        return jsonify({
+            'status': 'error',
+            'message': 'Only officers and admins can view share-outs'
+        }), 403
+
+    share_outs = ShareOut.query.filter_by(group_id=group_id).order_by(ShareOut.cycle_start.desc()).all()
+    return jsonify({'status': 'success', 'data': [s.to_dict() for s in share_outs]}), 200
+
+
+@share_outs_blueprint.route('/groups/<int:group_id>/share-outs', methods=['POST'])
+@authenticate
+def create_share_out(user_id, group_id):
+    """
+    Compute a DRAFT share-out for review (officers/admins only). Computing
+    again replaces the earlier draft of the same cycle.
+
+    Request Body (optional):
+    {
+        "month": "2026-09"  // share out the cycle ending that month (default: last closed cycle)
+    }
+    """
+    if not is_officer_or_admin(user_id, group_id):
+        return jsonify({
+            'status': 'error',
+            'message': 'Only officers and admins can compute share-outs'
+        }), 403
+
+    data = request.get_json(silent=True) or {}
+    try:
+        if data.get('month'):
+            month = datetime.datetime.strptime(data['month'], '%Y-%m').date()
+            cycle = closing_cycles(month, [group_id]).get(group_id)
+        else:
+            cycle = last_closed_cycle(group_id)
+    except ValueError:
+        return jsonify({'status': 'error', 'message': 'month must be YYYY-MM'}), 400
+
+    if cycle is None:
+        return jsonify({
+            'status': 'error',
+            'message': 'No saving cycle of this group has closed in that period'
+        }), 404
+
+    try:
+        drafts = create_drafts({group_id: cycle}, created_by=user_id)
+        if not drafts:
+            db.session.rollback()
+            return jsonify({
+                'status': 'error',
+                'message': f'Cycle {cycle.number} has already been shared out'
+            }), 409
+        db.session.commit()
+
+        return jsonify({'status': 'success', 'data': _share_out_data(drafts[0])}), 201
+
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'status': 'error', 'message': str(e)}), 400
+
+
+@share_outs_blueprint.route('/groups/<int:group_id>/share-outs/<int:share_out_id>', methods=['GET'])
+@authenticate
+def get_share_out(user_id, group_id, share_out_id):
+    """Get a share-out with every member's line (officers/admins only)."""
+    if not is_officer_or_admin(user_id, group_id):
+        return jsonify({
+            'status': 'error',
+            'message': 'Only officers and admins can view share-outs'
+        }), 403
+
+    share_out = ShareOut.query.filter_by(id=share_out_id, group_id=group_id).first()
+    if not share_out:
+        return jsonify({'status': 'error', 'message': 'Share-out not found'}), 404
+
+    return jsonify({'status': 'success', 'data': _share_out_data(share_out)}), 200
+
+
+@share_outs_blueprint.route('/groups/<int:group_id>/share-outs/<int:share_out_id>/post', methods=['POST'])
+@authenticate
+def post_group_share_out(user_id, group_id, share_out_id):
+    """
+    Post a DRAFT share-out (officers/admins only): withdraws every member's
+    cycle savings and records the payout, in one transaction. Refused while
+    members have outstanding loans or if the draft is out of date.
+    """
+    if not is_officer_or_admin(user_id, group_id):
+        return jsonify({
+            'status': 'error',
+            'message': 'Only officers and admins can post share-outs'
+        }), 403
+
+    share_out = ShareOut.query.filter_by(id=share_out_id, group_id=group_id).first()
+    if not share_out:
+        return jsonify({'status': 'error', 'message': 'Share-out not found'}), 404
+
+    try:
+        result = post_share_out(share_out, posted_by=user_id)
+        db.session.commit()
+        bump_group_version(group_id)
+
+        return jsonify({
+            'status': 'success',
+            'message': 'Share-out posted',
+            'data': result
+        }), 200
+
+    except ShareOutConflict as e:
+        db.session.rollback()
+        return jsonify({'status': 'error', 'message': str(e)}), 409
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'status': 'error', 'message': str(e)}), 400
@@ -0,0 +1,223 @@
+"""
+Shared Cache
+Versioned cache shared by every gunicorn worker on a host, for group
+configuration (settings, saving types) that changes rarely but is read on
+almost every screen, and for group aggregates every member would otherwise
+recompute (dashboard averages).
+
+Each group has a version counter; every write to its settings, saving
+types, meetings, transactions or the group itself calls
+bump_group_version() after the commit.
+Entries are stored with the version they were computed at, so a bump makes
+every worker miss and reload once, from the primary. Entries also expire
+after SHARED_CACHE_TTL_SECONDS, which bounds staleness for changes made
+outside the API (SQL, seeds).
+
+cached_json_response() serves an entry with an ETag (a hash of the body):
+a client sending it back in If-None-Match gets 304 Not Modified without a
+database query or a body.
+
+The store is a SQLite file (SHARED_CACHE_PATH, one per database URL by
+default) in WAL mode; nothing needs to run beside the app. If the store
+cannot be used, values are computed on every request as before.
+"""
+import hashlib
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from typing import Any, Callable, Optional, Tuple
+from flask import current_app, request
+
+
+DEFAULT_TTL_SECONDS = 300
+
+SCHEMA = """
+    CREATE TABLE IF NOT EXISTS group_versions (
+        group_id INTEGER PRIMARY KEY,
+        version INTEGER NOT NULL
+    );
+    CREATE TABLE IF NOT EXISTS cache_entries (
+        group_id INTEGER NOT NULL,
+        name TEXT NOT NULL,
+        version INTEGER NOT NULL,
+        expires_at REAL NOT NULL,
+        etag TEXT NOT NULL,
+        body BLOB NOT NULL,
+        PRIMARY KEY (group_id, name)
+    );
+"""
+
+CURRENT_VERSION_SQL = "SELECT COALESCE((SELECT version FROM group_versions WHERE group_id = ?), 0)"
+
+# The entry only counts if it was computed at the group's current version
+FRESH_ENTRY_SQL = """
+    SELECT e.etag, e.body FROM cache_entries e
+    WHERE e.group_id = ? AND e.name = ? AND e.expires_at > ?
+      AND e.version = COALESCE((SELECT v.version FROM group_versions v WHERE v.group_id = e.group_id), 0)
+"""
+
+BUMP_VERSION_SQL = """
+    INSERT INTO group_versions (group_id, version) VALUES (?, 1)
+    ON CONFLICT (group_id) DO UPDATE SET version = version + 1
+"""
+
+
+class SharedCache:
+    """
+    Group-versioned key/value store in a SQLite file shared by processes.
+
+    Connections are opened per process and thread, so the store is safe to
+    use from forked gunicorn workers and threaded servers alike.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._local = threading.local()
+
+    def _connection(self) -> sqlite3.Connection:
+        local = self._local
+        if getattr(local, 'pid', None) != os.getpid():
+            connection = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('PRAGMA synchronous=NORMAL')
+            connection.executescript(SCHEMA)
+            local.connection, local.pid = connection, os.getpid()
+        return local.connection
+
+    def version(self, group_id: int) -> int:
+        return self._connection().execute(CURRENT_VERSION_SQL, (group_id,)).fetchone()[0]
+
+    def get(self, group_id: int, name: str) -> Optional[Tuple[str, bytes]]:
+        """(etag, body) of the entry if it is current and unexpired, else None."""
+        return self._connection().execute(FRESH_ENTRY_SQL, (group_id, name, time.time())).fetchone()
+
+    def set(self, group_id: int, name: str, version: int, body: bytes, ttl: float) -> str:
+        """Store body as computed at version; returns its ETag."""
+        etag = hashlib.sha1(body).hexdigest()
+        self._connection().execute(
+            "INSERT OR REPLACE INTO cache_entries (group_id, name, version, expires_at, etag, body) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            (group_id, name, version, time.time() + ttl, etag, body)
+        )
+        return etag
+
+    def bump(self, group_id: int):
+        """Move the group to a new version, dropping its entries."""
+        connection = self._connection()
+        connection.execute('BEGIN IMMEDIATE')
+        try:
+            connection.execute(BUMP_VERSION_SQL, (group_id,))
+            connection.execute('DELETE FROM cache_entries WHERE group_id = ?', (group_id,))
+            connection.execute('COMMIT')
+        except Exception:
+            connection.execute('ROLLBACK')
+            raise
+
+    def clear(self):
+        self._connection().execute('DELETE FROM cache_entries')
+
+
+_caches = {}
+_caches_lock = threading.Lock()
+
+
+def default_cache_path(database_uri: str) -> str:
+    """A cache file per database, so two apps on one host never share entries."""
+    digest = hashlib.sha1((database_uri or '').encode()).hexdigest()[:12]
+    return os.path.join(tempfile.gettempdir(), f'microsavings-cache-{digest}.db')
+
+
+def shared_cache() -> SharedCache:
+    config = current_app.config
+    path = config.get('SHARED_CACHE_PATH') or default_cache_path(config.get('SQLALCHEMY_DATABASE_URI'))
+    cache = _caches.get(path)
+    if cache is None:
+        with _caches_lock:
+            cache = _caches.setdefault(path, SharedCache(path))
+    return cache
+
+
+def _ttl() -> float:
+    return current_app.config.get('SHARED_CACHE_TTL_SECONDS', DEFAULT_TTL_SECONDS)
+
+
+def _load_from_primary(loader: Callable[[], Any]) -> Any:
+    # A freshly bumped version must not be cached from a lagging replica
+    current_app.extensions['sqlalchemy'].session.info['replica'] = None
+    return loader()
+
+
+def bump_group_version(group_id: int):
+    """Invalidate a group's cached configuration in every worker; call after the commit."""
+    if group_id is None:
+        return
+    try:
+        shared_cache().bump(group_id)
+    except sqlite3.Error as e:
+        current_app.logger.warning(f'Shared cache unavailable, group {group_id} not invalidated: {e}')
+
+
+def get_or_compute(group_id: int, name: str, loader: Callable[[], Any]) -> Any:
+    """
+    The cached value for (group_id, name), computing it with loader on a miss.
+
+    Args:
+        group_id: Group the value belongs to
+        name: Name of the cached value
+        loader: Zero-argument callable returning a JSON-serializable value
+    """
+    json = current_app.json
+    try:
+        cache = shared_cache()
+        entry = cache.get(group_id, name)
+        if entry:
+            return json.loads(entry[1])
+        version = cache.version(group_id)
+    except sqlite3.Error as e:
+        current_app.logger.warning(f'Shared cache unavailable: {e}')
+        return loader()
+
+    value = _load_from_primary(loader)
+    try:
+        cache.set(group_id, name, version, json.dumps(value).encode(), _ttl())
+    except sqlite3.Error as e:
+        current_app.logger.warning(f'Shared cache unavailable: {e}')
+    return value
+
+
+def cached_json_response(group_id: int, name: str, loader: Callable[[], Any]):
+    """
+    A success response for {'status': 'success', 'data': loader()}, served
+    from the shared cache with an ETag, or 304 if the client has it already.
+    Returns None (and caches nothing) when loader returns None.
+    """
+    etag = body = None
+    try:
+        cache = shared_cache()
+        entry = cache.get(group_id, name)
+        if entry:
+            etag, body = entry
+        else:
+            version = cache.version(group_id)
+    except sqlite3.Error as e:
+        current_app.logger.warning(f'Shared cache unavailable: {e}')
+        cache = None
+
+    if body is None:
+        data = _load_from_primary(loader) if cache else loader()
+        if data is None:
+            return None
+        body = current_app.json.response({'status': 'success', 'data': data}).get_data()
+        if cache:
+            try:
+                etag = cache.set(group_id, name, version, body, _ttl())
+            except sqlite3.Error as e:
+                current_app.logger.warning(f'Shared cache unavailable: {e}')
+
+    response = current_app.response_class(body, mimetype=current_app.json.mimetype)
+    response.set_etag(etag or hashlib.sha1(body).hexdigest())
+    response.cache_control.private = True
+    response.cache_control.no_cache = True
+    return response.make_conditional(request)
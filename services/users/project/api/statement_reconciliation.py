@@ -0,0 +1,297 @@
+"""
+Statement Reconciliation
+Matches a mobile-money provider statement (MTN, Airtel, ... CSV exports)
+against PENDING remote payments.
+
+The group's pending payments are loaded once as plain rows (no ORM
+objects) into two hash indexes: by normalized reference, and by
+(normalized phone, amount). Statement lines are streamed from the CSV in
+batches and matched in O(1) each:
+1. by reference - an exact match when the amount also agrees
+2. otherwise by (phone, amount), among payments submitted within the
+   time window of the statement line
+Each pending payment is matched at most once. Lines matching more than
+one candidate (or a reference with a different amount) are ambiguous and
+left for an officer. Amounts keep their sign: debit lines (refunds,
+reversals) are never matched and are reported as unmatched.
+"""
+import csv
+import datetime
+import re
+from collections import defaultdict
+from decimal import Decimal, InvalidOperation
+from typing import Dict, Iterable, Iterator, List, Optional
+from sqlalchemy import DateTime, Integer, Numeric, String
+from project import db
+
+
+BATCH_SIZE = 5000
+DEFAULT_WINDOW_HOURS = 72
+
+# Compare phone numbers on their last digits, so +256 7XX..., 2567XX... and 07XX... agree
+PHONE_DIGITS = 9
+
+# Unmatched lines are counted in full but only this many are listed
+MAX_UNMATCHED_DETAIL = 1000
+
+# Accepted header names (lower-cased) for each statement field
+COLUMN_ALIASES = {
+    'reference': ('reference', 'transaction_id', 'transaction id', 'txn_id', 'txn id', 'external_id',
+                  'receipt', 'receipt no', 'financial transaction id', 'id'),
+    'phone': ('phone', 'msisdn', 'phone_number', 'phone number', 'sender', 'from', 'mobile', 'from msisdn'),
+    'amount': ('amount', 'credit', 'value', 'paid in'),
+    'timestamp': ('timestamp', 'date', 'datetime', 'transaction_date', 'transaction date', 'time', 'completion time'),
+}
+
+TIMESTAMP_FORMATS = (
+    '%Y-%m-%d %H:%M:%S', '%Y-%m-%dT%H:%M:%S', '%Y-%m-%d %H:%M', '%d/%m/%Y %H:%M:%S',
+    '%d/%m/%Y %H:%M', '%d-%m-%Y %H:%M:%S', '%Y-%m-%d', '%d/%m/%Y',
+)
+
+PENDING_PAYMENTS_SQL = db.text("""
+    SELECT st.id, st.amount, st.mobile_money_reference, st.mobile_money_phone, st.created_date
+    FROM saving_transactions st
+    JOIN meetings m ON m.id = st.meeting_id
+    WHERE m.group_id = :group_id
+    AND st.is_mobile_money = TRUE
+    AND st.verification_status = 'PENDING'
+""").columns(id=Integer, amount=Numeric(12, 2), mobile_money_reference=String, mobile_money_phone=String,
+             created_date=DateTime)
+
+_NON_DIGITS = re.compile(r'\D')
+_AMOUNT_NOISE = re.compile(r'[^\d.\-]')
+
+
+class StatementFormatError(ValueError):
+    """The statement is missing columns needed for matching."""
+
+
+def normalize_reference(value) -> Optional[str]:
+    value = (value or '').strip().upper().replace(' ', '')
+    return value or None
+
+
+def normalize_phone(value) -> Optional[str]:
+    digits = _NON_DIGITS.sub('', value or '')
+    return digits[-PHONE_DIGITS:] if len(digits) >= PHONE_DIGITS else None
+
+
+def parse_amount(value) -> Optional[Decimal]:
+    try:
+        amount = Decimal(_AMOUNT_NOISE.sub('', str(value or '')))
+    except InvalidOperation:
+        return None
+    return amount.quantize(Decimal('0.01'))
+
+
+class _TimestampParser:
+    """Parses statement timestamps, remembering the format that last worked."""
+
+    def __init__(self):
+        self.last_format = None
+
+    def __call__(self, value) -> Optional[datetime.datetime]:
+        value = (value or '').strip()
+        if not value:
+            return None
+        if self.last_format:
+            try:
+                return datetime.datetime.strptime(value, self.last_format)
+            except ValueError:
+                pass
+        for fmt in TIMESTAMP_FORMATS:
+            try:
+                parsed = datetime.datetime.strptime(value, fmt)
+            except ValueError:
+                continue
+            self.last_format = fmt
+            return parsed
+        try:
+            return datetime.datetime.fromisoformat(value).replace(tzinfo=None)
+        except ValueError:
+            return None
+
+
+def _resolve_columns(fieldnames: Iterable[str]) -> Dict[str, str]:
+    by_name = {(name or '').strip().lower(): name for name in fieldnames or []}
+    columns = {}
+    for field, aliases in COLUMN_ALIASES.items():
+        for alias in aliases:
+            if alias in by_name:
+                columns[field] = by_name[alias]
+                break
+    if 'amount' not in columns or not ({'reference', 'phone'} & set(columns)):
+        raise StatementFormatError(
+            'Statement needs an amount column and a reference or phone column '
+            f"(found: {', '.join(by_name) or 'no header'})"
+        )
+    return columns
+
+
+def _checked(reader):
+    try:
+        yield from reader
+    except csv.Error as e:
+        raise StatementFormatError(f'Unreadable statement at line {reader.line_num}: {e}')
+
+
+def read_statement(text_stream) -> Iterator[List[Dict]]:
+    """
+    Stream a CSV statement as batches of normalized lines.
+
+    Yields:
+        Lists of dicts with line_number, reference, phone, amount, timestamp
+    """
+    reader = csv.DictReader(text_stream)
+    try:
+        columns = _resolve_columns(reader.fieldnames)
+    except csv.Error as e:
+        raise StatementFormatError(f'Unreadable statement: {e}')
+    parse_timestamp = _TimestampParser()
+    get = {field: columns.get(field) for field in COLUMN_ALIASES}
+
+    batch = []
+    for line_number, line in enumerate(_checked(reader), start=2):
+        batch.append({
+            'line_number': line_number,
+            'reference': normalize_reference(line.get(get['reference'])) if get['reference'] else None,
+            'phone': normalize_phone(line.get(get['phone'])) if get['phone'] else None,
+            'amount': parse_amount(line.get(get['amount'])),
+            'timestamp': parse_timestamp(line.get(get['timestamp'])) if get['timestamp'] else None,
+        })
+        if len(batch) >= BATCH_SIZE:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+class _PendingIndex:
+    """Hash indexes over a group's pending payments; matched payments are removed."""
+
+    def __init__(self, rows):
+        self.payments = {}
+        self.by_reference = defaultdict(list)
+        self.by_phone_amount = defaultdict(list)
+        for row in rows:
+            amount = Decimal(str(row.amount)).quantize(Decimal('0.01'))
+            payment = {
+                'transaction_id': row.id,
+                'amount': amount,
+                'reference': row.mobile_money_reference,
+                'phone': row.mobile_money_phone,
+                'submitted': row.created_date,
+            }
+            self.payments[row.id] = payment
+            reference = normalize_reference(row.mobile_money_reference)
+            if reference:
+                self.by_reference[reference].append(row.id)
+            phone = normalize_phone(row.mobile_money_phone)
+            if phone:
+                self.by_phone_amount[(phone, amount)].append(row.id)
+
+    def available(self, ids: List[int]) -> List[int]:
+        return [i for i in ids if i in self.payments]
+
+    def take(self, transaction_id: int) -> Dict:
+        return self.payments.pop(transaction_id)
+
+
+def _line_summary(line: Dict) -> Dict:
+    return {
+        'line_number': line['line_number'],
+        'reference': line['reference'],
+        'phone': line['phone'],
+        'amount': float(line['amount']) if line['amount'] is not None else None,
+        'timestamp': line['timestamp'].isoformat() if line['timestamp'] else None,
+    }
+
+
+def _payment_summary(payment: Dict) -> Dict:
+    return {
+        'transaction_id': payment['transaction_id'],
+        'amount': float(payment['amount']),
+        'mobile_money_reference': payment['reference'],
+        'mobile_money_phone': payment['phone'],
+        'submitted_date': payment['submitted'].isoformat() if payment['submitted'] else None,
+    }
+
+
+def reconcile_statement(group_id: int, text_stream, window_hours: int = DEFAULT_WINDOW_HOURS) -> Dict:
+    """
+    Match a statement against a group's pending remote payments.
+
+    Returns:
+        Dictionary with matched (each flagged exact or not), ambiguous and
+        unmatched lines, the pending payments left unmatched, and counts
+    """
+    rows = db.session.execute(PENDING_PAYMENTS_SQL, {'group_id': group_id}).fetchall()
+    index = _PendingIndex(rows)
+    window = datetime.timedelta(hours=window_hours)
+
+    def in_window(line, transaction_id):
+        submitted = index.payments[transaction_id]['submitted']
+        return line['timestamp'] is None or submitted is None or abs(submitted - line['timestamp']) <= window
+
+    matched, ambiguous, unmatched = [], [], []
+    unmatched_count = 0
+    lines_read = 0
+
+    for batch in read_statement(text_stream):
+        lines_read += len(batch)
+        for line in batch:
+            if line['amount'] is None:
+                unmatched_count += 1
+                if len(unmatched) < MAX_UNMATCHED_DETAIL:
+                    unmatched.append(dict(_line_summary(line), reason='invalid_amount'))
+                continue
+            if line['amount'] <= 0:
+                unmatched_count += 1
+                if len(unmatched) < MAX_UNMATCHED_DETAIL:
+                    unmatched.append(dict(_line_summary(line), reason='not_a_credit'))
+                continue
+
+            # 1. Reference
+            by_reference = index.available(index.by_reference.get(line['reference'], [])) if line['reference'] else []
+            if len(by_reference) == 1:
+                transaction_id = by_reference[0]
+                if index.payments[transaction_id]['amount'] == line['amount']:
+                    matched.append({'line': _line_summary(line), 'payment': _payment_summary(index.take(transaction_id)),
+                                    'method': 'reference', 'exact': True})
+                else:
+                    ambiguous.append({'line': _line_summary(line), 'reason': 'amount_mismatch',
+                                      'candidates': [_payment_summary(index.payments[transaction_id])]})
+                continue
+            if len(by_reference) > 1:
+                ambiguous.append({'line': _line_summary(line), 'reason': 'duplicate_reference',
+                                  'candidates': [_payment_summary(index.payments[t]) for t in by_reference]})
+                continue
+
+            # 2. Phone and amount within the time window
+            by_phone = []
+            if line['phone']:
+                by_phone = [t for t in index.available(index.by_phone_amount.get((line['phone'], line['amount']), []))
+                            if in_window(line, t)]
+            if len(by_phone) == 1:
+                matched.append({'line': _line_summary(line), 'payment': _payment_summary(index.take(by_phone[0])),
+                                'method': 'phone_amount', 'exact': False})
+            elif by_phone:
+                ambiguous.append({'line': _line_summary(line), 'reason': 'multiple_candidates',
+                                  'candidates': [_payment_summary(index.payments[t]) for t in by_phone]})
+            else:
+                unmatched_count += 1
+                if len(unmatched) < MAX_UNMATCHED_DETAIL:
+                    unmatched.append(dict(_line_summary(line), reason='no_pending_payment'))
+
+    return {
+        'lines_read': lines_read,
+        'pending_payments': len(rows),
+        'matched_count': len(matched),
+        'exact_match_count': sum(1 for m in matched if m['exact']),
+        'ambiguous_count': len(ambiguous),
+        'unmatched_count': unmatched_count,
+        'matched': matched,
+        'ambiguous': ambiguous,
+        'unmatched': unmatched,
+        'unmatched_payments': [_payment_summary(p) for p in index.payments.values()],
+    }
@@ -0,0 +1,220 @@
+"""
+Storage Garbage Collector
+Finds files on disk that no document row references (including thumbnails
+and previews) and deletes or quarantines them.
+"""
+import os
+import time
+import shutil
+import datetime
+from typing import Dict, Iterator, List, Set, Tuple
+from sqlalchemy import bindparam
+from project import db
+from project.api import storage_ledger
+
+
+# Directories the collector walks; everything else under the upload root is
+# either transient (temp) or managed separately (dictionaries, quarantine)
+THUMBNAIL_DIRECTORIES = ('thumbnails', 'previews')
+SKIP_DIRECTORIES = {'temp', 'dictionaries', 'quarantine'}
+
+# (table, soft-delete timestamp column) for every table that stores file paths
+DOCUMENT_TABLES = (
+    ('activity_documents', 'deleted_date'),
+    ('group_documents', 'deleted_date'),
+    ('transaction_documents', 'deleted_at'),
+)
+
+PATH_COLUMNS = ('file_path', 'thumbnail_path', 'preview_path')
+
+
+def _build_reference_query():
+    """
+    One UNION query returning which of a batch of paths are still referenced.
+
+    A path counts as referenced if any live row points at it, or a soft-deleted
+    row that is still inside the retention window.
+    """
+    selects = []
+    for table, deleted_column in DOCUMENT_TABLES:
+        for column in PATH_COLUMNS:
+            selects.append(
+                f"SELECT {column} AS path FROM {table} "
+                f"WHERE {column} IN :paths "
+                f"AND (is_deleted IS NOT TRUE OR {deleted_column} IS NULL OR {deleted_column} > :retention_cutoff)"
+            )
+    return db.text(" UNION ".join(selects)).bindparams(bindparam('paths', expanding=True))
+
+
+def iter_stored_files(base_folder: str) -> Iterator[Tuple[str, os.stat_result]]:
+    """
+    Stream (path, stat) for every stored file without building the full list.
+
+    Walks entity directories (<type>s/<id>/) and the shared thumbnail and
+    preview directories.
+    """
+    with os.scandir(base_folder) as top_entries:
+        top_dirs = [entry.path for entry in top_entries
+                    if entry.is_dir(follow_symlinks=False) and entry.name not in SKIP_DIRECTORIES]
+
+    stack = top_dirs
+    while stack:
+        directory = stack.pop()
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(entry.path)
+                    elif entry.is_file(follow_symlinks=False):
+                        yield entry.path, entry.stat(follow_symlinks=False)
+        except FileNotFoundError:
+            continue
+
+
+class _RateLimiter:
+    """Spaces out destructive operations to at most `rate` per second."""
+
+    def __init__(self, rate: float = None):
+        self.interval = 1.0 / rate if rate else 0
+        self._next = time.monotonic()
+
+    def wait(self):
+        if not self.interval:
+            return
+        now = time.monotonic()
+        if now < self._next:
+            time.sleep(self._next - now)
+        self._next = max(now, self._next) + self.interval
+
+
+class OrphanedFileCollector:
+    """
+    Garbage collector for unreferenced upload files.
+
+    Files are checked against the document tables in batches with one
+    set-based query each, so the cost is one round trip per `batch_size`
+    files rather than one per file.
+    """
+
+    def __init__(self, base_folder: str, dry_run: bool = True, quarantine: bool = True,
+                 grace_period_seconds: int = 3600, retention_days: int = 30,
+                 batch_size: int = 500, max_files_per_second: float = None):
+        """
+        Args:
+            base_folder: Upload root
+            dry_run: Only report orphans, do not touch them
+            quarantine: Move orphans to quarantine/<date>/ instead of deleting them
+            grace_period_seconds: Skip files modified more recently (in-flight uploads)
+            retention_days: Keep files of soft-deleted documents for this many days
+            batch_size: Paths checked per database query
+            max_files_per_second: Optional limit on deletes/moves per second
+        """
+        self.base_folder = base_folder
+        self.dry_run = dry_run
+        self.quarantine = quarantine
+        self.grace_period_seconds = grace_period_seconds
+        self.retention_days = retention_days
+        self.batch_size = batch_size
+        self.rate_limiter = _RateLimiter(max_files_per_second)
+        self.quarantine_folder = os.path.join(
+            base_folder, 'quarantine', datetime.datetime.utcnow().strftime('%Y%m%d')
+        )
+        self.stats = {
+            'files_scanned': 0,
+            'files_in_grace_period': 0,
+            'orphans_found': 0,
+            'orphans_removed': 0,
+            'orphan_bytes': 0,
+            'temp_files_removed': 0,
+            'failed': 0,
+            'dry_run': dry_run,
+            'quarantine': quarantine
+        }
+
+    def _referenced_paths(self, paths: List[str]) -> Set[str]:
+        retention_cutoff = datetime.datetime.utcnow() - datetime.timedelta(days=self.retention_days)
+        rows = db.session.execute(
+            _build_reference_query(),
+            {'paths': paths, 'retention_cutoff': retention_cutoff}
+        ).fetchall()
+        return {row[0] for row in rows}
+
+    def _remove(self, path: str, size: int):
+        self.rate_limiter.wait()
+        try:
+            if self.quarantine:
+                target = os.path.join(self.quarantine_folder, os.path.relpath(path, self.base_folder))
+                os.makedirs(os.path.dirname(target), exist_ok=True)
+                shutil.move(path, target)
+            else:
+                os.remove(path)
+        except OSError:
+            self.stats['failed'] += 1
+            return
+
+        storage_ledger.record_file_change(self.base_folder, path, -1, -size)
+        self.stats['orphans_removed'] += 1
+
+    def _process_batch(self, batch: List[Tuple[str, int]]):
+        referenced = self._referenced_paths([path for path, _ in batch])
+        for path, size in batch:
+            if path in referenced:
+                continue
+            self.stats['orphans_found'] += 1
+            self.stats['orphan_bytes'] += size
+            if not self.dry_run:
+                self._remove(path, size)
+
+        if not self.dry_run:
+            db.session.commit()
+
+    def clean_temp(self):
+        """Remove temp/ leftovers older than the grace period."""
+        temp_folder = os.path.join(self.base_folder, 'temp')
+        if not os.path.isdir(temp_folder):
+            return
+        cutoff = time.time() - self.grace_period_seconds
+        with os.scandir(temp_folder) as entries:
+            for entry in entries:
+                if entry.is_file(follow_symlinks=False) and entry.stat().st_mtime < cutoff:
+                    if not self.dry_run:
+                        self.rate_limiter.wait()
+                        try:
+                            os.remove(entry.path)
+                        except OSError:
+                            self.stats['failed'] += 1
+                            continue
+                    self.stats['temp_files_removed'] += 1
+
+    def purge_quarantine(self, older_than_days: int):
+        """Permanently delete quarantine folders older than the given number of days."""
+        quarantine_root = os.path.join(self.base_folder, 'quarantine')
+        if self.dry_run or not os.path.isdir(quarantine_root):
+            return
+        cutoff = (datetime.datetime.utcnow() - datetime.timedelta(days=older_than_days)).strftime('%Y%m%d')
+        with os.scandir(quarantine_root) as entries:
+            for entry in entries:
+                if entry.is_dir() and entry.name.isdigit() and entry.name < cutoff:
+                    shutil.rmtree(entry.path, ignore_errors=True)
+
+    def run(self) -> Dict:
+        """Run a full collection pass and return statistics."""
+        cutoff = time.time() - self.grace_period_seconds
+        batch = []
+
+        for path, stat in iter_stored_files(self.base_folder):
+            self.stats['files_scanned'] += 1
+            if stat.st_mtime >= cutoff:
+                self.stats['files_in_grace_period'] += 1
+                continue
+            batch.append((path, stat.st_size))
+            if len(batch) >= self.batch_size:
+                self._process_batch(batch)
+                batch = []
+
+        if batch:
+            self._process_batch(batch)
+
+        self.clean_temp()
+        self.stats['orphan_bytes_mb'] = round(self.stats['orphan_bytes'] / (1024 * 1024), 2)
+        return self.stats
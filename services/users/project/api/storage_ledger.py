@@ -0,0 +1,389 @@
+"""
+Storage Usage Ledger
+Per-entity, per-group and global storage counters maintained on upload and
+delete, so storage-usage endpoints are constant-time reads instead of
+directory walks. A reconciliation pass re-walks the tree and corrects drift.
+"""
+import os
+import datetime
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, List, Optional, Tuple
+from sqlalchemy import bindparam
+from project import db
+from project.api.archival import HISTORY_SQL
+from project.api.compression_codecs import CodecRegistry
+
+
+SCOPE_ENTITY = 'ENTITY'
+SCOPE_GROUP = 'GROUP'
+SCOPE_GLOBAL = 'GLOBAL'
+
+# Top-level upload directories that do not belong to an entity
+NON_ENTITY_DIRECTORIES = {'previews', 'thumbnails', 'temp', 'dictionaries', 'quarantine'}
+
+# Entity directories are "<entity_type>s"; the legacy documents API uses "activities"
+DIRECTORY_ALIASES = {'activities': 'activity'}
+
+# SQL resolving the owning group of each entity type (ids is an expanding IN list)
+GROUP_LOOKUP_SQL = {
+    'group': "SELECT id, id FROM savings_groups WHERE id IN :ids",
+    'member': "SELECT id, group_id FROM group_members WHERE id IN :ids",
+    'meeting': "SELECT id, group_id FROM meetings WHERE id IN :ids",
+    'activity': """
+        SELECT ma.id, m.group_id FROM meeting_activities ma
+        JOIN meetings m ON m.id = ma.meeting_id WHERE ma.id IN :ids
+    """,
+    'training': """
+        SELECT tr.id, m.group_id FROM training_records tr
+        JOIN meetings m ON m.id = tr.meeting_id WHERE tr.id IN :ids
+    """,
+    'voting': """
+        SELECT vr.id, m.group_id FROM voting_records vr
+        JOIN meetings m ON m.id = vr.meeting_id WHERE vr.id IN :ids
+    """,
+    'loan_repayment': f"""
+        SELECT lr.id, gl.group_id FROM {HISTORY_SQL['loan_repayments']} lr
+        JOIN group_loans gl ON gl.id = lr.loan_id WHERE lr.id IN :ids
+    """,
+    'fine': f"""
+        SELECT mf.id, gm.group_id FROM {HISTORY_SQL['member_fines']} mf
+        JOIN group_members gm ON gm.id = mf.member_id WHERE mf.id IN :ids
+    """,
+    'savings': f"""
+        SELECT st.id, gm.group_id FROM {HISTORY_SQL['saving_transactions']} st
+        JOIN member_savings ms ON ms.id = st.member_saving_id
+        JOIN group_members gm ON gm.id = ms.member_id WHERE st.id IN :ids
+    """,
+}
+
+UPSERT_SQL = """
+    INSERT INTO storage_usage
+        (scope, entity_type, entity_id, file_category, group_id, file_count, total_size, updated_date)
+    VALUES
+        (:scope, :entity_type, :entity_id, :file_category, :group_id, :file_count, :total_size, :now)
+    ON CONFLICT (scope, entity_type, entity_id, file_category) DO UPDATE SET
+        file_count = storage_usage.file_count + excluded.file_count,
+        total_size = storage_usage.total_size + excluded.total_size,
+        group_id = COALESCE(excluded.group_id, storage_usage.group_id),
+        updated_date = excluded.updated_date
+"""
+
+
+def directory_entity_type(directory_name: str) -> str:
+    """Map an upload directory name back to its entity type."""
+    if directory_name in DIRECTORY_ALIASES:
+        return DIRECTORY_ALIASES[directory_name]
+    return directory_name[:-1] if directory_name.endswith('s') else directory_name
+
+
+def file_category(filename: str) -> str:
+    """Category of a stored file, ignoring any compression extension."""
+    from project.api.file_storage_service import FileStorageService
+
+    # Stored names are <uuid>.<ext>; a bare <uuid>.gz is a user's gzip upload
+    name = CodecRegistry.strip_extension(filename)
+    if '.' not in name:
+        name = filename
+    return FileStorageService.get_file_category(FileStorageService.get_file_extension(name))
+
+
+def parse_storage_path(base_folder: str, file_path: str) -> Optional[Tuple[str, int]]:
+    """
+    Extract (entity_type, entity_id) from a path like <base>/<entity_type>s/<id>/<file>.
+
+    Returns:
+        Tuple of (entity_type, entity_id), or None for files outside entity directories
+    """
+    relative = os.path.relpath(os.path.abspath(file_path), os.path.abspath(base_folder))
+    parts = relative.split(os.sep)
+    if len(parts) != 3 or parts[0] in NON_ENTITY_DIRECTORIES or not parts[1].isdigit():
+        return None
+    return directory_entity_type(parts[0]), int(parts[1])
+
+
+def resolve_group_ids(entity_type: str, entity_ids: Iterable[int]) -> Dict[int, int]:
+    """
+    Resolve the owning group of many entities of one type in a single query.
+
+    Returns:
+        Mapping of entity_id to group_id (entities that no longer exist are omitted)
+    """
+    entity_ids = list(set(entity_ids))
+    sql = GROUP_LOOKUP_SQL.get(entity_type)
+    if not sql or not entity_ids:
+        return {}
+
+    query = db.text(sql).bindparams(bindparam('ids', expanding=True))
+    rows = db.session.execute(query, {'ids': entity_ids}).fetchall()
+    return {row[0]: row[1] for row in rows}
+
+
+def _ledger_rows(entity_type: str, entity_id: int, category: str, group_id: Optional[int],
+                 count_delta: int, size_delta: int, now: datetime.datetime) -> List[Dict]:
+    """Build the ENTITY/GROUP/GLOBAL upsert parameters for one delta."""
+    base = {'entity_type': entity_type, 'file_category': category, 'group_id': group_id,
+            'file_count': count_delta, 'total_size': size_delta, 'now': now}
+    rows = [dict(base, scope=SCOPE_ENTITY, entity_id=entity_id)]
+    if group_id is not None:
+        rows.append(dict(base, scope=SCOPE_GROUP, entity_id=group_id))
+    rows.append(dict(base, scope=SCOPE_GLOBAL, entity_id=0, group_id=None))
+    return rows
+
+
+def record_usage(entity_type: str, entity_id: int, category: str,
+                 count_delta: int, size_delta: int, group_id: int = None):
+    """
+    Apply a file count/size delta to the ledger.
+
+    The update is an atomic increment, so concurrent uploads never lose
+    counts. It runs in the caller's transaction and commits with it.
+
+    Args:
+        entity_type: Type of entity (activity, group, member, meeting, ...)
+        entity_id: ID of entity
+        category: File category (documents, images, ...)
+        count_delta: Change in number of files
+        size_delta: Change in stored bytes
+        group_id: Owning group, resolved from the entity if omitted
+    """
+    if count_delta == 0 and size_delta == 0:
+        return
+    if group_id is None:
+        group_id = resolve_group_ids(entity_type, [entity_id]).get(entity_id)
+
+    now = datetime.datetime.utcnow()
+    db.session.execute(
+        db.text(UPSERT_SQL),
+        _ledger_rows(entity_type, entity_id, category, group_id, count_delta, size_delta, now)
+    )
+
+
+def record_file_change(base_folder: str, file_path: str, count_delta: int, size_delta: int,
+                       group_id: int = None):
+    """
+    Apply a delta for a stored file, deriving entity and category from its path.
+
+    Files outside entity directories (thumbnails, previews, temp) are ignored.
+    Pass group_id when the owning entity has already been deleted.
+    """
+    entity = parse_storage_path(base_folder, file_path)
+    if entity is None:
+        return
+    entity_type, entity_id = entity
+    record_usage(entity_type, entity_id, file_category(os.path.basename(file_path)),
+                 count_delta, size_delta, group_id)
+
+
+def _usage_rows(scope: str, entity_id: int, entity_type: str = None):
+    query = "SELECT entity_type, file_category, file_count, total_size FROM storage_usage " \
+            "WHERE scope = :scope AND entity_id = :entity_id"
+    params = {'scope': scope, 'entity_id': entity_id}
+    if entity_type:
+        query += " AND entity_type = :entity_type"
+        params['entity_type'] = entity_type
+    return db.session.execute(db.text(query), params).fetchall()
+
+
+def _summarize(rows, include_entity_types: bool) -> Dict:
+    total_files = 0
+    total_size = 0
+    by_category = {}
+    by_entity_type = {}
+
+    for entity_type, category, count, size in rows:
+        if not count and not size:
+            continue
+        total_files += count
+        total_size += size
+        entry = by_category.setdefault(category, {'count': 0, 'size': 0})
+        entry['count'] += count
+        entry['size'] += size
+        entry = by_entity_type.setdefault(entity_type, {'count': 0, 'size': 0})
+        entry['count'] += count
+        entry['size'] += size
+
+    result = {
+        'total_files': total_files,
+        'total_size': total_size,
+        'total_size_mb': round(total_size / (1024 * 1024), 2),
+        'by_category': by_category
+    }
+    if include_entity_types:
+        result['total_size_gb'] = round(total_size / (1024 * 1024 * 1024), 2)
+        result['by_entity_type'] = by_entity_type
+    return result
+
+
+def get_entity_usage(entity_type: str, entity_id: int) -> Dict:
+    """Storage usage of a single entity directory."""
+    return _summarize(_usage_rows(SCOPE_ENTITY, entity_id, entity_type), include_entity_types=False)
+
+
+def get_group_usage(group_id: int) -> Dict:
+    """Storage usage of everything belonging to a group (meetings, activities, members, ...)."""
+    return _summarize(_usage_rows(SCOPE_GROUP, group_id), include_entity_types=True)
+
+
+def get_global_usage() -> Dict:
+    """Storage usage across all groups."""
+    return _summarize(_usage_rows(SCOPE_GLOBAL, 0), include_entity_types=True)
+
+
+def _scan_entity_directory(task: Tuple[str, int, str]) -> Tuple[str, int, Dict[str, List[int]]]:
+    """Count files and bytes per category in one entity directory."""
+    entity_type, entity_id, path = task
+    usage = {}
+    try:
+        with os.scandir(path) as entries:
+            for entry in entries:
+                if entry.is_file(follow_symlinks=False):
+                    counts = usage.setdefault(file_category(entry.name), [0, 0])
+                    counts[0] += 1
+                    counts[1] += entry.stat(follow_symlinks=False).st_size
+    except FileNotFoundError:
+        pass
+    return entity_type, entity_id, usage
+
+
+def scan_storage_tree(base_folder: str, max_workers: int = 8) -> Dict[Tuple[str, int, str], List[int]]:
+    """
+    Walk all entity directories in parallel.
+
+    Returns:
+        Mapping of (entity_type, entity_id, category) to [file_count, total_size]
+    """
+    tasks = []
+    with os.scandir(base_folder) as type_dirs:
+        for type_dir in type_dirs:
+            if not type_dir.is_dir() or type_dir.name in NON_ENTITY_DIRECTORIES:
+                continue
+            entity_type = directory_entity_type(type_dir.name)
+            with os.scandir(type_dir.path) as entity_dirs:
+                for entity_dir in entity_dirs:
+                    if entity_dir.is_dir() and entity_dir.name.isdigit():
+                        tasks.append((entity_type, int(entity_dir.name), entity_dir.path))
+
+    totals = {}
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        for entity_type, entity_id, usage in executor.map(_scan_entity_directory, tasks):
+            for category, (count, size) in usage.items():
+                counts = totals.setdefault((entity_type, entity_id, category), [0, 0])
+                counts[0] += count
+                counts[1] += size
+    return totals
+
+
+def _reconcile_rollups(now: datetime.datetime) -> int:
+    """Bring GROUP and GLOBAL rows back in line with the sum of ENTITY rows."""
+    corrections = []
+    rollup_queries = (
+        (SCOPE_GROUP, """
+            SELECT entity_type, group_id, file_category, SUM(file_count), SUM(total_size)
+            FROM storage_usage WHERE scope = :entity_scope AND group_id IS NOT NULL
+            GROUP BY entity_type, group_id, file_category
+        """),
+        (SCOPE_GLOBAL, """
+            SELECT entity_type, 0, file_category, SUM(file_count), SUM(total_size)
+            FROM storage_usage WHERE scope = :entity_scope
+            GROUP BY entity_type, file_category
+        """),
+    )
+    for scope, rollup_sql in rollup_queries:
+        expected = {}
+        rows = db.session.execute(db.text(rollup_sql), {'entity_scope': SCOPE_ENTITY}).fetchall()
+        for entity_type, rollup_id, category, count, size in rows:
+            expected[(entity_type, int(rollup_id), category)] = (int(count), int(size))
+
+        recorded = {}
+        rows = db.session.execute(db.text(
+            "SELECT entity_type, entity_id, file_category, file_count, total_size "
+            "FROM storage_usage WHERE scope = :scope"
+        ), {'scope': scope}).fetchall()
+        for entity_type, rollup_id, category, count, size in rows:
+            recorded[(entity_type, rollup_id, category)] = (count, size)
+
+        for key in set(expected) | set(recorded):
+            expected_count, expected_size = expected.get(key, (0, 0))
+            recorded_count, recorded_size = recorded.get(key, (0, 0))
+            if expected_count != recorded_count or expected_size != recorded_size:
+                entity_type, rollup_id, category = key
+                corrections.append({
+                    'scope': scope, 'entity_type': entity_type, 'entity_id': rollup_id,
+                    'file_category': category,
+                    'group_id': rollup_id if scope == SCOPE_GROUP else None,
+                    'file_count': expected_count - recorded_count,
+                    'total_size': expected_size - recorded_size,
+                    'now': now
+                })
+
+    if corrections:
+        db.session.execute(db.text(UPSERT_SQL), corrections)
+    return len(corrections)
+
+
+def reconcile_storage_usage(base_folder: str, max_workers: int = 8, dry_run: bool = False) -> Dict:
+    """
+    Re-walk the upload tree and correct ledger drift.
+
+    Corrections are applied as deltas through the same atomic upsert used by
+    uploads, so GROUP/GLOBAL rollups stay consistent and uploads running
+    concurrently with the reconciliation are not overwritten.
+
+    Args:
+        base_folder: Upload root
+        max_workers: Thread pool size for directory scanning
+        dry_run: If True, report drift without changing the ledger
+
+    Returns:
+        Dictionary with reconciliation statistics
+    """
+    actual = scan_storage_tree(base_folder, max_workers=max_workers)
+
+    recorded = {}
+    rows = db.session.execute(db.text(
+        "SELECT entity_type, entity_id, file_category, file_count, total_size, group_id "
+        "FROM storage_usage WHERE scope = :scope"
+    ), {'scope': SCOPE_ENTITY}).fetchall()
+    for entity_type, entity_id, category, count, size, group_id in rows:
+        recorded[(entity_type, entity_id, category)] = (count, size, group_id)
+
+    drift = []
+    for key in set(actual) | set(recorded):
+        actual_count, actual_size = actual.get(key, (0, 0))
+        recorded_count, recorded_size, group_id = recorded.get(key, (0, 0, None))
+        if actual_count != recorded_count or actual_size != recorded_size:
+            drift.append((key, actual_count - recorded_count, actual_size - recorded_size, group_id))
+
+    # Resolve groups for drifting entities without a recorded group, one query per type
+    missing_groups = {}
+    for (entity_type, entity_id, _), _, _, group_id in drift:
+        if group_id is None:
+            missing_groups.setdefault(entity_type, set()).add(entity_id)
+    resolved = {
+        entity_type: resolve_group_ids(entity_type, ids)
+        for entity_type, ids in missing_groups.items()
+    }
+
+    rollups_corrected = 0
+    if not dry_run:
+        now = datetime.datetime.utcnow()
+        if drift:
+            params = []
+            for (entity_type, entity_id, category), count_delta, size_delta, group_id in drift:
+                if group_id is None:
+                    group_id = resolved.get(entity_type, {}).get(entity_id)
+                params.extend(_ledger_rows(entity_type, entity_id, category, group_id,
+                                           count_delta, size_delta, now))
+            db.session.execute(db.text(UPSERT_SQL), params)
+
+        rollups_corrected = _reconcile_rollups(now)
+        db.session.commit()
+
+    return {
+        'entities_scanned': len({(t, i) for t, i, _ in actual}),
+        'rows_corrected': len(drift),
+        'rollups_corrected': rollups_corrected,
+        'file_count_drift': sum(d[1] for d in drift),
+        'size_drift': sum(d[2] for d in drift),
+        'dry_run': dry_run
+    }
@@ -297,8 +297,9 @@ def download_document(user_id, document_id):
         return jsonify({'status': 'error', 'message': 'File not found on server'}), 404
     
     try:
+        storage_service = get_file_storage_service()
         return send_file(
-            document.file_path,
+            storage_service.open_file(document.file_path, document.is_compressed),
             as_attachment=True,
             download_name=document.original_filename,
             mimetype=document.mime_type
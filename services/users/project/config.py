@@ -13,6 +13,21 @@ class BaseConfig:
     UPLOAD_FOLDER = os.environ.get('UPLOAD_FOLDER', '/app/uploads')
     MAX_CONTENT_LENGTH = 50 * 1024 * 1024  # 50MB max file size
 
+    # Read replicas, comma-separated URLs (a second Postgres, or a SQLite copy
+    # locally); GET requests and report jobs read from them
+    SQLALCHEMY_BINDS = {
+        f'replica_{i}': url.strip()
+        for i, url in enumerate(u for u in os.environ.get('DATABASE_REPLICA_URLS', '').split(',') if u.strip())
+    }
+    REPLICA_MAX_LAG_SECONDS = float(os.environ.get('REPLICA_MAX_LAG_SECONDS', 5))
+    REPLICA_LAG_CHECK_SECONDS = 5
+    READ_YOUR_WRITES_SECONDS = float(os.environ.get('READ_YOUR_WRITES_SECONDS', 10))
+
+    # Group settings/saving types cache shared by the workers of a host (a
+    # SQLite file; default: one per database in the temp directory)
+    SHARED_CACHE_PATH = os.environ.get('SHARED_CACHE_PATH')
+    SHARED_CACHE_TTL_SECONDS = 300
+
 
 class DevelopmentConfig(BaseConfig):
     """Development configuration."""
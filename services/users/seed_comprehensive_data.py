@@ -754,6 +754,7 @@ def create_meetings_with_all_transactions(groups, all_members):
                             group_id=group.id,
                             principal=loan_amount,
                             interest_rate=group.loan_interest_rate,
+                            interest_basis='TERM',
                             term_months=term_months,
                             monthly_payment=monthly_payment,
                             total_amount_due=total_amount_due,
@@ -93,6 +93,187 @@ ADD COLUMN IF NOT EXISTS is_current_version BOOLEAN DEFAULT TRUE,
 ADD COLUMN IF NOT EXISTS access_level VARCHAR(50) DEFAULT 'GROUP';
 " || echo "⚠️  Schema update skipped"
 
+# Storage usage ledger
+echo "📝 Creating storage_usage ledger table..."
+psql $DATABASE_URL -c "
+CREATE TABLE IF NOT EXISTS storage_usage (
+    id SERIAL PRIMARY KEY,
+    scope VARCHAR(20) NOT NULL,
+    entity_type VARCHAR(50) NOT NULL,
+    entity_id INTEGER NOT NULL,
+    file_category VARCHAR(50) NOT NULL,
+    group_id INTEGER,
+    file_count INTEGER NOT NULL DEFAULT 0,
+    total_size BIGINT NOT NULL DEFAULT 0,
+    updated_date TIMESTAMP NOT NULL DEFAULT NOW(),
+    CONSTRAINT uq_storage_usage_key UNIQUE (scope, entity_type, entity_id, file_category)
+);
+CREATE INDEX IF NOT EXISTS ix_storage_usage_group_id ON storage_usage (group_id);
+" || echo "⚠️  Storage ledger creation skipped"
+
+# Loan amortization schedules
+echo "📝 Creating loan_installments table..."
+psql $DATABASE_URL -c "
+ALTER TABLE group_loans ADD COLUMN IF NOT EXISTS interest_method VARCHAR(20) DEFAULT 'FLAT';
+ALTER TABLE group_loans ADD COLUMN IF NOT EXISTS interest_basis VARCHAR(20);
+-- Existing loans were written as principal x (1 + rate) over the whole term
+UPDATE group_loans SET interest_basis = CASE
+    WHEN ABS(total_amount_due - principal * (1 + interest_rate)) <= 0.01 THEN 'TERM'
+    ELSE 'MONTHLY'
+END
+WHERE interest_basis IS NULL;
+ALTER TABLE group_loans ALTER COLUMN interest_basis SET DEFAULT 'MONTHLY';
+CREATE TABLE IF NOT EXISTS loan_installments (
+    id SERIAL PRIMARY KEY,
+    loan_id INTEGER NOT NULL REFERENCES group_loans(id) ON DELETE CASCADE,
+    group_id INTEGER NOT NULL REFERENCES savings_groups(id),
+    member_id INTEGER NOT NULL REFERENCES group_members(id),
+    installment_number INTEGER NOT NULL,
+    due_date DATE NOT NULL,
+    principal_due NUMERIC(15, 2) NOT NULL,
+    interest_due NUMERIC(15, 2) NOT NULL,
+    amount_due NUMERIC(15, 2) NOT NULL,
+    balance_after NUMERIC(15, 2) NOT NULL,
+    amount_paid NUMERIC(15, 2) NOT NULL DEFAULT 0,
+    status VARCHAR(20) NOT NULL DEFAULT 'PENDING',
+    created_date TIMESTAMP NOT NULL DEFAULT NOW(),
+    CONSTRAINT uq_loan_installments_loan_number UNIQUE (loan_id, installment_number)
+);
+CREATE INDEX IF NOT EXISTS ix_loan_installments_group_due ON loan_installments (group_id, status, due_date);
+" || echo "⚠️  Loan installments creation skipped"
+
+# Cached portfolio reports
+echo "📝 Creating report_snapshots table..."
+psql $DATABASE_URL -c "
+CREATE TABLE IF NOT EXISTS report_snapshots (
+    id SERIAL PRIMARY KEY,
+    report_type VARCHAR(50) NOT NULL,
+    report_date DATE NOT NULL,
+    data TEXT NOT NULL,
+    generated_by INTEGER REFERENCES users(id),
+    created_date TIMESTAMP NOT NULL DEFAULT NOW(),
+    CONSTRAINT uq_report_snapshots_type_date UNIQUE (report_type, report_date)
+);
+" || echo "⚠️  Report snapshots creation skipped"
+
+# Member counters
+echo "📝 Adding member counter columns..."
+psql $DATABASE_URL -c "
+ALTER TABLE group_members
+ADD COLUMN IF NOT EXISTS meetings_attended INTEGER DEFAULT 0,
+ADD COLUMN IF NOT EXISTS meetings_total INTEGER DEFAULT 0;
+CREATE INDEX IF NOT EXISTS ix_group_members_group_contributions ON group_members (group_id, total_contributions);
+CREATE INDEX IF NOT EXISTS ix_group_members_group_attendance ON group_members (group_id, attendance_percentage);
+" || echo "⚠️  Member counter columns skipped"
+
+# Per-group meeting number sequences
+echo "📝 Creating group_sequences table..."
+psql $DATABASE_URL -c "
+CREATE TABLE IF NOT EXISTS group_sequences (
+    group_id INTEGER NOT NULL REFERENCES savings_groups(id) ON DELETE CASCADE,
+    name VARCHAR(50) NOT NULL,
+    last_value INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (group_id, name)
+);
+INSERT INTO group_sequences (group_id, name, last_value)
+SELECT group_id, 'meeting_number', MAX(meeting_number) FROM meetings GROUP BY group_id
+ON CONFLICT (group_id, name) DO UPDATE SET last_value = GREATEST(group_sequences.last_value, EXCLUDED.last_value);
+" || echo "⚠️  Group sequences creation skipped"
+
+psql $DATABASE_URL -c "
+DO \$\$ BEGIN
+    IF NOT EXISTS (SELECT 1 FROM pg_constraint WHERE conname = 'uq_meetings_group_number') THEN
+        ALTER TABLE meetings ADD CONSTRAINT uq_meetings_group_number UNIQUE (group_id, meeting_number);
+    END IF;
+END \$\$;
+" || echo "⚠️  Meeting number constraint skipped (duplicate meeting numbers need review)"
+
+# Foreign-key indexes used by the set-based cascade deletes
+echo "📝 Creating foreign key indexes..."
+psql $DATABASE_URL -c "
+CREATE INDEX IF NOT EXISTS ix_saving_transactions_member_saving_id ON saving_transactions (member_saving_id);
+CREATE INDEX IF NOT EXISTS ix_saving_transactions_meeting_id ON saving_transactions (meeting_id);
+CREATE INDEX IF NOT EXISTS ix_meeting_attendance_meeting_id ON meeting_attendance (meeting_id);
+CREATE INDEX IF NOT EXISTS ix_member_fines_meeting_id ON member_fines (meeting_id);
+CREATE INDEX IF NOT EXISTS ix_training_records_meeting_id ON training_records (meeting_id);
+CREATE INDEX IF NOT EXISTS ix_training_attendance_training_id ON training_attendance (training_id);
+CREATE INDEX IF NOT EXISTS ix_voting_records_meeting_id ON voting_records (meeting_id);
+CREATE INDEX IF NOT EXISTS ix_member_votes_voting_record_id ON member_votes (voting_record_id);
+CREATE INDEX IF NOT EXISTS ix_loan_repayments_meeting_id ON loan_repayments (meeting_id);
+CREATE INDEX IF NOT EXISTS ix_meeting_activities_meeting_id ON meeting_activities (meeting_id);
+CREATE INDEX IF NOT EXISTS ix_activity_documents_activity_id ON activity_documents (activity_id);
+CREATE INDEX IF NOT EXISTS ix_member_activity_participation_activity_id ON member_activity_participation (activity_id);
+" || echo "⚠️  Foreign key indexes skipped"
+
+# Archive tables for closed saving cycles, range-partitioned by date
+# (yearly partitions are added by manage.py archive_closed_cycles)
+echo "📝 Creating archive tables..."
+psql $DATABASE_URL -c "
+CREATE TABLE IF NOT EXISTS saving_transactions_archive (LIKE saving_transactions) PARTITION BY RANGE (transaction_date);
+CREATE TABLE IF NOT EXISTS saving_transactions_archive_default PARTITION OF saving_transactions_archive DEFAULT;
+CREATE INDEX IF NOT EXISTS ix_saving_transactions_archive_id ON saving_transactions_archive (id);
+CREATE INDEX IF NOT EXISTS ix_saving_transactions_archive_member_saving_id ON saving_transactions_archive (member_saving_id);
+CREATE INDEX IF NOT EXISTS ix_saving_transactions_archive_meeting_id ON saving_transactions_archive (meeting_id);
+CREATE TABLE IF NOT EXISTS meeting_attendance_archive (LIKE meeting_attendance) PARTITION BY RANGE (meeting_date);
+CREATE TABLE IF NOT EXISTS meeting_attendance_archive_default PARTITION OF meeting_attendance_archive DEFAULT;
+CREATE INDEX IF NOT EXISTS ix_meeting_attendance_archive_id ON meeting_attendance_archive (id);
+CREATE INDEX IF NOT EXISTS ix_meeting_attendance_archive_group_id ON meeting_attendance_archive (group_id);
+CREATE INDEX IF NOT EXISTS ix_meeting_attendance_archive_member_id ON meeting_attendance_archive (member_id);
+CREATE INDEX IF NOT EXISTS ix_meeting_attendance_archive_meeting_id ON meeting_attendance_archive (meeting_id);
+CREATE TABLE IF NOT EXISTS member_fines_archive (LIKE member_fines) PARTITION BY RANGE (fine_date);
+CREATE TABLE IF NOT EXISTS member_fines_archive_default PARTITION OF member_fines_archive DEFAULT;
+CREATE INDEX IF NOT EXISTS ix_member_fines_archive_id ON member_fines_archive (id);
+CREATE INDEX IF NOT EXISTS ix_member_fines_archive_member_id ON member_fines_archive (member_id);
+CREATE INDEX IF NOT EXISTS ix_member_fines_archive_meeting_id ON member_fines_archive (meeting_id);
+CREATE TABLE IF NOT EXISTS loan_repayments_archive (LIKE loan_repayments) PARTITION BY RANGE (repayment_date);
+CREATE TABLE IF NOT EXISTS loan_repayments_archive_default PARTITION OF loan_repayments_archive DEFAULT;
+CREATE INDEX IF NOT EXISTS ix_loan_repayments_archive_id ON loan_repayments_archive (id);
+CREATE INDEX IF NOT EXISTS ix_loan_repayments_archive_loan_id ON loan_repayments_archive (loan_id);
+CREATE INDEX IF NOT EXISTS ix_loan_repayments_archive_meeting_id ON loan_repayments_archive (meeting_id);
+CREATE INDEX IF NOT EXISTS ix_loan_repayments_archive_member_id ON loan_repayments_archive (member_id);
+" || echo "⚠️  Archive tables skipped"
+
+# End-of-cycle share-outs
+echo "📝 Creating share_outs tables..."
+psql $DATABASE_URL -c "
+CREATE TABLE IF NOT EXISTS share_outs (
+    id SERIAL PRIMARY KEY,
+    group_id INTEGER NOT NULL REFERENCES savings_groups(id) ON DELETE CASCADE,
+    cycle_number INTEGER NOT NULL,
+    cycle_start DATE NOT NULL,
+    cycle_end DATE NOT NULL,
+    status VARCHAR(20) NOT NULL DEFAULT 'DRAFT',
+    members_count INTEGER NOT NULL DEFAULT 0,
+    total_savings NUMERIC(15, 2) NOT NULL DEFAULT 0,
+    interest_income NUMERIC(15, 2) NOT NULL DEFAULT 0,
+    fine_income NUMERIC(15, 2) NOT NULL DEFAULT 0,
+    profit_pool NUMERIC(15, 2) NOT NULL DEFAULT 0,
+    total_payout NUMERIC(15, 2) NOT NULL DEFAULT 0,
+    total_share_days NUMERIC(20, 2) NOT NULL DEFAULT 0,
+    created_by INTEGER REFERENCES users(id),
+    posted_by INTEGER REFERENCES users(id),
+    posted_date TIMESTAMP,
+    created_date TIMESTAMP NOT NULL DEFAULT NOW(),
+    updated_date TIMESTAMP NOT NULL DEFAULT NOW(),
+    CONSTRAINT uq_share_outs_group_cycle UNIQUE (group_id, cycle_start)
+);
+CREATE TABLE IF NOT EXISTS share_out_items (
+    id SERIAL PRIMARY KEY,
+    share_out_id INTEGER NOT NULL REFERENCES share_outs(id) ON DELETE CASCADE,
+    member_id INTEGER NOT NULL REFERENCES group_members(id),
+    opening_balance NUMERIC(15, 2) NOT NULL DEFAULT 0,
+    deposits NUMERIC(15, 2) NOT NULL DEFAULT 0,
+    withdrawals NUMERIC(15, 2) NOT NULL DEFAULT 0,
+    closing_balance NUMERIC(15, 2) NOT NULL DEFAULT 0,
+    share_days NUMERIC(20, 2) NOT NULL DEFAULT 0,
+    share_percentage NUMERIC(7, 4) NOT NULL DEFAULT 0,
+    profit_share NUMERIC(15, 2) NOT NULL DEFAULT 0,
+    payout_amount NUMERIC(15, 2) NOT NULL DEFAULT 0,
+    outstanding_loans NUMERIC(15, 2) NOT NULL DEFAULT 0,
+    CONSTRAINT uq_share_out_items_member UNIQUE (share_out_id, member_id)
+);
+" || echo "⚠️  Share-out tables skipped"
+
 # Seed initial data
 echo "🌱 Seeding initial data..."
 python manage.py seed_db || echo "⚠️  Admin seeding skipped"
@@ -105,6 +286,22 @@ else
     echo "ℹ️  Demo data already seeded (delete /usr/src/app/.data_seeded to reseed)"
 fi
 
+# Backfill the storage ledger the first time it is introduced; drift is
+# corrected by running reconcile_storage_usage from cron or by hand
+if [ "$(psql $DATABASE_URL -tAc 'SELECT COUNT(*) FROM storage_usage')" = "0" ]; then
+    python manage.py reconcile_storage_usage || echo "⚠️  Storage usage backfill skipped"
+fi
+
+# Backfill installment schedules for loans created before loan_installments existed
+if [ "$(psql $DATABASE_URL -tAc 'SELECT COUNT(*) FROM loan_installments')" = "0" ]; then
+    python manage.py regenerate_loan_schedules || echo "⚠️  Loan schedule backfill skipped"
+fi
+
+# Backfill member counters the first time they are introduced
+if [ "$(psql $DATABASE_URL -tAc 'SELECT COUNT(*) FROM group_members WHERE meetings_total > 0')" = "0" ]; then
+    python manage.py recompute_member_counters || echo "⚠️  Member counter backfill skipped"
+fi
+
 # Start the Flask application
 echo "🎯 Starting Flask application on port 5001..."
 exec gunicorn -b 0.0.0.0:5001 --workers 4 --timeout 120 --access-logfile - --error-logfile - "project:create_app()"
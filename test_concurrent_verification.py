@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+"""
+Concurrency stress test for remote payment verification.
+Submits a batch of remote payments, has three officers verify every one of
+them at the same time, and checks that each payment was applied exactly
+once to the member's balance and contribution counters.
+"""
+
+import datetime
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+BASE_URL = "http://localhost:5001/api"
+
+MEMBER_EMAIL = "diana.mutesi@example.com"
+OFFICER_EMAILS = [
+    "alice.mukamana@example.com",
+    "betty.uwase@example.com",
+    "catherine.ingabire@example.com",
+]
+PASSWORD = "password123"
+
+PAYMENT_COUNT = 20
+PAYMENT_AMOUNT = 1000.50
+
+
+def login(email, password=PASSWORD):
+    response = requests.post(f"{BASE_URL}/auth/login", json={"email": email, "password": password})
+    if response.status_code != 200:
+        print(f"✗ Login failed for {email}: {response.status_code}")
+        return None
+    return {"Authorization": f"Bearer {response.json()['auth_token']}"}
+
+
+def find_member(headers, email):
+    """Return (group_id, member) for the member with this email."""
+    groups = requests.get(f"{BASE_URL}/savings-groups", headers=headers).json()['data']['groups']
+    for group in groups:
+        members = requests.get(f"{BASE_URL}/savings-groups/{group['id']}/members", headers=headers).json()
+        for member in members['data']['members']:
+            if member['email'] == email:
+                return group['id'], member
+    return None, None
+
+
+def member_totals(headers, group_id, member_id, saving_type_name):
+    """Deposits on one fund plus the member's contribution counters."""
+    dashboard = requests.get(f"{BASE_URL}/members/{member_id}/dashboard", headers=headers).json()['data']
+    fund = next((f for f in dashboard['savings']['by_fund'] if f['name'] == saving_type_name), None)
+    members = requests.get(f"{BASE_URL}/savings-groups/{group_id}/members", headers=headers).json()
+    member = next(m for m in members['data']['members'] if m['id'] == member_id)
+    return {
+        'fund_deposits': round(fund['total_deposits'] if fund else 0.0, 2),
+        'total_contributions': round(float(member['total_contributions']), 2),
+        'share_balance': round(float(member['share_balance']), 2),
+    }
+
+
+def test_concurrent_verification():
+    """Verify the same payments from several officers in parallel."""
+
+    print("\n" + "="*60)
+    print("CONCURRENT REMOTE PAYMENT VERIFICATION TEST")
+    print("="*60)
+
+    # 1. Login
+    print("\n1. Authenticating member and officers...")
+    member_headers = login(MEMBER_EMAIL)
+    officer_headers = [login(email) for email in OFFICER_EMAILS]
+    if not member_headers or not all(officer_headers):
+        return False
+    print(f"✓ Authenticated 1 member and {len(officer_headers)} officers")
+
+    # 2. Find the member's group
+    print("\n2. Finding member...")
+    group_id, member = find_member(officer_headers[0], MEMBER_EMAIL)
+    if not member:
+        print(f"✗ Member {MEMBER_EMAIL} not found")
+        return False
+    print(f"✓ {member['first_name']} {member['last_name']} (ID: {member['id']}) in group {group_id}")
+
+    # 3. Create a fresh meeting, so the member is not marked present
+    print("\n3. Creating meeting...")
+    response = requests.post(
+        f"{BASE_URL}/groups/{group_id}/meetings",
+        headers=officer_headers[0],
+        json={"meeting_date": datetime.date.today().isoformat(), "location": "Stress test"}
+    )
+    if response.status_code != 201:
+        print(f"✗ Failed to create meeting: {response.status_code} {response.text}")
+        return False
+    meeting_id = response.json()['meeting']['id']
+    print(f"✓ Created meeting {meeting_id}")
+
+    # 4. Submit remote payments
+    print(f"\n4. Submitting {PAYMENT_COUNT} remote payments of {PAYMENT_AMOUNT}...")
+    saving_types = requests.get(f"{BASE_URL}/meetings/{meeting_id}", headers=officer_headers[0]).json()['saving_types']
+    saving_type = None
+    transaction_ids = []
+    for candidate in saving_types:
+        response = requests.post(
+            f"{BASE_URL}/meetings/{meeting_id}/remote-payment",
+            headers=member_headers,
+            json={
+                "saving_type_id": candidate['id'],
+                "amount": PAYMENT_AMOUNT,
+                "mobile_money_reference": "STRESS-0",
+                "mobile_money_phone": "+256700000000"
+            }
+        )
+        if response.status_code == 201:
+            saving_type = candidate
+            transaction_ids.append(response.json()['data']['transaction_id'])
+            break
+    if not saving_type:
+        print("✗ No saving type accepted a remote payment")
+        return False
+
+    for i in range(1, PAYMENT_COUNT):
+        response = requests.post(
+            f"{BASE_URL}/meetings/{meeting_id}/remote-payment",
+            headers=member_headers,
+            json={
+                "saving_type_id": saving_type['id'],
+                "amount": PAYMENT_AMOUNT,
+                "mobile_money_reference": f"STRESS-{i}",
+                "mobile_money_phone": "+256700000000"
+            }
+        )
+        if response.status_code != 201:
+            print(f"✗ Failed to submit payment {i}: {response.status_code} {response.text}")
+            return False
+        transaction_ids.append(response.json()['data']['transaction_id'])
+    print(f"✓ Submitted {len(transaction_ids)} payments to {saving_type['name']}")
+
+    before = member_totals(officer_headers[0], group_id, member['id'], saving_type['name'])
+
+    # 5. Every officer verifies every payment at once
+    print(f"\n5. Verifying with {len(officer_headers)} officers in parallel...")
+
+    def verify(args):
+        transaction_id, headers = args
+        response = requests.put(
+            f"{BASE_URL}/savings-transactions/{transaction_id}/verify",
+            headers=headers,
+            json={"action": "VERIFY", "notes": "Stress test"}
+        )
+        return transaction_id, response.status_code
+
+    jobs = [(transaction_id, headers) for transaction_id in transaction_ids for headers in officer_headers]
+    with ThreadPoolExecutor(max_workers=len(jobs)) as pool:
+        results = list(pool.map(verify, jobs))
+
+    successes = {}
+    for transaction_id, status_code in results:
+        if status_code == 200:
+            successes[transaction_id] = successes.get(transaction_id, 0) + 1
+        elif status_code not in (400, 409):
+            print(f"✗ Unexpected status {status_code} verifying transaction {transaction_id}")
+            return False
+
+    double_verified = [t for t, count in successes.items() if count > 1]
+    unverified = [t for t in transaction_ids if t not in successes]
+    if double_verified or unverified:
+        print(f"✗ Double verified: {double_verified}, never verified: {unverified}")
+        return False
+    print(f"✓ {len(results)} requests, each payment verified exactly once")
+
+    # 6. Check final balances
+    print("\n6. Checking balances...")
+    after = member_totals(officer_headers[0], group_id, member['id'], saving_type['name'])
+    expected = round(PAYMENT_COUNT * PAYMENT_AMOUNT, 2)
+    passed = True
+    for field in before:
+        delta = round(after[field] - before[field], 2)
+        if delta == expected:
+            print(f"✓ {field}: +{delta}")
+        else:
+            print(f"✗ {field}: +{delta}, expected +{expected}")
+            passed = False
+
+    return passed
+
+
+if __name__ == "__main__":
+    success = test_concurrent_verification()
+    print("\n" + "="*60)
+    print("✓ TEST PASSED" if success else "✗ TEST FAILED")
+    print("="*60)
+    sys.exit(0 if success else 1)